@@ -0,0 +1,277 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import requests
+
+from batch import BatchSummary, ChannelCoalescer, HostLimiter, read_channel_urls, run_batch
+from filters import compile_filter
+from main import VideoEntry
+from title_index import TitleIndex
+from video_index import VideoIndex
+
+FEED = b"""<feed>
+    <entry>
+        <title>Video 1</title>
+        <published>2023-10-01T00:00:00+00:00</published>
+        <link href="https://www.youtube.com/watch?v=video1"/>
+    </entry>
+</feed>"""
+
+
+class FakeSession:
+    """A stand-in for requests.Session serving canned channel pages and feeds."""
+
+    def __init__(self, delays=None):
+        self.delays = delays or {}
+        self.requested = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.requested.append(url)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delays.get(url, 0.01))
+            if "missing" in url:
+                raise requests.exceptions.HTTPError("404 Client Error")
+            response = MagicMock()
+            handle = url.rsplit("@", 1)[-1]
+            channel_id = "UC" + handle.ljust(22, "x")
+            response.content = (
+                f'<meta property="og:url" content="https://www.youtube.com/channel/{channel_id}">'
+            ).encode()
+            response.iter_content.return_value = iter([FEED])
+            return response
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_read_channel_urls_skips_blanks_and_comments():
+    """
+    Test case for reading channel URLs from lines of text.
+
+    Steps:
+    1. Define input lines with blank lines, comments and surrounding whitespace.
+    2. Call the `read_channel_urls` function with the lines.
+    3. Assert that only the stripped channel URLs are returned.
+    """
+    lines = [
+        "# watchlist\n",
+        "https://www.youtube.com/@a\n",
+        "\n",
+        "  https://www.youtube.com/@b  \n",
+    ]
+    assert list(read_channel_urls(lines)) == [
+        "https://www.youtube.com/@a",
+        "https://www.youtube.com/@b",
+    ]
+
+
+def test_run_batch_yields_results_in_completion_order():
+    """
+    Test case for processing several channels concurrently.
+
+    This test verifies that `run_batch` yields each channel as soon as it is done, reports
+    failed channels, and never runs more requests against one host than the per-host limit.
+
+    Steps:
+    1. Define a fake session where the first channel page is slow and one channel is missing.
+    2. Call the `run_batch` function with the channel URLs and a per-host limit of 2.
+    3. Assert that the slow channel is yielded last and the missing channel failed.
+    4. Assert that at most two requests were in flight at the same time.
+    """
+    urls = [
+        "https://www.youtube.com/@slow",
+        "https://www.youtube.com/@fast",
+        "https://www.youtube.com/@missing",
+    ]
+    session = FakeSession(delays={urls[0]: 0.3})
+
+    results = list(run_batch(urls, max_workers=3, per_host_limit=2, session=session))
+
+    assert [result.url for result in results][-1] == urls[0]
+    by_url = {result.url: result for result in results}
+    assert by_url[urls[1]].ok
+    assert by_url[urls[1]].channel_id == "UCfast" + "x" * 18
+    assert by_url[urls[1]].videos[0]["title"] == "Video 1"
+    assert not by_url[urls[2]].ok
+    assert by_url[urls[2]].error == "Channel ID not found."
+    assert session.max_in_flight <= 2
+
+
+def test_run_batch_fetches_each_channel_once():
+    """
+    Test case for coalescing the URL forms of the same channel.
+
+    Steps:
+    1. Define four forms of the same channel URL: a handle URL, a mobile URL with a suffix and
+       a tracking query string, a URL without a scheme, and the '/channel/' URL.
+    2. Call the `run_batch` function with the URLs, all processed concurrently.
+    3. Assert that every URL gets a result with the same channel ID and videos.
+    4. Assert that the channel page and the feed, whose fetches overlap, were each fetched once.
+    """
+    channel_id = "UC" + "dup".ljust(22, "x")
+    feed_url = f"https://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"
+    urls = [
+        "https://www.youtube.com/@dup",
+        "https://m.youtube.com/@Dup/videos?si=tracking",
+        "youtube.com/@dup/featured",
+        f"https://www.youtube.com/channel/{channel_id}",
+    ]
+    session = FakeSession(delays={"https://www.youtube.com/@dup": 0.1, feed_url: 0.3})
+    results = list(run_batch(urls, max_workers=4, session=session))
+
+    assert sorted(result.url for result in results) == sorted(urls)
+    assert {result.channel_id for result in results} == {channel_id}
+    assert all(result.videos[0]["title"] == "Video 1" for result in results)
+    assert sorted(session.requested) == ["https://www.youtube.com/@dup", feed_url]
+
+
+def test_channel_coalescer_keeps_resolutions_but_not_feeds():
+    """
+    Test case for the results a channel coalescer keeps for the rest of a run.
+
+    Steps:
+    1. Resolve a channel URL twice in turn, and fetch the feed of its channel twice in turn.
+    2. Assert that the resolution ran once and was reused.
+    3. Assert that the feed was fetched each time, as its result is dropped once fetched.
+    """
+    coalescer = ChannelCoalescer()
+    resolve = MagicMock(return_value="UC" + "x" * 22)
+    fetch = MagicMock(return_value=[])
+    for _ in range(2):
+        assert coalescer.resolve("https://www.youtube.com/@x", resolve) == "UC" + "x" * 22
+        assert coalescer.fetch("UC" + "x" * 22, fetch) == []
+
+    assert resolve.call_count == 1
+    assert fetch.call_count == 2
+
+
+def test_run_batch_adds_fetched_feeds_to_title_index(tmp_path):
+    """
+    Test case for indexing the titles of the fetched feeds.
+
+    Steps:
+    1. Run a batch of two channels with a title index.
+    2. Assert that the video, which both fake feeds list, is indexed once and searchable.
+    """
+    urls = ["https://www.youtube.com/@first", "https://www.youtube.com/@second"]
+    with TitleIndex(tmp_path / "titles.sqlite3") as index:
+        list(run_batch(urls, max_workers=2, session=FakeSession(), title_index=index))
+
+        assert len(index) == 1
+        assert [entry.title for entry in index.search("video")] == ["Video 1"]
+
+
+def test_run_batch_records_only_videos_kept_by_filter(tmp_path):
+    """
+    Test case for combining the index of seen videos with a video filter.
+
+    Steps:
+    1. Run a batch of a channel with the index of seen videos and a filter rejecting its video.
+    2. Assert that no video is emitted and that the video is not recorded as seen.
+    3. Run it again with a filter keeping the video, and assert that the video is emitted.
+    """
+    urls = ["https://www.youtube.com/@first"]
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        rejecting = compile_filter(None, None, title_terms=["tutorial"])
+        (result,) = run_batch(
+            urls, session=FakeSession(), video_index=index, video_filter=rejecting
+        )
+        assert result.videos == []
+        assert "video1" not in index
+
+        (result,) = run_batch(urls, session=FakeSession(), video_index=index)
+        assert [video["title"] for video in result.videos] == ["Video 1"]
+        assert "video1" in index
+
+
+def test_run_batch_with_existing_index_records_only_videos_kept_by_filter(tmp_path):
+    """
+    Test case for combining a video filter with an index holding earlier videos of a channel.
+
+    Steps:
+    1. Record an older video of the channel in the index of seen videos.
+    2. Run a batch of the channel with a filter rejecting its new video.
+    3. Assert that no video is emitted and that the new video is not recorded as seen.
+    4. Run it again without the filter, and assert that the new video is emitted and recorded.
+    """
+    urls = ["https://www.youtube.com/@first"]
+    channel_id = "UC" + "first".ljust(22, "x")
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        older = VideoEntry(
+            "video0",
+            "Video 0",
+            "2023-09-01T00:00:00+00:00",
+            "https://www.youtube.com/watch?v=video0",
+            "First",
+        )
+        index.record(channel_id, older)
+        rejecting = compile_filter(None, None, title_terms=["tutorial"])
+        (result,) = run_batch(
+            urls, session=FakeSession(), video_index=index, video_filter=rejecting
+        )
+        assert result.videos == []
+        assert "video1" not in index
+
+        (result,) = run_batch(urls, session=FakeSession(), video_index=index)
+        assert [video["title"] for video in result.videos] == ["Video 1"]
+        assert len(index) == 2
+
+
+def test_batch_summary_counts_failures():
+    """
+    Test case for summarizing a batch run.
+
+    Steps:
+    1. Run a batch with one good and one missing channel.
+    2. Add every result to a `BatchSummary`.
+    3. Assert that the counts and the failure report are correct.
+    """
+    urls = ["https://www.youtube.com/@good", "https://www.youtube.com/@missing"]
+    summary = BatchSummary()
+    for result in run_batch(urls, max_workers=2, session=FakeSession()):
+        summary.add(result)
+
+    assert summary.total == 2
+    assert summary.succeeded == 1
+    assert str(summary).splitlines() == [
+        "Processed 2 channels: 1 succeeded, 1 failed.",
+        "FAILED https://www.youtube.com/@missing: Channel ID not found.",
+    ]
+
+
+def test_host_limiter_limits_per_host():
+    """
+    Test case for limiting concurrent work per host.
+
+    Steps:
+    1. Start four threads that each hold a slot of the same host for a short time.
+    2. Assert that no more than two slots were held at the same time.
+    """
+    limiter = HostLimiter(per_host_limit=2)
+    held = []
+    current = [0]
+    lock = threading.Lock()
+
+    def work():
+        with limiter.limit("https://www.youtube.com/@a"):
+            with lock:
+                current[0] += 1
+                held.append(current[0])
+            time.sleep(0.05)
+            with lock:
+                current[0] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(held) == 2
@@ -0,0 +1,92 @@
+import json
+
+import pytest
+import requests
+
+from benchmarks.bench_suite import run_suite, summarize
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+from main import get_youtube_channel_id, parse_feed_entries
+
+
+@pytest.mark.parametrize("engine", ["regex", "soup"])
+def test_corpus_pages_and_feeds_are_realistic(engine):
+    """
+    Test case for the synthetic corpus.
+
+    Steps:
+    1. Generate a corpus of two channels with 64 KiB pages.
+    2. Assert that both channel ID placements are used and the pages have the requested size.
+    3. Assert that the channel ID is extracted from every page with the given engine.
+    4. Assert that every feed parses into 15 entries.
+    """
+    corpus = Corpus(2, page_size=64 * 1024)
+
+    assert [channel.placement for channel in corpus] == ["meta", "script"]
+    for channel in corpus:
+        assert len(channel.page) == 64 * 1024
+        assert get_youtube_channel_id(channel.page, engine=engine) == channel.channel_id
+        assert len(parse_feed_entries([channel.feed], limit=20)) == 15
+
+
+def test_standin_serves_corpus_and_injects_errors():
+    """
+    Test case for the local YouTube stand-in.
+
+    Steps:
+    1. Serve a corpus from a stand-in and request a channel page, a feed and an unknown page.
+    2. Assert that the page and feed are served and the unknown page is a 404.
+    3. Serve the corpus with an error rate of 1 and assert that requests fail with a 503.
+    """
+    corpus = Corpus(1, page_size=1024)
+    channel = corpus.channels[0]
+    with StandInServer(corpus) as server:
+        assert requests.get(server.channel_url(channel.handle), timeout=5).content == channel.page
+        assert requests.get(server.feed_url(channel.channel_id), timeout=5).content == channel.feed
+        assert requests.get(server.channel_url("unknown"), timeout=5).status_code == 404
+        assert server.requests == 3
+
+    with StandInServer(corpus, error_rate=1.0) as server:
+        assert requests.get(server.channel_url(channel.handle), timeout=5).status_code == 503
+
+
+def test_run_suite_reports_every_stage():
+    """
+    Test case for the benchmark suite report.
+
+    Steps:
+    1. Run the suite over three small channels.
+    2. Assert that every stage timed three operations without errors.
+    3. Assert that the report holds the percentiles and is serializable as JSON.
+    """
+    report = run_suite(channels=3, page_size=16 * 1024)
+
+    assert list(report["stages"]) == [
+        "get_youtube_source_code",
+        "get_youtube_channel_id",
+        "fetch_rss_feed_content",
+        "filter_videos",
+        "end_to_end",
+    ]
+    for stage in report["stages"].values():
+        assert stage["count"] == 3
+        assert stage["errors"] == 0
+        assert 0 <= stage["p50_ms"] <= stage["p95_ms"] <= stage["p99_ms"]
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_summarize_percentiles():
+    """
+    Test case for summarizing stage latencies.
+
+    Steps:
+    1. Summarize 100 latencies of 1 to 100 milliseconds taking one second in total.
+    2. Assert that the percentiles, mean and throughput are correct.
+    """
+    summary = summarize([ms / 1000 for ms in range(1, 101)], errors=0, wall_time=1.0)
+
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p95_ms"] == pytest.approx(95.05)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["mean_ms"] == pytest.approx(50.5)
+    assert summary["throughput_per_s"] == 100
@@ -0,0 +1,158 @@
+from unittest.mock import patch
+
+from channel_cache import (
+    ChannelIdCache,
+    canonical_channel_url,
+    channel_id_from_url,
+    normalize_channel_url,
+)
+from main import lookup_channel_id
+
+CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+
+
+def test_normalize_channel_url_variants():
+    """
+    Test case for normalizing the different forms of a YouTube channel URL.
+
+    This test verifies that `normalize_channel_url` maps URLs that differ only in scheme,
+    host prefix, letter case, trailing path or query string to the same cache key.
+
+    Steps:
+    1. Define several forms of '/channel/', '/@handle', '/c/' and '/user/' URLs.
+    2. Call the `normalize_channel_url` function with each URL.
+    3. Assert that each URL is mapped to its expected cache key.
+    """
+    expected_keys = {
+        f"https://www.youtube.com/channel/{CHANNEL_ID}": f"channel/{CHANNEL_ID}",
+        f"http://m.youtube.com/channel/{CHANNEL_ID}/videos?view=0": f"channel/{CHANNEL_ID}",
+        "https://www.youtube.com/@GoogleDevelopers": "@googledevelopers",
+        "youtube.com/@googledevelopers/featured": "@googledevelopers",
+        "https://m.youtube.com/@GoogleDevelopers?si=abc#top": "@googledevelopers",
+        "https://www.youtube.com/c/GoogleDevelopers/videos": "c/googledevelopers",
+        "https://youtube.com/user/GoogleDevelopers": "user/googledevelopers",
+    }
+    for url, expected_key in expected_keys.items():
+        assert normalize_channel_url(url) == expected_key, url
+
+
+def test_normalize_channel_url_rejects_other_urls():
+    """
+    Test case for rejecting URLs that are not YouTube channel URLs.
+
+    Steps:
+    1. Call the `normalize_channel_url` function with non-channel URLs.
+    2. Assert that None is returned for each of them.
+    """
+    assert normalize_channel_url("https://example.com/@GoogleDevelopers") is None
+    assert normalize_channel_url("https://www.youtube.com/watch?v=dQw4w9WgXcQ") is None
+    assert normalize_channel_url("https://www.youtube.com/channel/not-an-id") is None
+    assert normalize_channel_url("https://www.youtube.com/") is None
+
+
+def test_channel_id_from_url():
+    """
+    Test case for extracting the channel ID from a '/channel/UC...' URL.
+
+    Steps:
+    1. Call the `channel_id_from_url` function with a '/channel/' URL and a handle URL.
+    2. Assert that only the '/channel/' URL yields a channel ID.
+    """
+    assert channel_id_from_url(f"https://m.youtube.com/channel/{CHANNEL_ID}/about") == CHANNEL_ID
+    assert channel_id_from_url("https://www.youtube.com/@GoogleDevelopers") is None
+
+
+def test_canonical_channel_url():
+    """
+    Test case for the canonical form of a YouTube channel URL.
+
+    Steps:
+    1. Call the `canonical_channel_url` function with a mobile handle URL carrying a suffix and
+       a tracking query string, and with a non-YouTube URL.
+    2. Assert that the handle URL is mapped to its canonical form and the other URL to None.
+    """
+    assert (
+        canonical_channel_url("https://m.youtube.com/@GoogleDevelopers/videos?si=abc")
+        == "https://www.youtube.com/@googledevelopers"
+    )
+    assert canonical_channel_url("https://example.com/@GoogleDevelopers") is None
+
+
+def test_channel_id_cache_persists_between_instances(tmp_path):
+    """
+    Test case for storing and reading back channel IDs across cache instances.
+
+    Steps:
+    1. Store a channel ID for a handle URL and close the cache.
+    2. Open a new cache on the same database file.
+    3. Assert that another form of the same URL resolves to the stored channel ID.
+    """
+    path = tmp_path / "channel_ids.sqlite3"
+    with ChannelIdCache(path) as cache:
+        cache.set("https://www.youtube.com/@GoogleDevelopers", CHANNEL_ID)
+
+    with ChannelIdCache(path) as cache:
+        assert cache.get("https://m.youtube.com/@googledevelopers/videos") == CHANNEL_ID
+        assert cache.get("https://www.youtube.com/@someone-else") is None
+
+
+def test_channel_id_cache_expires_entries(tmp_path):
+    """
+    Test case for expiring cache entries after their TTL.
+
+    Steps:
+    1. Store a channel ID with a TTL of 60 seconds.
+    2. Read it back 30 and 90 seconds later.
+    3. Assert that the entry is returned only before it expired, and is removed afterwards.
+    """
+    with ChannelIdCache(tmp_path / "cache.sqlite3", ttl=60) as cache:
+        with patch("channel_cache.time.time", return_value=1000.0):
+            cache.set("https://www.youtube.com/@GoogleDevelopers", CHANNEL_ID)
+        with patch("channel_cache.time.time", return_value=1030.0):
+            assert cache.get("https://www.youtube.com/@GoogleDevelopers") == CHANNEL_ID
+        with patch("channel_cache.time.time", return_value=1090.0):
+            assert cache.get("https://www.youtube.com/@GoogleDevelopers") is None
+        assert len(cache) == 0
+
+
+def test_channel_id_cache_evicts_least_recently_used(tmp_path):
+    """
+    Test case for evicting the least recently used entry once the cache is full.
+
+    Steps:
+    1. Fill a cache limited to two entries and read back the first entry.
+    2. Store a third entry.
+    3. Assert that the second entry, the least recently used one, was evicted.
+    """
+    with ChannelIdCache(tmp_path / "cache.sqlite3", max_entries=2) as cache:
+        with patch("channel_cache.time.time", return_value=1.0):
+            cache.set("https://www.youtube.com/@first", "UC" + "a" * 22)
+        with patch("channel_cache.time.time", return_value=2.0):
+            cache.set("https://www.youtube.com/@second", "UC" + "b" * 22)
+        with patch("channel_cache.time.time", return_value=3.0):
+            assert cache.get("https://www.youtube.com/@first") == "UC" + "a" * 22
+        with patch("channel_cache.time.time", return_value=4.0):
+            cache.set("https://www.youtube.com/@third", "UC" + "c" * 22)
+
+            assert len(cache) == 2
+            assert cache.get("https://www.youtube.com/@second") is None
+            assert cache.get("https://www.youtube.com/@first") == "UC" + "a" * 22
+
+
+def test_lookup_channel_id_without_network(tmp_path):
+    """
+    Test case for resolving channel IDs from the URL and the cache without any request.
+
+    Steps:
+    1. Mock the `requests.get` method.
+    2. Call the `lookup_channel_id` function with a '/channel/' URL, a cached URL and an
+       uncached URL.
+    3. Assert that the first two are resolved, the last is not, and no request was made.
+    """
+    with ChannelIdCache(tmp_path / "cache.sqlite3") as cache, patch("requests.get") as mock_get:
+        cache.set("https://www.youtube.com/@GoogleDevelopers", CHANNEL_ID)
+
+        assert lookup_channel_id(f"https://www.youtube.com/channel/{CHANNEL_ID}") == CHANNEL_ID
+        assert lookup_channel_id("https://youtube.com/@googledevelopers", cache) == CHANNEL_ID
+        assert lookup_channel_id("https://www.youtube.com/@unknown", cache) is None
+        mock_get.assert_not_called()
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from main import get_youtube_channel_id
+
+CORPUS_DIR = Path(__file__).parent / "fixtures" / "channel_pages"
+EXPECTED_IDS = json.loads((CORPUS_DIR / "expected.json").read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("page_name", sorted(EXPECTED_IDS))
+def test_channel_id_engines_agree_on_corpus(page_name):
+    """
+    Test case for the parity of the "regex" and "soup" channel ID engines.
+
+    This test runs both engines of `get_youtube_channel_id` over every saved channel page of
+    the corpus. It verifies that both engines return the same, expected channel ID.
+
+    Steps:
+    1. Read the saved channel page from the corpus.
+    2. Call the `get_youtube_channel_id` function with the "regex" and the "soup" engine.
+    3. Assert that both engines return the channel ID recorded in 'expected.json'.
+    """
+    html_source_code = (CORPUS_DIR / page_name).read_bytes()
+
+    regex_result = get_youtube_channel_id(html_source_code, engine="regex")
+    soup_result = get_youtube_channel_id(html_source_code, engine="soup")
+
+    assert regex_result == soup_result == EXPECTED_IDS[page_name]
+
+
+def test_channel_id_corpus_is_complete():
+    """
+    Test case for keeping 'expected.json' in sync with the saved channel pages.
+
+    Steps:
+    1. List the saved channel pages of the corpus.
+    2. Assert that every page has an expected channel ID and vice versa.
+    """
+    page_names = {path.name for path in CORPUS_DIR.glob("*.html")}
+    assert page_names == set(EXPECTED_IDS)
+
+
+def test_get_youtube_channel_id_unknown_engine():
+    """
+    Test case for rejecting an unknown channel ID engine.
+
+    Steps:
+    1. Call the `get_youtube_channel_id` function with an unknown engine.
+    2. Assert that a `ValueError` is raised.
+    """
+    with pytest.raises(ValueError):
+        get_youtube_channel_id(b"<html></html>", engine="lxml")
@@ -0,0 +1,244 @@
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import WebhookStandIn
+from delivery import Delivery, FileSink, Outbox, WebhookSink, create_sink
+from http_archive import HttpArchive
+from main import VideoEntry, create_rss_feed_url
+
+CHANNEL_ID = "UC" + "0" * 22
+
+
+def make_entries(count, start=0):
+    """Returns video entries with the video IDs 'v<start>' to 'v<start + count - 1>'."""
+    return [
+        VideoEntry(
+            f"v{number}",
+            f"Video {number}",
+            "2024-01-01T00:00:00+00:00",
+            f"https://www.youtube.com/watch?v=v{number}",
+            "Channel",
+        )
+        for number in range(start, start + count)
+    ]
+
+
+def wait_until(condition, timeout=5.0):
+    """Waits until a condition holds, returning whether it did before the timeout."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class FakeResponse:
+    """A stand-in for requests.Response with a status, headers and a body."""
+
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+        self.reason = "OK"
+        self.headers = {}
+
+
+class FlakySink:
+    """A sink raising an unexpected error for its first batches, then recording the batches."""
+
+    def __init__(self, failures):
+        self.name = "flaky"
+        self.failures = failures
+        self.batches = []
+
+    def send(self, records):
+        if self.failures:
+            self.failures -= 1
+            raise ValueError("unexpected sink error")
+        self.batches.append(records)
+
+    def close(self):
+        pass
+
+
+def test_batches_videos_by_size_and_window(tmp_path):
+    """
+    Test case for batching the videos sent to a webhook and a file.
+
+    Steps:
+    1. Deliver 25 videos to a webhook stand-in and a file, in batches of at most 10 videos.
+    2. Assert that two full batches are sent at once and the rest after the batch window.
+    3. Assert that every batch went over a single connection and that the file holds every
+       video as a JSON line, with its channel.
+    """
+    path = tmp_path / "videos.jsonl"
+    with WebhookStandIn() as server:
+        assert isinstance(create_sink(server.base_url), WebhookSink)
+        assert isinstance(create_sink(str(path)), FileSink)
+        delivery = Delivery(
+            [create_sink(server.base_url), create_sink(str(path))],
+            Outbox(tmp_path / "outbox.sqlite3"),
+            batch_size=10,
+            window=0.3,
+        )
+        for entry in make_entries(25):
+            delivery.deliver_video(entry, CHANNEL_ID, "https://www.youtube.com/@channel")
+
+        assert wait_until(lambda: len(server.batches) == 2)
+        assert [len(batch) for batch in server.batches] == [10, 10]
+        assert wait_until(lambda: len(server.batches) == 3)
+        delivery.close()
+
+    assert [video["video_id"] for video in server.videos] == [f"v{n}" for n in range(25)]
+    assert (server.requests, server.connections) == (3, 1)
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records == server.videos
+    assert records[0]["channel_id"] == CHANNEL_ID
+    assert delivery.stats() == {
+        "videos": 25,
+        "batches": 6,
+        "delivered": 50,
+        "failures": 0,
+        "outbox": 0,
+    }
+
+
+def test_failed_batches_are_retried_from_outbox(tmp_path):
+    """
+    Test case for storing the batches a webhook fails to take and retrying them.
+
+    Steps:
+    1. Deliver 12 videos in batches of 5 to a webhook stand-in answering with 503 errors.
+    2. Assert that queueing the videos does not wait for the webhook, and that the failed
+       batches are stored in the outbox.
+    3. Bring the webhook back up and assert that every batch is delivered, in order, and the
+       outbox emptied.
+    """
+    with WebhookStandIn(down=True, latency=0.05) as server:
+        delivery = Delivery(
+            [WebhookSink(server.base_url)],
+            Outbox(tmp_path / "outbox.sqlite3"),
+            batch_size=5,
+            window=0.05,
+            backoff=0.05,
+            max_backoff=0.1,
+        )
+        started = time.monotonic()
+        for entry in make_entries(12):
+            delivery.deliver_video(entry)
+        assert time.monotonic() - started < 0.05
+
+        assert wait_until(lambda: delivery.stats()["outbox"] == 3)
+        assert delivery.stats()["failures"] >= 1
+        server.down = False
+        assert wait_until(lambda: delivery.stats()["outbox"] == 0)
+        delivery.close()
+
+    assert [len(batch) for batch in server.batches] == [5, 5, 2]
+    assert [video["video_id"] for video in server.videos] == [f"v{n}" for n in range(12)]
+
+
+def test_unexpected_sink_errors_keep_batches_in_outbox(tmp_path, capsys):
+    """
+    Test case for a sink failing with an error that is neither a request nor an OS error.
+
+    Steps:
+    1. Deliver 3 videos in batches of 2 to a sink raising a ValueError for its first 2 batches.
+    2. Assert that the errors were logged and counted as failures.
+    3. Assert that the worker thread kept running and delivered every batch, in order, from the
+       outbox.
+    """
+    sink = FlakySink(failures=2)
+    with Outbox(tmp_path / "outbox.sqlite3") as outbox:
+        delivery = Delivery([sink], outbox, batch_size=2, window=0.0, backoff=0.01)
+        for entry in make_entries(3):
+            delivery.deliver_video(entry)
+        assert wait_until(lambda: len(sink.batches) == 2)
+        delivery.close()
+        assert delivery.stats()["failures"] == 2
+        assert len(outbox) == 0
+
+    assert (
+        "Error delivering to flaky: ValueError('unexpected sink error')" in capsys.readouterr().err
+    )
+    assert [[video["video_id"] for video in batch] for batch in sink.batches] == [
+        ["v0", "v1"],
+        ["v2"],
+    ]
+
+
+def test_outbox_is_retried_by_next_run(tmp_path):
+    """
+    Test case for delivering the batches left in the outbox by an earlier run.
+
+    Steps:
+    1. Deliver 3 videos to a webhook stand-in that is down, and close the delivery.
+    2. Assert that the batch stays in the outbox.
+    3. Start a delivery with the same outbox while the webhook is up, and assert that the
+       batch is delivered before the videos of the new run.
+    """
+    outbox_path = tmp_path / "outbox.sqlite3"
+    with WebhookStandIn(down=True) as server:
+        with Outbox(outbox_path) as outbox:
+            delivery = Delivery([WebhookSink(server.base_url)], outbox, window=0.0, backoff=60)
+            for entry in make_entries(3):
+                delivery.deliver_video(entry)
+            delivery.close()
+            assert len(outbox) == 1
+
+        server.down = False
+        with Outbox(outbox_path) as outbox:
+            with Delivery([WebhookSink(server.base_url)], outbox, window=10) as delivery:
+                for entry in make_entries(2, start=3):
+                    delivery.deliver_video(entry)
+            assert len(outbox) == 0
+
+    assert [len(batch) for batch in server.batches] == [3, 2]
+    assert [video["video_id"] for video in server.videos] == [f"v{n}" for n in range(5)]
+
+
+def test_main_delivers_videos(tmp_path):
+    """
+    Test case for delivering the videos of a channel with --deliver.
+
+    Steps:
+    1. Write an HTTP archive holding the page and feed of a channel.
+    2. Run main.py for the channel with --replay, delivering to a webhook stand-in and a file.
+    3. Assert that the 5 videos of the channel were sent in one batch to both sinks.
+    """
+    channel = Corpus(1, page_size=16 * 1024).channels[0]
+    archive_path = tmp_path / "capture.archive"
+    with HttpArchive(archive_path, mode="a") as archive:
+        archive.record(f"https://www.youtube.com/@{channel.handle}", FakeResponse(channel.page))
+        archive.record(create_rss_feed_url(channel.channel_id), FakeResponse(channel.feed))
+    path = tmp_path / "videos.jsonl"
+
+    with WebhookStandIn() as server:
+        subprocess.run(
+            [
+                sys.executable,
+                "main.py",
+                f"https://www.youtube.com/@{channel.handle}",
+                "--replay",
+                str(archive_path),
+                "--deliver",
+                server.base_url,
+                "--deliver",
+                str(path),
+                "--outbox",
+                str(tmp_path / "outbox.sqlite3"),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+        )
+
+    assert [len(batch) for batch in server.batches] == [5]
+    records = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert records == server.videos
+    assert {record["channel_id"] for record in records} == {channel.channel_id}
@@ -0,0 +1,134 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from feed_cache import FeedCache
+from main import fetch_rss_feed_content
+
+FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id=UC_x5XG1OV2P6uZZ5FSM9Ttw"
+FEED = b"""<feed>
+    <entry>
+        <title>Video 1</title>
+        <published>2023-10-01T00:00:00+00:00</published>
+        <link href="https://www.youtube.com/watch?v=video1"/>
+    </entry>
+</feed>"""
+
+
+def make_response(status_code, content=b"", headers=None):
+    """Builds a mocked requests.Response."""
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.headers = headers or {}
+    if status_code >= 400:
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError(str(status_code))
+    return response
+
+
+def test_feed_cache_revalidates_with_conditional_request(tmp_path):
+    """
+    Test case for revalidating a cached feed with a conditional request.
+
+    This test verifies that the second fetch of a feed sends the stored validators, and that a
+    '304 Not Modified' answer is served from the cache.
+
+    Steps:
+    1. Fetch a feed whose response carries an 'ETag' and a 'Last-Modified' header.
+    2. Fetch it again, answering with '304 Not Modified'.
+    3. Assert that the validators were sent and the cached body was returned.
+    4. Assert that the counters report one miss and one revalidation.
+    """
+    http_get = MagicMock(
+        side_effect=[
+            make_response(200, FEED, {"ETag": '"v1"', "Last-Modified": "Sun, 01 Oct 2023"}),
+            make_response(304),
+        ]
+    )
+    with FeedCache(tmp_path / "feeds.sqlite3") as cache:
+        assert cache.fetch(FEED_URL, http_get) == FEED
+        assert cache.fetch(FEED_URL, http_get) == FEED
+
+        assert http_get.call_args_list[0].kwargs["headers"] == {}
+        assert http_get.call_args_list[1].kwargs["headers"] == {
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Sun, 01 Oct 2023",
+        }
+        assert cache.stats() == {"hits": 0, "revalidations": 1, "misses": 1}
+
+
+def test_feed_cache_serves_fresh_feed_without_request(tmp_path):
+    """
+    Test case for serving a feed within the freshness window without any request.
+
+    Steps:
+    1. Fetch a feed with a freshness window of 60 seconds.
+    2. Fetch it again 30 seconds later, then 90 seconds later.
+    3. Assert that only the first and the last fetch sent a request.
+    """
+    http_get = MagicMock(return_value=make_response(200, FEED))
+    with FeedCache(tmp_path / "feeds.sqlite3", freshness=60) as cache:
+        with patch("feed_cache.time.time", return_value=1000.0):
+            cache.fetch(FEED_URL, http_get)
+        with patch("feed_cache.time.time", return_value=1030.0):
+            assert cache.fetch(FEED_URL, http_get) == FEED
+        with patch("feed_cache.time.time", return_value=1090.0):
+            cache.fetch(FEED_URL, http_get)
+
+        assert http_get.call_count == 2
+        assert cache.stats() == {"hits": 1, "revalidations": 0, "misses": 2}
+
+
+def test_feed_cache_propagates_errors(tmp_path):
+    """
+    Test case for failing requests through the feed cache.
+
+    Steps:
+    1. Fetch a feed whose request fails with '500 Internal Server Error'.
+    2. Assert that the HTTP error is raised and nothing was cached.
+    """
+    http_get = MagicMock(return_value=make_response(500))
+    with FeedCache(tmp_path / "feeds.sqlite3") as cache:
+        with pytest.raises(requests.exceptions.HTTPError):
+            cache.fetch(FEED_URL, http_get)
+        assert cache.get(FEED_URL) is None
+
+
+def test_feed_cache_rejects_not_modified_for_uncached_feed(tmp_path):
+    """
+    Test case for a '304 Not Modified' answer to a feed that is not cached.
+
+    Steps:
+    1. Fetch a feed that is not cached, answering with '304 Not Modified'.
+    2. Assert that an HTTP error is raised and no empty body was cached.
+    3. Fetch it again, answering with the feed, and assert that the feed is returned.
+    """
+    http_get = MagicMock(side_effect=[make_response(304), make_response(200, FEED)])
+    with FeedCache(tmp_path / "feeds.sqlite3") as cache:
+        with pytest.raises(requests.exceptions.HTTPError):
+            cache.fetch(FEED_URL, http_get)
+        assert cache.get(FEED_URL) is None
+
+        assert cache.fetch(FEED_URL, http_get) == FEED
+        assert cache.stats() == {"hits": 0, "revalidations": 0, "misses": 1}
+
+
+def test_fetch_rss_feed_content_with_feed_cache(tmp_path):
+    """
+    Test case for fetching an RSS feed through the feed cache.
+
+    Steps:
+    1. Mock the `requests.get` method to return the feed, then '304 Not Modified'.
+    2. Call the `fetch_rss_feed_content` function twice with a feed cache.
+    3. Assert that both calls return the parsed entries.
+    """
+    with FeedCache(tmp_path / "feeds.sqlite3") as cache, patch("requests.get") as mock_get:
+        mock_get.side_effect = [make_response(200, FEED, {"ETag": '"v1"'}), make_response(304)]
+
+        first = fetch_rss_feed_content(FEED_URL, feed_cache=cache)
+        second = fetch_rss_feed_content(FEED_URL, feed_cache=cache)
+
+        assert [entry.title for entry in first] == ["Video 1"]
+        assert second == first
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
@@ -0,0 +1,138 @@
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from benchmarks.corpus import Corpus, generate_feed
+from feed_entries import ALL_FIELDS, LazyEntry, check_fields, iter_entry_bytes
+from http_archive import HttpArchive
+from main import create_rss_feed_url, filter_videos, parse_feed_entries
+
+FEED = generate_feed("UC" + "0" * 22, "Tom & Jerry")
+
+
+class FakeResponse:
+    """A stand-in for requests.Response with a status, headers and a body."""
+
+    def __init__(self, content):
+        self.content = content
+        self.status_code = 200
+        self.reason = "OK"
+        self.headers = {}
+
+
+def test_lazy_entries_match_video_entries():
+    """
+    Test case for decoding the fields of lazy entries.
+
+    Steps:
+    1. Parse a YouTube feed into VideoEntry records, and into LazyEntry records from 100-byte
+       chunks.
+    2. Assert that both give the same video ID, title, date, link and unescaped author.
+    3. Assert that the media fields are decoded from the 'media:group' of the entries.
+    """
+    records = parse_feed_entries([FEED], limit=15)
+    chunks = [FEED[i : i + 100] for i in range(0, len(FEED), 100)]
+    entries = parse_feed_entries(iter(chunks), limit=15, fields=ALL_FIELDS)
+
+    assert len(entries) == 15
+    for record, entry in zip(records, entries):
+        assert tuple(getattr(entry, field) for field in record._fields) == record
+    entry = entries[0]
+    assert entry.author == "Tom & Jerry"
+    assert entry.thumbnail == f"https://i1.ytimg.com/vi/{entry.video_id}/hqdefault.jpg"
+    assert entry.description.startswith(f"{entry.title}. python tutorial")
+    assert isinstance(entry.views, int) and isinstance(entry.star_count, int)
+    assert entry.star_rating == 5.0
+
+
+def test_lazy_entry_decodes_projected_fields_on_first_access():
+    """
+    Test case for the projection and caching of lazy entry fields.
+
+    Steps:
+    1. Create a LazyEntry projected on the title and view count.
+    2. Assert that a field is decoded into its slot only when it is first read.
+    3. Assert that reading a field outside the projection raises an AttributeError.
+    4. Assert that unknown fields are rejected and that the entry can be pickled.
+    """
+    raw = next(iter_entry_bytes([FEED]))
+    entry = LazyEntry(raw, ("title", "views"))
+
+    with pytest.raises(AttributeError):
+        LazyEntry.title.__get__(entry)
+    title = entry.title
+    assert LazyEntry.title.__get__(entry) is title
+    assert entry.views > 0
+    with pytest.raises(AttributeError, match="projection"):
+        entry.link
+    assert getattr(entry, "description", None) is None
+
+    with pytest.raises(ValueError, match="likes"):
+        check_fields(["title", "likes"])
+    assert pickle.loads(pickle.dumps(entry)).title == title
+
+
+def test_lazy_parsing_stops_after_limit():
+    """
+    Test case for splitting entries from a stream and stopping at the limit.
+
+    Steps:
+    1. Feed the chunks of a YouTube feed cut in its third entry, followed by an error, with a
+       limit of 2.
+    2. Assert that two entries are returned without reading past them.
+    3. Filter the entries and assert that only the requested fields are returned.
+    """
+    third = FEED.index(b"<entry", FEED.index(b"<entry", FEED.index(b"<entry") + 1) + 1)
+    head = FEED[: third + 50]
+
+    def chunks():
+        yield from (head[i : i + 64] for i in range(0, len(head), 64))
+        raise AssertionError("read past the limit")
+
+    entries = parse_feed_entries(chunks(), limit=2, fields=("title", "published", "views"))
+
+    assert len(entries) == 2
+    videos = filter_videos(entries, fields=("title", "views"))
+    assert [set(video) for video in videos] == [{"title", "views"}] * 2
+
+
+def test_main_prints_requested_fields(tmp_path):
+    """
+    Test case for printing the fields given with --fields.
+
+    Steps:
+    1. Write an HTTP archive holding the page and feed of a channel.
+    2. Run main.py for the channel with --replay and --fields title,views,star_rating.
+    3. Assert that each video is printed with those fields only.
+    """
+    channel = Corpus(1, page_size=16 * 1024).channels[0]
+    path = tmp_path / "capture.archive"
+    with HttpArchive(path, mode="a") as archive:
+        archive.record(f"https://www.youtube.com/@{channel.handle}", FakeResponse(channel.page))
+        archive.record(create_rss_feed_url(channel.channel_id), FakeResponse(channel.feed))
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "main.py",
+            f"https://www.youtube.com/@{channel.handle}",
+            "--replay",
+            str(path),
+            "--fields",
+            "title,views,star_rating",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+
+    videos = result.stdout.split("RSS Feed URL:")[1].split("\n", 1)[1].strip().split("\n\n")
+    assert len(videos) == 5
+    for video in videos:
+        lines = video.strip().splitlines()
+        assert [line.split(":", 1)[0] for line in lines] == ["Title", "Views", "Star rating"]
+        assert lines[1].split(": ")[1].isdigit()
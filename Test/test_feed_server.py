@@ -0,0 +1,215 @@
+import gzip
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+import requests
+
+from feed_server import FeedServer, LRUCache
+from main import parse_feed_entries
+
+CHANNEL_A = "UC" + "a" * 22
+CHANNEL_B = "UC" + "b" * 22
+CHANNEL_C = "UC" + "c" * 22
+
+
+def make_feed(channel_id, days, offset="+00:00"):
+    """
+    Returns a YouTube-like feed of the channel with one video at midnight of each of the given
+    days, in the UTC offset.
+    """
+    entries = "".join(
+        f"""<entry>
+            <yt:videoId>{channel_id[2]}{day}</yt:videoId>
+            <title>Video {day} of {channel_id[2]}</title>
+            <link rel="alternate" href="https://www.youtube.com/watch?v={channel_id[2]}{day}"/>
+            <author><name>Channel {channel_id[2]}</name></author>
+            <published>2023-10-{day:02d}T00:00:00{offset}</published>
+        </entry>"""
+        for day in days
+    )
+    return (
+        '<feed xmlns="http://www.w3.org/2005/Atom"'
+        f' xmlns:yt="http://www.youtube.com/xml/schemas/2015">{entries}</feed>'
+    ).encode()
+
+
+FEEDS = {
+    CHANNEL_A: make_feed(CHANNEL_A, [9, 5, 1]),
+    CHANNEL_B: make_feed(CHANNEL_B, [8, 3]),
+    CHANNEL_C: make_feed(CHANNEL_C, [8], offset="+14:00"),
+}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves the canned feeds of FEEDS, slowly, and counts the requests per channel."""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        channel_id = parse_qs(urlsplit(self.path).query)["channel_id"][0]
+        with self.server.lock:
+            self.server.requests[channel_id] = self.server.requests.get(channel_id, 0) + 1
+        time.sleep(self.server.delay)
+        body = FEEDS.get(channel_id)
+        self.send_response(200 if body else 404)
+        self.send_header("Content-Length", str(len(body or b"")))
+        self.end_headers()
+        self.wfile.write(body or b"")
+
+
+@pytest.fixture(name="upstream")
+def fixture_upstream():
+    """Runs a local stand-in for YouTube's feed endpoint."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    server.requests = {}
+    server.lock = threading.Lock()
+    server.delay = 0.2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="feed_server")
+def fixture_feed_server(upstream, monkeypatch):
+    """Runs a feed server whose upstream is the stand-in."""
+    monkeypatch.setattr(BaseHTTPRequestHandler, "log_message", lambda *args: None)
+    port = upstream.server_address[1]
+    server = FeedServer(
+        ("127.0.0.1", 0),
+        session=requests.Session(),
+        feed_url_builder=lambda cid: f"http://127.0.0.1:{port}/feeds/videos.xml?channel_id={cid}",
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def feed_url(server, query):
+    """Returns the URL of the feed server for the query."""
+    return f"http://127.0.0.1:{server.server_address[1]}/feed?{query}"
+
+
+def test_serves_channel_feed_with_gzip_and_etag(feed_server):
+    """
+    Test case for serving the Atom feed of a single channel.
+
+    This test verifies that the served feed can be read by the feed parser, that gzip is served
+    to clients accepting it, and that a revalidation with the ETag is answered with a 304.
+
+    Steps:
+    1. Request the feed of a channel without compression.
+    2. Assert that the parsed entries match the upstream feed.
+    3. Request it again with gzip and assert that the decompressed body is the same.
+    4. Revalidate with the ETag and assert that a bodiless 304 is returned.
+    """
+    url = feed_url(feed_server, f"channel={CHANNEL_A}")
+    response = requests.get(url, headers={"Accept-Encoding": "identity"}, timeout=5)
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("application/atom+xml")
+    entries = parse_feed_entries([response.content], limit=10)
+    assert [entry.video_id for entry in entries] == ["a9", "a5", "a1"]
+    assert entries[0].author == "Channel a"
+
+    raw = requests.get(url, headers={"Accept-Encoding": "gzip"}, stream=True, timeout=5)
+    assert raw.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(raw.raw.read()) == response.content
+
+    revalidation = requests.get(url, headers={"If-None-Match": response.headers["ETag"]}, timeout=5)
+    assert revalidation.status_code == 304
+    assert revalidation.content == b""
+    assert feed_server.stats()["upstream_fetches"] == 1
+
+
+def test_concurrent_requests_share_one_upstream_fetch(feed_server, upstream):
+    """
+    Test case for coalescing concurrent requests for the same channel.
+
+    Steps:
+    1. Send eight concurrent requests for differently filtered feeds of the same channel.
+    2. Assert that every request succeeded.
+    3. Assert that the stand-in received a single request for the channel.
+    """
+    statuses = []
+
+    def fetch(number):
+        url = feed_url(feed_server, f"channel={CHANNEL_A}&limit={number}")
+        statuses.append(requests.get(url, timeout=5).status_code)
+
+    threads = [threading.Thread(target=fetch, args=(number,)) for number in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses == [200] * 8
+    assert upstream.requests == {CHANNEL_A: 1}
+    assert feed_server.stats()["upstream_fetches"] == 1
+
+
+def test_serves_merged_filtered_json_feed(feed_server):
+    """
+    Test case for merging the feeds of several channels.
+
+    Steps:
+    1. Request the JSON feed of two channels, filtered with a date range.
+    2. Assert that the entries of both channels are merged newest first and filtered.
+    3. Request a feed with an invalid filter and assert that a 400 is returned.
+    """
+    response = requests.get(
+        feed_url(
+            feed_server,
+            f"channel={CHANNEL_A}&channel={CHANNEL_B}&format=json"
+            "&since=2023-10-02&until=2023-10-08",
+        ),
+        timeout=5,
+    )
+    document = response.json()
+    assert document["channels"] == [CHANNEL_A, CHANNEL_B]
+    assert [entry["video_id"] for entry in document["entries"]] == ["b8", "a5", "b3"]
+
+    invalid = requests.get(feed_url(feed_server, f"channel={CHANNEL_A}&since=yesterday"), timeout=5)
+    assert invalid.status_code == 400
+
+
+def test_merged_feed_orders_entries_by_utc_time(feed_server):
+    """
+    Test case for merging the feeds of channels publishing with different UTC offsets.
+
+    Steps:
+    1. Request the JSON feed of a channel publishing in UTC and of one publishing at +14:00.
+    2. Assert that the entries are ordered by their UTC publication time, not by their
+       timestamp strings.
+    3. Assert that the limit applies to the merged entries.
+    """
+    query = f"channel={CHANNEL_B}&channel={CHANNEL_C}&format=json"
+    document = requests.get(feed_url(feed_server, query), timeout=5).json()
+    assert [entry["video_id"] for entry in document["entries"]] == ["b8", "c8", "b3"]
+
+    document = requests.get(feed_url(feed_server, query + "&limit=2"), timeout=5).json()
+    assert [entry["video_id"] for entry in document["entries"]] == ["b8", "c8"]
+
+
+def test_lru_cache_bounds_size_and_expires_entries():
+    """
+    Test case for the size bound and TTL of the LRU cache.
+
+    Steps:
+    1. Store three entries in a cache bounded to 10 bytes.
+    2. Assert that the least recently used entry was evicted.
+    3. Assert that entries expire after the TTL.
+    """
+    cache = LRUCache(ttl=60, max_bytes=10)
+    cache.set("a", "A", size=4, now=0)
+    cache.set("b", "B", size=4, now=0)
+    assert cache.get("a", now=1) == "A"
+    cache.set("c", "C", size=4, now=1)
+
+    assert cache.get("b", now=1) is None
+    assert cache.get("a", now=1) == "A"
+    assert cache.size == 8
+    assert cache.get("c", now=61) is None
@@ -0,0 +1,117 @@
+import pytest
+
+from filters import compile_filter
+from main import VideoEntry, filter_videos
+
+ENTRIES = [
+    VideoEntry("v4", "Python Tutorial: Async IO", "2023-10-04T18:00:00+00:00", "link4", "A"),
+    VideoEntry("v3", "Cooking Show: Pasta", "2023-10-03T12:00:00+00:00", "link3", "A"),
+    VideoEntry("v2", "Python Live Stream", "2023-10-02T09:00:00+00:00", "link2", "A"),
+    VideoEntry("v1", "Rust Tutorial", "2023-10-01T00:00:00+00:00", "link1", "A"),
+]
+
+
+def kept_ids(video_filter, entries=ENTRIES):
+    """Returns the video IDs kept by a compiled filter."""
+    return [entry.video_id for entry in video_filter.apply(entries)]
+
+
+def test_compile_filter_date_range():
+    """
+    Test case for filtering by an inclusive date range.
+
+    Steps:
+    1. Compile a filter with `since` and `until` dates.
+    2. Assert that only the entries published within the range are kept.
+    """
+    assert kept_ids(compile_filter(since="2023-10-02", until="2023-10-03")) == ["v3", "v2"]
+
+
+def test_compile_filter_stops_at_entries_older_than_since():
+    """
+    Test case for the early termination of date-bounded filters.
+
+    This test verifies that a filter with a lower date bound stops reading the newest-first
+    entries as soon as an entry is older than the bound.
+
+    Steps:
+    1. Define a generator recording which entries were read.
+    2. Apply a filter with `since` set to the second newest date.
+    3. Assert that the third entry was the last one read.
+    """
+    read = []
+
+    def entries():
+        for entry in ENTRIES:
+            read.append(entry.video_id)
+            yield entry
+
+    assert kept_ids(compile_filter(since="2023-10-03"), entries()) == ["v4", "v3"]
+    assert read == ["v4", "v3", "v2"]
+
+
+def test_compile_filter_title_terms_all_and_any():
+    """
+    Test case for combining several title keywords with AND and OR.
+
+    Steps:
+    1. Compile filters with two keywords, matching all of them and any of them.
+    2. Assert that the AND filter keeps only titles with both keywords.
+    3. Assert that the OR filter keeps titles with either keyword.
+    """
+    assert kept_ids(compile_filter(title_terms=["python", "TUTORIAL"])) == ["v4"]
+    assert kept_ids(compile_filter(title_terms=["python", "tutorial"], match="any")) == [
+        "v4",
+        "v2",
+        "v1",
+    ]
+
+
+def test_compile_filter_regex_and_exclusions():
+    """
+    Test case for combining a title regex with excluded keywords.
+
+    Steps:
+    1. Compile a filter with a case-insensitive regex and an excluded keyword.
+    2. Assert that only titles matching the regex and not containing the keyword are kept.
+    """
+    video_filter = compile_filter(title_regex=r"^(python|rust)\b", exclude=["live"])
+    assert kept_ids(video_filter) == ["v4", "v1"]
+
+
+def test_compile_filter_rejects_invalid_specs():
+    """
+    Test case for validating the filter specification once, at compile time.
+
+    Steps:
+    1. Compile filters with an invalid date, an empty range, a missing value, an unknown
+       criteria and an invalid regex.
+    2. Assert that each one raises a `ValueError`.
+    """
+    invalid_specs = [
+        {"filter_by": "date", "filter_value": "01/10/2023"},
+        {"since": "2023-10-05", "until": "2023-10-01"},
+        {"filter_by": "title"},
+        {"filter_by": "author", "filter_value": "someone"},
+        {"title_regex": "(unclosed"},
+        {"match": "most"},
+    ]
+    for spec in invalid_specs:
+        with pytest.raises(ValueError):
+            compile_filter(**spec)
+
+
+def test_filter_videos_with_compiled_filter():
+    """
+    Test case for passing a compiled filter to `filter_videos`.
+
+    Steps:
+    1. Compile an exact date filter.
+    2. Call the `filter_videos` function with the compiled filter.
+    3. Assert that only the video published on that date is returned.
+    """
+    video_filter = compile_filter("date", "2023-10-02")
+
+    assert filter_videos(ENTRIES, video_filter=video_filter) == [
+        {"title": "Python Live Stream", "published": "2023-10-02T09:00:00+00:00", "link": "link2"}
+    ]
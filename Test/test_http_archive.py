@@ -0,0 +1,153 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import requests
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+from http_archive import ArchiveMissError, HttpArchive, RecordingSession, ReplaySession
+from main import create_rss_feed_url
+
+
+class FakeResponse:
+    """A stand-in for requests.Response with a status, headers and a body."""
+
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.reason = "OK"
+        self.headers = headers or {}
+
+
+def test_record_and_replay(tmp_path):
+    """
+    Test case for recording responses from a server and replaying them offline.
+
+    Steps:
+    1. Record a channel page, a streamed feed and a 404 page from a stand-in server.
+    2. Stop the server and replay the archive.
+    3. Assert that statuses, headers and bodies are replayed, also as a streamed response.
+    4. Assert that a URL missing from the archive raises an ArchiveMissError.
+    """
+    corpus = Corpus(1, page_size=16 * 1024)
+    channel = corpus.channels[0]
+    path = tmp_path / "capture.archive"
+
+    with StandInServer(corpus) as server, HttpArchive(path, mode="a") as archive:
+        session = RecordingSession(requests.Session(), archive)
+        page_url = server.channel_url(channel.handle)
+        feed_url = server.feed_url(channel.channel_id)
+        missing_url = server.channel_url("missing")
+        assert session.get(page_url).content == channel.page
+        response = session.get(feed_url, stream=True)
+        assert b"".join(response.iter_content(chunk_size=1024)) == channel.feed
+        assert session.get(missing_url).status_code == 404
+        requests_served = server.requests
+
+    with HttpArchive(path) as archive:
+        assert len(archive) == 3
+        session = ReplaySession(archive)
+        response = session.get(page_url)
+        assert (response.status_code, response.content) == (200, channel.page)
+        assert response.headers["content-type"] == "text/html; charset=utf-8"
+        assert "Content-Length" not in response.headers
+        response = session.get(feed_url, stream=True)
+        assert b"".join(response.iter_content(chunk_size=1024)) == channel.feed
+        with pytest.raises(requests.exceptions.HTTPError):
+            session.get(missing_url).raise_for_status()
+        with pytest.raises(ArchiveMissError):
+            session.get(server.channel_url("unknown"))
+        assert (session.hits, session.misses) == (3, 1)
+    assert server.requests == requests_served
+    assert path.stat().st_size < len(channel.page) + len(channel.feed)
+
+
+def test_archive_recovers_from_crash(tmp_path):
+    """
+    Test case for opening an archive whose index is missing or whose last record was cut short.
+
+    Steps:
+    1. Record the same URL twice and another URL once.
+    2. Delete the index file and assert that reopening rebuilds it, replaying the latest response.
+    3. Cut the last record short and append another response.
+    4. Assert that the cut record is dropped and the other responses are replayed.
+    """
+    path = tmp_path / "capture.archive"
+    with HttpArchive(path, mode="a") as archive:
+        archive.record("https://example.com/a", FakeResponse(b"first"))
+        archive.record("https://example.com/a", FakeResponse(b"second"))
+        archive.record("https://example.com/b", FakeResponse(b"b" * 1000))
+
+    index_path = Path(f"{path}.idx")
+    index_path.unlink()
+    with HttpArchive(path) as archive:
+        assert len(archive) == 2
+        assert archive.get("https://example.com/a").body == b"second"
+    assert not index_path.exists()
+
+    with open(path, "r+b") as archive_file:
+        archive_file.truncate(path.stat().st_size - 10)
+    with HttpArchive(path, mode="a") as archive:
+        archive.record("https://example.com/c", FakeResponse(b"c", status_code=503))
+
+    with HttpArchive(path) as archive:
+        assert "https://example.com/b" not in archive
+        assert archive.get("https://example.com/a").body == b"second"
+        assert archive.get("https://example.com/c").status == 503
+    assert len(index_path.read_text().splitlines()) == 3
+
+
+def test_invalid_archive(tmp_path):
+    """
+    Test case for opening files that are not HTTP archives.
+
+    Steps:
+    1. Assert that opening a missing archive for replay raises a FileNotFoundError.
+    2. Assert that opening a file that is not an archive raises a ValueError.
+    """
+    with pytest.raises(FileNotFoundError):
+        HttpArchive(tmp_path / "missing.archive")
+
+    path = tmp_path / "notes.txt"
+    path.write_text("not an archive\n" * 10)
+    with pytest.raises(ValueError):
+        HttpArchive(path, mode="a")
+
+
+def test_main_replays_channel_offline(tmp_path):
+    """
+    Test case for running the command line tool from an archive.
+
+    Steps:
+    1. Write an archive holding the page and RSS feed of a channel under their YouTube URLs.
+    2. Run main.py for the channel with --replay and --format jsonl.
+    3. Assert that the videos of the archived feed are written, without any network access.
+    """
+    channel = Corpus(1, page_size=16 * 1024).channels[0]
+    path = tmp_path / "capture.archive"
+    with HttpArchive(path, mode="a") as archive:
+        archive.record(f"https://www.youtube.com/@{channel.handle}", FakeResponse(channel.page))
+        archive.record(create_rss_feed_url(channel.channel_id), FakeResponse(channel.feed))
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "main.py",
+            f"https://www.youtube.com/@{channel.handle}",
+            "--replay",
+            str(path),
+            "--format",
+            "jsonl",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(records) == 5
+    assert {record["channel_id"] for record in records} == {channel.channel_id}
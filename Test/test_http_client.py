@@ -0,0 +1,370 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+import instrumentation
+from http_client import (
+    LATENCY_BOUNDS,
+    MIN_LATENCY_SAMPLES,
+    CircuitOpenError,
+    HttpClient,
+    LatencyHistogram,
+    TokenBucket,
+    endpoint_type,
+    parse_retry_after,
+)
+
+URL = "https://www.youtube.com/@GoogleDevelopers"
+
+
+class FakeResponse:
+    """A stand-in for requests.Response with a status and headers."""
+
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ScriptedSession:
+    """A stand-in for requests.Session answering with a script of responses and errors."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((time.monotonic(), kwargs))
+        outcome = self.outcomes.pop(0) if len(self.outcomes) > 1 else self.outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(*outcome)
+
+
+def test_parse_retry_after():
+    """
+    Test case for parsing 'Retry-After' headers.
+
+    Steps:
+    1. Parse a number of seconds, an HTTP date in the future and invalid values.
+    2. Assert that seconds are returned for valid headers and None otherwise.
+    """
+    assert parse_retry_after("120") == 120.0
+    assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
+    assert parse_retry_after(formatdate(time.time() - 60, usegmt=True)) == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_retries_transient_failures():
+    """
+    Test case for retrying connection errors and 5xx responses.
+
+    Steps:
+    1. Script a connection error and a 503 before a 200 response.
+    2. Assert that the client returns the 200 response after two retries.
+    3. Assert that the client sends its (connect, read) timeout with every request.
+    4. Assert that a 404 response is returned without retrying.
+    """
+    session = ScriptedSession(requests.exceptions.ConnectionError("reset"), (503,), (200,))
+    client = HttpClient(session, backoff=0.001, connect_timeout=1, read_timeout=5)
+
+    assert client.get(URL).status_code == 200
+    assert client.stats()["retries"] == 2
+    assert [kwargs["timeout"] for _, kwargs in session.calls] == [(1, 5)] * 3
+
+    session = ScriptedSession((404,))
+    assert HttpClient(session, backoff=0.001).get(URL).status_code == 404
+    assert len(session.calls) == 1
+
+
+def test_gives_up_after_retries():
+    """
+    Test case for exhausting the retries.
+
+    Steps:
+    1. Script a server that always answers 500, and one that always times out.
+    2. Assert that the last 500 response is returned after the retries.
+    3. Assert that the timeout is raised after the retries.
+    """
+    session = ScriptedSession((500,))
+    assert HttpClient(session, retries=2, backoff=0.001).get(URL).status_code == 500
+    assert len(session.calls) == 3
+
+    session = ScriptedSession(requests.exceptions.ReadTimeout("slow"))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        HttpClient(session, retries=1, backoff=0.001).get(URL)
+    assert len(session.calls) == 2
+
+
+def test_honors_retry_after():
+    """
+    Test case for the 'Retry-After' header of 429 responses.
+
+    Steps:
+    1. Script a 429 response asking to retry after 1 second, then a 200 response.
+    2. Assert that the retry is sent only after the requested delay.
+    3. Assert that a 429 response asking for more than `max_retry_after` is not retried.
+    """
+    session = ScriptedSession((429, {"Retry-After": "1"}), (200,))
+    client = HttpClient(session, backoff=0.001)
+
+    assert client.get(URL).status_code == 200
+    assert session.calls[1][0] - session.calls[0][0] >= 0.95
+    assert client.stats()["rate_limited"] == 1
+
+    session = ScriptedSession((429, {"Retry-After": "3600"}))
+    assert HttpClient(session, max_retry_after=60).get(URL).status_code == 429
+    assert len(session.calls) == 1
+
+
+def test_circuit_breaker_pauses_failing_host():
+    """
+    Test case for the circuit breaker.
+
+    Steps:
+    1. Let a host fail three times in a row with a failure threshold of 3 and no retries.
+    2. Assert that the next request fails fast with a CircuitOpenError, without being sent.
+    3. After the cooldown, assert that a successful probe closes the circuit again.
+    """
+    session = ScriptedSession((502,), (502,), (502,), (200,))
+    client = HttpClient(session, retries=0, failure_threshold=3, cooldown=0.2)
+    for _ in range(3):
+        assert client.get(URL).status_code == 502
+
+    with pytest.raises(CircuitOpenError):
+        client.get(URL)
+    assert len(session.calls) == 3
+    assert client.stats()["rejected"] == 1
+
+    time.sleep(0.25)
+    assert client.get(URL).status_code == 200
+    assert client.get(URL).status_code == 200
+
+
+def test_circuit_recovers_from_probe_failing_with_other_error():
+    """
+    Test case for a probe of an open circuit failing with an error that is not retried.
+
+    Steps:
+    1. Open the circuit of a host with a failure threshold of 1.
+    2. After the cooldown, let the probe fail with a TooManyRedirects error.
+    3. Assert that the circuit opens again and, after another cooldown, lets a request through.
+    """
+    session = ScriptedSession((502,), requests.exceptions.TooManyRedirects("loop"), (200,))
+    client = HttpClient(session, retries=0, failure_threshold=1, cooldown=0.05)
+    assert client.get(URL).status_code == 502
+
+    time.sleep(0.06)
+    with pytest.raises(requests.exceptions.TooManyRedirects):
+        client.get(URL)
+    with pytest.raises(CircuitOpenError):
+        client.get(URL)
+
+    time.sleep(0.06)
+    assert client.get(URL).status_code == 200
+    assert client.get(URL).status_code == 200
+
+
+def test_circuit_ignores_errors_that_are_not_host_failures():
+    """
+    Test case for errors of a request that say nothing about the host.
+
+    Steps:
+    1. With a failure threshold of 1, let a request fail with a MissingSchema error.
+    2. Assert that the circuit stays closed and the next request goes through.
+    3. Open the circuit and, after the cooldown, let the probe fail with a RuntimeError.
+    4. Assert that the probe was released and the next request is let through.
+    """
+    session = ScriptedSession(
+        requests.exceptions.MissingSchema("no schema"),
+        (200,),
+        (502,),
+        RuntimeError("interrupted"),
+        (200,),
+    )
+    client = HttpClient(session, retries=0, failure_threshold=1, cooldown=0.05)
+    with pytest.raises(requests.exceptions.MissingSchema):
+        client.get(URL)
+    assert client.get(URL).status_code == 200
+
+    assert client.get(URL).status_code == 502
+    time.sleep(0.06)
+    with pytest.raises(RuntimeError):
+        client.get(URL)
+    assert client.get(URL).status_code == 200
+
+
+def test_token_bucket_spaces_requests():
+    """
+    Test case for the token bucket.
+
+    Steps:
+    1. Take 5 tokens from a bucket refilling at 20 per second with a burst of 1.
+    2. Assert that the requests were spaced at the refill rate.
+    """
+    bucket = TokenBucket(rate=20, burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert 0.18 <= time.monotonic() - started < 0.5
+
+
+def test_against_stand_in_with_errors_and_rate_limit():
+    """
+    Test case for fetching from a stand-in returning 5xx errors and enforcing a rate limit.
+
+    Steps:
+    1. Serve a channel page with a 30% error rate and fetch it 20 times with retries and no
+       circuit breaker.
+    2. Assert that every fetch succeeds.
+    3. Serve it with a rate limit of 20 requests per second, and fetch it 30 times at 15 per
+       second.
+    4. Assert that every fetch succeeds without a single 429 error.
+    """
+    corpus = Corpus(1, page_size=1024)
+    url_path = f"/@{corpus.channels[0].handle}"
+
+    with StandInServer(corpus, error_rate=0.3, seed=1) as server:
+        with HttpClient(retries=10, backoff=0.001, failure_threshold=0) as client:
+            statuses = [client.get(server.base_url + url_path).status_code for _ in range(20)]
+        assert statuses == [200] * 20
+        assert client.stats()["retries"] > 0
+
+    with StandInServer(corpus, rate_limit=20) as server:
+        with HttpClient(rate=15) as client:
+            statuses = [client.get(server.base_url + url_path).status_code for _ in range(30)]
+        assert statuses == [200] * 30
+        assert server.throttled == 0
+
+
+def test_latency_histogram_quantiles():
+    """
+    Test case for the percentiles of the rolling latency histogram.
+
+    Steps:
+    1. Record 90 latencies of 10 ms and 10 of 1 s in a histogram keeping 100.
+    2. Assert that the median and 95th percentile are within one bucket of 10 ms and 1 s.
+    3. Record 100 latencies of 50 ms and assert that the older latencies left the histogram.
+    """
+    histogram = LatencyHistogram(window=100)
+    assert histogram.quantile(0.5) is None
+    for seconds in [0.01] * 90 + [1.0] * 10:
+        histogram.record(seconds)
+
+    assert 0.01 <= histogram.quantile(0.5) < 0.012
+    assert 1.0 <= histogram.quantile(0.95) < 1.2
+    for _ in range(100):
+        histogram.record(0.05)
+    assert len(histogram) == 100
+    assert 0.05 <= histogram.quantile(0.99) < 0.06
+    histogram.record(1e6)
+    assert histogram.quantile(1.0) == LATENCY_BOUNDS[-1]
+
+
+def test_adaptive_timeouts():
+    """
+    Test case for adapting the read timeout to the recent latencies of an endpoint type.
+
+    Steps:
+    1. Send requests to a channel page with adaptive timeouts and a minimum read timeout of
+       0.05 seconds.
+    2. Assert that the fixed timeout is used until enough latencies were recorded, and the
+       minimum read timeout afterwards.
+    3. Assert that a feed has its own latencies and that a given timeout is kept.
+    """
+    session = ScriptedSession((200,))
+    client = HttpClient(session, adaptive_timeouts=True, min_read_timeout=0.05)
+    for _ in range(MIN_LATENCY_SAMPLES + 1):
+        client.get(URL)
+
+    timeouts = [kwargs["timeout"] for _, kwargs in session.calls]
+    assert timeouts[0] == timeouts[MIN_LATENCY_SAMPLES - 1] == client.timeout
+    assert timeouts[MIN_LATENCY_SAMPLES] == (client.timeout[0], 0.05)
+    assert endpoint_type("https://www.youtube.com/feeds/videos.xml?channel_id=UC") == "feed"
+    client.get("https://www.youtube.com/feeds/videos.xml?channel_id=UC")
+    assert session.calls[-1][1]["timeout"] == client.timeout
+    client.get(URL, timeout=30)
+    assert session.calls[-1][1]["timeout"] == 30
+    assert client.stats()["latency"]["page"]["samples"] == MIN_LATENCY_SAMPLES + 2
+
+
+def test_adaptive_timeout_gives_up_on_stalled_response():
+    """
+    Test case for retrying a stalled response once the adaptive read timeout expires.
+
+    Steps:
+    1. Serve a channel page stalling every other response for 2 seconds.
+    2. Record the latencies of fast responses and fetch the page with adaptive timeouts and a
+       minimum read timeout of 0.2 seconds.
+    3. Assert that every fetch succeeds, well before the stalls would have ended.
+    """
+    corpus = Corpus(1, page_size=1024)
+    url_path = f"/@{corpus.channels[0].handle}"
+
+    with StandInServer(corpus, slow_rate=0.5, slow_latency=2.0, seed=3) as server:
+        client = HttpClient(retries=10, backoff=0.001, adaptive_timeouts=True, min_read_timeout=0.2)
+        for _ in range(MIN_LATENCY_SAMPLES):
+            client.latency("page").record(0.01)
+        started = time.monotonic()
+        statuses = [client.get(server.base_url + url_path).status_code for _ in range(5)]
+        elapsed = time.monotonic() - started
+        client.close()
+        assert server.stalled > 0
+
+    assert statuses == [200] * 5
+    assert client.stats()["retries"] == server.stalled
+    assert elapsed < 2.0
+
+
+def test_hedges_slow_feed_requests():
+    """
+    Test case for hedging feed requests against a stand-in stalling some responses.
+
+    Steps:
+    1. Serve the feed of a channel stalling a third of the responses for 2 seconds.
+    2. Record the latencies of fast feed responses and fetch the feed 10 times, with hedging.
+    3. Assert that every fetch succeeds, that stalled requests were hedged, and that only the
+       fetches whose hedge was not answered first waited for a stall.
+    4. Assert that the hedges are counted in the instrumentation span and that no request is
+       hedged with max_hedges set to 0.
+    """
+    corpus = Corpus(1, page_size=1024)
+    channel = corpus.channels[0]
+    metrics = instrumentation.enable()
+
+    try:
+        with StandInServer(corpus, slow_rate=0.3, slow_latency=2.0, seed=1) as server:
+            feed_url = server.feed_url(channel.channel_id)
+            client = HttpClient(hedge=True)
+            for _ in range(400):
+                client.latency("feed").record(0.01)
+            started = time.monotonic()
+            with instrumentation.stage("feed_fetch"):
+                bodies = [client.get(feed_url).content for _ in range(10)]
+            elapsed = time.monotonic() - started
+
+            unhedged = HttpClient(hedge=True, max_hedges=0)
+            for _ in range(MIN_LATENCY_SAMPLES):
+                unhedged.latency("feed").record(0.01)
+            unhedged.get(server.base_url + f"/@{channel.handle}")
+            unhedged.get(feed_url)
+    finally:
+        instrumentation.disable()
+
+    stats = client.stats()
+    assert bodies == [channel.feed] * 10
+    assert stats["hedges"] > 0 and stats["hedge_wins"] > 0
+    assert stats["requests"] == 10 + stats["hedges"]
+    # Only the fetches whose hedge stalled as well waited for a stall.
+    assert elapsed < 2.0 * (stats["hedges"] - stats["hedge_wins"]) + 1.0
+    summary = metrics.summary()["stages"]["feed_fetch"]
+    assert (summary["hedges"], summary["hedge_wins"]) == (stats["hedges"], stats["hedge_wins"])
+    assert unhedged.stats()["hedges"] == 0
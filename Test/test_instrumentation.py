@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+import instrumentation
+from main import get_youtube_channel_id, get_youtube_source_code
+
+META_PAGE = b'<meta property="og:url" content="https://www.youtube.com/channel/UC1234567890">'
+SCRIPT_PAGE = b'<script>var ytInitialData = {"externalId":"UC0987654321"};</script>'
+
+
+@pytest.fixture(name="metrics")
+def fixture_metrics():
+    """Enables instrumentation for the duration of a test."""
+    yield instrumentation.enable()
+    instrumentation.disable()
+
+
+def test_disabled_instrumentation_records_nothing():
+    """
+    Test case for the disabled instrumentation.
+
+    Steps:
+    1. Assert that instrumentation is disabled by default.
+    2. Run a stage and assert that the shared no-op span is used.
+    3. Assert that byte counting passes the chunks through untouched.
+    """
+    assert instrumentation.get_metrics() is None
+    with instrumentation.stage("page_fetch") as span:
+        span.set(bytes=10, status=200)
+    assert span is instrumentation.stage("filter")
+    chunks = [b"a", b"b"]
+    assert instrumentation.count_bytes(chunks, span) is chunks
+
+
+@patch("requests.get")
+def test_stages_record_status_bytes_and_method(mock_get, metrics):
+    """
+    Test case for recording the page fetch and channel ID extraction stages.
+
+    Steps:
+    1. Mock `requests.get` to return a page, then to fail with a connection error.
+    2. Fetch the page twice and extract the channel ID from a meta tag and a script.
+    3. Assert that the status, bytes and error type of the fetches are recorded.
+    4. Assert that the extraction method of each lookup is recorded.
+    """
+    response = MagicMock(status_code=200, content=META_PAGE)
+    mock_get.side_effect = [response, requests.exceptions.ConnectionError("unreachable")]
+
+    get_youtube_source_code("https://www.youtube.com/@channel")
+    get_youtube_source_code("https://www.youtube.com/@channel")
+    get_youtube_channel_id(META_PAGE)
+    get_youtube_channel_id(SCRIPT_PAGE, engine="soup")
+
+    stages = metrics.summary()["stages"]
+    assert stages["page_fetch"]["count"] == 2
+    assert stages["page_fetch"]["status"] == {"200": 1}
+    assert stages["page_fetch"]["bytes"] == len(META_PAGE)
+    assert stages["page_fetch"]["errors_by_type"] == {"ConnectionError": 1}
+    assert stages["channel_id_extract"]["methods"] == {"meta": 1, "script_external_id": 1}
+    assert stages["channel_id_extract"]["errors"] == 0
+
+
+def test_prometheus_exposition(metrics):
+    """
+    Test case for the Prometheus text exposition.
+
+    Steps:
+    1. Record a successful and a failed run of a stage.
+    2. Assert that the histogram buckets are cumulative and the counters are labeled.
+    """
+    metrics.record("feed_fetch", 0.02, 0.001, {"bytes": 100, "status": 200}, None)
+    metrics.record("feed_fetch", 3.0, 0.001, {"status": 503}, "HTTPError")
+
+    lines = metrics.to_prometheus().splitlines()
+    assert "# TYPE youtube_rss_stage_duration_seconds histogram" in lines
+    assert 'youtube_rss_stage_duration_seconds_bucket{stage="feed_fetch",le="0.025"} 1' in lines
+    assert 'youtube_rss_stage_duration_seconds_bucket{stage="feed_fetch",le="+Inf"} 2' in lines
+    assert 'youtube_rss_stage_duration_seconds_count{stage="feed_fetch"} 2' in lines
+    assert 'youtube_rss_bytes_total{stage="feed_fetch"} 100' in lines
+    assert 'youtube_rss_http_responses_total{stage="feed_fetch",status="503"} 1' in lines
+    assert 'youtube_rss_stage_errors_total{stage="feed_fetch",error="HTTPError"} 1' in lines
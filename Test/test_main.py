@@ -1,13 +1,22 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
 from unittest.mock import patch
 from bs4 import BeautifulSoup
+import pyperclip
 import requests
 
 from main import (
+    copy_to_clipboard,
     get_youtube_source_code,
     get_youtube_channel_id,
+    stream_youtube_channel_id,
     create_rss_feed_url,
     fetch_rss_feed_content,
     filter_videos,
+    parse_feed_entries,
+    VideoEntry,
 )
 
 
@@ -128,6 +137,79 @@ def test_get_youtube_channel_id_none_input():
     assert result is None
 
 
+def test_stream_youtube_channel_id_stops_at_first_match():
+    """
+    Test case for streaming the YouTube page until the channel ID is found.
+
+    This test mocks the `requests.get` method to return the page in chunks, with the 'og:url'
+    meta tag split across a chunk boundary. It verifies that `stream_youtube_channel_id`
+    finds the channel ID, stops reading before the remaining chunks and closes the response.
+
+    Steps:
+    1. Mock a streamed response whose 'og:url' meta tag spans the first two chunks.
+    2. Call the `stream_youtube_channel_id` function with the URL.
+    3. Assert that the channel ID is found and only the first two chunks were read.
+    4. Assert that the response was closed.
+    """
+    url = "https://www.youtube.com/@GoogleDevelopers"
+    chunks = [
+        b'<html><head><meta property="og:url" content="https://www.you',
+        b'tube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw"></head>',
+        b"<body>" + b"x" * 4096 + b"</body></html>",
+    ]
+
+    with patch("requests.get") as mock_get:
+        mock_get.return_value.iter_content.return_value = iter(chunks)
+
+        channel_id, bytes_read = stream_youtube_channel_id(url)
+
+        assert channel_id == "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+        assert bytes_read == len(chunks[0]) + len(chunks[1])
+        assert mock_get.call_args.kwargs["stream"] is True
+        mock_get.return_value.close.assert_called_once()
+
+
+def test_stream_youtube_channel_id_falls_back_to_full_page():
+    """
+    Test case for the full-page fallback of the streaming channel ID resolution.
+
+    This test verifies that `stream_youtube_channel_id` reads the whole page and falls back
+    to `get_youtube_channel_id` when no streaming pattern matches.
+
+    Steps:
+    1. Mock a streamed response that contains no channel ID.
+    2. Call the `stream_youtube_channel_id` function with the URL.
+    3. Assert that no channel ID is returned and every byte of the page was read.
+    """
+    url = "https://www.youtube.com/@GoogleDevelopers"
+    chunks = [b"<html><head></head>", b"<body>No channel ID here</body></html>"]
+
+    with patch("requests.get") as mock_get:
+        mock_get.return_value.iter_content.return_value = iter(chunks)
+
+        channel_id, bytes_read = stream_youtube_channel_id(url)
+
+        assert channel_id is None
+        assert bytes_read == sum(len(chunk) for chunk in chunks)
+
+
+def test_stream_youtube_channel_id_failure():
+    """
+    Test case for handling failure when streaming the YouTube page.
+
+    Steps:
+    1. Mock the `requests.get` method to raise a `requests.exceptions.RequestException`.
+    2. Call the `stream_youtube_channel_id` function with the URL.
+    3. Assert that no channel ID is returned and no bytes were read.
+    """
+    url = "https://www.youtube.com/@GoogleDevelopers"
+
+    with patch("requests.get") as mock_get:
+        mock_get.side_effect = requests.exceptions.RequestException("Mocked Exception")
+
+        assert stream_youtube_channel_id(url) == (None, 0)
+
+
 def test_create_rss_feed_url_valid_channel_id():
     """
     Test case for creating a valid RSS feed URL with a given YouTube channel ID.
@@ -210,14 +292,14 @@ def test_fetch_rss_feed_content_success():
 
         with patch("requests.get") as mock_get:
             mock_get.return_value.status_code = 200
-            mock_get.return_value.content = expected_content
+            mock_get.return_value.iter_content.return_value = iter([expected_content])
 
             result = fetch_rss_feed_content(feed_url)
 
             assert result is not None, "The result should not be None"
             assert len(result) == 2
-            assert result[0].find("title").text == "Video 1"
-            assert result[1].find("title").text == "Video 2"
+            assert result[0].title == "Video 1"
+            assert result[1].title == "Video 2"
 
 
 def test_fetch_rss_feed_content_failure():
@@ -243,6 +325,82 @@ def test_fetch_rss_feed_content_failure():
             assert result is None
 
 
+def test_parse_feed_entries_stops_after_limit():
+    """
+    Test case for parsing a YouTube Atom feed incrementally up to a limit.
+
+    This test feeds a namespaced YouTube feed to `parse_feed_entries` in small chunks, with
+    the third entry cut short by a chunk that is not well-formed XML. It verifies that parsing stops once
+    `limit` entries have been read, before the malformed chunk is ever parsed.
+
+    Steps:
+    1. Split a YouTube feed into 64-byte chunks, up to the middle of its third entry.
+    2. Append a malformed chunk and call `parse_feed_entries` with a limit of 2.
+    3. Assert that two complete VideoEntry records are returned.
+    """
+    feed = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015"
+      xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">
+ <title>Google for Developers</title>
+ <entry>
+  <yt:videoId>video1</yt:videoId>
+  <title>Video 1</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v=video1"/>
+  <author><name>Google for Developers</name></author>
+  <published>2023-10-02T00:00:00+00:00</published>
+ </entry>
+ <entry>
+  <title>Video 2</title>
+  <link rel="alternate" href="https://www.youtube.com/watch?v=video2"/>
+  <published>2023-10-01T00:00:00+00:00</published>
+ </entry>
+ <entry>
+  <title>Video 3</title>
+ </entry>
+</feed>"""
+    head = feed[: feed.index(b"<title>Video 3")]
+    chunks = [head[i : i + 64] for i in range(0, len(head), 64)] + [b"<<not xml"]
+
+    result = parse_feed_entries(iter(chunks), limit=2)
+
+    assert result == [
+        VideoEntry(
+            video_id="video1",
+            title="Video 1",
+            published="2023-10-02T00:00:00+00:00",
+            link="https://www.youtube.com/watch?v=video1",
+            author="Google for Developers",
+        ),
+        VideoEntry(
+            video_id="video2",
+            title="Video 2",
+            published="2023-10-01T00:00:00+00:00",
+            link="https://www.youtube.com/watch?v=video2",
+            author="",
+        ),
+    ]
+
+
+def test_filter_videos_video_entry_records():
+    """
+    Test case for filtering VideoEntry records by title.
+
+    Steps:
+    1. Define a list of VideoEntry records with different titles.
+    2. Call the `filter_videos` function with a title filter.
+    3. Assert that only the matching record is returned.
+    """
+    entries = [
+        VideoEntry("video1", "Python Tutorial", "2023-10-01T00:00:00+00:00", "link1", "A"),
+        VideoEntry("video2", "Cooking Show", "2023-10-02T00:00:00+00:00", "link2", "A"),
+    ]
+
+    result = filter_videos(entries, "title", "python")
+    assert result == [
+        {"title": "Python Tutorial", "published": "2023-10-01T00:00:00+00:00", "link": "link1"}
+    ]
+
+
 def test_filter_videos_by_date():
         """
         Test case for filtering videos by date.
@@ -335,3 +493,48 @@ def test_filter_videos_no_filter():
             assert len(result) == 2
             assert result[0]["title"] == "Video 1"
             assert result[1]["title"] == "Video 2"
+
+
+def test_import_does_not_load_network_or_html_stack():
+    """
+    Test case for keeping the import of main cheap.
+
+    This test verifies that importing main and creating an RSS feed URL does not import the
+    network, HTML or clipboard libraries, which are only imported by the code paths using them.
+
+    Steps:
+    1. Import main in a fresh interpreter and call the `create_rss_feed_url` function.
+    2. Collect the names of the loaded modules.
+    3. Assert that none of requests, bs4, lxml, pyperclip or http were loaded.
+    """
+    script = (
+        "import sys, json, main\n"
+        "main.create_rss_feed_url('UC_x5XG1OV2P6uZZ5FSM9Ttw')\n"
+        "print(json.dumps(sorted(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    loaded = {module.split(".", 1)[0] for module in json.loads(result.stdout)}
+    assert not loaded & {"requests", "bs4", "lxml", "pyperclip", "http"}
+
+
+@patch("pyperclip.copy")
+def test_copy_to_clipboard(mock_copy):
+    """
+    Test case for copying the RSS feed URL to the clipboard.
+
+    Steps:
+    1. Mock `pyperclip.copy` to succeed, then to fail as on a headless machine.
+    2. Call the `copy_to_clipboard` function twice.
+    3. Assert that the first call copied the text and the second call reported the failure.
+    """
+    mock_copy.side_effect = [None, pyperclip.PyperclipException("no clipboard")]
+
+    assert copy_to_clipboard("https://www.youtube.com/feeds/videos.xml?channel_id=UC123")
+    assert not copy_to_clipboard("https://www.youtube.com/feeds/videos.xml?channel_id=UC123")
+    mock_copy.assert_called_with("https://www.youtube.com/feeds/videos.xml?channel_id=UC123")
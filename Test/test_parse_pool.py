@@ -0,0 +1,108 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from main import VideoEntry, fetch_rss_feed_content, get_youtube_channel_id
+from parse_pool import ParsePool
+
+CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+
+PAGE = (
+    '<html><head><meta property="og:url"'
+    f' content="https://www.youtube.com/channel/{CHANNEL_ID}"></head></html>'
+).encode()
+
+FEED = b"""<feed>
+    <entry>
+        <title>Video 1</title>
+        <published>2023-10-01T00:00:00+00:00</published>
+        <link href="https://www.youtube.com/watch?v=video1"/>
+        <author><name>Google for Developers</name></author>
+    </entry>
+</feed>"""
+
+
+@pytest.fixture(scope="module")
+def pool():
+    """A parse pool of two worker processes, shared by the tests of this module."""
+    with ParsePool(2) as parse_pool:
+        yield parse_pool
+
+
+def feed_session(content):
+    """Builds a stand-in session whose responses have the given content."""
+    session = MagicMock()
+    session.get.return_value.status_code = 200
+    session.get.return_value.content = content
+    return session
+
+
+@pytest.mark.parametrize("engine", ["regex", "soup"])
+def test_get_youtube_channel_id_in_parse_pool(pool, engine):
+    """
+    Test case for extracting the channel ID in a worker process.
+
+    Steps:
+    1. Call the `get_youtube_channel_id` function with a page and the parse pool.
+    2. Assert that the channel ID is the same as when extracted in the calling thread.
+    """
+    assert get_youtube_channel_id(PAGE, engine, parse_pool=pool) == CHANNEL_ID
+    assert get_youtube_channel_id(PAGE, engine) == CHANNEL_ID
+
+
+def test_fetch_rss_feed_content_in_parse_pool(pool):
+    """
+    Test case for parsing feeds in a worker process.
+
+    Steps:
+    1. Fetch a feed through a stand-in session with the parse pool.
+    2. Assert that the VideoEntry records are returned.
+    3. Fetch a malformed feed and assert that None is returned instead of an exception.
+    """
+    entries = fetch_rss_feed_content(
+        "https://example.com/feed", session=feed_session(FEED), parse_pool=pool
+    )
+    assert entries == [
+        VideoEntry(
+            "video1",
+            "Video 1",
+            "2023-10-01T00:00:00+00:00",
+            "https://www.youtube.com/watch?v=video1",
+            "Google for Developers",
+        )
+    ]
+
+    malformed = fetch_rss_feed_content(
+        "https://example.com/feed", session=feed_session(b"<feed><entry>"), parse_pool=pool
+    )
+    assert malformed is None
+
+
+def test_parse_pool_raises_task_errors(pool):
+    """
+    Test case for errors raised in a worker process.
+
+    Steps:
+    1. Run a call that raises a ValueError in the parse pool.
+    2. Assert that the error is raised in the calling thread.
+    """
+    with pytest.raises(ValueError):
+        pool.run(int, "x")
+
+
+def test_parse_pool_sends_queued_tasks_in_chunks():
+    """
+    Test case for chunking the tasks queued up while every worker is busy.
+
+    Steps:
+    1. Submit 20 tasks at once to a pool with one worker and a chunk size of 8.
+    2. Assert that every task has its own result.
+    3. Assert that the tasks were sent in fewer chunks than tasks, none larger than 8.
+    """
+    with ParsePool(1, chunksize=8) as pool:
+        futures = [pool.submit(abs, -number) for number in range(20)]
+        assert [future.result() for future in futures] == list(range(20))
+    assert pool.tasks == 20
+    assert 20 / 8 <= pool.chunks < 20
+    with pytest.raises(ValueError):
+        ParsePool(1, chunksize=0)
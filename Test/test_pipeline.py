@@ -0,0 +1,138 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from pipeline import Checkpoint, Pipeline
+
+FEED = b"""<feed>
+    <entry>
+        <title>Video 1</title>
+        <published>2023-10-01T00:00:00+00:00</published>
+        <link href="https://www.youtube.com/watch?v=video1"/>
+    </entry>
+</feed>"""
+
+
+class FakeSession:
+    """A stand-in for requests.Session serving canned channel pages and feeds."""
+
+    def __init__(self):
+        self.requested = []
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        with self._lock:
+            self.requested.append(url)
+        if "missing" in url:
+            raise requests.exceptions.HTTPError("404 Client Error")
+        response = MagicMock()
+        channel_id = "UC" + url.rsplit("@", 1)[-1].ljust(22, "x")
+        response.content = (
+            f'<meta property="og:url" content="https://www.youtube.com/channel/{channel_id}">'
+        ).encode()
+        response.iter_content.return_value = iter([FEED])
+        return response
+
+
+def channel_lines(count):
+    """Returns input lines listing `count` channels."""
+    return [f"https://www.youtube.com/@channel{number}\n" for number in range(count)]
+
+
+def test_pipeline_processes_every_channel():
+    """
+    Test case for processing a channel list through the pipeline.
+
+    Steps:
+    1. Run the pipeline over lines with channels, a failing channel, a comment and a blank line.
+    2. Assert that every channel gets exactly one result, in any order.
+    3. Assert that the failing channel has an error and the others have their videos.
+    """
+    lines = ["# channels\n", *channel_lines(20), "\n", "https://www.youtube.com/@missing\n"]
+    pipeline = Pipeline(workers=4, queue_depth=2, session=FakeSession())
+
+    results = {result.url: result for result in pipeline.run(lines)}
+
+    assert len(results) == 21
+    assert results["https://www.youtube.com/@missing"].error == "Channel ID not found."
+    channel = results["https://www.youtube.com/@channel7"]
+    assert channel.ok
+    assert channel.channel_id == "UCchannel7xxxxxxxxxxxxxx"
+    assert [video["title"] for video in channel.videos] == ["Video 1"]
+
+
+def test_pipeline_applies_backpressure():
+    """
+    Test case for bounding the input read ahead of a slow consumer.
+
+    Steps:
+    1. Run the pipeline over 1000 lines with queues of depth 2, counting the lines read.
+    2. Take one result and wait while the stages fill their queues.
+    3. Assert that only a few lines more than the queues and threads hold were read.
+    """
+    read = []
+
+    def lines():
+        for line in channel_lines(1000):
+            read.append(line)
+            yield line
+
+    pipeline = Pipeline(workers=2, queue_depth=2, session=FakeSession())
+    results = pipeline.run(lines())
+    next(results)
+    threading.Event().wait(0.5)
+    results.close()
+
+    # 4 queues of 2, 2 + 2 + 1 stage threads, the result taken and the line being put.
+    assert len(read) <= 4 * 2 + 5 + 2
+
+
+def test_pipeline_resumes_from_checkpoint(tmp_path):
+    """
+    Test case for checkpointing and resuming a run.
+
+    Steps:
+    1. Run the pipeline with a checkpoint and stop it after three results.
+    2. Assert that the checkpoint holds the offset of the first line not written.
+    3. Resume with the same checkpoint and assert that only the remaining channels are processed.
+    4. Assert that the checkpoint is removed once the whole input is done.
+    """
+    path = tmp_path / "checkpoint.json"
+    lines = ["# channels\n", *channel_lines(2), "\n", *channel_lines(5)[2:]]
+
+    def pipeline():
+        return Pipeline(
+            workers=1, queue_depth=1, session=FakeSession(), checkpoint=Checkpoint(path)
+        )
+
+    results = pipeline().run(lines)
+    first = [next(results).url for _ in range(3)]
+    results.close()
+
+    assert first == [line.strip() for line in channel_lines(3)]
+    assert json.loads(path.read_text()) == {"offset": 4}
+
+    rest = [result.url for result in pipeline().run(lines)]
+    assert rest == [line.strip() for line in channel_lines(5)[2:]]
+    assert not path.exists()
+
+
+def test_invalid_pipeline_options(tmp_path):
+    """
+    Test case for validating the pipeline options and checkpoint files.
+
+    Steps:
+    1. Assert that non-positive workers or queue depths raise a ValueError.
+    2. Write a corrupt checkpoint file and assert that opening it raises a ValueError.
+    """
+    for options in [{"workers": 0}, {"queue_depth": 0}, {"queue_depths": {"fetch": 0}}]:
+        with pytest.raises(ValueError):
+            Pipeline(session=FakeSession(), **options)
+
+    path = tmp_path / "checkpoint.json"
+    path.write_text("{")
+    with pytest.raises(ValueError):
+        Checkpoint(path)
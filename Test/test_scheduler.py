@@ -0,0 +1,197 @@
+import threading
+
+import pytest
+
+from batch import ChannelResult
+from scheduler import PollScheduler, estimate_interval, watch
+
+HOUR = 60 * 60
+DAY = 24 * HOUR
+
+# 2023-10-10T00:00:00+00:00
+NOW = 1696896000.0
+
+
+def daily_uploads(count):
+    """Returns newest-first publication timestamps of one upload per day before NOW."""
+    return [f"2023-10-{9 - day:02d}T00:00:00+00:00" for day in range(count)]
+
+
+def test_estimate_interval_from_upload_cadence():
+    """
+    Test case for estimating the poll interval from publication timestamps.
+
+    Steps:
+    1. Estimate the interval of a channel uploading daily, with a single upload, and with none.
+    2. Assert that the daily channel is polled twice a day.
+    3. Assert that a single upload uses the time since that upload, and no uploads give None.
+    """
+    assert estimate_interval(daily_uploads(5), NOW) == DAY / 2
+    assert estimate_interval(["2023-10-06T00:00:00+00:00"], NOW) == 2 * DAY
+    assert estimate_interval([], NOW) is None
+
+
+def test_estimate_interval_skips_malformed_timestamps(tmp_path):
+    """
+    Test case for estimating the poll interval from feeds with malformed publication timestamps.
+
+    Steps:
+    1. Estimate the interval of a daily channel with malformed timestamps among its uploads.
+    2. Assert that the malformed timestamps are skipped, and that only malformed ones give None.
+    3. Record a success with only malformed timestamps and assert that the channel is polled
+       again after the maximum interval.
+    """
+    published = ["not a date", *daily_uploads(5), "2023-13-45T99:00:00"]
+    assert estimate_interval(published, NOW) == DAY / 2
+    assert estimate_interval(["not a date", ""], NOW) is None
+
+    with PollScheduler(
+        tmp_path / "schedule.sqlite3", min_interval=DAY, max_interval=7 * DAY, jitter=0
+    ) as scheduler:
+        scheduler.add("https://www.youtube.com/@broken", now=NOW)
+        assert (
+            scheduler.record_success("https://www.youtube.com/@broken", ["not a date"], now=NOW)
+            == NOW + 7 * DAY
+        )
+
+
+def test_scheduler_orders_channels_by_cadence(tmp_path):
+    """
+    Test case for scheduling channels by their observed upload cadence.
+
+    This test verifies that new channels are due right away and that, after a poll, an active
+    channel is due again much sooner than a rarely uploading one, within the interval bounds.
+
+    Steps:
+    1. Add two channels and pop them as due.
+    2. Record a daily upload cadence for one and a yearly cadence for the other.
+    3. Assert that their next polls are clamped to the minimum and maximum intervals.
+    4. Assert that the active channel is popped first.
+    """
+    with PollScheduler(
+        tmp_path / "schedule.sqlite3", min_interval=DAY, max_interval=7 * DAY, jitter=0
+    ) as scheduler:
+        scheduler.add("https://www.youtube.com/@active", now=NOW)
+        scheduler.add("https://www.youtube.com/@dormant", now=NOW)
+        assert scheduler.pop_due(NOW) == [
+            "https://www.youtube.com/@active",
+            "https://www.youtube.com/@dormant",
+        ]
+        assert scheduler.pop_due(NOW) == []
+
+        yearly = ["2023-01-01T00:00:00+00:00", "2022-01-01T00:00:00+00:00"]
+        assert (
+            scheduler.record_success("https://www.youtube.com/@dormant", yearly, now=NOW)
+            == NOW + 7 * DAY
+        )
+        assert (
+            scheduler.record_success("https://www.youtube.com/@active", daily_uploads(5), now=NOW)
+            == NOW + DAY
+        )
+
+        assert scheduler.next_poll_time() == NOW + DAY
+        assert scheduler.pop_due(NOW + 2 * DAY) == ["https://www.youtube.com/@active"]
+
+
+def test_scheduler_backs_off_exponentially_on_errors(tmp_path):
+    """
+    Test case for the exponential backoff of failing channels.
+
+    Steps:
+    1. Record four consecutive failures of a channel.
+    2. Assert that the delay doubles each time, up to the maximum interval.
+    3. Record a success and assert that the backoff is reset.
+    """
+    url = "https://www.youtube.com/@flaky"
+    with PollScheduler(
+        tmp_path / "schedule.sqlite3", min_interval=HOUR, max_interval=6 * HOUR, jitter=0
+    ) as scheduler:
+        scheduler.add(url, now=NOW)
+        delays = [scheduler.record_failure(url, now=NOW) - NOW for _ in range(4)]
+        assert delays == [HOUR, 2 * HOUR, 4 * HOUR, 6 * HOUR]
+        assert scheduler.record_success(url, daily_uploads(3), now=NOW) == NOW + 6 * HOUR
+
+
+def test_scheduler_applies_jitter_within_bounds(tmp_path):
+    """
+    Test case for randomizing poll intervals with jitter.
+
+    Steps:
+    1. Record successes of a channel with a jitter of 10%.
+    2. Assert that every delay lies within 10% of the interval, and that they differ.
+    """
+    url = "https://www.youtube.com/@channel"
+    with PollScheduler(
+        tmp_path / "schedule.sqlite3", min_interval=HOUR, max_interval=DAY, jitter=0.1
+    ) as scheduler:
+        scheduler.add(url, now=NOW)
+        delays = {scheduler.record_success(url, daily_uploads(5), now=NOW) - NOW for _ in range(5)}
+        assert all(0.9 * DAY / 2 <= delay <= 1.1 * DAY / 2 for delay in delays)
+        assert len(delays) > 1
+
+
+def test_scheduler_state_survives_restart(tmp_path):
+    """
+    Test case for persisting the schedule across restarts.
+
+    Steps:
+    1. Add a channel, record a success and close the scheduler.
+    2. Open a new scheduler on the same file and add the channel again.
+    3. Assert that the persisted next poll time is resumed instead of polling right away.
+    """
+    path = tmp_path / "schedule.sqlite3"
+    url = "https://www.youtube.com/@channel"
+    with PollScheduler(path, min_interval=HOUR, max_interval=DAY, jitter=0) as scheduler:
+        scheduler.add(url, now=NOW)
+        scheduler.pop_due(NOW)
+        next_poll = scheduler.record_success(url, daily_uploads(5), now=NOW)
+
+    with PollScheduler(path, min_interval=HOUR, max_interval=DAY, jitter=0) as scheduler:
+        assert scheduler.add(url, now=NOW + 60) == next_poll
+        assert scheduler.pop_due(NOW + 60) == []
+
+
+def test_scheduler_rejects_inverted_bounds(tmp_path):
+    """
+    Test case for rejecting a minimum interval greater than the maximum interval.
+
+    Steps:
+    1. Create a scheduler with `min_interval` greater than `max_interval`.
+    2. Assert that a `ValueError` is raised.
+    """
+    with pytest.raises(ValueError):
+        PollScheduler(tmp_path / "schedule.sqlite3", min_interval=DAY, max_interval=HOUR)
+
+
+def test_watch_polls_and_reschedules(tmp_path):
+    """
+    Test case for the polling loop.
+
+    Steps:
+    1. Add a healthy and a failing channel to a scheduler.
+    2. Run `watch` with a fake poll function that stops the loop after the first round.
+    3. Assert that both channels were polled once and rescheduled into the future.
+    """
+    stop = threading.Event()
+    polled = []
+    seen = []
+
+    def process(urls):
+        polled.extend(urls)
+        for url in urls:
+            error = "Channel ID not found." if "failing" in url else None
+            yield ChannelResult(url, None, None, [], error, 0.0, daily_uploads(3))
+        stop.set()
+
+    with PollScheduler(tmp_path / "schedule.sqlite3", jitter=0) as scheduler:
+        scheduler.add("https://www.youtube.com/@healthy")
+        scheduler.add("https://www.youtube.com/@failing")
+
+        watch(scheduler, process, seen.append, stop)
+
+        assert sorted(polled) == [
+            "https://www.youtube.com/@failing",
+            "https://www.youtube.com/@healthy",
+        ]
+        assert len(seen) == 2
+        assert scheduler.pop_due() == []
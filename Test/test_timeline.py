@@ -0,0 +1,116 @@
+import requests
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+from main import VideoEntry, parse_feed_entries
+from timeline import fetch_timeline, merge_timelines
+from video_index import VideoIndex
+
+
+def entry(video_id, published):
+    """Returns a video entry with the given ID and publication timestamp."""
+    return VideoEntry(video_id, video_id, published, f"https://youtu.be/{video_id}", "Author")
+
+
+class StandInSession:
+    """Sends the requests for www.youtube.com to a local stand-in instead."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def get(self, url, **kwargs):
+        return self.session.get(url.replace("https://www.youtube.com", self.base_url), **kwargs)
+
+
+def test_merge_timelines_is_sorted_and_lazy():
+    """
+    Test case for merging newest-first timelines.
+
+    This test verifies that the merged timeline is newest first, also across UTC offsets, and
+    that merging stops consuming the timelines once the limit is reached.
+
+    Steps:
+    1. Define two newest-first timelines, one of them with a non-UTC offset.
+    2. Wrap the second timeline in a generator recording how many entries were consumed.
+    3. Merge them with a limit of 3.
+    4. Assert that the entries are merged in order and the second timeline was not exhausted.
+    """
+    first = [
+        entry("a1", "2023-10-05T00:00:00+00:00"),
+        entry("a2", "2023-10-03T00:00:00+00:00"),
+    ]
+    second = [
+        entry("b1", "2023-10-05T01:00:00+02:00"),  # 2023-10-04T23:00 UTC
+        entry("b2", "2023-10-02T00:00:00+00:00"),
+        entry("b3", "2023-10-01T00:00:00+00:00"),
+    ]
+    consumed = []
+
+    def tracked(entries):
+        for item in entries:
+            consumed.append(item.video_id)
+            yield item
+
+    merged = merge_timelines([first, tracked(second)], limit=3)
+
+    assert [item.video_id for item in merged] == ["a1", "b1", "a2"]
+    assert "b3" not in consumed
+
+
+def test_fetch_timeline_merges_channels():
+    """
+    Test case for fetching and merging the feeds of several channels.
+
+    Steps:
+    1. Serve a corpus of three channels from a local stand-in for YouTube.
+    2. Call the `fetch_timeline` function with the channel URLs, plus the '/channel/' URL of
+       the first channel, and a limit of 10.
+    3. Assert that the result is the 10 newest entries of all feeds, newest first, with the
+       videos of the channel listed twice merged only once.
+    """
+    corpus = Corpus(3, page_size=4096)
+    all_entries = [item for channel in corpus for item in parse_feed_entries([channel.feed], 20)]
+    expected = sorted(all_entries, key=lambda item: item.published, reverse=True)[:10]
+
+    with StandInServer(corpus) as server:
+        timeline = list(
+            fetch_timeline(
+                [server.channel_url(channel.handle) for channel in corpus]
+                + [f"https://www.youtube.com/channel/{corpus.channels[0].channel_id}"],
+                limit=10,
+                session=StandInSession(server.base_url),
+            )
+        )
+
+    assert [item.published for item in timeline] == [item.published for item in expected]
+    assert {item.author for item in timeline} == {"Channel 0", "Channel 1", "Channel 2"}
+
+
+def test_fetch_timeline_records_only_emitted_videos(tmp_path):
+    """
+    Test case for recording the videos of a limited timeline in the index of seen videos.
+
+    Steps:
+    1. Serve a corpus of two channels from a local stand-in for YouTube.
+    2. Fetch their timeline with the index of seen videos and a limit of 2, twice.
+    3. Assert that each run emits the next 2 newest videos, and that only the emitted videos
+       are recorded as seen.
+    """
+    corpus = Corpus(2, page_size=4096)
+    all_entries = [item for channel in corpus for item in parse_feed_entries([channel.feed], 20)]
+    expected = sorted(all_entries, key=lambda item: item.published, reverse=True)[:4]
+
+    with StandInServer(corpus) as server, VideoIndex(tmp_path / "videos.sqlite3") as index:
+        urls = [server.channel_url(channel.handle) for channel in corpus]
+        runs = [
+            list(
+                fetch_timeline(
+                    urls, limit=2, session=StandInSession(server.base_url), video_index=index
+                )
+            )
+            for _ in range(2)
+        ]
+
+        assert [item.video_id for item in runs[0] + runs[1]] == [item.video_id for item in expected]
+        assert len(index) == 4
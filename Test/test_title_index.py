@@ -0,0 +1,137 @@
+import sqlite3
+from typing import NamedTuple
+
+import pytest
+
+from main import VideoEntry
+from title_index import TitleIndex, tokenize
+
+CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+
+
+def make_entry(number, title, day):
+    """Builds a VideoEntry with the given title, published on the given day of October 2023."""
+    return VideoEntry(
+        video_id=f"video{number}",
+        title=title,
+        published=f"2023-10-{day:02d}T00:00:00+00:00",
+        link=f"https://www.youtube.com/watch?v=video{number}",
+        author="Google for Developers",
+    )
+
+
+ENTRIES = [
+    make_entry(4, "Python Tutorial: Decorators", 4),
+    make_entry(3, "Rust tutorials for Python developers", 3),
+    make_entry(2, "Kotlin news", 2),
+    make_entry(1, "Python news, October edition", 1),
+]
+
+
+def test_tokenize_lowercases_and_deduplicates():
+    """
+    Test case for splitting titles into tokens.
+
+    Steps:
+    1. Tokenize a title with punctuation, mixed case and a repeated word.
+    2. Assert that the distinct lowercased words are returned in order.
+    """
+    assert tokenize("Python: Tips & Tricks, python TIPS") == ["python", "tips", "tricks"]
+
+
+def test_search_all_any_and_prefix_terms(tmp_path):
+    """
+    Test case for multi-term and prefix queries.
+
+    Steps:
+    1. Add four entries to the index.
+    2. Assert that 'all' queries return only the entries containing every term, newest first.
+    3. Assert that 'any' queries return the entries containing either term.
+    4. Assert that a prefix term matches every word starting with it.
+    """
+    with TitleIndex(tmp_path / "titles.sqlite3") as index:
+        assert index.add(CHANNEL_ID, ENTRIES) == 4
+
+        def video_ids(query, **options):
+            return [entry.video_id for entry in index.search(query, **options)]
+
+        assert video_ids("python news") == ["video1"]
+        assert video_ids("PYTHON") == ["video4", "video3", "video1"]
+        assert video_ids("kotlin rust", match="any") == ["video3", "video2"]
+        assert video_ids("tutorial*") == ["video4", "video3"]
+        assert video_ids("tutorial") == ["video4"]
+        assert video_ids("python", limit=1) == ["video4"]
+        assert index.search("decorators")[0] == ENTRIES[0]
+
+
+def test_search_date_bounds(tmp_path):
+    """
+    Test case for date-bounded queries.
+
+    Steps:
+    1. Add four entries published on consecutive days.
+    2. Assert that the since and until bounds are inclusive.
+    3. Assert that invalid queries and dates raise a ValueError.
+    """
+    with TitleIndex(tmp_path / "titles.sqlite3") as index:
+        index.add(CHANNEL_ID, ENTRIES)
+
+        found = index.search("python", since="2023-10-02", until="2023-10-03")
+        assert [entry.video_id for entry in found] == ["video3"]
+
+        for query, options in [("", {}), ("python", {"since": "10/01/2023"})]:
+            with pytest.raises(ValueError):
+                index.search(query, **options)
+
+
+def test_search_without_limit_returns_more_matches_than_query_variables(tmp_path, monkeypatch):
+    """
+    Test case for searching without a limit when the matches outnumber the query variables.
+
+    Steps:
+    1. Lower the variable limit of the index's SQLite connection to 10, and the number of
+       videos looked up per query to 8.
+    2. Add 25 entries with the same word in their titles.
+    3. Assert that a search without a limit returns every entry, newest first.
+    """
+    monkeypatch.setattr("title_index.MAX_QUERY_VARIABLES", 8)
+    with TitleIndex(tmp_path / "titles.sqlite3") as index:
+        # pylint: disable-next=protected-access
+        index._connection.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 10)
+        index.add(CHANNEL_ID, [make_entry(day, f"Daily news {day}", day) for day in range(1, 26)])
+
+        found = index.search("daily", limit=None)
+        assert [entry.video_id for entry in found] == [f"video{day}" for day in range(25, 0, -1)]
+
+
+def test_add_is_incremental_and_persistent(tmp_path):
+    """
+    Test case for incremental updates of the index.
+
+    Steps:
+    1. Add the entries, then add them again with one title changed, and close the index.
+    2. Assert that only the changed entry was re-indexed.
+    3. Reopen the index and assert that the old title no longer matches and the new one does.
+    4. Add an entry with a description and assert that its description is searchable.
+    """
+    path = tmp_path / "titles.sqlite3"
+    with TitleIndex(path) as index:
+        index.add(CHANNEL_ID, ENTRIES)
+        renamed = ENTRIES[2]._replace(title="Kotlin coroutines explained")
+        assert index.add(CHANNEL_ID, [ENTRIES[0], renamed]) == 1
+
+    class DescribedEntry(NamedTuple):
+        video_id: str
+        title: str
+        published: str
+        link: str
+        author: str
+        description: str
+
+    with TitleIndex(path) as index:
+        assert len(index) == 4
+        assert index.search("news") == [ENTRIES[3]]
+        assert index.search("coroutines") == [renamed]
+
+        index.add(CHANNEL_ID, [DescribedEntry(*make_entry(5, "Live", 5), "Ask us about Gradle")])
+        assert [entry.video_id for entry in index.search("gradle")] == ["video5"]
@@ -0,0 +1,129 @@
+from main import VideoEntry
+from video_index import VideoIndex
+
+CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+
+
+def make_entry(number, day):
+    """Builds a VideoEntry published on the given day of October 2023."""
+    return VideoEntry(
+        video_id=f"video{number}",
+        title=f"Video {number}",
+        published=f"2023-10-{day:02d}T00:00:00+00:00",
+        link=f"https://www.youtube.com/watch?v=video{number}",
+        author="Google for Developers",
+    )
+
+
+def test_iter_new_records_and_skips_seen_videos(tmp_path):
+    """
+    Test case for emitting only videos not seen in an earlier run.
+
+    This test verifies that `VideoIndex.iter_new` yields every entry on the first run, and on
+    the next run yields only the new upload before stopping at the first recorded video.
+
+    Steps:
+    1. Pass a newest-first feed of two entries through the index and close it.
+    2. Reopen the index and pass a feed with one new entry on top of the old ones.
+    3. Assert that only the new entry is yielded the second time.
+    4. Assert that iteration stopped without consuming the rest of the feed.
+    """
+    path = tmp_path / "videos.sqlite3"
+    with VideoIndex(path) as index:
+        first_run = list(index.iter_new(CHANNEL_ID, [make_entry(2, 2), make_entry(1, 1)]))
+        assert [entry.video_id for entry in first_run] == ["video2", "video1"]
+
+    consumed = []
+
+    def feed():
+        for entry in [make_entry(3, 3), make_entry(2, 2), make_entry(1, 1)]:
+            consumed.append(entry.video_id)
+            yield entry
+
+    with VideoIndex(path) as index:
+        second_run = list(index.iter_new(CHANNEL_ID, feed()))
+        assert [entry.video_id for entry in second_run] == ["video3"]
+        assert consumed == ["video3", "video2"]
+        assert len(index) == 3
+        assert index.latest_published(CHANNEL_ID) == "2023-10-03T00:00:00+00:00"
+
+
+def test_iter_new_stops_at_videos_older_than_newest_recorded(tmp_path):
+    """
+    Test case for stopping at unrecorded videos older than the newest recorded one.
+
+    Steps:
+    1. Record a single video published on October 5th.
+    2. Pass a feed with a newer video and an older, unrecorded video through the index.
+    3. Assert that only the newer video is yielded.
+    """
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        index.record(CHANNEL_ID, make_entry(5, 5))
+
+        new_entries = list(index.iter_new(CHANNEL_ID, [make_entry(6, 6), make_entry(4, 4)]))
+
+        assert [entry.video_id for entry in new_entries] == ["video6"]
+        assert "video4" not in index
+
+
+def test_iter_new_keeps_channels_apart(tmp_path):
+    """
+    Test case for tracking the newest recorded video per channel.
+
+    Steps:
+    1. Record a recent video for one channel.
+    2. Pass an older feed of another channel through the index.
+    3. Assert that every entry of the other channel is yielded.
+    """
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        index.record(CHANNEL_ID, make_entry(9, 9))
+
+        other = list(index.iter_new("UC" + "b" * 22, [make_entry(2, 2), make_entry(1, 1)]))
+
+        assert len(other) == 2
+
+
+def test_iter_new_skips_cutoff_for_malformed_timestamps(tmp_path):
+    """
+    Test case for feed entries without a valid publication timestamp.
+
+    Steps:
+    1. Record a video, then pass a feed with an entry with an empty and one with a malformed
+       timestamp through the index.
+    2. Assert that both entries are yielded and recorded, without comparing them to the newest
+       recorded video.
+    3. Assert that they are skipped on the next run, as recorded videos.
+    """
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        index.record(CHANNEL_ID, make_entry(5, 5))
+        feed = [
+            make_entry(7, 7)._replace(published=""),
+            make_entry(6, 6)._replace(published="yesterday"),
+        ]
+
+        assert [entry.video_id for entry in index.iter_new(CHANNEL_ID, feed)] == [
+            "video7",
+            "video6",
+        ]
+        assert list(index.iter_new(CHANNEL_ID, feed)) == []
+
+
+def test_iter_new_cutoff_applies_to_videos_rejected_by_a_filter(tmp_path):
+    """
+    Test case for videos rejected by a filter in an earlier run.
+
+    Steps:
+    1. Record the video kept by a filter from a feed of three videos, the rejected ones being
+       newer and older than the kept one.
+    2. Pass the whole feed through the index, as with the filter removed.
+    3. Assert that only the rejected video newer than the kept one is yielded.
+    """
+    feed = [make_entry(3, 3), make_entry(2, 2), make_entry(1, 1)]
+    with VideoIndex(tmp_path / "videos.sqlite3") as index:
+        kept = list(index.iter_new(CHANNEL_ID, [feed[1]]))
+        assert [entry.video_id for entry in kept] == ["video2"]
+
+        new_entries = list(index.iter_new(CHANNEL_ID, feed))
+
+        assert [entry.video_id for entry in new_entries] == ["video3"]
+        assert "video1" not in index
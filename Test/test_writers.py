@@ -0,0 +1,142 @@
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from batch import ChannelResult
+from main import VideoEntry, parse_feed_entries
+from writers import VIDEO_FIELDS, create_writer, open_output
+
+CHANNEL_ID = "UC_x5XG1OV2P6uZZ5FSM9Ttw"
+CHANNEL_URL = "https://www.youtube.com/@GoogleDevelopers"
+FEED_URL = f"https://www.youtube.com/feeds/videos.xml?channel_id={CHANNEL_ID}"
+
+ENTRIES = [
+    VideoEntry(
+        "abc123",
+        'Tips & "tricks" <2024>',
+        "2024-01-02T00:00:00+00:00",
+        "https://www.youtube.com/watch?v=abc123",
+        "Google for Developers",
+    ),
+    VideoEntry(
+        "def456",
+        "Überblick, Teil 2",
+        "2024-01-01T00:00:00+00:00",
+        "https://www.youtube.com/watch?v=def456",
+        "Google for Developers",
+    ),
+]
+
+
+def test_jsonl_writer_streams_records():
+    """
+    Test case for the JSON Lines writer.
+
+    Steps:
+    1. Write a video and assert that its line is written before the writer is closed.
+    2. Write a second video, close the writer and parse every line.
+    3. Assert that the records hold the video and channel fields.
+    """
+    stream = io.StringIO()
+    writer = create_writer("jsonl", stream)
+    writer.write_video(ENTRIES[0], CHANNEL_ID, CHANNEL_URL)
+    assert stream.getvalue().count("\n") == 1
+    writer.write_video(ENTRIES[1], CHANNEL_ID, CHANNEL_URL)
+    writer.close()
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["video_id"] for record in records] == ["abc123", "def456"]
+    assert records[1]["title"] == "Überblick, Teil 2"
+    assert records[0]["channel_id"] == CHANNEL_ID
+    assert list(records[0]) == list(VIDEO_FIELDS)
+
+
+def test_csv_writer_quotes_fields():
+    """
+    Test case for the CSV writer.
+
+    Steps:
+    1. Write two videos, one of them with quotes and commas in its title.
+    2. Assert that the header row and the rows round-trip through the csv module.
+    """
+    stream = io.StringIO()
+    with create_writer("csv", stream) as writer:
+        for entry in ENTRIES:
+            writer.write_video(entry, CHANNEL_ID)
+
+    rows = list(csv.DictReader(io.StringIO(stream.getvalue())))
+    assert [row["title"] for row in rows] == [entry.title for entry in ENTRIES]
+    assert rows[0]["channel_id"] == CHANNEL_ID
+    assert rows[0]["channel_url"] == ""
+
+
+def test_csv_writer_appends_without_repeating_header(tmp_path):
+    """
+    Test case for appending to an output file, as when resuming an interrupted run.
+
+    Steps:
+    1. Write a video to a new CSV file, then append a second video to it.
+    2. Assert that the file has a single header row followed by both videos.
+    """
+    path = tmp_path / "videos.csv"
+    for append, entry in [(False, ENTRIES[0]), (True, ENTRIES[1])]:
+        with open_output(str(path), append=append) as stream:
+            with create_writer("csv", stream) as writer:
+                writer.write_video(entry, CHANNEL_ID)
+
+    rows = list(csv.DictReader(io.StringIO(path.read_text(encoding="utf-8"))))
+    assert [row["video_id"] for row in rows] == ["abc123", "def456"]
+
+
+def test_atom_writer_output_parses_as_feed():
+    """
+    Test case for the Atom writer.
+
+    Steps:
+    1. Write two videos as an Atom feed.
+    2. Assert that the feed parses back into the same entries with the feed parser.
+    """
+    stream = io.StringIO()
+    with create_writer("atom", stream, title="Subscriptions") as writer:
+        for entry in ENTRIES:
+            writer.write_video(entry, CHANNEL_ID)
+
+    assert parse_feed_entries([stream.getvalue().encode("utf-8")], limit=10) == ENTRIES
+
+
+def test_opml_writer_lists_each_channel_once():
+    """
+    Test case for the OPML writer.
+
+    Steps:
+    1. Write a successful batch result twice and a failed result.
+    2. Assert that the OPML lists the channel once, with its feed URL and name.
+    3. Assert that videos are not written to the OPML list.
+    """
+    result = ChannelResult(CHANNEL_URL, CHANNEL_ID, FEED_URL, [], None, 0.1, entries=list(ENTRIES))
+    failed = ChannelResult("https://www.youtube.com/@missing", None, None, None, "Not found.", 0.1)
+    stream = io.StringIO()
+    with create_writer("opml", stream) as writer:
+        writer.write_result(result)
+        writer.write_result(result)
+        writer.write_result(failed)
+
+    outlines = ET.fromstring(stream.getvalue()).findall("./body/outline")
+    assert len(outlines) == 1
+    assert outlines[0].get("xmlUrl") == FEED_URL
+    assert outlines[0].get("htmlUrl") == CHANNEL_URL
+    assert outlines[0].get("text") == "Google for Developers"
+
+
+def test_create_writer_rejects_unknown_format():
+    """
+    Test case for creating a writer of an unknown format.
+
+    Steps:
+    1. Assert that a ValueError is raised for the 'text' format, which has no writer.
+    """
+    with pytest.raises(ValueError):
+        create_writer("text", io.StringIO())
@@ -0,0 +1,410 @@
+"""
+Concurrent multi-channel batch mode.
+
+Resolves channel IDs and fetches the RSS feeds of many channels at once. The channels are
+processed by a bounded thread pool sharing one requests.Session, whose connection pool is sized
+to the number of workers so that connections to YouTube are reused instead of reopened for every
+request. A per-host limit caps how many requests run against the same host at a time. Results are
+yielded in completion order, as soon as each channel is done.
+
+The same channel often appears under several URL forms ('/@handle', 'm.youtube.com', '/videos'
+suffixes, tracking query strings, '/channel/UC...'). Within a run, channel pages are resolved
+once per canonical URL, and concurrent fetches of the feed of the same channel wait for the one
+in flight and share its result. Feeds are not kept once fetched, so that the memory of a run
+does not grow with the entries of every channel.
+
+With a parse pool (see parse_pool), the threads only fetch: channel pages and feeds are parsed
+in worker processes, so that CPU-bound parsing scales with the number of cores.
+
+Functions:
+    format_channel_result(result): Formats the outcome of a channel for printing.
+    read_channel_urls(lines): Reads channel URLs from lines of text, skipping blanks and comments.
+    create_session(pool_size, ...): Creates an HTTP client with a connection pool of the given
+        size, retries and per-host rate limiting.
+    process_channel(url, session, ...): Resolves and fetches the feed of a single channel.
+    run_batch(urls, ...): Processes channels concurrently, yielding results in completion order.
+
+Classes:
+    HostLimiter: Limits the number of concurrent requests per host.
+    ChannelCoalescer: Shares channel resolutions and feed fetches within a run.
+    ChannelResult: The outcome of processing one channel.
+    BatchSummary: Success and failure counts of a batch run.
+"""
+
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+from http_client import HttpClient
+from channel_cache import ChannelIdCache, normalize_channel_url
+from coalesce import Once, SingleFlight
+from feed_cache import FeedCache
+from filters import VideoFilter
+from parse_pool import ParsePool
+from title_index import TitleIndex
+from video_index import VideoIndex
+from main import VideoEntry, create_rss_feed_url, fetch_rss_feed_content, resolve_channel_id
+
+DEFAULT_WORKERS = 16
+DEFAULT_PER_HOST_LIMIT = 8
+
+
+class ChannelResult(NamedTuple):
+    """
+    The outcome of processing one channel.
+
+    Attributes:
+        url (str): The YouTube channel URL from the input.
+        channel_id (str): The resolved channel ID, or None.
+        feed_url (str): The RSS feed URL, or None.
+        videos (list): The filtered video details, or None if the channel failed.
+        error (str): A description of the failure, or None if the channel succeeded.
+        elapsed (float): The number of seconds spent on the channel.
+        published (list): The publication timestamps of all fetched feed entries, before
+            filtering, or None if the feed was not fetched.
+        entries (list): The filtered VideoEntry records, or None if the channel failed.
+    """
+
+    url: str
+    channel_id: str | None
+    feed_url: str | None
+    videos: list[dict[str, str]] | None
+    error: str | None
+    elapsed: float
+    published: list[str] | None = None
+    entries: list[VideoEntry] | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the channel was processed successfully."""
+        return self.error is None
+
+
+class BatchSummary:
+    """Success and failure counts of a batch run."""
+
+    def __init__(self):
+        self.succeeded = 0
+        self.failures: list[ChannelResult] = []
+
+    def add(self, result: ChannelResult) -> None:
+        """
+        Records the outcome of one channel.
+
+        Args:
+            result (ChannelResult): The outcome of the channel.
+        """
+        if result.ok:
+            self.succeeded += 1
+        else:
+            self.failures.append(result)
+
+    @property
+    def total(self) -> int:
+        """The number of channels processed."""
+        return self.succeeded + len(self.failures)
+
+    def __str__(self) -> str:
+        lines = [
+            f"Processed {self.total} channels: "
+            f"{self.succeeded} succeeded, {len(self.failures)} failed."
+        ]
+        lines.extend(f"FAILED {result.url}: {result.error}" for result in self.failures)
+        return "\n".join(lines)
+
+
+class HostLimiter:
+    """
+    Limits the number of concurrent requests per host.
+
+    Args:
+        per_host_limit (int): The maximum number of concurrent requests to the same host.
+    """
+
+    def __init__(self, per_host_limit: int = DEFAULT_PER_HOST_LIMIT):
+        self.per_host_limit = per_host_limit
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str):
+        """
+        Holds one of the request slots of the host of the URL for the duration of the block.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        host = urlsplit(url).hostname or ""
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+        with semaphore:
+            yield
+
+
+class ChannelCoalescer:
+    """
+    Shares channel resolutions and feed fetches between the channels of a run, so that every
+    channel page is fetched once however many URL forms of it are listed. The feeds are only
+    shared while their fetch is in flight, and not kept afterwards.
+
+    Attributes:
+        resolutions (Once): The channel ID resolutions, by canonical channel URL.
+        feeds (SingleFlight): The feed fetches in flight, by channel ID.
+    """
+
+    def __init__(self):
+        self.resolutions = Once()
+        self.feeds = SingleFlight()
+        self._claimed: set[str] = set()
+        self._lock = threading.Lock()
+
+    def resolve(self, url: str, function: Callable[[], str | None]) -> str | None:
+        """
+        Resolves the channel ID of a URL once per canonical channel URL.
+
+        Args:
+            url (str): The YouTube channel URL.
+            function (Callable): Resolves the channel ID, if no other form of the URL has.
+
+        Returns:
+            str: The channel ID, or None if it was not found.
+        """
+        return self.resolutions.do(normalize_channel_url(url) or url, function)
+
+    def fetch(
+        self, channel_id: str, function: Callable[[], list[VideoEntry] | None]
+    ) -> list[VideoEntry] | None:
+        """
+        Fetches the feed entries of a channel, or waits for the fetch in flight for it.
+
+        Args:
+            channel_id (str): The channel ID.
+            function (Callable): Fetches the feed entries, if no other URL of the channel is.
+
+        Returns:
+            list: The feed entries, or None if the feed could not be fetched.
+        """
+        return self.feeds.do(channel_id, function)
+
+    def claim(self, channel_id: str) -> bool:
+        """
+        Claims a channel for the first URL that resolves to it.
+
+        Args:
+            channel_id (str): The channel ID.
+
+        Returns:
+            bool: True the first time the channel is claimed in the run, otherwise False.
+        """
+        with self._lock:
+            if channel_id in self._claimed:
+                return False
+            self._claimed.add(channel_id)
+            return True
+
+
+def format_channel_result(result: ChannelResult) -> str:
+    """
+    Formats the outcome of a channel for printing, in the style of the single-channel output.
+
+    Args:
+        result (ChannelResult): The outcome of the channel.
+
+    Returns:
+        str: The formatted channel, followed by a blank line.
+    """
+    lines = [f"Channel: {result.url}"]
+    if not result.ok:
+        lines.append(f"Error: {result.error}\n")
+        return "\n".join(lines)
+    lines.append(f"Channel ID: {result.channel_id}")
+    lines.append(f"RSS Feed URL: {result.feed_url}\n")
+    for video in result.videos:
+        lines.append(f"Title: {video['title']}")
+        lines.append(f"Published: {video['published']}")
+        lines.append(f"Link: {video['link']}\n")
+    return "\n".join(lines)
+
+
+def read_channel_urls(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Reads channel URLs from lines of text, skipping blank lines and '#' comments.
+
+    Args:
+        lines (Iterable[str]): The lines of text, e.g. an open file or sys.stdin.
+
+    Yields:
+        str: The channel URLs.
+    """
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+def create_session(pool_size: int = DEFAULT_WORKERS, **client_options) -> HttpClient:
+    """
+    Creates an HTTP client over a session with a connection pool of the given size.
+
+    Args:
+        pool_size (int, optional): The number of connections kept per host. Defaults to 16.
+        **client_options: Further arguments for HttpClient (retries, backoff, rate, burst,
+            failure_threshold, cooldown, connect_timeout, read_timeout).
+
+    Returns:
+        HttpClient: The client, retrying transient failures and rate limiting each host.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return HttpClient(session, **client_options)
+
+
+def process_channel(
+    url: str,
+    session: requests.Session | None = None,
+    limiter: HostLimiter | None = None,
+    cache: ChannelIdCache | None = None,
+    feed_cache: FeedCache | None = None,
+    video_index: VideoIndex | None = None,
+    engine: str = "regex",
+    limit: int = 5,
+    video_filter: VideoFilter | None = None,
+    coalescer: ChannelCoalescer | None = None,
+    title_index: TitleIndex | None = None,
+    parse_pool: ParsePool | None = None,
+) -> ChannelResult:
+    """
+    Resolves the channel ID, fetches the RSS feed and filters the videos of a single channel.
+
+    Args:
+        url (str): The YouTube channel URL.
+        session (requests.Session, optional): The shared HTTP session. Defaults to None.
+        limiter (HostLimiter, optional): The per-host request limiter. Defaults to None.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+        feed_cache (FeedCache, optional): The conditional GET feed cache. Defaults to None.
+        video_index (VideoIndex, optional): The index of seen videos; if given, only videos
+            not seen before are kept. Defaults to None.
+        engine (str, optional): The channel ID extraction engine. Defaults to "regex".
+        limit (int, optional): The maximum number of videos to fetch. Defaults to 5.
+        video_filter (VideoFilter, optional): The compiled video filter. Defaults to None.
+        coalescer (ChannelCoalescer, optional): Shares resolutions and feed fetches with the
+            other channels of the run. Defaults to None.
+        title_index (TitleIndex, optional): The title index the fetched entries are added to.
+            Defaults to None.
+        parse_pool (ParsePool, optional): The worker processes the channel page and feed are
+            parsed in. Defaults to None, which parses them in the calling thread.
+
+    Returns:
+        ChannelResult: The outcome of the channel.
+    """
+    limiter = limiter or HostLimiter()
+    coalescer = coalescer or ChannelCoalescer()
+    started = time.perf_counter()
+
+    def result(
+        channel_id=None, feed_url=None, videos=None, error=None, published=None, entries=None
+    ) -> ChannelResult:
+        elapsed = time.perf_counter() - started
+        return ChannelResult(url, channel_id, feed_url, videos, error, elapsed, published, entries)
+
+    def resolve() -> str | None:
+        with limiter.limit(url):
+            return resolve_channel_id(url, cache, engine, session, parse_pool)
+
+    channel_id = coalescer.resolve(url, resolve)
+    if not channel_id:
+        return result(error="Channel ID not found.")
+    feed_url = create_rss_feed_url(channel_id)
+
+    def fetch() -> list[VideoEntry] | None:
+        with limiter.limit(feed_url):
+            fetched = fetch_rss_feed_content(feed_url, limit, session, feed_cache, parse_pool)
+        if fetched is not None and title_index is not None:
+            title_index.add(channel_id, fetched)
+        return fetched
+
+    entries = coalescer.fetch(channel_id, fetch)
+    if entries is None:
+        return result(channel_id, feed_url, error="Could not fetch RSS feed content.")
+    published = [entry.published for entry in entries]
+    with instrumentation.stage("filter"):
+        if video_filter is not None:
+            entries = video_filter.apply(entries)
+        if video_index is not None:
+            # Only the videos kept by the filter are emitted, and so recorded as seen.
+            entries = video_index.iter_new(channel_id, entries)
+        entries = list(entries)
+    videos = [
+        {"title": entry.title, "published": entry.published, "link": entry.link}
+        for entry in entries
+    ]
+    return result(channel_id, feed_url, videos, published=published, entries=entries)
+
+
+def run_batch(
+    urls: Iterable[str],
+    max_workers: int = DEFAULT_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: requests.Session | None = None,
+    **channel_options,
+) -> Iterator[ChannelResult]:
+    """
+    Processes channels concurrently, yielding each result as soon as its channel is done.
+
+    At most `max_workers` channels are in flight at a time and the input is consumed lazily,
+    so a long list of URLs is never held in memory at once. Every channel is resolved once,
+    however many URL forms of it are listed, and its concurrent feed fetches are shared; each
+    listed URL still gets a result.
+
+    Args:
+        urls (Iterable[str]): The YouTube channel URLs.
+        max_workers (int, optional): The global concurrency limit. Defaults to 16.
+        per_host_limit (int, optional): The per-host concurrency limit. Defaults to 8.
+        session (requests.Session, optional): The shared HTTP session. Defaults to a new
+            session with a connection pool sized to `max_workers`.
+        **channel_options: Further arguments for process_channel (cache, feed_cache,
+            video_index, engine, limit, video_filter, title_index, parse_pool).
+
+    Yields:
+        ChannelResult: The outcome of each channel, in completion order.
+    """
+    session = session if session is not None else create_session(max_workers)
+    limiter = HostLimiter(per_host_limit)
+    coalescer = ChannelCoalescer()
+    url_iterator = iter(urls)
+    pending: dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_next() -> bool:
+            url = next(url_iterator, None)
+            if url is None:
+                return False
+            future = executor.submit(
+                process_channel, url, session, limiter, coalescer=coalescer, **channel_options
+            )
+            pending[future] = url
+            return True
+
+        while len(pending) < max_workers and submit_next():
+            pass
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                url = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    yield ChannelResult(url, None, None, None, f"Unexpected error: {e}", 0.0)
+                submit_next()
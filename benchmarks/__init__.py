@@ -0,0 +1 @@
+"""Benchmarks for the YouTube channel to RSS feed script."""
@@ -0,0 +1,119 @@
+"""
+Benchmark of delivering videos to a webhook one by one and in batches.
+
+Delivers synthetic videos to a local webhook stand-in whose every request costs the receiver a
+fixed time, through a Delivery with batches of 1 video (one POST per video) and of increasing
+sizes. The report gives, per batch size, the number of requests received, the best wall time
+over several rounds until every video was delivered, the CPU time of the process (sender and
+stand-in) per video in microseconds in that round, and the speedup of the wall time over one POST
+per video, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_delivery [--videos 2000] [--batch-sizes 1,10,50,100,500]
+                                        [--latency 0.001] [--rounds 3]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.standin import WebhookStandIn
+from delivery import Delivery, Outbox, WebhookSink
+from main import VideoEntry
+
+DEFAULT_BATCH_SIZES = (1, 10, 50, 100, 500)
+
+
+def make_entries(videos: int) -> list[VideoEntry]:
+    """Returns synthetic video entries."""
+    return [
+        VideoEntry(
+            f"video{number:07d}",
+            f"Synthetic video number {number}",
+            "2024-01-01T00:00:00+00:00",
+            f"https://www.youtube.com/watch?v=video{number:07d}",
+            "Synthetic channel",
+        )
+        for number in range(videos)
+    ]
+
+
+def time_delivery(entries: list[VideoEntry], batch_size: int, latency: float) -> dict:
+    """
+    Delivers the videos to a fresh webhook stand-in.
+
+    Args:
+        entries (list): The video entries.
+        batch_size (int): The largest number of videos in a batch.
+        latency (float): The time each request costs the stand-in, in seconds.
+
+    Returns:
+        dict: Whether every video was delivered, the requests received, the wall time and the
+        CPU time per video.
+    """
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        WebhookStandIn(latency=latency) as server,
+        Outbox(Path(directory) / "outbox.sqlite3") as outbox,
+    ):
+        delivery = Delivery([WebhookSink(server.base_url)], outbox, batch_size, window=0.05)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        for entry in entries:
+            delivery.deliver_video(entry, "UC" + "0" * 22)
+        delivery.close()
+        elapsed = time.perf_counter() - started
+        cpu = time.process_time() - cpu_started
+        return {
+            "all_delivered": len(server.videos) == len(entries),
+            "requests": server.requests,
+            "wall_seconds": round(elapsed, 3),
+            "cpu_us_per_video": round(cpu / len(entries) * 1e6, 1),
+        }
+
+
+def run(videos: int, batch_sizes: tuple[int, ...], latency: float, rounds: int) -> dict:
+    """
+    Delivers the videos with every batch size, keeping the fastest round.
+
+    Returns:
+        dict: The report.
+    """
+    entries = make_entries(videos)
+    report = {"videos": videos, "latency": latency, "rounds": rounds, "batch_sizes": {}}
+    baseline = None
+    for batch_size in batch_sizes:
+        result = min(
+            (time_delivery(entries, batch_size, latency) for _ in range(rounds)),
+            key=lambda result: result["wall_seconds"],
+        )
+        baseline = baseline or result["wall_seconds"]
+        result["speedup"] = round(baseline / result["wall_seconds"], 1)
+        report["batch_sizes"][str(batch_size)] = result
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark batched webhook delivery.")
+    parser.add_argument("--videos", type=int, default=2000, help="Number of videos delivered")
+    parser.add_argument(
+        "--batch-sizes",
+        default=",".join(map(str, DEFAULT_BATCH_SIZES)),
+        help="Comma-separated batch sizes, the first one being the baseline",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.001, help="Stand-in time per request in seconds"
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Number of rounds")
+    args = parser.parse_args()
+
+    batch_sizes = tuple(int(size) for size in args.batch_sizes.split(","))
+    report = run(args.videos, batch_sizes, args.latency, args.rounds)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
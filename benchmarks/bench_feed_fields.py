@@ -0,0 +1,100 @@
+"""
+Benchmark of decoding feed entries eagerly and lazily with field projections.
+
+Parses a synthetic YouTube feed (15 entries with their 'media:group') and reads the videos
+through filter_videos, comparing today's path, which parses every entry into a VideoEntry record
+and returns its title, publication date and link, with LazyEntry records projected on:
+
+    three       the same three fields
+    one         the title only
+    media       the title, view count and star rating
+    all         every field, including the description and thumbnail
+
+The report gives, per path, the best time per feed over several rounds in microseconds and the
+ratio to today's path, and whether the three-field projection costs no more than today's path,
+as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_feed_fields [--feeds 2000] [--limit 15] [--rounds 5]
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.corpus import FEED_ENTRIES, generate_feed
+from feed_entries import ALL_FIELDS
+from main import DEFAULT_VIDEO_FIELDS, filter_videos, parse_feed_entries
+
+PROJECTIONS = {
+    "three": DEFAULT_VIDEO_FIELDS,
+    "one": ("title",),
+    "media": ("title", "views", "star_rating"),
+    "all": ALL_FIELDS,
+}
+
+
+def time_path(feed: bytes, feeds: int, limit: int, rounds: int, fields=None) -> float:
+    """
+    Times parsing a feed and reading its videos.
+
+    Args:
+        feed (bytes): The feed content.
+        feeds (int): The number of times the feed is parsed per round.
+        limit (int): The maximum number of entries parsed.
+        rounds (int): The number of rounds.
+        fields (tuple, optional): The projection, or None for VideoEntry records and the
+            default fields.
+
+    Returns:
+        float: The best time per feed in seconds.
+    """
+    read_fields = DEFAULT_VIDEO_FIELDS if fields is None else fields
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(feeds):
+            filter_videos(parse_feed_entries([feed], limit, fields), fields=read_fields)
+        best = min(best, (time.perf_counter() - started) / feeds)
+    return best
+
+
+def run(feeds: int, limit: int, rounds: int) -> dict:
+    """
+    Times today's path and every projection.
+
+    Returns:
+        dict: The report.
+    """
+    feed = generate_feed("UC" + "0" * 22, "Channel", entries=max(limit, FEED_ENTRIES))
+    baseline = time_path(feed, feeds, limit, rounds)
+    report = {
+        "feeds": feeds,
+        "limit": limit,
+        "rounds": rounds,
+        "paths": {"video_entry": {"us_per_feed": round(baseline * 1e6, 1), "ratio": 1.0}},
+    }
+    for name, fields in PROJECTIONS.items():
+        elapsed = time_path(feed, feeds, limit, rounds, fields)
+        report["paths"][name] = {
+            "us_per_feed": round(elapsed * 1e6, 1),
+            "ratio": round(elapsed / baseline, 2),
+        }
+    report["projection_within_budget"] = report["paths"]["three"]["ratio"] <= 1.0
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark lazy feed entry fields.")
+    parser.add_argument("--feeds", type=int, default=2000, help="Feeds parsed per round")
+    parser.add_argument("--limit", type=int, default=FEED_ENTRIES, help="Entries parsed per feed")
+    parser.add_argument("--rounds", type=int, default=5, help="Number of rounds")
+    args = parser.parse_args()
+
+    report = run(args.feeds, args.limit, args.rounds)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
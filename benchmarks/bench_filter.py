@@ -0,0 +1,122 @@
+"""
+Micro-benchmark of the per-entry cost of filter_videos.
+
+Generates synthetic newest-first video entries and measures the cost per entry of several
+filter specifications with the compiled filter engine, next to the previous per-entry
+implementation (which parsed the filter value and lowercased the needle for every entry) as a
+baseline.
+
+Usage:
+    python -m benchmarks.bench_filter [--entries 100000] [--repeat 5]
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from filters import compile_filter
+from main import VideoEntry, filter_videos
+
+WORDS = ("python", "tutorial", "live", "stream", "cooking", "rust", "review", "news", "music")
+
+
+def make_entries(count: int, seed: int = 0) -> list[VideoEntry]:
+    """
+    Generates synthetic video entries, one per hour, newest first.
+
+    Args:
+        count (int): The number of entries.
+        seed (int, optional): The random seed for the titles. Defaults to 0.
+
+    Returns:
+        list: The video entries.
+    """
+    rng = random.Random(seed)
+    newest = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    entries = []
+    for number in range(count):
+        published = (newest - timedelta(hours=number)).isoformat()
+        title = " ".join(rng.choice(WORDS) for _ in range(5)).title()
+        entries.append(
+            VideoEntry(f"v{number}", title, published, f"https://youtu.be/v{number}", "Author")
+        )
+    return entries
+
+
+def legacy_filter_videos(entries, filter_by=None, filter_value=None):
+    """The per-entry filter implementation that the compiled engine replaced, as a baseline."""
+    filtered_videos = []
+    for entry in entries:
+        title, published, link = entry.title, entry.published, entry.link
+        if filter_by == "date":
+            entry_date = datetime.strptime(published, "%Y-%m-%dT%H:%M:%S%z")
+            filter_date = datetime.strptime(filter_value, "%Y-%m-%d")
+            if entry_date.date() == filter_date.date():
+                filtered_videos.append({"title": title, "published": published, "link": link})
+        elif filter_by == "title" and filter_value.lower() in title.lower():
+            filtered_videos.append({"title": title, "published": published, "link": link})
+        elif not filter_by:
+            filtered_videos.append({"title": title, "published": published, "link": link})
+    return filtered_videos
+
+
+def measure(function, entries, repeat: int) -> float:
+    """
+    Returns the best time per entry, in nanoseconds, of calling a function with the entries.
+
+    Args:
+        function (Callable): Called with the entries.
+        entries (list): The video entries.
+        repeat (int): The number of measurements.
+
+    Returns:
+        float: The best time per entry in nanoseconds.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter_ns()
+        function(entries)
+        best = min(best, time.perf_counter_ns() - started)
+    return best / len(entries)
+
+
+def main() -> None:
+    """Runs the benchmark and prints the per-entry cost of each filter specification."""
+    parser = argparse.ArgumentParser(description="Benchmark the per-entry cost of filter_videos.")
+    parser.add_argument("--entries", type=int, default=100_000, help="Number of entries")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of measurements")
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries)
+    middle_date = entries[len(entries) // 2].published[:10]
+    cases = {
+        "no filter": {},
+        "title keyword": {"filter_by": "title", "filter_value": "python"},
+        "exact date": {"filter_by": "date", "filter_value": middle_date},
+        "since (early stop)": {"since": middle_date},
+        "2 keywords, any": {"title_terms": ["python", "rust"], "match": "any"},
+        "regex + exclude": {"title_regex": r"^python\b", "exclude": ["live"]},
+    }
+
+    print(f"{'filter':<20} {'legacy ns/entry':>16} {'compiled ns/entry':>18}")
+    for name, spec in cases.items():
+        video_filter = compile_filter(**spec)
+        compiled = measure(
+            lambda items, video_filter=video_filter: filter_videos(
+                items, video_filter=video_filter
+            ),
+            entries,
+            args.repeat,
+        )
+        legacy = "-"
+        if set(spec) <= {"filter_by", "filter_value"}:
+            legacy_cost = measure(
+                lambda items, spec=spec: legacy_filter_videos(items, **spec), entries, args.repeat
+            )
+            legacy = f"{legacy_cost:.1f}"
+        print(f"{name:<20} {legacy:>16} {compiled:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark of hedged requests and adaptive timeouts on feed fetches with a slow tail.
+
+Fetches the RSS feed of every channel of a synthetic corpus from a local stand-in for YouTube
+with network-like latency and jitter that stalls a small fraction of its responses, as stalled
+upstream connections do. The feeds are fetched concurrently through an HttpClient:
+
+    plain       the fixed read timeout, which waits out every stall
+    adaptive    adaptive read timeouts, which give up stalled requests and retry them
+    hedged      hedged requests, which send a second request for a feed not answered by the
+                95th percentile latency
+    both        adaptive read timeouts and hedged requests
+
+The report gives, per client, the wall time, the 50th, 95th and 99th percentile and the longest
+fetch latency in milliseconds, the requests sent per feed (the extra load), the retries, and
+the hedges sent and answered first, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_hedging [--channels 800] [--latency 0.02] [--jitter 0.02]
+                                       [--slow-rate 0.02] [--slow-latency 5] [--threads 8]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+from http_client import HttpClient
+
+CLIENTS = {
+    "plain": {},
+    "adaptive": {"adaptive_timeouts": True},
+    "hedged": {"hedge": True},
+    "both": {"adaptive_timeouts": True, "hedge": True},
+}
+
+
+def percentile(latencies: list[float], fraction: float) -> float:
+    """Returns a percentile of sorted latencies, in milliseconds."""
+    return round(latencies[min(int(fraction * len(latencies)), len(latencies) - 1)] * 1000, 1)
+
+
+def fetch_all(client: HttpClient, urls: list[str], threads: int) -> tuple[float, list[float]]:
+    """
+    Fetches every feed concurrently.
+
+    Args:
+        client (HttpClient): The client fetching the feeds.
+        urls (list): The feed URLs.
+        threads (int): The number of threads.
+
+    Returns:
+        tuple: The wall time in seconds and the sorted latency of every fetch.
+    """
+
+    def fetch(url: str) -> float:
+        started = time.perf_counter()
+        client.get(url).raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(executor.map(fetch, urls))
+    return time.perf_counter() - started, latencies
+
+
+def run(
+    channels: int,
+    latency: float,
+    jitter: float,
+    slow_rate: float,
+    slow_latency: float,
+    threads: int,
+) -> dict:
+    """
+    Fetches the feeds with every client.
+
+    Returns:
+        dict: The report.
+    """
+    corpus = Corpus(channels, page_size=1024)
+    report = {
+        "channels": channels,
+        "latency": latency,
+        "jitter": jitter,
+        "slow_rate": slow_rate,
+        "slow_latency": slow_latency,
+        "threads": threads,
+        "clients": {},
+    }
+    for name, options in CLIENTS.items():
+        with StandInServer(
+            corpus,
+            latency=latency,
+            jitter=jitter,
+            slow_rate=slow_rate,
+            slow_latency=slow_latency,
+            seed=1,
+        ) as server:
+            urls = [server.feed_url(channel.channel_id) for channel in corpus]
+            with HttpClient(retries=3, backoff=0.01, failure_threshold=0, **options) as client:
+                elapsed, latencies = fetch_all(client, urls, threads)
+            stats = client.stats()
+            report["clients"][name] = {
+                "wall_seconds": round(elapsed, 2),
+                "p50_ms": percentile(latencies, 0.5),
+                "p95_ms": percentile(latencies, 0.95),
+                "p99_ms": percentile(latencies, 0.99),
+                "max_ms": round(latencies[-1] * 1000, 1),
+                "requests_per_feed": round(stats["requests"] / channels, 3),
+                "stalled": server.stalled,
+                "retries": stats["retries"],
+                "hedges": stats["hedges"],
+                "hedge_wins": stats["hedge_wins"],
+            }
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark hedged requests and timeouts.")
+    parser.add_argument("--channels", type=int, default=800, help="Number of feeds fetched")
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Stand-in response delay in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.02, help="Random extra stand-in delay in seconds"
+    )
+    parser.add_argument(
+        "--slow-rate", type=float, default=0.02, help="Fraction of stand-in responses stalled"
+    )
+    parser.add_argument(
+        "--slow-latency", type=float, default=5.0, help="Delay of stalled responses in seconds"
+    )
+    parser.add_argument("--threads", type=int, default=8, help="Number of concurrent threads")
+    args = parser.parse_args()
+
+    report = run(
+        args.channels, args.latency, args.jitter, args.slow_rate, args.slow_latency, args.threads
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark of recording a batch run to an HTTP archive and replaying it offline.
+
+Fetches the page and RSS feed of every channel of a synthetic corpus from a local stand-in for
+YouTube with network-like latency and jitter, resolving the channel IDs and parsing the feeds,
+while recording every response to an HttpArchive. The same channels are then processed twice
+from the archive with a ReplaySession, without the stand-in.
+
+The report gives the size of the archive next to the bytes received, the time to open the
+archive for replay, the wall time of the live run and of both replays, the peak memory
+allocated by Python (tracemalloc) during a replay, and whether both replays produced the same
+results as the live run, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_http_archive [--channels 100] [--page-size 1048576]
+                                            [--latency 0.05] [--jitter 0.05] [--threads 8]
+"""
+
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from batch import create_session
+from benchmarks.corpus import DEFAULT_PAGE_SIZE, Corpus
+from benchmarks.standin import StandInServer
+from http_archive import HttpArchive, RecordingSession, ReplaySession
+from main import fetch_rss_feed_content, get_youtube_channel_id, get_youtube_source_code
+
+
+def process_all(session, urls: list[tuple[str, str]], threads: int) -> tuple[float, list]:
+    """
+    Resolves the channel ID and parses the feed of every channel concurrently.
+
+    Args:
+        session: The session fetching the pages and feeds.
+        urls (list): The (page URL, feed URL) of every channel.
+        threads (int): The number of threads.
+
+    Returns:
+        tuple: The wall time in seconds and, per channel, the channel ID and video IDs.
+    """
+
+    def process(channel_urls: tuple[str, str]) -> tuple:
+        page_url, feed_url = channel_urls
+        channel_id = get_youtube_channel_id(get_youtube_source_code(page_url, session))
+        entries = fetch_rss_feed_content(feed_url, limit=15, session=session) or []
+        return channel_id, [entry.video_id for entry in entries]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = list(executor.map(process, urls))
+    return time.perf_counter() - started, results
+
+
+def run(channels: int, page_size: int, latency: float, jitter: float, threads: int) -> dict:
+    """
+    Records the channels to an archive and replays them.
+
+    Returns:
+        dict: The report.
+    """
+    corpus = Corpus(channels, page_size=page_size)
+    report = {
+        "channels": channels,
+        "page_size": page_size,
+        "latency": latency,
+        "jitter": jitter,
+        "threads": threads,
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "capture.archive"
+        with StandInServer(corpus, latency=latency, jitter=jitter) as server:
+            urls = [
+                (server.channel_url(channel.handle), server.feed_url(channel.channel_id))
+                for channel in corpus
+            ]
+            with HttpArchive(path, mode="a") as archive:
+                session = RecordingSession(create_session(threads), archive)
+                live_time, live_results = process_all(session, urls, threads)
+
+        started = time.perf_counter()
+        archive = HttpArchive(path)
+        open_time = time.perf_counter() - started
+        with archive:
+            session = ReplaySession(archive)
+            replay_times = []
+            replay_results = []
+            for _ in range(2):
+                tracemalloc.start()
+                replay_time, results = process_all(session, urls, threads)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                replay_times.append(replay_time)
+                replay_results.append(results)
+
+        received = sum(len(channel.page) + len(channel.feed) for channel in corpus)
+        report.update(
+            {
+                "received_mib": round(received / 2**20, 1),
+                "archive_mib": round(path.stat().st_size / 2**20, 1),
+                "index_kib": round(Path(f"{path}.idx").stat().st_size / 2**10, 1),
+                "open_ms": round(open_time * 1000, 2),
+                "live_seconds": round(live_time, 2),
+                "replay_seconds": [round(replay_time, 2) for replay_time in replay_times],
+                "replay_peak_mib": round(peak / 2**20, 1),
+                "replays_match_live": all(results == live_results for results in replay_results),
+            }
+        )
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark recording and replaying HTTP.")
+    parser.add_argument("--channels", type=int, default=100, help="Number of channels")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Size of each page in bytes"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="Stand-in response delay in seconds"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.05, help="Random extra stand-in delay in seconds"
+    )
+    parser.add_argument("--threads", type=int, default=8, help="Number of concurrent threads")
+    args = parser.parse_args()
+
+    report = run(args.channels, args.page_size, args.latency, args.jitter, args.threads)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
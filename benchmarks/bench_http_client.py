@@ -0,0 +1,119 @@
+"""
+Benchmark of the HTTP client against a rate-limited, failing stand-in for YouTube.
+
+Serves a synthetic corpus from a local stand-in that answers a fraction of the requests with 503
+errors and enforces a request rate, answering requests beyond it with 429 and 'Retry-After', as
+YouTube throttles clients. The channel pages are then fetched concurrently with four clients:
+
+    no_retry        one attempt per request, as without the HTTP layer
+    retry           retries with backoff and 'Retry-After', but no rate limit
+    rate_limited    retries, and requests spaced at 90% of the stand-in's rate
+    default         the default settings of the command line: 3 retries, no rate limit, and a
+                    circuit breaker opening after 5 consecutive failures of a host
+
+The first three clients disable the circuit breaker. The report gives, per client, the number
+of pages fetched successfully, the wall time, the goodput (successful pages per second), the 429
+errors received, the retries and the requests refused by an open circuit, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_http_client [--requests 400] [--threads 16] [--rate-limit 100]
+                                           [--error-rate 0.05] [--retry-after 1]
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.corpus import Corpus
+from benchmarks.standin import StandInServer
+from http_client import HttpClient
+
+CLIENTS = {
+    "no_retry": {"retries": 0, "failure_threshold": 0},
+    "retry": {"retries": 5, "backoff": 0.1, "failure_threshold": 0},
+    "rate_limited": {"retries": 5, "backoff": 0.1, "failure_threshold": 0, "rate_share": 0.9},
+    "default": {},
+}
+
+
+def fetch_all(client: HttpClient, urls: list[str], threads: int) -> int:
+    """Fetches every URL concurrently and returns the number of successful fetches."""
+
+    def fetch(url: str) -> bool:
+        try:
+            return client.get(url).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return sum(executor.map(fetch, urls))
+
+
+def run(requests_count: int, threads: int, rate_limit: float, error_rate: float, retry_after: int):
+    """
+    Fetches the pages with every client.
+
+    Returns:
+        dict: The report.
+    """
+    corpus = Corpus(16, page_size=16 * 1024)
+    report = {
+        "requests": requests_count,
+        "threads": threads,
+        "rate_limit": rate_limit,
+        "error_rate": error_rate,
+        "retry_after": retry_after,
+        "clients": {},
+    }
+    for name, options in CLIENTS.items():
+        options = dict(options)
+        rate = rate_limit * options.pop("rate_share", 0.0)
+        # A fresh stand-in per client, so that each starts with a full rate limit.
+        with StandInServer(
+            corpus, error_rate=error_rate, rate_limit=rate_limit, retry_after=retry_after
+        ) as server:
+            urls = [
+                server.channel_url(corpus.channels[number % len(corpus)].handle)
+                for number in range(requests_count)
+            ]
+            with HttpClient(rate=rate, **options) as client:
+                started = time.perf_counter()
+                succeeded = fetch_all(client, urls, threads)
+                wall_time = time.perf_counter() - started
+                stats = client.stats()
+            report["clients"][name] = {
+                "succeeded": succeeded,
+                "wall_seconds": round(wall_time, 2),
+                "goodput_per_s": round(succeeded / wall_time, 1),
+                "throttled_429": server.throttled,
+                "retries": stats["retries"],
+                "rejected": stats["rejected"],
+            }
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP client.")
+    parser.add_argument("--requests", type=int, default=400, help="Number of pages fetched")
+    parser.add_argument("--threads", type=int, default=16, help="Number of concurrent threads")
+    parser.add_argument(
+        "--rate-limit", type=float, default=100.0, help="Requests per second the stand-in serves"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.05, help="Fraction of requests answered with 503"
+    )
+    parser.add_argument(
+        "--retry-after", type=int, default=1, help="'Retry-After' seconds of the 429 errors"
+    )
+    args = parser.parse_args()
+
+    report = run(args.requests, args.threads, args.rate_limit, args.error_rate, args.retry_after)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
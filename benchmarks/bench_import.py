@@ -0,0 +1,130 @@
+"""
+Import-time budget check of the command line entry point.
+
+Runs `python -X importtime` in fresh interpreters, importing main and calling
+create_rss_feed_url, and reports the cumulative import time of main (best of several runs)
+together with the wall time of the whole process. The check fails if the import time exceeds
+the budget, or if the network or HTML stack was imported, which create_rss_feed_url-only usage
+must not do.
+
+Startup budget: importing main must take at most IMPORT_BUDGET_MS milliseconds (cumulative,
+as reported by -X importtime) and must not import any of FORBIDDEN_MODULES.
+
+Usage:
+    python -m benchmarks.bench_import [--repeat 5] [--budget-ms 50]
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+IMPORT_BUDGET_MS = 50.0
+
+# Top-level packages that importing main must not load.
+FORBIDDEN_MODULES = (
+    "requests",
+    "urllib3",
+    "bs4",
+    "lxml",
+    "pyperclip",
+    "http",
+    "socket",
+    "ssl",
+)
+
+SCRIPT = (
+    "import sys, json, main\n"
+    "main.create_rss_feed_url('UC_x5XG1OV2P6uZZ5FSM9Ttw')\n"
+    "print(json.dumps(sorted(sys.modules)))\n"
+)
+
+_IMPORTTIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_importtime(output: str) -> dict[str, int]:
+    """
+    Parses the output of -X importtime into the cumulative import time of each module.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        dict: The cumulative import time in microseconds, by top-level imported module.
+    """
+    times = {}
+    for line in output.splitlines():
+        match = _IMPORTTIME_PATTERN.match(line)
+        if match and len(match.group(3)) == 1:
+            times[match.group(4)] = int(match.group(2))
+    return times
+
+
+def measure_once() -> tuple[float, float, list[str]]:
+    """
+    Imports main in a fresh interpreter.
+
+    Returns:
+        tuple: The cumulative import time of main and the wall time of the process, in
+            milliseconds, and the names of the modules loaded by the end of the script.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=REPO_ROOT,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    import_ms = parse_importtime(result.stderr)["main"] / 1000
+    return import_ms, wall_ms, json.loads(result.stdout)
+
+
+def forbidden_imports(modules: list[str]) -> list[str]:
+    """
+    Returns the forbidden modules among loaded modules.
+
+    Args:
+        modules (list[str]): The names of the loaded modules.
+
+    Returns:
+        list[str]: The loaded top-level packages listed in FORBIDDEN_MODULES.
+    """
+    loaded = {module.split(".", 1)[0] for module in modules}
+    return sorted(loaded.intersection(FORBIDDEN_MODULES))
+
+
+def main() -> None:
+    """Runs the check and exits with a non-zero status if the budget is exceeded."""
+    parser = argparse.ArgumentParser(description="Check the import-time budget of main.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of interpreter runs")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=IMPORT_BUDGET_MS,
+        help=f"Import-time budget in milliseconds (default: {IMPORT_BUDGET_MS:g})",
+    )
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.repeat)]
+    import_ms = min(run[0] for run in runs)
+    wall_ms = min(run[1] for run in runs)
+    forbidden = forbidden_imports(runs[0][2])
+
+    print(f"import main:          {import_ms:8.1f} ms (budget: {args.budget_ms:g} ms)")
+    print(f"interpreter + import: {wall_ms:8.1f} ms")
+    print(f"forbidden imports:    {', '.join(forbidden) or 'none'}")
+    if import_ms > args.budget_ms or forbidden:
+        print("FAILED")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
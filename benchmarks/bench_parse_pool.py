@@ -0,0 +1,161 @@
+"""
+Scaling benchmark of batch channel resolution with the parse pool.
+
+Serves a synthetic corpus of channel pages from a local YouTube stand-in and resolves every
+channel as a batch run does: a pool of I/O threads fetches the pages over a shared session and
+extracts the channel ID, either in the fetching threads (parse workers: 0) or in a ParsePool of
+1, 2, 4, ... worker processes, up to the number of CPUs. With the CPU-bound BeautifulSoup
+engine, threads alone are limited by the GIL, while the parse pool should scale close to
+linearly with the number of cores.
+
+The report gives, per number of parse workers, the wall time, the throughput in channels per
+second, the speedup over parsing in the fetching threads and the number of chunks the pages
+were sent in, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_parse_pool [--channels 64] [--page-size 1048576]
+                                          [--engine soup] [--threads 16] [--chunksize 8]
+                                          [--max-workers <cpus>]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from batch import create_session
+from benchmarks.corpus import DEFAULT_PAGE_SIZE, Corpus
+from benchmarks.standin import StandInServer
+from main import CHANNEL_ID_ENGINES, get_youtube_channel_id, get_youtube_source_code
+from parse_pool import DEFAULT_CHUNKSIZE, ParsePool
+
+
+def worker_counts(max_workers: int) -> list[int]:
+    """
+    Returns the numbers of parse workers to measure: 0, then powers of two up to the maximum.
+
+    Args:
+        max_workers (int): The largest number of parse workers.
+
+    Returns:
+        list[int]: The numbers of parse workers.
+    """
+    counts = [0]
+    workers = 1
+    while workers < max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def resolve_all(
+    server: StandInServer, corpus: Corpus, engine: str, threads: int, parse_pool: ParsePool | None
+) -> tuple[float, int]:
+    """
+    Resolves every channel of the corpus concurrently.
+
+    Args:
+        server (StandInServer): The stand-in serving the corpus.
+        corpus (Corpus): The corpus.
+        engine (str): The channel ID extraction engine.
+        threads (int): The number of I/O threads.
+        parse_pool (ParsePool): The parse pool, or None to parse in the I/O threads.
+
+    Returns:
+        tuple: The wall time in seconds and the number of correctly resolved channels.
+    """
+    session = create_session(threads)
+
+    def resolve(channel) -> bool:
+        page = get_youtube_source_code(server.channel_url(channel.handle), session)
+        return get_youtube_channel_id(page, engine, parse_pool) == channel.channel_id
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        resolved = sum(executor.map(resolve, corpus))
+    return time.perf_counter() - started, resolved
+
+
+def run(
+    channels: int,
+    page_size: int,
+    engine: str,
+    threads: int,
+    chunksize: int,
+    max_workers: int,
+) -> dict:
+    """
+    Measures batch resolution with every number of parse workers.
+
+    Returns:
+        dict: The report.
+    """
+    corpus = Corpus(channels, page_size=page_size)
+    report = {
+        "channels": channels,
+        "page_size": page_size,
+        "engine": engine,
+        "threads": threads,
+        "chunksize": chunksize,
+        "cpus": os.cpu_count(),
+        "runs": [],
+    }
+    with StandInServer(corpus) as server:
+        baseline = None
+        for workers in worker_counts(max_workers):
+            if workers == 0:
+                wall_time, resolved = resolve_all(server, corpus, engine, threads, None)
+                chunks = 0
+            else:
+                with ParsePool(workers, chunksize) as parse_pool:
+                    # Start every worker process before timing.
+                    for started in [parse_pool.submit(time.sleep, 0.5) for _ in range(workers)]:
+                        started.result()
+                    wall_time, resolved = resolve_all(server, corpus, engine, threads, parse_pool)
+                    chunks = parse_pool.chunks - workers
+            baseline = baseline or wall_time
+            report["runs"].append(
+                {
+                    "parse_workers": workers,
+                    "wall_seconds": round(wall_time, 3),
+                    "channels_per_s": round(channels / wall_time, 2),
+                    "speedup": round(baseline / wall_time, 2),
+                    "resolved": resolved,
+                    "chunks": chunks,
+                }
+            )
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark batch resolution with a parse pool.")
+    parser.add_argument("--channels", type=int, default=64, help="Number of channels")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Size of each page in bytes"
+    )
+    parser.add_argument(
+        "--engine", choices=CHANNEL_ID_ENGINES, default="soup", help="Extraction engine"
+    )
+    parser.add_argument("--threads", type=int, default=16, help="Number of I/O threads")
+    parser.add_argument(
+        "--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Pages sent per chunk"
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Largest number of parse workers (default: the number of CPUs)",
+    )
+    args = parser.parse_args()
+
+    report = run(
+        args.channels, args.page_size, args.engine, args.threads, args.chunksize, args.max_workers
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Memory benchmark of the streaming pipeline over growing channel lists.
+
+Runs channel lists of increasing length (1k, 10k and 100k lines by default) through a Pipeline
+and measures the peak memory allocated by Python (tracemalloc) during each run, next to the
+wall time and throughput. Channel pages and feeds are generated on request by an in-process
+stand-in session, so that neither the corpus nor a server holds every channel in memory and the
+peak only reflects the pipeline. The writer is slowed down by `--write-delay` seconds per
+result, so that the stages fill their queues and block on them.
+
+With bounded stage queues the peak memory stays flat as the input grows; the report also gives
+the peak of collecting the same results with run_batch into a list, which grows with the input.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes 1000,10000,100000] [--queue-depth 64]
+                                        [--workers 16] [--page-size 16384] [--write-delay 0]
+"""
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+from batch import read_channel_urls, run_batch
+from benchmarks.corpus import generate_channel_page, generate_feed
+from pipeline import DEFAULT_QUEUE_DEPTH, Pipeline
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_PAGE_SIZE = 16 * 1024
+
+# The channel ID of the page template, replaced with the ID of each requested channel.
+_TEMPLATE_ID = b"UC" + b"0" * 22
+
+
+class _Response:
+    """The parts of requests.Response read by the pipeline."""
+
+    status_code = 200
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int = 1):
+        return (self.content[i : i + chunk_size] for i in range(0, len(self.content), chunk_size))
+
+    def close(self) -> None:
+        pass
+
+
+class GeneratingSession:
+    """A stand-in for requests.Session generating each channel page and feed on request."""
+
+    def __init__(self, page_size: int):
+        self.page = generate_channel_page(_TEMPLATE_ID.decode(), "Channel", size=page_size)
+        self.feed = generate_feed(_TEMPLATE_ID.decode(), "Channel")
+
+    def get(self, url: str, **kwargs) -> _Response:
+        if "channel_id=" in url:
+            template, channel_id = self.feed, url.rsplit("=", 1)[-1]
+        else:
+            template, channel_id = self.page, "UC" + url.rsplit("@", 1)[-1].rjust(22, "0")
+        return _Response(template.replace(_TEMPLATE_ID, channel_id.encode()))
+
+
+def channel_list(size: int) -> io.StringIO:
+    """Returns a channel list of `size` lines, as a file."""
+    return io.StringIO("".join(f"https://www.youtube.com/@{number}\n" for number in range(size)))
+
+
+def measure(function) -> tuple[float, int]:
+    """Runs a function, returning its wall time and peak traced memory in bytes."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        function()
+        return time.perf_counter() - started, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(
+    sizes: list[int], queue_depth: int, workers: int, page_size: int, write_delay: float
+) -> dict:
+    """
+    Measures the pipeline and run_batch over channel lists of every size.
+
+    Returns:
+        dict: The report.
+    """
+    report = {
+        "queue_depth": queue_depth,
+        "workers": workers,
+        "page_size": page_size,
+        "write_delay": write_delay,
+        "runs": [],
+    }
+    for size in sizes:
+        lines = channel_list(size)
+        session = GeneratingSession(page_size)
+        written = []
+
+        def stream():
+            pipeline = Pipeline(workers=workers, queue_depth=queue_depth, session=session)
+            for result in pipeline.run(lines):
+                written.append(result.ok)
+                time.sleep(write_delay)
+
+        wall_time, peak = measure(stream)
+        lines.seek(0)
+        collected = []
+        _, collect_peak = measure(
+            lambda: collected.extend(
+                run_batch(read_channel_urls(lines), max_workers=workers, session=session)
+            )
+        )
+        report["runs"].append(
+            {
+                "channels": size,
+                "succeeded": sum(written),
+                "wall_seconds": round(wall_time, 2),
+                "channels_per_s": round(size / wall_time),
+                "peak_mib": round(peak / 2**20, 1),
+                "run_batch_collected_peak_mib": round(collect_peak / 2**20, 1),
+            }
+        )
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark the memory use of the pipeline.")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="Comma-separated numbers of channels",
+    )
+    parser.add_argument(
+        "--queue-depth", type=int, default=DEFAULT_QUEUE_DEPTH, help="Capacity of each queue"
+    )
+    parser.add_argument("--workers", type=int, default=16, help="Threads per network stage")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Size of each page in bytes"
+    )
+    parser.add_argument(
+        "--write-delay", type=float, default=0.0, help="Seconds the writer takes per result"
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    report = run(sizes, args.queue_depth, args.workers, args.page_size, args.write_delay)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+Latency and throughput benchmark of the channel pipeline against a local YouTube stand-in.
+
+Generates a synthetic corpus of channel pages and feeds, serves it from a StandInServer, and
+times each stage of the pipeline separately over N channels, then the whole pipeline end to end:
+
+    get_youtube_source_code   fetch the channel page
+    get_youtube_channel_id    extract the channel ID from the page
+    fetch_rss_feed_content    fetch and parse the feed
+    filter_videos             filter the feed entries
+    end_to_end                all of the above for one channel
+
+For every stage the report gives the p50/p95/p99 and mean latency in milliseconds, the
+throughput in operations per second and the number of failed operations, together with the peak
+RSS of the process, as JSON on stdout (or in the --output file), so that runs can be compared
+between commits.
+
+Usage:
+    python -m benchmarks.bench_suite [--channels 50] [--page-size 1048576] [--latency 0]
+                                     [--jitter 0] [--error-rate 0] [--output report.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable
+
+import requests
+
+from benchmarks.corpus import DEFAULT_PAGE_SIZE, Corpus
+from benchmarks.standin import StandInServer
+from filters import compile_filter
+from main import (
+    fetch_rss_feed_content,
+    filter_videos,
+    get_youtube_channel_id,
+    get_youtube_source_code,
+)
+
+# The filter applied in the filter_videos and end_to_end stages.
+FILTER_SPEC = {"filter_by": "title", "filter_value": "python"}
+
+
+def summarize(latencies: list[float], errors: int, wall_time: float) -> dict:
+    """
+    Summarizes the latencies of a stage.
+
+    Args:
+        latencies (list[float]): The latency of each operation in seconds.
+        errors (int): The number of failed operations.
+        wall_time (float): The total time spent on the stage in seconds.
+
+    Returns:
+        dict: The count, errors, p50/p95/p99 and mean latency in milliseconds, and throughput.
+    """
+    summary = {"count": len(latencies), "errors": errors}
+    if len(latencies) >= 2:
+        percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    summary.update(
+        p50_ms=round(p50 * 1000, 3),
+        p95_ms=round(p95 * 1000, 3),
+        p99_ms=round(p99 * 1000, 3),
+        mean_ms=round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+        throughput_per_s=round(len(latencies) / wall_time, 2) if wall_time > 0 else 0.0,
+    )
+    return summary
+
+
+def peak_rss_bytes() -> int | None:
+    """
+    Returns the peak resident set size of the process.
+
+    Returns:
+        int: The peak RSS in bytes, or None where the resource module is unavailable.
+    """
+    try:
+        import resource  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kibibytes elsewhere.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_commit() -> str | None:
+    """
+    Returns the abbreviated hash of the checked out commit.
+
+    Returns:
+        str: The commit hash, or None outside a git checkout.
+    """
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def time_stage(inputs: list, operation: Callable) -> tuple[list, dict]:
+    """
+    Runs an operation on every input and times each call.
+
+    A call fails if it returns None or raises.
+
+    Args:
+        inputs (list): The inputs of the operation.
+        operation (Callable): Called with each input.
+
+    Returns:
+        tuple: The outputs (None for failed calls) and the summary of the stage.
+    """
+    outputs = []
+    latencies = []
+    errors = 0
+    stage_started = time.perf_counter()
+    for item in inputs:
+        started = time.perf_counter()
+        try:
+            output = operation(item)
+        except Exception:  # pylint: disable=broad-exception-caught
+            output = None
+        latencies.append(time.perf_counter() - started)
+        errors += output is None
+        outputs.append(output)
+    return outputs, summarize(latencies, errors, time.perf_counter() - stage_started)
+
+
+def run_suite(
+    channels: int = 50,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    """
+    Runs every stage of the benchmark and returns the report.
+
+    Args:
+        channels (int, optional): The number of synthetic channels. Defaults to 50.
+        page_size (int, optional): The size of each channel page in bytes. Defaults to 1 MiB.
+        latency (float, optional): The injected latency per response in seconds. Defaults to 0.
+        jitter (float, optional): The injected random extra latency in seconds. Defaults to 0.
+        error_rate (float, optional): The fraction of responses that are errors. Defaults to 0.
+        seed (int, optional): The random seed of the corpus and faults. Defaults to 0.
+
+    Returns:
+        dict: The report, ready to be serialized as JSON.
+    """
+    corpus = Corpus(channels, page_size, seed)
+    video_filter = compile_filter(**FILTER_SPEC)
+    stages = {}
+    with (
+        StandInServer(corpus, latency, jitter, error_rate, seed) as server,
+        requests.Session() as session,
+        contextlib.redirect_stdout(io.StringIO()),  # silence the per-request error messages
+    ):
+        channel_urls = [server.channel_url(channel.handle) for channel in corpus]
+        feed_urls = [server.feed_url(channel.channel_id) for channel in corpus]
+
+        _, stages["get_youtube_source_code"] = time_stage(
+            channel_urls, lambda url: get_youtube_source_code(url, session)
+        )
+        _, stages["get_youtube_channel_id"] = time_stage(
+            [channel.page for channel in corpus], get_youtube_channel_id
+        )
+        feeds, stages["fetch_rss_feed_content"] = time_stage(
+            feed_urls, lambda url: fetch_rss_feed_content(url, 15, session)
+        )
+        _, stages["filter_videos"] = time_stage(
+            [feed for feed in feeds if feed is not None],
+            lambda entries: filter_videos(entries, video_filter=video_filter),
+        )
+
+        def end_to_end(url: str) -> list | None:
+            channel_id = get_youtube_channel_id(get_youtube_source_code(url, session))
+            if channel_id is None:
+                return None
+            entries = fetch_rss_feed_content(server.feed_url(channel_id), 15, session)
+            if entries is None:
+                return None
+            return filter_videos(entries, video_filter=video_filter)
+
+        _, stages["end_to_end"] = time_stage(channel_urls, end_to_end)
+
+    return {
+        "commit": current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "channels": channels,
+            "page_size": page_size,
+            "latency": latency,
+            "jitter": jitter,
+            "error_rate": error_rate,
+            "seed": seed,
+            "filter": FILTER_SPEC,
+        },
+        "stages": stages,
+        "peak_rss_bytes": peak_rss_bytes(),
+    }
+
+
+def main() -> None:
+    """Runs the benchmark suite and writes the JSON report."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark the channel pipeline against a local YouTube stand-in."
+    )
+    parser.add_argument("--channels", type=int, default=50, help="Number of channels")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="Channel page size in bytes"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Injected latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Injected jitter in seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of responses that are errors"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", metavar="FILE", help="Write the report to FILE")
+    args = parser.parse_args()
+
+    report = run_suite(
+        args.channels, args.page_size, args.latency, args.jitter, args.error_rate, args.seed
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            output_file.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
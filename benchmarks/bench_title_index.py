@@ -0,0 +1,126 @@
+"""
+Benchmark of the title index: indexing throughput and query latency over many entries.
+
+Generates synthetic newest-first video entries whose titles draw words from a Zipf-like
+vocabulary (a few very common words and a long tail of rare ones), adds them to a TitleIndex
+in feed-sized batches, then times a set of queries against it, each repeated several times:
+
+    rare            a single rare word
+    common          a single common word
+    all             a common and a rare word, both required
+    any             two rare words, either one
+    prefix          a prefix of many words
+    date_bounded    a common word within one week
+
+The report gives the indexing throughput and, per query, the number of matches and the
+p50/p95/p99 and mean latency in milliseconds, as JSON on stdout.
+
+Usage:
+    python -m benchmarks.bench_title_index [--entries 1000000] [--repeat 20] [--path FILE]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from pathlib import Path
+
+from benchmarks.bench_suite import summarize
+from main import VideoEntry
+from title_index import TitleIndex
+
+VOCABULARY_SIZE = 20_000
+TITLE_WORDS = 7
+BATCH_SIZE = 15
+
+QUERIES = {
+    "rare": {"query": "word12345"},
+    "common": {"query": "word1"},
+    "all": {"query": "word1 word4321"},
+    "any": {"query": "word777 word888", "match": "any"},
+    "prefix": {"query": "word99*"},
+    "date_bounded": {"query": "word2", "since": "2023-06-01", "until": "2023-06-07"},
+}
+
+
+def make_entries(count: int, seed: int = 0):
+    """
+    Generates synthetic video entries, one every five minutes, newest first.
+
+    Args:
+        count (int): The number of entries.
+        seed (int, optional): The random seed for the titles. Defaults to 0.
+
+    Yields:
+        VideoEntry: The video entries.
+    """
+    rng = random.Random(seed)
+    cumulative_weights = list(accumulate(1 / rank for rank in range(1, VOCABULARY_SIZE + 1)))
+    words = [f"word{rank}" for rank in range(VOCABULARY_SIZE)]
+    newest = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for number in range(count):
+        published = (newest - timedelta(minutes=5 * number)).isoformat()
+        title = " ".join(rng.choices(words, cum_weights=cumulative_weights, k=TITLE_WORDS))
+        yield VideoEntry(f"v{number}", title, published, f"https://youtu.be/v{number}", "Author")
+
+
+def run(entries: int, repeat: int, path: Path) -> dict:
+    """
+    Builds the index and times the queries.
+
+    Args:
+        entries (int): The number of entries indexed.
+        repeat (int): The number of runs of each query.
+        path (Path): The database file of the index.
+
+    Returns:
+        dict: The report.
+    """
+    report = {"entries": entries}
+    with TitleIndex(path) as index:
+        batch = []
+        started = time.perf_counter()
+        for entry in make_entries(entries):
+            batch.append(entry)
+            if len(batch) == BATCH_SIZE:
+                index.add("UC" + "x" * 22, batch)
+                batch = []
+        index.add("UC" + "x" * 22, batch)
+        elapsed = time.perf_counter() - started
+        report["index_seconds"] = round(elapsed, 2)
+        report["index_entries_per_s"] = round(entries / elapsed)
+        report["queries"] = {}
+        for name, options in QUERIES.items():
+            latencies = []
+            for _ in range(repeat):
+                query_started = time.perf_counter()
+                found = index.search(**options)
+                latencies.append(time.perf_counter() - query_started)
+            report["queries"][name] = {
+                "matches": len(found),
+                **summarize(latencies, 0, sum(latencies)),
+            }
+    return report
+
+
+def main() -> None:
+    """Runs the benchmark and prints the report."""
+    parser = argparse.ArgumentParser(description="Benchmark the title index.")
+    parser.add_argument("--entries", type=int, default=1_000_000, help="Number of entries")
+    parser.add_argument("--repeat", type=int, default=20, help="Number of runs of each query")
+    parser.add_argument("--path", help="Database file of the index (default: a temporary file)")
+    args = parser.parse_args()
+
+    if args.path:
+        report = run(args.entries, args.repeat, Path(args.path))
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            report = run(args.entries, args.repeat, Path(directory) / "titles.sqlite3")
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Synthetic corpus of YouTube channel pages and RSS feeds.
+
+Channel pages are padded to a realistic size (about 1 MB by default) with markup and script data
+that resemble a YouTube channel page. Half of the pages carry the channel ID in the 'og:url'
+meta tag near the top; the other half only carry it as '"externalId"' deep inside the
+'ytInitialData' script at the end of the page, which is the worst case for the channel ID lookup.
+Feeds have the layout of YouTube channel feeds, with 15 entries including their 'media:group'.
+
+The corpus is deterministic for a given seed.
+
+Functions:
+    generate_channel_page(channel_id, title, placement, size): Generates a channel page.
+    generate_feed(channel_id, title, entries, newest): Generates the RSS feed of a channel.
+
+Classes:
+    SyntheticChannel: A generated channel.
+    Corpus: A deterministic set of generated channels.
+"""
+
+import random
+import string
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+PLACEMENTS = ("meta", "script")
+DEFAULT_PAGE_SIZE = 1024 * 1024
+FEED_ENTRIES = 15
+
+_ID_ALPHABET = string.ascii_letters + string.digits + "-_"
+_WORDS = ("python", "tutorial", "live", "stream", "cooking", "rust", "review", "news", "music")
+
+
+class SyntheticChannel(NamedTuple):
+    """
+    A generated channel.
+
+    Attributes:
+        handle (str): The channel handle, without the '@'.
+        channel_id (str): The channel ID.
+        placement (str): Where the page carries the channel ID, "meta" or "script".
+        page (bytes): The channel page.
+        feed (bytes): The RSS feed of the channel.
+    """
+
+    handle: str
+    channel_id: str
+    placement: str
+    page: bytes
+    feed: bytes
+
+
+def _random_id(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(_ID_ALPHABET) for _ in range(length))
+
+
+def _filler(size: int, seed: int = 0) -> str:
+    """Returns about `size` characters of markup and script data without any channel ID."""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(8))
+        part = (
+            f'<div class="style-scope ytd-rich-item-renderer" id="{_random_id(rng, 12)}">'
+            f'<a href="/watch?v={_random_id(rng, 11)}" title="{words}">{words}</a></div>'
+            f'{{"videoRenderer":{{"videoId":"{_random_id(rng, 11)}",'
+            f'"title":{{"runs":[{{"text":"{words}"}}]}},'
+            f'"viewCountText":"{rng.randrange(10**6)}"}}}}'
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+def generate_channel_page(
+    channel_id: str,
+    title: str,
+    placement: str = "meta",
+    size: int = DEFAULT_PAGE_SIZE,
+    filler: str | None = None,
+) -> bytes:
+    """
+    Generates a channel page of about `size` bytes.
+
+    Args:
+        channel_id (str): The channel ID.
+        title (str): The channel title.
+        placement (str, optional): "meta" puts the channel ID in the 'og:url' meta tag near the
+            top, "script" only in the 'ytInitialData' script at the end. Defaults to "meta".
+        size (int, optional): The approximate size of the page in bytes. Defaults to 1 MiB.
+        filler (str, optional): Pre-generated filler markup, reused to generate many pages
+            quickly. Defaults to None, which generates it.
+
+    Returns:
+        bytes: The UTF-8 encoded page.
+
+    Raises:
+        ValueError: If the placement is unknown.
+    """
+    if placement not in PLACEMENTS:
+        raise ValueError(f"Unknown placement: {placement!r}")
+    head = f"<!DOCTYPE html><html><head><title>{escape(title)} - YouTube</title>"
+    if placement == "meta":
+        head += (
+            f'<meta property="og:title" content="{escape(title)}">'
+            f'<meta property="og:url" content="https://www.youtube.com/channel/{channel_id}">'
+        )
+    head += "</head><body><ytd-app>"
+    tail = (
+        '</ytd-app><script nonce="x">var ytInitialData = {"metadata":{"channelMetadataRenderer":'
+        f'{{"title":"{title}","externalId":"{channel_id}"}}}}}};</script></body></html>'
+    )
+    if filler is None:
+        filler = _filler(size)
+    body = filler[: max(size - len(head) - len(tail), 0)]
+    return (head + body + tail).encode("utf-8")
+
+
+def generate_feed(
+    channel_id: str,
+    title: str,
+    entries: int = FEED_ENTRIES,
+    newest: datetime | None = None,
+    seed: int = 0,
+) -> bytes:
+    """
+    Generates the RSS feed of a channel in the layout of YouTube channel feeds.
+
+    Args:
+        channel_id (str): The channel ID.
+        title (str): The channel title.
+        entries (int, optional): The number of entries. Defaults to 15.
+        newest (datetime, optional): The publication time of the newest entry; the entries are
+            a day apart. Defaults to 2024-01-01.
+        seed (int, optional): The random seed for the video IDs and titles. Defaults to 0.
+
+    Returns:
+        bytes: The UTF-8 encoded feed.
+    """
+    rng = random.Random(seed)
+    newest = newest or datetime(2024, 1, 1, tzinfo=timezone.utc)
+    channel_url = f"https://www.youtube.com/channel/{channel_id}"
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns:yt="http://www.youtube.com/xml/schemas/2015"'
+        ' xmlns:media="http://search.yahoo.com/mrss/" xmlns="http://www.w3.org/2005/Atom">\n'
+        ' <link rel="self"'
+        f' href="http://www.youtube.com/feeds/videos.xml?channel_id={channel_id}"/>\n'
+        f" <id>yt:channel:{channel_id}</id>\n"
+        f" <yt:channelId>{channel_id}</yt:channelId>\n"
+        f" <title>{escape(title)}</title>\n"
+        f' <link rel="alternate" href="{channel_url}"/>\n'
+        f" <author>\n  <name>{escape(title)}</name>\n  <uri>{channel_url}</uri>\n </author>\n"
+        f" <published>2010-01-01T00:00:00+00:00</published>\n"
+    ]
+    for number in range(entries):
+        video_id = _random_id(rng, 11)
+        video_title = " ".join(rng.choice(_WORDS) for _ in range(5)).title()
+        published = (newest - timedelta(days=number)).isoformat()
+        parts.append(
+            f" <entry>\n"
+            f"  <id>yt:video:{video_id}</id>\n"
+            f"  <yt:videoId>{video_id}</yt:videoId>\n"
+            f"  <yt:channelId>{channel_id}</yt:channelId>\n"
+            f"  <title>{video_title}</title>\n"
+            f'  <link rel="alternate" href="https://www.youtube.com/watch?v={video_id}"/>\n'
+            f"  <author>\n   <name>{escape(title)}</name>\n"
+            f"   <uri>{channel_url}</uri>\n  </author>\n"
+            f"  <published>{published}</published>\n"
+            f"  <updated>{published}</updated>\n"
+            f"  <media:group>\n"
+            f"   <media:title>{video_title}</media:title>\n"
+            f'   <media:content url="https://www.youtube.com/v/{video_id}?version=3"'
+            f' type="application/x-shockwave-flash" width="640" height="390"/>\n'
+            f'   <media:thumbnail url="https://i1.ytimg.com/vi/{video_id}/hqdefault.jpg"'
+            f' width="480" height="360"/>\n'
+            f"   <media:description>{video_title}. {' '.join(_WORDS * 4)}</media:description>\n"
+            f"   <media:community>\n"
+            f'    <media:starRating count="{rng.randrange(10**5)}"'
+            ' average="5.00" min="1" max="5"/>\n'
+            f'    <media:statistics views="{rng.randrange(10**7)}"/>\n'
+            f"   </media:community>\n"
+            f"  </media:group>\n"
+            f" </entry>\n"
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode("utf-8")
+
+
+class Corpus:
+    """
+    A deterministic set of generated channels, alternating between the "meta" and "script"
+    channel ID placements.
+
+    Args:
+        channels (int): The number of channels.
+        page_size (int, optional): The approximate size of each channel page in bytes.
+            Defaults to 1 MiB.
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    def __init__(self, channels: int, page_size: int = DEFAULT_PAGE_SIZE, seed: int = 0):
+        rng = random.Random(seed)
+        filler = _filler(page_size, seed)
+        self.channels: list[SyntheticChannel] = []
+        for number in range(channels):
+            channel_id = "UC" + _random_id(rng, 22)
+            title = f"Channel {number}"
+            placement = PLACEMENTS[number % len(PLACEMENTS)]
+            self.channels.append(
+                SyntheticChannel(
+                    handle=f"channel{number}",
+                    channel_id=channel_id,
+                    placement=placement,
+                    page=generate_channel_page(channel_id, title, placement, page_size, filler),
+                    feed=generate_feed(channel_id, title, seed=seed + number),
+                )
+            )
+        self.by_handle = {channel.handle: channel for channel in self.channels}
+        self.by_channel_id = {channel.channel_id: channel for channel in self.channels}
+
+    def __len__(self) -> int:
+        return len(self.channels)
+
+    def __iter__(self):
+        return iter(self.channels)
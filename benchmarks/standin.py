@@ -0,0 +1,295 @@
+"""
+Local HTTP stand-in for YouTube, serving a synthetic corpus.
+
+Serves the channel pages of a Corpus at '/@<handle>' and their RSS feeds at
+'/feeds/videos.xml?channel_id=<channel ID>', with optional injected latency and errors, so that
+benchmarks and tests exercise real sockets without touching the network. Like YouTube, it can
+also enforce a request rate, answering requests beyond it with 429 and a 'Retry-After' header,
+and stall a fraction of the responses, as a stalled upstream connection does.
+
+A webhook stand-in receives the batches of videos POSTed by delivery.WebhookSink, keeping them
+and counting the requests and connections, and can be taken down to test failed deliveries.
+
+Classes:
+    StandInServer: Threaded HTTP server serving a corpus, usable as a context manager.
+    WebhookStandIn: Threaded HTTP server receiving webhook deliveries, usable as a context
+        manager.
+"""
+
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.corpus import Corpus
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Serves the pages and feeds of the corpus of a StandInServer."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs stall every response.
+    disable_nagle_algorithm = True
+    server: "StandInServer"
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serves a channel page or feed, after the injected latency."""
+        url = urlsplit(self.path)
+        delay, fail = self.server.next_fault()
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self._send(503, b"Service Unavailable", "text/plain")
+            return
+        retry_after = self.server.next_throttle()
+        if retry_after is not None:
+            self._send(429, b"Too Many Requests", "text/plain", {"Retry-After": str(retry_after)})
+            return
+
+        channel = None
+        content_type = "text/html; charset=utf-8"
+        if url.path.startswith("/@"):
+            channel = self.server.corpus.by_handle.get(url.path[2:].split("/", 1)[0])
+            body = channel.page if channel else None
+        elif url.path == "/feeds/videos.xml":
+            channel_id = parse_qs(url.query).get("channel_id", [""])[0]
+            channel = self.server.corpus.by_channel_id.get(channel_id)
+            body = channel.feed if channel else None
+            content_type = "text/xml; charset=utf-8"
+        if channel is None:
+            self._send(404, b"Not Found", "text/plain")
+        else:
+            self._send(200, body, content_type)
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, headers: dict | None = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class _BackgroundServer(ThreadingHTTPServer):
+    """Threaded HTTP server usable as a context manager that runs it in a background thread."""
+
+    daemon_threads = True
+    _thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """str: The URL of the server, e.g. 'http://127.0.0.1:8080'."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def handle_error(self, request, client_address):
+        """Ignores clients that went away, such as a request given up after its read timeout."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInServer(_BackgroundServer):
+    """
+    Threaded HTTP server serving a corpus, usable as a context manager that runs it in a
+    background thread.
+
+    Args:
+        corpus (Corpus): The channels to serve.
+        latency (float, optional): The number of seconds each response is delayed.
+            Defaults to 0.
+        jitter (float, optional): A random extra delay of up to this many seconds.
+            Defaults to 0.
+        error_rate (float, optional): The fraction of requests answered with a 503 error.
+            Defaults to 0.
+        seed (int, optional): The random seed for the jitter and errors. Defaults to 0.
+        rate_limit (float, optional): The number of requests per second served, with bursts of
+            up to one second's worth; requests beyond it are answered with a 429 error. Defaults
+            to 0, which serves every request.
+        retry_after (int, optional): The 'Retry-After' seconds of the 429 errors. Defaults to 1.
+        slow_rate (float, optional): The fraction of requests stalled for `slow_latency`
+            seconds before they are answered. Defaults to 0.
+        slow_latency (float, optional): The extra delay of the stalled requests, in seconds.
+            Defaults to 5.
+        address (tuple, optional): The (host, port) to listen on. Defaults to a free port on
+            127.0.0.1.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+        rate_limit: float = 0.0,
+        retry_after: int = 1,
+        slow_rate: float = 0.0,
+        slow_latency: float = 5.0,
+    ):
+        super().__init__(address, _StandInHandler)
+        self.corpus = corpus
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.requests = 0
+        self.throttled = 0
+        self.stalled = 0
+        self._tokens = max(rate_limit, 1.0)
+        self._refilled = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def channel_url(self, handle: str) -> str:
+        """
+        Returns the URL of a channel page.
+
+        Args:
+            handle (str): The channel handle, without the '@'.
+
+        Returns:
+            str: The URL of the channel page.
+        """
+        return f"{self.base_url}/@{handle}"
+
+    def feed_url(self, channel_id: str) -> str:
+        """
+        Returns the URL of a channel's RSS feed, like main.create_rss_feed_url.
+
+        Args:
+            channel_id (str): The channel ID.
+
+        Returns:
+            str: The URL of the RSS feed.
+        """
+        return f"{self.base_url}/feeds/videos.xml?channel_id={channel_id}"
+
+    def next_fault(self) -> tuple[float, bool]:
+        """
+        Counts a request and draws its injected delay and whether it fails.
+
+        Returns:
+            tuple: The delay in seconds and whether to answer with an error.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if self.slow_rate > 0 and self._rng.random() < self.slow_rate:
+                self.stalled += 1
+                delay += self.slow_latency
+        return delay, fail
+
+    def next_throttle(self) -> int | None:
+        """
+        Takes a token of the rate limit for a request.
+
+        Returns:
+            int: The 'Retry-After' seconds if the request is beyond the rate limit, else None.
+        """
+        if not self.rate_limit:
+            return None
+        with self._lock:
+            now = time.monotonic()
+            burst = max(self.rate_limit, 1.0)
+            self._tokens = min(burst, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return None
+            self.throttled += 1
+            return self.retry_after
+
+
+class _WebhookHandler(BaseHTTPRequestHandler):
+    """Receives the batches POSTed to a WebhookStandIn."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "WebhookStandIn"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Keeps the videos of a batch, after the injected latency, unless the server is down."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        with self.server.lock:
+            self.server.requests += 1
+            down = self.server.down
+            if not down:
+                self.server.batches.append(json.loads(body)["videos"])
+        status, reply = (503, b"Service Unavailable") if down else (200, b"OK")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class WebhookStandIn(_BackgroundServer):
+    """
+    Threaded HTTP server receiving webhook deliveries, usable as a context manager that runs it
+    in a background thread.
+
+    Args:
+        latency (float, optional): The number of seconds each request is delayed. Defaults to 0.
+        down (bool, optional): Whether requests are answered with a 503 error, until `down` is
+            set to False. Defaults to False.
+        address (tuple, optional): The (host, port) to listen on. Defaults to a free port on
+            127.0.0.1.
+
+    Attributes:
+        batches (list): The videos of every batch received, in order.
+        requests (int): The number of requests received.
+        connections (int): The number of connections accepted.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        down: bool = False,
+        address: tuple[str, int] = ("127.0.0.1", 0),
+    ):
+        super().__init__(address, _WebhookHandler)
+        self.latency = latency
+        self.down = down
+        self.batches: list[list[dict]] = []
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def videos(self) -> list[dict]:
+        """list: The videos of every batch received, in order."""
+        with self.lock:
+            return [video for batch in self.batches for video in batch]
@@ -0,0 +1,200 @@
+"""
+Persistent cache mapping YouTube channel URLs to channel IDs.
+
+A channel ID never changes, so once a channel URL has been resolved there is no need to fetch and
+parse the channel page again. URLs are normalized first, so that the different forms of the same
+channel URL ('www.' or 'm.' host, trailing '/videos' path, query string, ...) share one cache
+entry. '/channel/UC...' URLs carry the channel ID themselves and never need the network or the
+cache.
+
+The cache is a small SQLite database in the user cache directory. Entries expire after a TTL and
+the least recently used entries are evicted once the cache holds more than a maximum number of
+entries.
+
+Functions:
+    normalize_channel_url(url): Normalizes a YouTube channel URL to a cache key.
+    channel_id_from_url(url): Extracts the channel ID from a '/channel/UC...' URL.
+    canonical_channel_url(url): Returns the canonical form of a YouTube channel URL.
+
+Classes:
+    ChannelIdCache: SQLite backed channel URL to channel ID cache with TTL and LRU eviction.
+"""
+
+import re
+import time
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from sqlite_store import SQLiteStore
+
+# Channel IDs do not change, the TTL only guards against handles that are released and reused.
+DEFAULT_TTL = 30 * 24 * 60 * 60
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+_YOUTUBE_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com")
+_CHANNEL_ID_PATTERN = re.compile(r"UC[a-zA-Z0-9_-]{22}")
+
+
+def normalize_channel_url(url: str) -> str | None:
+    """
+    Normalizes a YouTube channel URL to a cache key.
+
+    Supported forms are '/channel/UC...', '/@handle', '/c/name' and '/user/name' on the
+    'youtube.com', 'www.youtube.com' and 'm.youtube.com' hosts, with or without a scheme,
+    trailing path (such as '/videos'), query string or fragment. Handles and names are
+    case-insensitive and are lowercased.
+
+    Args:
+        url (str): The YouTube channel URL.
+
+    Returns:
+        str: The cache key ('channel/UC...', '@handle', 'c/name' or 'user/name'), or None if
+        the URL is not a recognized YouTube channel URL.
+    """
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"
+    parts = urlsplit(url)
+    if (parts.hostname or "") not in _YOUTUBE_HOSTS:
+        return None
+
+    segments = [unquote(segment) for segment in parts.path.split("/") if segment]
+    if not segments:
+        return None
+    first = segments[0]
+    if first == "channel" and len(segments) > 1 and _CHANNEL_ID_PATTERN.fullmatch(segments[1]):
+        return f"channel/{segments[1]}"
+    if first.startswith("@") and len(first) > 1:
+        return first.lower()
+    if first in ("c", "user") and len(segments) > 1:
+        return f"{first}/{segments[1].lower()}"
+    return None
+
+
+def channel_id_from_url(url: str) -> str | None:
+    """
+    Extracts the channel ID from a '/channel/UC...' URL without any network access.
+
+    Args:
+        url (str): The YouTube channel URL.
+
+    Returns:
+        str: The channel ID if the URL is a '/channel/UC...' URL, otherwise None.
+    """
+    key = normalize_channel_url(url)
+    if key and key.startswith("channel/"):
+        return key.removeprefix("channel/")
+    return None
+
+
+def canonical_channel_url(url: str) -> str | None:
+    """
+    Returns the canonical form of a YouTube channel URL, so that the many forms of the same URL
+    ('m.youtube.com', '/videos' and '/featured' suffixes, tracking query strings, ...) fetch
+    the same page.
+
+    Args:
+        url (str): The YouTube channel URL.
+
+    Returns:
+        str: 'https://www.youtube.com/' followed by the key of normalize_channel_url, or None if
+        the URL is not a recognized YouTube channel URL.
+    """
+    key = normalize_channel_url(url)
+    if key is None:
+        return None
+    return f"https://www.youtube.com/{key}"
+
+
+class ChannelIdCache(SQLiteStore):
+    """
+    SQLite backed channel URL to channel ID cache with TTL and LRU eviction.
+
+    The cache can be shared between threads and is safe to use from several processes.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'channel_ids.sqlite3' in
+            the user cache directory.
+        ttl (float, optional): The number of seconds an entry stays valid. Defaults to 30 days.
+        max_entries (int, optional): The maximum number of entries kept. Defaults to 10,000.
+    """
+
+    FILENAME = "channel_ids.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS channels ("
+        " key TEXT PRIMARY KEY,"
+        " channel_id TEXT NOT NULL,"
+        " resolved_at REAL NOT NULL,"
+        " last_used REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS channels_last_used ON channels (last_used)",
+    )
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get(self, url: str) -> str | None:
+        """
+        Looks up the channel ID of a channel URL.
+
+        Args:
+            url (str): The YouTube channel URL.
+
+        Returns:
+            str: The cached channel ID, or None if the URL is not cached or the entry expired.
+        """
+        key = normalize_channel_url(url)
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT channel_id, resolved_at FROM channels WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            channel_id, resolved_at = row
+            if now - resolved_at > self.ttl:
+                self._connection.execute("DELETE FROM channels WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE channels SET last_used = ? WHERE key = ?", (now, key))
+            return channel_id
+
+    def set(self, url: str, channel_id: str) -> None:
+        """
+        Stores the channel ID of a channel URL, evicting the least recently used entries if the
+        cache is full. URLs that are not recognized channel URLs are ignored.
+
+        Args:
+            url (str): The YouTube channel URL.
+            channel_id (str): The channel ID resolved for the URL.
+        """
+        key = normalize_channel_url(url)
+        if key is None:
+            return
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO channels (key, channel_id, resolved_at, last_used)"
+                " VALUES (?, ?, ?, ?)",
+                (key, channel_id, now, now),
+            )
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM channels").fetchone()
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM channels WHERE key IN"
+                    " (SELECT key FROM channels ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM channels").fetchone()
+        return count
@@ -0,0 +1,976 @@
+"""
+Command line interface of the YouTube channel to RSS feed converter.
+
+`main.main` runs the interface, which is kept in its own module so that importing `main` for
+its functions does not build the argument parser or load the modules of every mode. See the
+docstring of `main` for the usage.
+
+Functions:
+    build_parser(): Builds the command line argument parser.
+    run(argv=None): Parses the command line and runs the requested mode.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import sqlite3
+import sys
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager, nullcontext
+from functools import partial
+from typing import IO, TYPE_CHECKING, NamedTuple
+
+import instrumentation
+from channel_cache import DEFAULT_TTL, ChannelIdCache, canonical_channel_url
+from feed_cache import FeedCache
+from feed_entries import ALL_FIELDS, check_fields
+from filters import MATCH_CHOICES, VideoFilter, compile_filter
+from main import (
+    CHANNEL_ID_ENGINES,
+    DEFAULT_VIDEO_FIELDS,
+    VideoEntry,
+    copy_to_clipboard,
+    create_rss_feed_url,
+    fetch_rss_feed_content,
+    filter_videos,
+    get_youtube_channel_id,
+    get_youtube_source_code,
+    lookup_channel_id,
+    stream_youtube_channel_id,
+)
+from video_index import VideoIndex
+from writers import OUTPUT_FORMATS, Writer, create_writer, open_output
+
+if TYPE_CHECKING:
+    from delivery import Delivery
+    from http_archive import HttpArchive
+    from pipeline import Checkpoint
+    from title_index import TitleIndex
+
+
+class _Resources(NamedTuple):
+    """
+    The filter, caches, indexes, writer and sinks set up from the command line options.
+
+    Attributes:
+        client_options (dict): The options of the HTTP clients.
+        video_filter (VideoFilter): The compiled video filter.
+        printed_fields (tuple): The fields printed for each video of a channel URL.
+        entry_fields (tuple): The fields decoded from the feed entries, or None for all.
+        checkpoint (Checkpoint): The progress checkpoint of --input, or None.
+        output_writer (Writer): The structured output writer, or None for text output.
+        delivery (Delivery): The delivery of the videos to the --deliver sinks, or None.
+        http_archive (HttpArchive): The archive recorded to or replayed from, or None.
+        channel_id_cache (ChannelIdCache): The channel ID cache, or None.
+        feed_cache (FeedCache): The RSS feed cache, or None.
+        video_index (VideoIndex): The index of seen videos with --new-only, or None.
+        title_index (TitleIndex): The title index, or None.
+    """
+
+    client_options: dict
+    video_filter: VideoFilter
+    printed_fields: tuple[str, ...]
+    entry_fields: tuple[str, ...] | None
+    checkpoint: Checkpoint | None
+    output_writer: Writer | None
+    delivery: Delivery | None
+    http_archive: HttpArchive | None
+    channel_id_cache: ChannelIdCache | None
+    feed_cache: FeedCache | None
+    video_index: VideoIndex | None
+    title_index: TitleIndex | None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the command line argument parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    # Initialize argument parser with description and example usage
+    parser = argparse.ArgumentParser(
+        description="Convert YouTube channel URL to RSS feed URL and fetch latest videos.",
+        epilog="Example usage: "
+        "python main.py https://www.youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw"
+        " --filter_by date --filter_value 2023-10-01",
+    )
+
+    # Add argument for YouTube channel URL
+    parser.add_argument("youtube_url", nargs="?", help="The YouTube channel URL")
+
+    # Add optional arguments for processing many channels concurrently
+    parser.add_argument(
+        "--input",
+        metavar="FILE",
+        help="Process the channel URLs listed in FILE (one per line, '-' for stdin) concurrently",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Maximum number of channels processed at the same time with --input (default: 16)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent requests to the same host with --input (default: 8)",
+    )
+
+    # Add optional arguments for retrying and rate limiting the HTTP requests
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=3,
+        help="Number of retries of requests failing with a connection error, a timeout, a 429 "
+        "or a 5xx error, with exponential backoff (default: 3)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=0.0,
+        help="Maximum number of requests per second to the same host, 0 for no limit (default: 0)",
+    )
+    parser.add_argument(
+        "--connect-timeout",
+        type=float,
+        default=3.05,
+        help="Number of seconds to wait for a connection to a host (default: 3.05)",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=10.0,
+        help="Number of seconds to wait for data from a host (default: 10)",
+    )
+    parser.add_argument(
+        "--adaptive-timeouts",
+        action="store_true",
+        help="Shrink the read timeout of channel pages and feeds to 4 times the 99th percentile "
+        "of their recent latencies (between 1 second and --read-timeout)",
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a feed request a second time if it has not been answered by the 95th "
+        "percentile of the recent feed latencies, and use the first response",
+    )
+    parser.add_argument(
+        "--max-hedges",
+        type=int,
+        default=4,
+        help="Maximum number of hedge requests in flight with --hedge (default: 4)",
+    )
+
+    # Add optional arguments for recording the HTTP responses and replaying them offline
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Append every HTTP response (URL, status, headers, body) to this archive file",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="Serve every HTTP response from an archive written by --record, without network "
+        "access",
+    )
+
+    # Add optional arguments for parsing the --input channels in worker processes
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Parse the channel pages and feeds of --input in N worker processes "
+        "(default: 0, parse in the fetching threads)",
+    )
+    parser.add_argument(
+        "--parse-chunksize",
+        type=int,
+        default=8,
+        metavar="N",
+        help="Maximum number of pages sent to a parse worker at once (default: 8)",
+    )
+
+    # Add optional arguments for streaming very large --input lists through bounded queues
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        metavar="N",
+        help="Stream --input through a pipeline of stages with queues of N channels, reading "
+        "the input only as fast as results are written (default with --checkpoint: 64)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="Save the progress through --input to FILE and resume from it after a crash; "
+        "removed once the whole input is done",
+    )
+
+    # Add optional arguments for merging the --input channels into one timeline
+    parser.add_argument(
+        "--timeline",
+        action="store_true",
+        help="Print the videos of all --input channels as one timeline, newest first",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="Only print the N newest videos of the --timeline or --search (default for "
+        "--search: 20)",
+    )
+
+    # Add optional argument for filtering videos by date or title
+    parser.add_argument(
+        "--filter_by", choices=["date", "title"], help="Filter videos by date or title"
+    )
+
+    # Add optional argument for the value to filter videos by
+    parser.add_argument(
+        "--filter_value",
+        help="Value to filter videos by (e.g., date in YYYY-MM-DD format or title keyword)",
+    )
+
+    # Add optional arguments for combined date range and title filters
+    parser.add_argument("--since", help="Only videos published on or after this YYYY-MM-DD date")
+    parser.add_argument("--until", help="Only videos published on or before this YYYY-MM-DD date")
+    parser.add_argument(
+        "--title",
+        action="append",
+        default=[],
+        metavar="KEYWORD",
+        help="Only videos whose title contains KEYWORD (can be repeated)",
+    )
+    parser.add_argument(
+        "--match",
+        choices=MATCH_CHOICES,
+        default="all",
+        help="Whether titles must contain all or any of the --title keywords (default: all)",
+    )
+    parser.add_argument(
+        "--title-regex", help="Only videos whose title matches this case-insensitive regex"
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        default=[],
+        metavar="KEYWORD",
+        help="Skip videos whose title contains KEYWORD (can be repeated)",
+    )
+
+    # Add optional argument for printing other fields of each video
+    parser.add_argument(
+        "--fields",
+        metavar="FIELD,...",
+        help="Comma-separated fields printed for each video of a channel URL, decoded only when "
+        f"printed (default: title,published,link; choose from {','.join(ALL_FIELDS)})",
+    )
+
+    # Add optional flag for copying the RSS feed URL to the clipboard
+    parser.add_argument(
+        "--copy", action="store_true", help="Copy the RSS feed URL to the clipboard"
+    )
+
+    # Add optional flag for resolving the channel ID from a streamed, partially read page
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the channel page and stop reading as soon as the channel ID is found",
+    )
+
+    # Add optional argument for choosing the channel ID extraction engine
+    parser.add_argument(
+        "--parser",
+        choices=CHANNEL_ID_ENGINES,
+        default="regex",
+        help="Engine used to extract the channel ID from the page (default: regex)",
+    )
+
+    # Add optional arguments controlling the persistent channel ID cache
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the persistent channel ID and RSS feed caches",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=DEFAULT_TTL,
+        help="Number of seconds a cached channel ID stays valid (default: 30 days)",
+    )
+    parser.add_argument(
+        "--feed-freshness",
+        type=float,
+        default=0.0,
+        help="Number of seconds a cached RSS feed is used without revalidating it (default: 0)",
+    )
+
+    # Add optional arguments for emitting only videos not seen in earlier runs
+    parser.add_argument(
+        "--new-only",
+        action="store_true",
+        help="Only show videos not seen in earlier runs, and remember the ones shown",
+    )
+    parser.add_argument(
+        "--video-index",
+        metavar="PATH",
+        help="SQLite file recording the videos seen with --new-only (default: user cache dir)",
+    )
+
+    # Add optional arguments for indexing and searching the titles of fetched videos
+    parser.add_argument(
+        "--index-titles",
+        action="store_true",
+        help="Add the videos of every fetched feed to the persistent title index",
+    )
+    parser.add_argument(
+        "--search",
+        metavar="QUERY",
+        help="Search the title index instead of fetching feeds ('word' or 'prefix*' terms, "
+        "combined with --match, bounded by --since and --until)",
+    )
+    parser.add_argument(
+        "--title-index",
+        metavar="PATH",
+        help="SQLite file of the title index (default: user cache dir)",
+    )
+
+    # Add optional arguments for polling the --input channels from a long-running process
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep polling the --input channels, each at a rate adapted to its upload cadence",
+    )
+    parser.add_argument(
+        "--min-interval",
+        type=float,
+        default=15 * 60,
+        help="Shortest poll interval in seconds with --watch (default: 900)",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=24 * 60 * 60,
+        help="Longest poll interval and error backoff in seconds with --watch (default: 86400)",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.1,
+        help="Relative random variation of poll intervals with --watch (default: 0.1)",
+    )
+    parser.add_argument(
+        "--schedule",
+        metavar="PATH",
+        help="SQLite file keeping the --watch schedule across restarts (default: user cache dir)",
+    )
+
+    # Add optional arguments for serving feeds to local feed readers
+    parser.add_argument(
+        "--serve",
+        metavar="[HOST:]PORT",
+        help="Serve per-channel and merged feeds over HTTP on this address (default host: "
+        "127.0.0.1)",
+    )
+    parser.add_argument(
+        "--serve-ttl",
+        type=float,
+        default=5 * 60,
+        help="Number of seconds --serve keeps upstream feeds and rendered responses (default: 300)",
+    )
+
+    # Add optional arguments for exporting per-stage timings and counters
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Record per-stage timings and counters and write them as JSON to FILE at exit "
+        "('-' for stdout)",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        metavar="[HOST:]PORT",
+        help="Record per-stage timings and counters and serve them for Prometheus at "
+        "http://HOST:PORT/metrics",
+    )
+
+    # Add optional arguments for pushing the videos to webhooks and files in batches
+    parser.add_argument(
+        "--deliver",
+        action="append",
+        default=[],
+        metavar="TARGET",
+        help="Push the videos in batches to TARGET: a webhook URL, POSTed JSON, or a file, "
+        "appended JSON Lines (can be repeated)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="Maximum number of videos in a --deliver batch (default: 100)",
+    )
+    parser.add_argument(
+        "--batch-window",
+        type=float,
+        default=5.0,
+        help="Number of seconds a --deliver batch waits for more videos (default: 5)",
+    )
+    parser.add_argument(
+        "--outbox",
+        metavar="PATH",
+        help="SQLite file keeping the --deliver batches that failed, retried with backoff "
+        "(default: user cache dir)",
+    )
+
+    # Add optional arguments for writing structured records instead of text
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="text",
+        help="Output format: text, JSON Lines, CSV or an Atom feed of the videos, or an OPML "
+        "list of the channel RSS feeds (default: text)",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="Write the --format records to FILE instead of stdout",
+    )
+
+    return parser
+
+
+def _check_args(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """
+    Checks the combinations and values of the command line options, exiting on errors.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser reporting the errors.
+        args (argparse.Namespace): The parsed options.
+    """
+    if (
+        args.input is None
+        and args.youtube_url is None
+        and args.serve is None
+        and args.search is None
+    ):
+        parser.error("a YouTube channel URL, --input, --serve or --search is required")
+    if args.watch and args.input is None:
+        parser.error("--watch requires --input")
+    if args.timeline and (args.input is None or args.watch):
+        parser.error("--timeline requires --input and cannot be combined with --watch")
+    if args.limit is not None and args.limit < 0:
+        parser.error("--limit must not be negative")
+    if args.parse_workers < 0 or args.parse_chunksize < 1:
+        parser.error("--parse-workers must not be negative and --parse-chunksize must be positive")
+    if args.fields is not None and (args.youtube_url is None or args.format != "text"):
+        parser.error("--fields requires a channel URL and text output")
+    if args.output is not None and args.format == "text":
+        parser.error("--output requires a --format other than text")
+    if (args.queue_depth is not None or args.checkpoint is not None) and (
+        args.input is None or args.watch or args.timeline
+    ):
+        parser.error("--queue-depth and --checkpoint require --input without --watch or --timeline")
+    if args.queue_depth is not None and args.queue_depth < 1:
+        parser.error("--queue-depth must be positive")
+    if args.retries < 0 or args.rate < 0:
+        parser.error("--retries and --rate must not be negative")
+    if args.connect_timeout <= 0 or args.read_timeout <= 0:
+        parser.error("--connect-timeout and --read-timeout must be positive")
+    if args.max_hedges < 0:
+        parser.error("--max-hedges must not be negative")
+    if args.record is not None and args.replay is not None:
+        parser.error("--record and --replay cannot be combined")
+    if args.deliver and ((args.input is None and args.youtube_url is None) or args.timeline):
+        parser.error("--deliver requires a channel URL or --input without --timeline")
+    if args.batch_size < 1 or args.batch_window < 0:
+        parser.error("--batch-size must be positive and --batch-window must not be negative")
+
+
+def _open_resources(parser: argparse.ArgumentParser, args: argparse.Namespace) -> _Resources:
+    """
+    Compiles the filter and opens the caches, indexes, writer and sinks the options ask for,
+    exiting on errors. Everything that must be flushed or closed is registered to run at exit.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser reporting the errors.
+        args (argparse.Namespace): The parsed options.
+
+    Returns:
+        _Resources: The resources.
+    """
+    # Options of the HTTP clients retrying and rate limiting every request
+    client_options = {
+        "retries": args.retries,
+        "rate": args.rate,
+        "connect_timeout": args.connect_timeout,
+        "read_timeout": args.read_timeout,
+        "adaptive_timeouts": args.adaptive_timeouts,
+        "hedge": args.hedge,
+        "max_hedges": args.max_hedges,
+    }
+
+    # Compile the video filter once, validating the filter options
+    try:
+        video_filter = compile_filter(
+            args.filter_by,
+            args.filter_value,
+            since=args.since,
+            until=args.until,
+            title_terms=args.title,
+            match=args.match,
+            title_regex=args.title_regex,
+            exclude=args.exclude,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Decode the feed entries lazily when --fields prints other fields than the default ones,
+    # keeping the VideoEntry fields read by the filter and the indexes
+    printed_fields = DEFAULT_VIDEO_FIELDS
+    entry_fields = None
+    if args.fields is not None:
+        printed_fields = tuple(field.strip() for field in args.fields.split(",") if field.strip())
+        if not printed_fields:
+            parser.error("--fields must name at least one field")
+        try:
+            entry_fields = check_fields((*VideoEntry._fields, *printed_fields))
+        except ValueError as e:
+            parser.error(f"--fields: {e}")
+
+    # Enable the per-stage instrumentation
+    if args.metrics is not None or args.metrics_port is not None:
+        instrumentation.enable()
+    if args.metrics is not None:
+        atexit.register(instrumentation.write_summary, args.metrics)
+    if args.metrics_port is not None:
+        from feed_server import parse_address  # pylint: disable=import-outside-toplevel
+
+        try:
+            instrumentation.start_metrics_server(parse_address(args.metrics_port))
+        except (ValueError, OSError) as e:
+            parser.error(f"cannot serve metrics on {args.metrics_port}: {e}")
+
+    # Open the progress checkpoint of --input, whose output is appended to when resuming
+    checkpoint = None
+    if args.checkpoint is not None:
+        from pipeline import Checkpoint  # pylint: disable=import-outside-toplevel
+
+        try:
+            checkpoint = Checkpoint(args.checkpoint)
+        except (ValueError, OSError) as e:
+            parser.error(f"cannot open checkpoint: {e}")
+        if checkpoint.resumed and args.output is not None and args.format in ("atom", "opml"):
+            parser.error(f"cannot resume a --format {args.format} document, use jsonl or csv")
+
+    # Open the structured output writer; while it writes to stdout, messages go to stderr
+    output_writer = None
+    if args.format != "text":
+        try:
+            output_stream = open_output(
+                args.output, append=checkpoint is not None and checkpoint.resumed > 0
+            )
+        except OSError as e:
+            parser.error(f"cannot open output file: {e}")
+        if output_stream is sys.stdout:
+            sys.stdout = sys.stderr
+        else:
+            atexit.register(output_stream.close)
+        output_writer = create_writer(args.format, output_stream)
+        atexit.register(output_writer.close)
+
+    # Start the delivery of the videos to the --deliver sinks, sending the last batches at exit
+    delivery = None
+    if args.deliver:
+        from delivery import Delivery, Outbox, create_sink  # pylint: disable=import-outside-toplevel
+
+        try:
+            outbox = Outbox(args.outbox)
+        except (OSError, sqlite3.Error) as e:
+            parser.error(f"cannot open delivery outbox: {e}")
+        atexit.register(outbox.close)
+        delivery = Delivery(
+            [create_sink(target) for target in args.deliver],
+            outbox,
+            batch_size=args.batch_size,
+            window=args.batch_window,
+        )
+        atexit.register(delivery.close)
+
+    # Open the HTTP archive; every page and feed goes through it, bypassing the caches
+    http_archive = None
+    if args.record is not None or args.replay is not None:
+        from http_archive import HttpArchive  # pylint: disable=import-outside-toplevel
+
+        try:
+            http_archive = HttpArchive(
+                args.record or args.replay, mode="r" if args.record is None else "a"
+            )
+        except (ValueError, OSError) as e:
+            parser.error(f"cannot open HTTP archive: {e}")
+        atexit.register(http_archive.close)
+
+    # Open the persistent channel ID and feed caches
+    channel_id_cache = None
+    feed_cache = None
+    if not args.no_cache and http_archive is None:
+        try:
+            channel_id_cache = ChannelIdCache(ttl=args.cache_ttl)
+            feed_cache = FeedCache(freshness=args.feed_freshness)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error opening cache: {e}")
+
+    # Open the index of seen videos
+    video_index = None
+    if args.new_only:
+        try:
+            video_index = VideoIndex(args.video_index)
+        except (OSError, sqlite3.Error) as e:
+            parser.error(f"cannot open video index: {e}")
+
+    # Open the title index of fetched videos
+    title_index = None
+    if args.index_titles or args.search is not None:
+        from title_index import TitleIndex  # pylint: disable=import-outside-toplevel
+
+        try:
+            title_index = TitleIndex(args.title_index)
+        except (OSError, sqlite3.Error) as e:
+            parser.error(f"cannot open title index: {e}")
+
+    return _Resources(
+        client_options,
+        video_filter,
+        printed_fields,
+        entry_fields,
+        checkpoint,
+        output_writer,
+        delivery,
+        http_archive,
+        channel_id_cache,
+        feed_cache,
+        video_index,
+        title_index,
+    )
+
+
+def _archived(args: argparse.Namespace, http_archive: HttpArchive | None, session):
+    """Records the responses of an HTTP client to the archive, or replays them instead."""
+    if args.replay is not None:
+        from http_archive import ReplaySession  # pylint: disable=import-outside-toplevel
+
+        return ReplaySession(http_archive)
+    if args.record is not None:
+        from http_archive import RecordingSession  # pylint: disable=import-outside-toplevel
+
+        return RecordingSession(session, http_archive)
+    return session
+
+
+def _open_input(args: argparse.Namespace) -> AbstractContextManager[IO[str]]:
+    """Opens the --input file, or stdin for '-'."""
+    return nullcontext(sys.stdin) if args.input == "-" else open(args.input, encoding="utf-8")
+
+
+def _search(parser: argparse.ArgumentParser, args: argparse.Namespace, res: _Resources) -> int:
+    """Searches the titles of the videos fetched in earlier runs, returning the exit status."""
+    from timeline import format_timeline_entry  # pylint: disable=import-outside-toplevel
+    from title_index import DEFAULT_SEARCH_LIMIT  # pylint: disable=import-outside-toplevel
+
+    try:
+        found_entries = res.title_index.search(
+            args.search,
+            match=args.match,
+            since=args.since,
+            until=args.until,
+            limit=DEFAULT_SEARCH_LIMIT if args.limit is None else args.limit,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    for found_entry in found_entries:
+        if res.output_writer is not None:
+            res.output_writer.write_video(found_entry)
+        else:
+            print(format_timeline_entry(found_entry))
+    return 0
+
+
+def _serve(parser: argparse.ArgumentParser, args: argparse.Namespace, res: _Resources) -> int:
+    """Serves feeds to local feed readers, sharing one upstream fetch per channel."""
+    from batch import create_session  # pylint: disable=import-outside-toplevel
+    from feed_server import serve  # pylint: disable=import-outside-toplevel
+
+    try:
+        serve(
+            args.serve,
+            session=_archived(args, res.http_archive, create_session(**res.client_options)),
+            cache=res.channel_id_cache,
+            feed_cache=res.feed_cache,
+            engine=args.parser,
+            ttl=args.serve_ttl,
+        )
+    except (ValueError, OSError) as e:
+        parser.error(f"cannot serve on {args.serve}: {e}")
+    return 0
+
+
+def _emit_result(res: _Resources, result, flush: bool = False) -> None:
+    """Writes a channel result to the output writer, or prints it as text."""
+    from batch import format_channel_result  # pylint: disable=import-outside-toplevel
+
+    if res.delivery is not None:
+        res.delivery.deliver_result(result)
+    if res.output_writer is not None and result.ok:
+        res.output_writer.write_result(result)
+        if flush:
+            res.output_writer.stream.flush()
+    else:
+        print(format_channel_result(result), flush=flush)
+
+
+def _watch(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    res: _Resources,
+    process: Callable[[list[str]], Iterable],
+) -> int:
+    """Polls the --input channels forever, each at the rate of its upload cadence."""
+    from batch import read_channel_urls  # pylint: disable=import-outside-toplevel
+    from scheduler import PollScheduler, watch  # pylint: disable=import-outside-toplevel
+
+    with _open_input(args) as input_file:
+        watched_urls = list(dict.fromkeys(read_channel_urls(input_file)))
+    try:
+        poll_scheduler = PollScheduler(
+            args.schedule,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            jitter=args.jitter,
+        )
+    except (ValueError, OSError, sqlite3.Error) as e:
+        parser.error(f"cannot open poll schedule: {e}")
+    for url in watched_urls:
+        poll_scheduler.add(url)
+    print(f"Watching {len(poll_scheduler)} channels. Press Ctrl+C to stop.")
+    try:
+        watch(poll_scheduler, process, partial(_emit_result, res, flush=True))
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    return 0
+
+
+def _print_timeline(args: argparse.Namespace, res: _Resources, channel_options: dict) -> int:
+    """Merges the feeds of the --input channels into one newest-first timeline."""
+    from batch import read_channel_urls  # pylint: disable=import-outside-toplevel
+    from timeline import fetch_timeline, format_timeline_entry  # pylint: disable=import-outside-toplevel
+
+    with _open_input(args) as input_file:
+        for timeline_entry in fetch_timeline(
+            read_channel_urls(input_file),
+            limit=args.limit,
+            max_workers=args.workers,
+            **channel_options,
+        ):
+            if res.output_writer is not None:
+                res.output_writer.write_video(timeline_entry)
+            else:
+                print(format_timeline_entry(timeline_entry))
+    return 0
+
+
+def _process_input(
+    parser: argparse.ArgumentParser, args: argparse.Namespace, res: _Resources
+) -> int:
+    """
+    Processes every --input channel concurrently and prints the results as they complete,
+    returning the exit status.
+    """
+    from batch import BatchSummary, create_session, read_channel_urls, run_batch  # pylint: disable=import-outside-toplevel
+
+    # One HTTP client for every channel, with a connection pool for every network thread
+    input_client = create_session(2 * args.workers, **res.client_options)
+    input_session = _archived(args, res.http_archive, input_client)
+
+    # Start the worker processes parsing the channel pages and feeds
+    parse_pool = None
+    if args.parse_workers > 0:
+        from parse_pool import ParsePool  # pylint: disable=import-outside-toplevel
+
+        parse_pool = ParsePool(args.parse_workers, args.parse_chunksize)
+        atexit.register(parse_pool.close)
+
+    channel_options = {
+        "per_host_limit": args.per_host,
+        "session": input_session,
+        "cache": res.channel_id_cache,
+        "feed_cache": res.feed_cache,
+        "video_index": res.video_index,
+        "engine": args.parser,
+        "video_filter": res.video_filter,
+        "title_index": res.title_index,
+        "parse_pool": parse_pool,
+    }
+    if args.watch:
+        return _watch(
+            parser, args, res, partial(run_batch, max_workers=args.workers, **channel_options)
+        )
+    if args.timeline:
+        return _print_timeline(args, res, channel_options)
+
+    if args.queue_depth is not None or args.checkpoint is not None:
+        # Stream the input through bounded stage queues, resuming from the checkpoint
+        from pipeline import DEFAULT_QUEUE_DEPTH, Pipeline  # pylint: disable=import-outside-toplevel
+
+        if res.checkpoint is not None:
+            # Results must reach the output before the checkpoint counts them as written
+            res.checkpoint.flush = (
+                res.output_writer.stream.flush
+                if res.output_writer is not None
+                else sys.stdout.flush
+            )
+            if res.checkpoint.resumed:
+                print(f"Resuming from line {res.checkpoint.resumed + 1} of the input.")
+        process_lines = Pipeline(
+            workers=args.workers,
+            queue_depth=args.queue_depth or DEFAULT_QUEUE_DEPTH,
+            checkpoint=res.checkpoint,
+            **channel_options,
+        ).run
+    else:
+
+        def process_lines(lines):
+            """Processes the channels of the input lines with a bounded thread pool."""
+            return run_batch(read_channel_urls(lines), max_workers=args.workers, **channel_options)
+
+    summary = BatchSummary()
+    with _open_input(args) as input_file:
+        for result in process_lines(input_file):
+            summary.add(result)
+            _emit_result(res, result)
+    print(summary)
+    if res.feed_cache is not None:
+        feed_cache_stats = res.feed_cache.stats()
+        print(
+            f"Feed cache: {feed_cache_stats['hits']} hits,"
+            f" {feed_cache_stats['revalidations']} revalidated,"
+            f" {feed_cache_stats['misses']} misses."
+        )
+    if res.delivery is not None:
+        # Send the last batches before counting the deliveries
+        res.delivery.close()
+        delivery_stats = res.delivery.stats()
+        print(
+            f"Delivery: {delivery_stats['delivered']} videos delivered in"
+            f" {delivery_stats['batches']} batches,"
+            f" {delivery_stats['outbox']} batches in the outbox."
+        )
+    if args.hedge and args.replay is None:
+        client_stats = input_client.stats()
+        win_rate = client_stats["hedge_win_rate"]
+        print(
+            f"Hedged requests: {client_stats['hedges']} sent,"
+            f" {client_stats['hedge_wins']} answered first"
+            + (f" ({win_rate:.0%})." if win_rate is not None else ".")
+        )
+    if args.replay is not None:
+        print(
+            f"HTTP archive: {input_session.hits} responses replayed,"
+            f" {input_session.misses} not in the archive."
+        )
+    return 1 if summary.failures else 0
+
+
+def _process_channel(args: argparse.Namespace, res: _Resources) -> int:
+    """Resolves the channel of the URL and prints or writes its videos, returning 0."""
+    from http_client import HttpClient  # pylint: disable=import-outside-toplevel
+
+    youtube_url = args.youtube_url
+    # Retry and rate limit the requests for the channel
+    session = _archived(args, res.http_archive, HttpClient(**res.client_options))
+
+    # Resolve '/channel/UC...' URLs and cached URLs without fetching the page
+    channel_id = lookup_channel_id(youtube_url, res.channel_id_cache)
+    page_fetched = channel_id is not None
+    if channel_id is None:
+        # Fetch the canonical form of the URL, without suffixes and tracking query strings
+        page_url = canonical_channel_url(youtube_url) or youtube_url
+        if args.stream:
+            # Read the YouTube page only up to the channel ID
+            channel_id, page_bytes_read = stream_youtube_channel_id(page_url, session=session)
+            print(f"Read {page_bytes_read} bytes of the channel page.")
+            page_fetched = page_bytes_read > 0
+        else:
+            # Fetch the source code of the YouTube page and extract the channel ID from it
+            source_code = get_youtube_source_code(page_url, session)
+            channel_id = get_youtube_channel_id(source_code, engine=args.parser)
+            page_fetched = source_code is not None
+        if channel_id and res.channel_id_cache is not None:
+            res.channel_id_cache.set(youtube_url, channel_id)
+    if not page_fetched:
+        return 0
+    if not channel_id:
+        print("Channel ID not found.")
+        return 0
+
+    # Create the RSS feed URL using the channel ID
+    rss_feed_url = create_rss_feed_url(channel_id)
+    print(f"Channel ID: {channel_id}")
+    print(f"RSS Feed URL: {rss_feed_url}")
+    if args.copy and copy_to_clipboard(rss_feed_url):
+        print("RSS feed URL has been copied to the clipboard.")
+
+    # Fetch and parse the RSS feed content
+    entries = fetch_rss_feed_content(
+        rss_feed_url, session=session, feed_cache=res.feed_cache, fields=res.entry_fields
+    )
+    if entries is None:
+        print("Could not fetch RSS feed content.")
+        return 0
+    if res.title_index is not None:
+        # Add the fetched videos to the title index
+        res.title_index.add(channel_id, entries)
+
+    # Filter the videos once, keeping with --new-only only the ones not seen in earlier runs,
+    # and recording those
+    entries = res.video_filter.apply(entries)
+    if res.video_index is not None:
+        entries = res.video_index.iter_new(channel_id, entries)
+    entries = list(entries)
+    if res.delivery is not None:
+        # Push the filtered videos to the delivery sinks
+        for entry in entries:
+            res.delivery.deliver_video(entry, channel_id, youtube_url)
+    if res.output_writer is not None:
+        # Write the channel and its filtered videos as structured records
+        channel_title = entries[0].author if entries else None
+        res.output_writer.write_channel(youtube_url, channel_id, rss_feed_url, channel_title)
+        for entry in entries:
+            res.output_writer.write_video(entry, channel_id, youtube_url)
+    else:
+        # Print the requested fields of the filtered videos
+        for video in filter_videos(entries, fields=res.printed_fields):
+            for field, value in video.items():
+                print(f"{field.replace('_', ' ').capitalize()}: {value}")
+            print()
+    return 0
+
+
+def run(argv: list[str] | None = None) -> None:
+    """
+    Parses the command line and runs the requested mode, exiting with its status.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    _check_args(parser, args)
+    res = _open_resources(parser, args)
+    if args.search is not None:
+        sys.exit(_search(parser, args, res))
+    if args.serve is not None:
+        sys.exit(_serve(parser, args, res))
+    if args.input is not None:
+        sys.exit(_process_input(parser, args, res))
+    sys.exit(_process_channel(args, res))
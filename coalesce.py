@@ -0,0 +1,109 @@
+"""
+In-flight call coalescing ("singleflight").
+
+When several threads ask for the same key at the same time, only the first one runs the call;
+the others wait for it and share its result (or its exception). Once the call has finished, the
+next request for the key runs the call again, unless the results are remembered with Once.
+
+Classes:
+    SingleFlight: Coalesces concurrent calls for the same key into one.
+    Once: Runs the call of each key at most once and shares its result with every request.
+"""
+
+import threading
+from collections.abc import Callable, Hashable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A call in flight, shared by every thread waiting for its key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    Attributes:
+        calls (int): The number of calls actually run.
+        shared (int): The number of requests answered by another thread's call.
+    """
+
+    def __init__(self):
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Runs the function for the key, or waits for the call already in flight for it.
+
+        Args:
+            key (Hashable): Identifies the call, e.g. a channel ID.
+            function (Callable): The call to run if none is in flight for the key.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            Exception: Whatever the call raised.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.shared += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = function()
+            except BaseException as e:  # pylint: disable=broad-exception-caught
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class Once(SingleFlight):
+    """
+    Runs the call of each key at most once and shares its result with every request, concurrent
+    or later. Calls that raise are not remembered, so the next request runs them again.
+
+    The results are kept for the lifetime of the object, e.g. a single batch run.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._results: dict[Hashable, object] = {}
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        with self._lock:
+            if key in self._results:
+                self.shared += 1
+                return self._results[key]
+
+        def call() -> T:
+            result = function()
+            with self._lock:
+                self._results[key] = result
+            return result
+
+        return super().do(key, call)
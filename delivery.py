@@ -0,0 +1,460 @@
+"""
+Batched push delivery of videos to webhook and file sinks.
+
+Instead of scraping the output of a run, downstream systems can have the videos pushed to them.
+Videos handed to a Delivery are converted into the records of writers.video_record and collected
+into batches, which are sent once they hold `batch_size` videos or `window` seconds after their
+first video, whichever comes first, so that a burst of uploads costs one request instead of one
+per video. Each sink is served by its own background thread, so that a slow or failing sink
+neither blocks the fetching threads nor delays the other sinks.
+
+Sinks:
+    webhook: 'http://' and 'https://' targets; every batch is POSTed as a JSON object
+        (`{"videos": [...]}`) over one persistent connection per sink.
+    file: any other target; every batch is appended to the file as JSON Lines and synced to
+        disk.
+
+A batch that a sink fails to take is stored in a durable outbox, a SQLite database in the user
+cache directory, and retried with exponential backoff and jitter. While a sink has batches in
+the outbox, its new batches are queued behind them, so that every sink receives the batches in
+order; batches still in the outbox when the process stops are retried when the next run starts.
+
+Functions:
+    create_sink(target, timeout=...): Creates the sink of a delivery target.
+
+Classes:
+    WebhookSink: POSTs batches of videos as JSON to an HTTP endpoint.
+    FileSink: Appends batches of videos to a JSON Lines file.
+    Outbox: SQLite backed store of the batches that failed to be delivered.
+    Delivery: Batches videos and delivers them to sinks from background threads.
+"""
+
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+from sqlite_store import SQLiteStore
+from main import VideoEntry
+from writers import video_record
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_WINDOW = 5.0
+DEFAULT_TIMEOUT = (3.05, 10.0)
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 5 * 60.0
+
+# Stops the thread of a sink once its queue is drained.
+_STOP = object()
+
+
+class WebhookSink:
+    """
+    POSTs batches of videos as JSON to an HTTP endpoint.
+
+    The sink keeps one persistent connection to the endpoint, reused by every batch.
+
+    Args:
+        url (str): The URL of the webhook.
+        timeout (tuple, optional): The (connect, read) timeout of each request, in seconds.
+            Defaults to (3.05, 10).
+    """
+
+    def __init__(self, url: str, timeout: tuple[float, float] = DEFAULT_TIMEOUT):
+        self.name = url
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def send(self, records: list[dict]) -> None:
+        """
+        Sends a batch of video records.
+
+        Args:
+            records (list): The video records.
+
+        Raises:
+            requests.exceptions.RequestException: If the request failed or was not answered
+                with a 2xx status.
+        """
+        body = json.dumps({"videos": records}, ensure_ascii=False).encode("utf-8")
+        with instrumentation.stage("deliver") as span:
+            response = self.session.post(
+                self.url,
+                data=body,
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout,
+            )
+            span.set(status=response.status_code, bytes=len(body))
+            # Read the body, so that the connection is released for the next batch.
+            response.content  # pylint: disable=pointless-statement
+            response.raise_for_status()
+
+    def close(self) -> None:
+        """Closes the connection."""
+        self.session.close()
+
+
+class FileSink:
+    """
+    Appends batches of videos to a JSON Lines file, one record per line.
+
+    The file is kept open and synced to disk after every batch, so that a delivered batch
+    survives a crash.
+
+    Args:
+        path (str | Path): The file.
+    """
+
+    def __init__(self, path: str | Path):
+        self.name = str(path)
+        self.path = Path(path)
+        self._file = None
+
+    def send(self, records: list[dict]) -> None:
+        """
+        Appends a batch of video records.
+
+        Args:
+            records (list): The video records.
+
+        Raises:
+            OSError: If the file could not be written.
+        """
+        with instrumentation.stage("deliver") as span:
+            if self._file is None:
+                # pylint: disable-next=consider-using-with
+                self._file = open(self.path, "a", encoding="utf-8")
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            self._file.write(lines)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            span.set(bytes=len(lines))
+
+    def close(self) -> None:
+        """Closes the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def create_sink(target: str, timeout: tuple[float, float] = DEFAULT_TIMEOUT):
+    """
+    Creates the sink of a delivery target.
+
+    Args:
+        target (str): A webhook URL ('http://' or 'https://') or the path of a file.
+        timeout (tuple, optional): The (connect, read) timeout of webhook requests, in seconds.
+
+    Returns:
+        WebhookSink | FileSink: The sink.
+    """
+    if target.startswith(("http://", "https://")):
+        return WebhookSink(target, timeout)
+    return FileSink(target)
+
+
+class Outbox(SQLiteStore):
+    """
+    SQLite backed store of the batches that failed to be delivered.
+
+    Every batch is stored with the name of its sink, the number of failed attempts and the time
+    of its next attempt. The batches of a sink are retried oldest first.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'outbox.sqlite3' in the user
+            cache directory.
+    """
+
+    FILENAME = "outbox.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS outbox ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " sink TEXT NOT NULL,"
+        " records TEXT NOT NULL,"
+        " attempts INTEGER NOT NULL,"
+        " next_attempt REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS outbox_sink ON outbox (sink, id)",
+    )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM outbox").fetchone()
+        return count
+
+    def add(self, sink: str, records: list[dict], attempts: int, next_attempt: float) -> None:
+        """
+        Stores a batch.
+
+        Args:
+            sink (str): The name of the sink.
+            records (list): The video records of the batch.
+            attempts (int): The number of failed attempts to deliver the batch.
+            next_attempt (float): The time of the next attempt.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO outbox (sink, records, attempts, next_attempt) VALUES (?, ?, ?, ?)",
+                (sink, json.dumps(records, ensure_ascii=False), attempts, next_attempt),
+            )
+
+    def oldest(self, sink: str) -> tuple[int, list[dict], int, float] | None:
+        """
+        Returns the oldest batch of a sink.
+
+        Args:
+            sink (str): The name of the sink.
+
+        Returns:
+            tuple: The ID, video records, failed attempts and next attempt time of the batch,
+            or None if the sink has no batch in the outbox.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, records, attempts, next_attempt FROM outbox"
+                " WHERE sink = ? ORDER BY id LIMIT 1",
+                (sink,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2], row[3]
+
+    def remove(self, batch_id: int) -> None:
+        """
+        Removes a delivered batch.
+
+        Args:
+            batch_id (int): The ID of the batch.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM outbox WHERE id = ?", (batch_id,))
+
+    def reschedule(self, batch_id: int, attempts: int, next_attempt: float) -> None:
+        """
+        Records a failed attempt to deliver a batch.
+
+        Args:
+            batch_id (int): The ID of the batch.
+            attempts (int): The number of failed attempts.
+            next_attempt (float): The time of the next attempt.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?",
+                (attempts, next_attempt, batch_id),
+            )
+
+
+class _SinkWorker:
+    """The thread batching the videos of one sink and retrying its batches in the outbox."""
+
+    def __init__(self, sink, delivery: "Delivery"):
+        self.sink = sink
+        self.delivery = delivery
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Time of the next attempt of the oldest batch in the outbox, None if it has none; the
+        # batches left by an earlier run are retried right away.
+        self.retry_at = time.time() if delivery.outbox.oldest(sink.name) is not None else None
+        self.thread = threading.Thread(target=self.run, name=f"delivery-{sink.name}", daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        batch: list[dict] = []
+        deadline = None
+        stopping = False
+        while not stopping:
+            wakeups = [at for at in (deadline, self.retry_at) if at is not None]
+            timeout = max(min(wakeups) - time.time(), 0.0) if wakeups else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            # Take every video already queued, sending the batches that are full.
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.time() + self.delivery.window
+                if len(batch) >= self.delivery.batch_size:
+                    self.deliver(batch)
+                    batch, deadline = [], None
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if batch and (stopping or time.time() >= deadline):
+                self.deliver(batch)
+                batch, deadline = [], None
+            if self.retry_at is not None and time.time() >= self.retry_at:
+                self.retry()
+
+    def deliver(self, batch: list[dict]) -> None:
+        """Sends a batch, or queues it in the outbox behind the batches already there."""
+        if self.retry_at is not None:
+            self.delivery.outbox.add(self.sink.name, batch, 0, self.retry_at)
+            return
+        if not self.send(batch):
+            self.retry_at = self.delivery.next_attempt(1)
+            self.delivery.outbox.add(self.sink.name, batch, 1, self.retry_at)
+
+    def retry(self) -> None:
+        """Sends the batches in the outbox oldest first, until one fails again."""
+        outbox = self.delivery.outbox
+        while (oldest := outbox.oldest(self.sink.name)) is not None:
+            batch_id, batch, attempts, _ = oldest
+            if not self.send(batch):
+                self.retry_at = self.delivery.next_attempt(attempts + 1)
+                outbox.reschedule(batch_id, attempts + 1, self.retry_at)
+                return
+            outbox.remove(batch_id)
+        self.retry_at = None
+
+    def send(self, batch: list[dict]) -> bool:
+        """Sends a batch to the sink, returning whether it was taken."""
+        try:
+            self.sink.send(batch)
+        except (requests.exceptions.RequestException, OSError):
+            self.delivery.count("failures")
+            return False
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Any other error of a sink must not stop its thread; the batch stays in the outbox.
+            print(f"Error delivering to {self.sink.name}: {e!r}", file=sys.stderr)
+            self.delivery.count("failures")
+            return False
+        self.delivery.count("batches", len(batch))
+        return True
+
+
+class Delivery:
+    """
+    Batches videos and delivers them to sinks from background threads.
+
+    Videos are queued without blocking the caller. Every sink gets every video.
+
+    Args:
+        sinks (list): The sinks, see create_sink.
+        outbox (Outbox, optional): The store of the batches that failed to be delivered.
+            Defaults to the outbox in the user cache directory.
+        batch_size (int, optional): The largest number of videos in a batch. Defaults to 100.
+        window (float, optional): The number of seconds a batch waits for more videos after its
+            first one. Defaults to 5.
+        backoff (float, optional): The base delay before retrying a failed batch, in seconds,
+            doubled after every failed attempt. Defaults to 1.
+        max_backoff (float, optional): The longest delay before retrying a failed batch, in
+            seconds. Defaults to 5 minutes.
+        rng (random.Random, optional): The random number generator for the jitter.
+    """
+
+    def __init__(
+        self,
+        sinks: list,
+        outbox: Outbox | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        window: float = DEFAULT_BATCH_WINDOW,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        rng: random.Random | None = None,
+    ):
+        if batch_size < 1 or window < 0:
+            raise ValueError("batch_size must be positive and window must not be negative")
+        self.outbox = outbox if outbox is not None else Outbox()
+        self.batch_size = batch_size
+        self.window = window
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.rng = rng or random.Random()
+        self._stats = {"videos": 0, "batches": 0, "delivered": 0, "failures": 0}
+        self._lock = threading.Lock()
+        self._workers = [_SinkWorker(sink, self) for sink in sinks]
+
+    def next_attempt(self, attempts: int) -> float:
+        """
+        Returns the time of the next attempt to deliver a batch, after a random delay growing
+        exponentially with the failed attempts ("full jitter").
+
+        Args:
+            attempts (int): The number of failed attempts.
+
+        Returns:
+            float: The time of the next attempt.
+        """
+        delay = self.rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempts - 1)))
+        return time.time() + delay
+
+    def count(self, name: str, videos: int = 0) -> None:
+        """Adds to a delivery counter, and the videos of a delivered batch."""
+        with self._lock:
+            self._stats[name] += 1
+            self._stats["delivered"] += videos
+
+    def deliver_video(
+        self, entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+    ) -> None:
+        """
+        Queues a video for delivery.
+
+        Args:
+            entry (VideoEntry): The video entry.
+            channel_id (str, optional): The ID of the channel of the video. Defaults to None.
+            channel_url (str, optional): The YouTube URL of the channel. Defaults to None.
+        """
+        record = video_record(entry, channel_id, channel_url)
+        with self._lock:
+            self._stats["videos"] += 1
+        for worker in self._workers:
+            worker.queue.put(record)
+
+    def deliver_result(self, result) -> None:
+        """
+        Queues the videos of a successful batch result for delivery; failed results are skipped.
+
+        Args:
+            result (batch.ChannelResult): The outcome of a channel.
+        """
+        if result.ok:
+            for entry in result.entries or []:
+                self.deliver_video(entry, result.channel_id, result.url)
+
+    def stats(self) -> dict:
+        """
+        Returns the delivery counters.
+
+        Returns:
+            dict: The numbers of videos queued, batches and videos delivered, failed attempts,
+            and batches waiting in the outbox.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["outbox"] = len(self.outbox)
+        return stats
+
+    def close(self) -> None:
+        """
+        Sends the pending batches, waiting for every sink, and closes the sinks. Batches that
+        fail are left in the outbox for the next run. Videos given after closing are dropped.
+        """
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.queue.put(_STOP)
+        for worker in workers:
+            worker.thread.join()
+            worker.sink.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
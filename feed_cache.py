@@ -0,0 +1,189 @@
+"""
+On-disk HTTP cache for RSS feeds using conditional requests.
+
+Most polls of a channel's RSS feed return exactly the same bytes as the previous poll. The cache
+stores the body of every feed together with its 'ETag' and 'Last-Modified' headers and sends them
+back as 'If-None-Match' and 'If-Modified-Since', so that an unchanged feed costs a bodiless
+'304 Not Modified' response. Within a configurable freshness window the cached body is served
+without any request at all.
+
+The cache is a SQLite database next to the channel ID cache; the least recently validated feeds
+are evicted once it holds more than a maximum number of feeds.
+
+Classes:
+    FeedCache: SQLite backed conditional GET cache for RSS feeds.
+"""
+
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import NamedTuple
+
+from sqlite_store import SQLiteStore
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+
+class CachedFeed(NamedTuple):
+    """
+    A cached RSS feed.
+
+    Attributes:
+        body (bytes): The feed content.
+        etag (str): The 'ETag' response header, or None.
+        last_modified (str): The 'Last-Modified' response header, or None.
+        fetched_at (float): The time the feed was last downloaded or revalidated.
+    """
+
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+
+
+class FeedCache(SQLiteStore):
+    """
+    SQLite backed conditional GET cache for RSS feeds.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'feeds.sqlite3' in the user
+            cache directory.
+        freshness (float, optional): The number of seconds a cached feed is served without
+            contacting the server. Defaults to 0, which revalidates on every fetch.
+        max_entries (int, optional): The maximum number of feeds kept. Defaults to 10,000.
+
+    Attributes:
+        hits (int): Fetches served from the cache without a request.
+        revalidations (int): Fetches answered with '304 Not Modified' and served from the cache.
+        misses (int): Fetches that downloaded the feed.
+    """
+
+    FILENAME = "feeds.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS feeds ("
+        " url TEXT PRIMARY KEY,"
+        " body BLOB NOT NULL,"
+        " etag TEXT,"
+        " last_modified TEXT,"
+        " fetched_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS feeds_fetched_at ON feeds (fetched_at)",
+    )
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        freshness: float = 0.0,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        super().__init__(path)
+        self.freshness = freshness
+        self.max_entries = max_entries
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    def get(self, url: str) -> CachedFeed | None:
+        """
+        Looks up the cached copy of a feed, without checking its freshness.
+
+        Args:
+            url (str): The URL of the RSS feed.
+
+        Returns:
+            CachedFeed: The cached feed, or None if the feed is not cached.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM feeds WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedFeed(*row) if row else None
+
+    def fetch(self, url: str, http_get: Callable) -> bytes:
+        """
+        Returns the content of a feed, from the cache if it is fresh or unchanged.
+
+        Args:
+            url (str): The URL of the RSS feed.
+            http_get (Callable): Sends the GET request; called as `http_get(url, headers=...)`
+                and returning a requests.Response.
+
+        Returns:
+            bytes: The feed content.
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails, or is answered with
+                '304 Not Modified' although the feed is not cached.
+        """
+        cached = self.get(url)
+        now = time.time()
+        if cached and now - cached.fetched_at < self.freshness:
+            self._count("hits")
+            return cached.body
+
+        headers = {}
+        if cached and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached and cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        response = http_get(url, headers=headers)
+        try:
+            if response.status_code == 304:
+                if not cached:
+                    # An unconditional request has no cached body to fall back on
+                    import requests  # pylint: disable=import-outside-toplevel
+
+                    raise requests.exceptions.HTTPError(
+                        f"304 Not Modified for the uncached feed {url}", response=response
+                    )
+                self._count("revalidations")
+                with self._lock, self._connection:
+                    self._connection.execute(
+                        "UPDATE feeds SET fetched_at = ? WHERE url = ?", (now, url)
+                    )
+                return cached.body
+            response.raise_for_status()
+            body = response.content
+        finally:
+            response.close()
+
+        self._count("misses")
+        self._store(
+            url,
+            CachedFeed(
+                body, response.headers.get("ETag"), response.headers.get("Last-Modified"), now
+            ),
+        )
+        return body
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit, revalidation and miss counters.
+
+        Returns:
+            dict: The counters by name.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+            }
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _store(self, url: str, feed: CachedFeed) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO feeds (url, body, etag, last_modified, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (url, *feed),
+            )
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM feeds").fetchone()
+            if count > self.max_entries:
+                self._connection.execute(
+                    "DELETE FROM feeds WHERE url IN"
+                    " (SELECT url FROM feeds ORDER BY fetched_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
@@ -0,0 +1,167 @@
+"""
+Lazily decoded RSS feed entries, including the rich media fields of YouTube feeds.
+
+Besides the title, publication date and link, every entry of a YouTube channel feed carries
+media fields in its 'media:group': the description, the thumbnail URL, and the view count and
+star rating of 'media:community'. Most consumers only read one or two fields of an entry, so a
+LazyEntry keeps the raw bytes of its 'entry' element and decodes each field only when it is
+first read, with a precompiled byte pattern, caching the value in a slot of the entry.
+
+A projection (`fields`) names the fields an entry may decode; reading any other field raises
+AttributeError, so that a projection also guarantees which columns are ever decoded.
+
+The raw entries are split from the feed with a byte pattern as the chunks arrive, without
+building an XML tree, so reading stops as soon as enough entries are complete. Unlike the lxml
+parser of main.parse_feed_entries, this does not check that the feed is well-formed XML.
+
+Functions:
+    check_fields(fields): Validates a projection of entry fields.
+    iter_entry_bytes(chunks): Splits a feed into the raw bytes of its entries.
+
+Classes:
+    LazyEntry: A feed entry whose fields are decoded on first access.
+"""
+
+import re
+from collections.abc import Callable, Iterable, Iterator
+from html import unescape
+
+# The fields of main.VideoEntry, followed by the media fields.
+ENTRY_FIELDS = ("video_id", "title", "published", "link", "author")
+MEDIA_FIELDS = ("description", "thumbnail", "views", "star_rating", "star_count")
+ALL_FIELDS = ENTRY_FIELDS + MEDIA_FIELDS
+
+_ENTRY_PATTERN = re.compile(rb"<entry[\s>].*?</entry>", re.DOTALL)
+_VIDEO_ID_PATTERN = re.compile(rb"<yt:videoId>([^<]*)<")
+_TITLE_PATTERN = re.compile(rb"<title(?:\s[^>]*)?>([^<]*)<")
+_PUBLISHED_PATTERN = re.compile(rb"<published>([^<]*)<")
+_LINK_PATTERN = re.compile(rb"<link\s[^>]*?href=[\"']([^\"']*)")
+_AUTHOR_PATTERN = re.compile(rb"<author>\s*<name>([^<]*)<")
+_DESCRIPTION_PATTERN = re.compile(rb"<media:description>([^<]*)<")
+_THUMBNAIL_PATTERN = re.compile(rb"<media:thumbnail\s[^>]*?url=[\"']([^\"']*)")
+_VIEWS_PATTERN = re.compile(rb"<media:statistics\s[^>]*?views=[\"'](\d+)")
+_STAR_RATING_PATTERN = re.compile(rb"<media:starRating\s[^>]*?average=[\"']([\d.]+)")
+_STAR_COUNT_PATTERN = re.compile(rb"<media:starRating\s[^>]*?count=[\"'](\d+)")
+_VIDEO_ID_QUERY_PATTERN = re.compile(rb"[?&]v=([a-zA-Z0-9_-]+)")
+
+
+def _text(pattern: re.Pattern, raw: bytes) -> str:
+    """Returns the unescaped text captured by a pattern, or an empty string."""
+    match = pattern.search(raw)
+    if match is None:
+        return ""
+    value = match.group(1).decode("utf-8")
+    return unescape(value) if "&" in value else value
+
+
+def _number(pattern: re.Pattern, raw: bytes, kind: type) -> int | float | None:
+    """Returns the number captured by a pattern, or None."""
+    match = pattern.search(raw)
+    return kind(match.group(1)) if match else None
+
+
+def _video_id(raw: bytes) -> str:
+    """Returns the 'yt:videoId' of an entry, or the 'v' query parameter of its link."""
+    video_id = _text(_VIDEO_ID_PATTERN, raw)
+    if video_id:
+        return video_id
+    link = _LINK_PATTERN.search(raw)
+    match = _VIDEO_ID_QUERY_PATTERN.search(link.group(1)) if link else None
+    return match.group(1).decode() if match else ""
+
+
+# Decodes each field from the raw bytes of an entry.
+_EXTRACTORS: dict[str, Callable[[bytes], object]] = {
+    "video_id": _video_id,
+    "title": lambda raw: _text(_TITLE_PATTERN, raw),
+    "published": lambda raw: _text(_PUBLISHED_PATTERN, raw),
+    "link": lambda raw: _text(_LINK_PATTERN, raw),
+    "author": lambda raw: _text(_AUTHOR_PATTERN, raw),
+    "description": lambda raw: _text(_DESCRIPTION_PATTERN, raw),
+    "thumbnail": lambda raw: _text(_THUMBNAIL_PATTERN, raw),
+    "views": lambda raw: _number(_VIEWS_PATTERN, raw, int),
+    "star_rating": lambda raw: _number(_STAR_RATING_PATTERN, raw, float),
+    "star_count": lambda raw: _number(_STAR_COUNT_PATTERN, raw, int),
+}
+
+
+def check_fields(fields: Iterable[str]) -> frozenset[str]:
+    """
+    Validates a projection of entry fields.
+
+    Args:
+        fields (Iterable[str]): The names of the fields, from ALL_FIELDS.
+
+    Returns:
+        frozenset: The names of the fields.
+
+    Raises:
+        ValueError: If a name is not an entry field.
+    """
+    fields = frozenset(fields)
+    unknown = sorted(fields - frozenset(ALL_FIELDS))
+    if unknown:
+        raise ValueError(
+            f"unknown entry fields: {', '.join(unknown)} (choose from {', '.join(ALL_FIELDS)})"
+        )
+    return fields
+
+
+def iter_entry_bytes(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Splits a feed into the raw bytes of its 'entry' elements, as the chunks arrive.
+
+    Args:
+        chunks (Iterable[bytes]): The RSS feed content, in chunks.
+
+    Yields:
+        bytes: The raw bytes of each complete entry, in feed order.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        end = 0
+        for match in _ENTRY_PATTERN.finditer(buffer):
+            yield match.group()
+            end = match.end()
+        if end:
+            buffer = buffer[end:]
+
+
+class LazyEntry:
+    """
+    A feed entry whose fields are decoded on first access.
+
+    The entry has the attributes of main.VideoEntry (`video_id`, `title`, `published`, `link`,
+    `author`) and the media fields: `description`, `thumbnail` (the URL of the thumbnail),
+    `views` (int), `star_rating` (the average rating, float) and `star_count` (the number of
+    ratings, int). Missing text fields are empty strings and missing numbers are None.
+
+    Args:
+        raw (bytes): The raw bytes of the 'entry' element.
+        fields (Iterable[str], optional): The fields that may be decoded. Defaults to every
+            field.
+    """
+
+    __slots__ = ("raw", "fields", *ALL_FIELDS)
+
+    def __init__(self, raw: bytes, fields: Iterable[str] = ALL_FIELDS):
+        self.raw = raw
+        self.fields = fields if isinstance(fields, frozenset) else check_fields(fields)
+
+    def __getattr__(self, name: str):
+        # Only called for the fields that have not been decoded yet.
+        extract = _EXTRACTORS.get(name)
+        if extract is None:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        if name not in self.fields:
+            raise AttributeError(f"field {name!r} is not in the projection of this entry")
+        value = extract(self.raw)
+        setattr(self, name, value)
+        return value
+
+    def __reduce__(self):
+        return type(self), (self.raw, self.fields)
+
+    def __repr__(self) -> str:
+        return f"LazyEntry(<{len(self.raw)} bytes>, fields={sorted(self.fields)})"
@@ -0,0 +1,552 @@
+"""
+Local aggregating feed server.
+
+Serves the feeds of one or more channels to local feed readers, so that many readers share one
+upstream fetch per channel instead of each polling YouTube directly. Feeds are requested as
+
+    GET /feed?channel=<channel URL or ID>[&channel=...][&format=atom|json][&limit=<n>]
+
+with the filter options of the command line as further query parameters (filter_by,
+filter_value, since, until, title, match, title_regex, exclude). With several channels, their
+videos are merged into one newest-first feed. GET /stats returns the cache and upstream counters
+and, if instrumentation is enabled, GET /metrics returns the per-stage metrics for Prometheus.
+
+Upstream feeds are kept in memory for a TTL, and concurrent requests for the same channel are
+coalesced into a single upstream fetch. Rendered responses are kept in a size-bounded LRU cache
+with the same TTL, together with a pre-compressed gzip body and an ETag, so that repeated
+requests are answered without rendering or compressing again and revalidations with
+If-None-Match are answered with a bodiless 304 Not Modified.
+
+Functions:
+    render_atom(entries, title, feed_id): Renders video entries as an Atom feed.
+    render_json(entries, title, channel_ids): Renders video entries as a JSON document.
+    parse_address(address): Parses a '[HOST:]PORT' server address.
+    serve(address, ...): Runs the feed server until interrupted.
+
+Classes:
+    LRUCache: Thread-safe, size-bounded LRU cache with a TTL.
+    RenderedFeed: A rendered response body with its gzip body and ETag.
+    FeedServer: The HTTP server holding the caches and the upstream session.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import NamedTuple
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+import instrumentation
+from batch import create_session
+from channel_cache import ChannelIdCache, normalize_channel_url
+from coalesce import SingleFlight
+from feed_cache import FeedCache
+from filters import VideoFilter, compile_filter
+from main import VideoEntry, create_rss_feed_url, fetch_rss_feed_content, resolve_channel_id
+from timeline import merge_timelines
+from writers import AtomWriter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_TTL = 5 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_CHANNELS = 1024
+
+# Number of entries in a YouTube channel feed; every upstream feed is read in full.
+FEED_ENTRIES = 15
+
+FORMATS = {
+    "atom": "application/atom+xml; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+}
+
+_CHANNEL_ID_PATTERN = re.compile(r"UC[a-zA-Z0-9_-]{22}")
+
+# Filter query parameters and the compile_filter arguments they map to; the parameters in
+# _LIST_PARAMETERS may be repeated.
+_FILTER_PARAMETERS = {
+    "filter_by": "filter_by",
+    "filter_value": "filter_value",
+    "since": "since",
+    "until": "until",
+    "title": "title_terms",
+    "match": "match",
+    "title_regex": "title_regex",
+    "exclude": "exclude",
+}
+_LIST_PARAMETERS = ("title", "exclude")
+
+
+class LRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with a TTL.
+
+    Args:
+        ttl (float): The number of seconds an entry stays valid.
+        max_entries (int, optional): The maximum number of entries. Defaults to 1024.
+        max_bytes (int, optional): The maximum total size of the entries, as reported by the
+            `size` argument of set. Defaults to None, which only bounds the number of entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, max_bytes: int | None = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # key -> (expires, size, value), least recently used first
+        self._entries: OrderedDict[Hashable, tuple[float, int, object]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, now: float | None = None):
+        """
+        Returns the value stored for the key, or None if it is missing or expired.
+
+        Args:
+            key (Hashable): The key.
+            now (float, optional): The current time. Defaults to time.monotonic().
+
+        Returns:
+            The value, or None.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[2]
+
+    def set(self, key: Hashable, value, size: int = 1, now: float | None = None) -> None:
+        """
+        Stores the value for the key, evicting the least recently used entries beyond the bounds.
+        Values larger than `max_bytes` are not stored.
+
+        Args:
+            key (Hashable): The key.
+            value: The value.
+            size (int, optional): The size of the value in bytes. Defaults to 1.
+            now (float, optional): The current time. Defaults to time.monotonic().
+        """
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (now + self.ttl, size, value)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """int: The total size of the entries in bytes."""
+        return self._bytes
+
+
+class RenderedFeed(NamedTuple):
+    """
+    A rendered response body with its gzip body and ETag.
+
+    Attributes:
+        body (bytes): The rendered feed.
+        gzip_body (bytes): The gzip-compressed feed.
+        etag (str): The quoted entity tag of the feed.
+        content_type (str): The media type of the feed.
+    """
+
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    content_type: str
+
+    @classmethod
+    def from_body(cls, body: bytes, content_type: str) -> "RenderedFeed":
+        """
+        Compresses the body and computes its ETag.
+
+        Args:
+            body (bytes): The rendered feed.
+            content_type (str): The media type of the feed.
+
+        Returns:
+            RenderedFeed: The rendered feed.
+        """
+        etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+        return cls(body, gzip.compress(body, mtime=0), etag, content_type)
+
+
+class ChannelNotFound(Exception):
+    """Raised when a requested channel cannot be resolved to a channel ID."""
+
+
+class UpstreamError(Exception):
+    """Raised when the feed of a channel cannot be fetched from upstream."""
+
+
+def render_atom(entries: Iterable[VideoEntry], title: str, feed_id: str) -> bytes:
+    """
+    Renders video entries as an Atom feed in the layout of YouTube channel feeds.
+
+    Args:
+        entries (Iterable[VideoEntry]): The video entries, newest first.
+        title (str): The title of the feed.
+        feed_id (str): The ID of the feed.
+
+    Returns:
+        bytes: The UTF-8 encoded Atom feed.
+    """
+    entries = list(entries)
+    stream = io.StringIO()
+    updated = entries[0].published if entries else None
+    with AtomWriter(stream, title, feed_id, updated) as writer:
+        for entry in entries:
+            writer.write_video(entry)
+    return stream.getvalue().encode("utf-8")
+
+
+def render_json(entries: Iterable[VideoEntry], title: str, channel_ids: list[str]) -> bytes:
+    """
+    Renders video entries as a JSON document.
+
+    Args:
+        entries (Iterable[VideoEntry]): The video entries, newest first.
+        title (str): The title of the feed.
+        channel_ids (list[str]): The IDs of the channels in the feed.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON document.
+    """
+    document = {
+        "title": title,
+        "channels": channel_ids,
+        "entries": [entry._asdict() for entry in entries],
+    }
+    return json.dumps(document, ensure_ascii=False).encode("utf-8")
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Returns whether an If-None-Match header matches the ETag, comparing weakly."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _compile_query_filter(query: dict[str, list[str]]) -> VideoFilter:
+    """
+    Compiles the filter options of a query.
+
+    Raises:
+        ValueError: If a filter option is invalid.
+    """
+    options = {}
+    for parameter, argument in _FILTER_PARAMETERS.items():
+        values = query.get(parameter)
+        if values:
+            options[argument] = values if parameter in _LIST_PARAMETERS else values[-1]
+    return compile_filter(**options)
+
+
+class FeedServer(ThreadingHTTPServer):
+    """
+    The HTTP server holding the caches and the upstream session.
+
+    Args:
+        address (tuple): The (host, port) to listen on; port 0 picks a free port.
+        session (requests.Session, optional): The upstream HTTP session. Defaults to a new
+            pooled session.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+        feed_cache (FeedCache, optional): The conditional GET feed cache. Defaults to None.
+        engine (str, optional): The channel ID extraction engine. Defaults to "regex".
+        ttl (float, optional): The number of seconds upstream feeds and rendered responses are
+            kept. Defaults to 5 minutes.
+        max_bytes (int, optional): The maximum total size of the rendered responses.
+            Defaults to 64 MiB.
+        max_channels (int, optional): The maximum number of upstream feeds kept.
+            Defaults to 1024.
+        feed_url_builder (Callable, optional): Builds the upstream feed URL of a channel ID.
+            Defaults to main.create_rss_feed_url.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        session: requests.Session | None = None,
+        cache: ChannelIdCache | None = None,
+        feed_cache: FeedCache | None = None,
+        engine: str = "regex",
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_channels: int = DEFAULT_MAX_CHANNELS,
+        feed_url_builder: Callable[[str], str | None] = create_rss_feed_url,
+    ):
+        super().__init__(address, _FeedRequestHandler)
+        self.session = session if session is not None else create_session()
+        self.cache = cache
+        self.feed_cache = feed_cache
+        self.engine = engine
+        self.ttl = ttl
+        self.feed_url_builder = feed_url_builder
+        self.channel_entries_cache = LRUCache(ttl, max_entries=max_channels)
+        self.rendered_cache = LRUCache(ttl, max_entries=max_channels, max_bytes=max_bytes)
+        self.upstream_fetches = 0
+        self._resolve_flight = SingleFlight()
+        self._fetch_flight = SingleFlight()
+        self._counter_lock = threading.Lock()
+
+    def resolve(self, channel: str) -> str:
+        """
+        Resolves a channel URL or ID to a channel ID.
+
+        Args:
+            channel (str): A YouTube channel URL or channel ID.
+
+        Returns:
+            str: The channel ID.
+
+        Raises:
+            ChannelNotFound: If the channel ID cannot be resolved.
+        """
+        if _CHANNEL_ID_PATTERN.fullmatch(channel):
+            return channel
+        channel_id = self._resolve_flight.do(
+            normalize_channel_url(channel) or channel,
+            lambda: resolve_channel_id(channel, self.cache, self.engine, self.session),
+        )
+        if not channel_id:
+            raise ChannelNotFound(channel)
+        return channel_id
+
+    def channel_entries(self, channel_id: str) -> list[VideoEntry]:
+        """
+        Returns the entries of a channel's feed, fetching it at most once per TTL no matter how
+        many requests ask for it concurrently.
+
+        Args:
+            channel_id (str): The channel ID.
+
+        Returns:
+            list[VideoEntry]: The entries of the feed, newest first.
+
+        Raises:
+            UpstreamError: If the feed cannot be fetched.
+        """
+        entries = self.channel_entries_cache.get(channel_id)
+        if entries is None:
+            entries = self._fetch_flight.do(channel_id, lambda: self._fetch_entries(channel_id))
+        return entries
+
+    def _fetch_entries(self, channel_id: str) -> list[VideoEntry]:
+        # A request may have missed the cache just before the previous fetch stored its result.
+        entries = self.channel_entries_cache.get(channel_id)
+        if entries is not None:
+            return entries
+        with self._counter_lock:
+            self.upstream_fetches += 1
+        entries = fetch_rss_feed_content(
+            self.feed_url_builder(channel_id), FEED_ENTRIES, self.session, self.feed_cache
+        )
+        if entries is None:
+            raise UpstreamError(channel_id)
+        self.channel_entries_cache.set(channel_id, entries)
+        return entries
+
+    def render(self, query: dict[str, list[str]]) -> RenderedFeed:
+        """
+        Renders the feed requested by a query, or returns it from the rendered feed cache.
+
+        Args:
+            query (dict): The parsed query string.
+
+        Returns:
+            RenderedFeed: The rendered feed.
+
+        Raises:
+            ValueError: If the query is invalid.
+            ChannelNotFound: If a channel cannot be resolved.
+            UpstreamError: If the feed of a channel cannot be fetched.
+        """
+        key = tuple(sorted((name, tuple(values)) for name, values in query.items()))
+        rendered = self.rendered_cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        channels = query.get("channel")
+        if not channels:
+            raise ValueError("at least one 'channel' parameter is required")
+        feed_format = query.get("format", ["atom"])[-1]
+        if feed_format not in FORMATS:
+            raise ValueError(f"unknown format {feed_format!r}, expected one of {list(FORMATS)}")
+        limit = query.get("limit", [None])[-1]
+        if limit is not None:
+            if not limit.isdigit():
+                raise ValueError(f"invalid limit {limit!r}, expected a non-negative number")
+            limit = int(limit)
+        video_filter = _compile_query_filter(query)
+
+        channel_ids = list(dict.fromkeys(self.resolve(channel) for channel in channels))
+        timelines = [
+            video_filter.apply(self.channel_entries(channel_id)) for channel_id in channel_ids
+        ]
+        # Merged by publication time, so that entries with different UTC offsets are in order
+        entries = list(merge_timelines(timelines, limit))
+
+        if len(channel_ids) == 1:
+            title = entries[0].author if entries and entries[0].author else channel_ids[0]
+        else:
+            title = f"{len(channel_ids)} channels"
+        if feed_format == "json":
+            body = render_json(entries, title, channel_ids)
+        else:
+            body = render_atom(entries, title, "yt:channels:" + ",".join(channel_ids))
+        rendered = RenderedFeed.from_body(body, FORMATS[feed_format])
+        self.rendered_cache.set(key, rendered, len(body) + len(rendered.gzip_body))
+        return rendered
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache and upstream counters of the server.
+
+        Returns:
+            dict: The counters.
+        """
+        return {
+            "rendered_hits": self.rendered_cache.hits,
+            "rendered_misses": self.rendered_cache.misses,
+            "rendered_entries": len(self.rendered_cache),
+            "rendered_bytes": self.rendered_cache.size,
+            "channel_hits": self.channel_entries_cache.hits,
+            "channel_misses": self.channel_entries_cache.misses,
+            "coalesced_fetches": self._fetch_flight.shared,
+            "upstream_fetches": self.upstream_fetches,
+        }
+
+
+class _FeedRequestHandler(BaseHTTPRequestHandler):
+    """Handles the requests of a FeedServer."""
+
+    server: FeedServer
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Serves /feed, /stats and, if instrumentation is enabled, /metrics."""
+        url = urlsplit(self.path)
+        if url.path == "/stats":
+            body = json.dumps(self.server.stats()).encode("utf-8")
+            self._send(HTTPStatus.OK, body, FORMATS["json"])
+            return
+        metrics = instrumentation.get_metrics()
+        if url.path == "/metrics" and metrics is not None:
+            body = metrics.to_prometheus().encode("utf-8")
+            self._send(HTTPStatus.OK, body, instrumentation.PROMETHEUS_CONTENT_TYPE)
+            return
+        if url.path != "/feed":
+            self._send_error(HTTPStatus.NOT_FOUND, "Not found.")
+            return
+
+        try:
+            rendered = self.server.render(parse_qs(url.query))
+        except ValueError as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, f"Invalid request: {e}")
+            return
+        except ChannelNotFound as e:
+            self._send_error(HTTPStatus.NOT_FOUND, f"Channel ID not found: {e}")
+            return
+        except UpstreamError as e:
+            self._send_error(HTTPStatus.BAD_GATEWAY, f"Could not fetch RSS feed of {e}.")
+            return
+
+        headers = {
+            "ETag": rendered.etag,
+            "Cache-Control": f"max-age={int(self.server.ttl)}",
+            "Vary": "Accept-Encoding",
+        }
+        if _etag_matches(self.headers.get("If-None-Match"), rendered.etag):
+            self._send(HTTPStatus.NOT_MODIFIED, b"", None, headers)
+            return
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            self._send(HTTPStatus.OK, rendered.gzip_body, rendered.content_type, headers)
+        else:
+            self._send(HTTPStatus.OK, rendered.body, rendered.content_type, headers)
+
+    def _send_error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, (message + "\n").encode("utf-8"), "text/plain; charset=utf-8")
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str | None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        self.send_response(status)
+        if content_type is not None:
+            self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def parse_address(address: str) -> tuple[str, int]:
+    """
+    Parses a '[HOST:]PORT' server address.
+
+    Args:
+        address (str): The address, e.g. '8080' or '0.0.0.0:8080'.
+
+    Returns:
+        tuple: The host (127.0.0.1 if omitted) and the port.
+
+    Raises:
+        ValueError: If the port is not a number.
+    """
+    host, _, port = address.rpartition(":")
+    return host or DEFAULT_HOST, int(port)
+
+
+def serve(address: str, **server_options) -> None:
+    """
+    Runs the feed server until interrupted.
+
+    Args:
+        address (str): The '[HOST:]PORT' address to listen on.
+        **server_options: Further arguments for FeedServer (cache, feed_cache, engine, ttl,
+            max_bytes).
+    """
+    with FeedServer(parse_address(address), **server_options) as server:
+        host, port = server.server_address[:2]
+        print(f"Serving feeds on http://{host}:{port}/feed?channel=<channel URL or ID>")
+        print("Press Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Stopped serving.")
@@ -0,0 +1,200 @@
+"""
+Compiled, single-pass filters for video entries.
+
+A filter specification (exact date, date range, title terms, title regex and exclusions) is
+parsed and validated once by compile_filter into a chain of predicates, which is then applied
+to the entries of a feed in a single pass. Title needles are lowercased once, dates are compared
+as ISO date strings without parsing every entry's timestamp, and since feeds list videos newest
+first, date-bounded filters stop reading as soon as an entry is older than the lower bound.
+
+Dates are compared in each entry's own UTC offset, i.e. the date part of its 'published'
+timestamp.
+
+Functions:
+    compile_filter(filter_by, filter_value, ...): Compiles a filter specification.
+
+Classes:
+    VideoFilter: A compiled filter applicable to newest-first video entries.
+"""
+
+import re
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date
+from itertools import takewhile
+
+FILTER_BY_CHOICES = ("date", "title")
+MATCH_CHOICES = ("all", "any")
+
+
+class VideoFilter:
+    """
+    A compiled filter applicable to newest-first video entries.
+
+    Args:
+        predicate (Callable, optional): Called with an entry, returns whether to keep it.
+            Defaults to None, which keeps every entry.
+        oldest_date (str, optional): The earliest date kept, as 'YYYY-MM-DD'; iteration stops
+            at the first entry published before it. Defaults to None.
+    """
+
+    def __init__(
+        self, predicate: Callable[[object], bool] | None = None, oldest_date: str | None = None
+    ):
+        self.predicate = predicate
+        self.oldest_date = oldest_date
+
+    def apply(self, entries: Iterable) -> Iterator:
+        """
+        Returns an iterator over the entries that satisfy the filter.
+
+        Args:
+            entries (Iterable[VideoEntry]): The video entries, newest first.
+
+        Returns:
+            Iterator[VideoEntry]: The entries kept by the filter.
+        """
+        if self.oldest_date is not None:
+            oldest_date = self.oldest_date
+            entries = takewhile(lambda entry: entry.published[:10] >= oldest_date, entries)
+        return filter(self.predicate, entries) if self.predicate else iter(entries)
+
+
+def _parse_date(value: str, option: str) -> str:
+    """
+    Validates a 'YYYY-MM-DD' date of the filter specification.
+
+    Args:
+        value (str): The date.
+        option (str): The name of the option, for the error message.
+
+    Returns:
+        str: The date in 'YYYY-MM-DD' form.
+
+    Raises:
+        ValueError: If the date is not a valid 'YYYY-MM-DD' date.
+    """
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"{option} must be a date in YYYY-MM-DD format, got {value!r}") from None
+
+
+def compile_filter(
+    filter_by: str | None = None,
+    filter_value: str | None = None,
+    *,
+    since: str | None = None,
+    until: str | None = None,
+    title_terms: Iterable[str] = (),
+    match: str = "all",
+    title_regex: str | None = None,
+    exclude: Iterable[str] = (),
+) -> VideoFilter:
+    """
+    Parses and validates a filter specification into a VideoFilter.
+
+    Args:
+        filter_by (str, optional): Filter by an exact 'date' or a 'title' keyword.
+        filter_value (str, optional): The date in YYYY-MM-DD format or the title keyword.
+        since (str, optional): Keep videos published on or after this YYYY-MM-DD date.
+        until (str, optional): Keep videos published on or before this YYYY-MM-DD date.
+        title_terms (Iterable[str], optional): Keywords the title must contain.
+        match (str, optional): Whether the title must contain "all" of the keywords or "any" of
+            them. Defaults to "all".
+        title_regex (str, optional): A case-insensitive regular expression the title must match.
+        exclude (Iterable[str], optional): Keywords the title must not contain.
+
+    Returns:
+        VideoFilter: The compiled filter.
+
+    Raises:
+        ValueError: If the specification is invalid.
+    """
+    predicates = []
+    oldest_date = None
+    terms = [term.lower() for term in title_terms if term]
+
+    if filter_by is not None:
+        if filter_by not in FILTER_BY_CHOICES:
+            raise ValueError(f"filter_by must be one of {FILTER_BY_CHOICES}, got {filter_by!r}")
+        if not filter_value:
+            raise ValueError(f"filter_value is required to filter by {filter_by}")
+        if filter_by == "date":
+            since = until = _parse_date(filter_value, "filter_value")
+        else:
+            terms.append(filter_value.lower())
+
+    if since is not None:
+        oldest_date = _parse_date(since, "since")
+    if until is not None:
+        newest_date = _parse_date(until, "until")
+        if oldest_date is not None and oldest_date > newest_date:
+            raise ValueError(f"since ({oldest_date}) is after until ({newest_date})")
+        predicates.append(lambda entry: entry.published[:10] <= newest_date)
+
+    if match not in MATCH_CHOICES:
+        raise ValueError(f"match must be one of {MATCH_CHOICES}, got {match!r}")
+    excluded = [term.lower() for term in exclude if term]
+    if terms or excluded:
+        predicates.append(_compile_title_predicate(terms, match, excluded))
+
+    if title_regex is not None:
+        try:
+            pattern = re.compile(title_regex, re.IGNORECASE)
+        except re.error as e:
+            raise ValueError(f"invalid title regex {title_regex!r}: {e}") from None
+        predicates.append(lambda entry: pattern.search(entry.title) is not None)
+
+    if not predicates:
+        return VideoFilter(None, oldest_date)
+    if len(predicates) == 1:
+        return VideoFilter(predicates[0], oldest_date)
+    return VideoFilter(lambda entry: all(predicate(entry) for predicate in predicates), oldest_date)
+
+
+def _compile_title_predicate(
+    terms: list[str], match: str, excluded: list[str]
+) -> Callable[[object], bool]:
+    """
+    Compiles the title keywords and exclusions into a single predicate that lowercases each
+    title once.
+
+    Args:
+        terms (list[str]): The lowercased keywords the title must contain.
+        match (str): Whether the title must contain "all" or "any" of the keywords.
+        excluded (list[str]): The lowercased keywords the title must not contain.
+
+    Returns:
+        Callable: The predicate, called with an entry.
+    """
+    if len(terms) == 1 and not excluded:
+        (term,) = terms
+        return lambda entry: term in entry.title.lower()
+    # Alternatives are matched by a single regex search on the lowercased title.
+    any_term = _alternation(terms) if match == "any" and terms else None
+    all_terms = terms if match == "all" else []
+    excluded_term = _alternation(excluded) if excluded else None
+
+    def predicate(entry) -> bool:
+        title = entry.title.lower()
+        for term in all_terms:
+            if term not in title:
+                return False
+        if any_term is not None and any_term(title) is None:
+            return False
+        return excluded_term is None or excluded_term(title) is None
+
+    return predicate
+
+
+def _alternation(terms: list[str]) -> Callable[[str], re.Match | None]:
+    """
+    Compiles keywords into the search method of a regex matching any of them.
+
+    Args:
+        terms (list[str]): The keywords.
+
+    Returns:
+        Callable: The search method of the compiled regex.
+    """
+    return re.compile("|".join(re.escape(term) for term in terms)).search
@@ -0,0 +1,367 @@
+"""
+Record/replay archive of HTTP responses, for offline reprocessing and deterministic benchmarks.
+
+A RecordingSession wraps the HTTP client of a run and appends every response it receives (URL,
+status, headers and body) to an HttpArchive. A ReplaySession later serves the same responses
+from the archive without any network access, so that a change to the parsing can be re-run
+over exactly the pages and feeds of an earlier run, and parsing can be benchmarked without
+network noise. Both are used wherever a session is accepted, as every function making HTTP
+requests only calls `session.get`.
+
+The archive is a single append-only file of records, each holding a small JSON header (URL,
+status, reason, response headers, time of recording) and the zlib-compressed body. Bodies are
+stored decoded, so the 'Content-Encoding' and 'Content-Length' headers of the transfer are
+dropped. Next to it, an index file ('<archive>.idx') lists the offset of every record with its
+URL, one record per line, and is appended to together with the archive.
+
+Opening an archive for replay reads only the index and memory-maps the archive: a response is
+decompressed from its offset when it is requested, so replaying a capture of several gigabytes
+starts at once and holds only the index and the responses in use in memory. A missing index, or
+an index missing the last records (e.g. after a crash), is rebuilt from the record headers of
+the archive; a record cut short by a crash is dropped from the end of the archive before
+recording more. When a URL was recorded several times, the latest response is replayed.
+
+Classes:
+    ArchiveMissError: Raised when replaying a URL that is not in the archive.
+    ArchivedResponse: A response stored in the archive.
+    HttpArchive: An append-only file of HTTP responses with an offset index.
+    RecordingSession: A session-like wrapper recording every response to an archive.
+    ReplaySession: A session-like stand-in serving responses from an archive.
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import NamedTuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+ARCHIVE_MAGIC = b"YTRSS-HTTP-ARCHIVE/1\n"
+INDEX_SUFFIX = ".idx"
+
+# Lengths of the JSON header and of the compressed body of a record.
+_RECORD_HEADER = struct.Struct(">II")
+
+# Headers of the transfer that no longer apply to the decoded body.
+_TRANSFER_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+class ArchiveMissError(requests.exceptions.ConnectionError):
+    """Raised when replaying a URL that is not in the archive."""
+
+
+class ArchivedResponse(NamedTuple):
+    """
+    A response stored in the archive.
+
+    Attributes:
+        url (str): The requested URL.
+        status (int): The HTTP status code.
+        reason (str): The reason phrase of the status.
+        headers (dict): The response headers.
+        body (bytes): The decoded response body.
+        recorded (float): The time the response was recorded.
+    """
+
+    url: str
+    status: int
+    reason: str
+    headers: dict[str, str]
+    body: bytes
+    recorded: float
+
+
+class HttpArchive:
+    """
+    An append-only file of HTTP responses with an offset index.
+
+    Args:
+        path (str | Path): The archive file.
+        mode (str, optional): "r" to replay an existing archive, "a" to record to it, creating it
+            if needed. Defaults to "r".
+
+    Raises:
+        ValueError: If the mode is invalid or the file is not an HTTP archive.
+        OSError: If the file cannot be opened, e.g. a missing archive in "r" mode.
+    """
+
+    def __init__(self, path: str | Path, mode: str = "r"):
+        if mode not in ("r", "a"):
+            raise ValueError(f"mode must be 'r' or 'a', got {mode!r}")
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        self.mode = mode
+        self._offsets: dict[str, int] = {}
+        self._lock = threading.Lock()
+        if mode == "a":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a+b")  # pylint: disable=consider-using-with
+            if self._file.seek(0, os.SEEK_END) == 0:
+                self._file.write(ARCHIVE_MAGIC)
+                self._file.flush()
+        else:
+            self._file = open(self.path, "rb")  # pylint: disable=consider-using-with
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[: len(ARCHIVE_MAGIC)] != ARCHIVE_MAGIC:
+                raise ValueError(f"{self.path} is not an HTTP archive")
+            end, unindexed, rebuilt = self._load_index()
+            if mode == "a":
+                # Append after the last complete record, dropping a record cut short by a crash.
+                self._map.close()
+                self._map = None
+                self._file.truncate(end)
+                self._index_file = open(  # pylint: disable=consider-using-with
+                    self.index_path, "w" if rebuilt else "a", encoding="utf-8"
+                )
+                self._index_file.writelines(f"{offset}\t{url}\n" for url, offset in unindexed)
+                self._index_file.flush()
+        except BaseException:
+            self.close()
+            raise
+
+    def _load_index(self) -> tuple[int, list[tuple[str, int]], bool]:
+        """
+        Loads the offsets of the index file and scans the archive for records it is missing.
+
+        Returns:
+            tuple: The end of the last complete record of the archive, the URLs and offsets of
+            the records missing from the index, and whether the index was missing or invalid
+            and is rebuilt from every record.
+        """
+        offsets = {}
+        last = None
+        try:
+            with open(self.index_path, encoding="utf-8") as index_file:
+                for line in index_file:
+                    offset, url = line.rstrip("\n").split("\t", 1)
+                    offsets[url] = last = int(offset)
+        except (FileNotFoundError, ValueError):
+            offsets, last = {}, None
+
+        end = len(ARCHIVE_MAGIC)
+        if last is not None:
+            record_end = self._record_end(last)
+            if record_end is None:
+                # The index points past the archive
+                offsets, last = {}, None
+            else:
+                end = record_end
+        unindexed = []
+        while (record_end := self._record_end(end)) is not None:
+            url = self._read_header(end)["url"]
+            offsets[url] = end
+            unindexed.append((url, end))
+            end = record_end
+        self._offsets = offsets
+        return end, unindexed, last is None
+
+    def _record_end(self, offset: int) -> int | None:
+        """Returns the end of the complete record at an offset, or None if there is none."""
+        header_end = offset + _RECORD_HEADER.size
+        if header_end > len(self._map):
+            return None
+        header_size, body_size = _RECORD_HEADER.unpack_from(self._map, offset)
+        end = header_end + header_size + body_size
+        return end if end <= len(self._map) else None
+
+    def _read_header(self, offset: int) -> dict:
+        header_size, _ = _RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + _RECORD_HEADER.size
+        return json.loads(self._map[start : start + header_size])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._offsets)
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._offsets
+
+    def record(self, url: str, response: requests.Response) -> None:
+        """
+        Appends a response to the archive and its index.
+
+        Args:
+            url (str): The requested URL.
+            response (requests.Response): The response, whose body is read in full.
+
+        Raises:
+            ValueError: If the archive was not opened for recording.
+        """
+        if self.mode != "a":
+            raise ValueError("the archive was not opened for recording")
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in _TRANSFER_HEADERS
+        }
+        header = json.dumps(
+            {
+                "url": url,
+                "status": response.status_code,
+                "reason": response.reason or "",
+                "headers": headers,
+                "recorded": time.time(),
+            }
+        ).encode()
+        body = zlib.compress(response.content or b"")
+        with self._lock:
+            offset = self._file.seek(0, os.SEEK_END)
+            self._file.write(_RECORD_HEADER.pack(len(header), len(body)))
+            self._file.write(header)
+            self._file.write(body)
+            self._file.flush()
+            # Index the record only once it is complete in the archive.
+            self._index_file.write(f"{offset}\t{url}\n")
+            self._index_file.flush()
+            self._offsets[url] = offset
+
+    def get(self, url: str) -> ArchivedResponse | None:
+        """
+        Looks up the latest response recorded for a URL.
+
+        Args:
+            url (str): The requested URL.
+
+        Returns:
+            ArchivedResponse: The response, or None if the URL is not in the archive.
+
+        Raises:
+            ValueError: If the archive was not opened for replay.
+        """
+        if self.mode != "r":
+            raise ValueError("the archive was not opened for replay")
+        with self._lock:
+            offset = self._offsets.get(url)
+        if offset is None:
+            return None
+        header_size, body_size = _RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + _RECORD_HEADER.size
+        header = json.loads(self._map[start : start + header_size])
+        start += header_size
+        body = zlib.decompress(self._map[start : start + body_size])
+        return ArchivedResponse(
+            header["url"],
+            header["status"],
+            header["reason"],
+            header["headers"],
+            body,
+            header["recorded"],
+        )
+
+    def close(self) -> None:
+        """Closes the archive and its index."""
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        if hasattr(self, "_index_file"):
+            self._index_file.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordingSession:
+    """
+    A session-like wrapper recording every response to an archive.
+
+    Streamed responses are read in full before they are returned, so that their body can be
+    recorded; they can still be iterated over with `iter_content`.
+
+    Args:
+        session (requests.Session | HttpClient): The session sending the requests.
+        archive (HttpArchive): The archive, opened for recording.
+    """
+
+    def __init__(self, session, archive: HttpArchive):
+        self.session = session
+        self.archive = archive
+
+    @property
+    def timeout(self):
+        """The (connect, read) timeout of the wrapped HTTP client, if it has one."""
+        return getattr(self.session, "timeout", None)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request through the wrapped session and records the response.
+
+        Args:
+            url (str): The URL to request.
+            **kwargs: Further arguments for the request.
+
+        Returns:
+            requests.Response: The response, with its body read.
+        """
+        response = self.session.get(url, **kwargs)
+        self.archive.record(url, response)
+        return response
+
+    def close(self) -> None:
+        """Closes the wrapped session."""
+        self.session.close()
+
+
+class ReplaySession:
+    """
+    A session-like stand-in serving responses from an archive, without network access.
+
+    Args:
+        archive (HttpArchive): The archive, opened for replay.
+
+    Attributes:
+        hits (int): Requests served from the archive.
+        misses (int): Requests for URLs that are not in the archive.
+    """
+
+    def __init__(self, archive: HttpArchive):
+        self.archive = archive
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, url: str, **kwargs) -> requests.Response:  # pylint: disable=unused-argument
+        """
+        Returns the response recorded for a URL.
+
+        Args:
+            url (str): The requested URL.
+            **kwargs: The arguments of the request, which are ignored.
+
+        Returns:
+            requests.Response: The recorded response, which can also be iterated over with
+            `iter_content` as a streamed response.
+
+        Raises:
+            ArchiveMissError: If the URL is not in the archive.
+        """
+        archived = self.archive.get(url)
+        with self._lock:
+            if archived is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if archived is None:
+            raise ArchiveMissError(f"{url} is not in the HTTP archive {self.archive.path}")
+        response = requests.Response()
+        response.url = url
+        response.status_code = archived.status
+        response.reason = archived.reason
+        response.headers = CaseInsensitiveDict(archived.headers)
+        response._content = archived.body  # pylint: disable=protected-access
+        response._content_consumed = True  # pylint: disable=protected-access
+        return response
+
+    def close(self) -> None:
+        """Does nothing; the archive is closed by its owner."""
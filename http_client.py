@@ -0,0 +1,634 @@
+"""
+Shared HTTP layer with retries, per-host rate limiting and circuit breaking.
+
+An HttpClient wraps a requests.Session and is used wherever a session is accepted: every
+function making HTTP requests calls `session.get`, so passing a client instead of a plain
+session adds to every request:
+
+- retries of connection errors, timeouts and 429 and 5xx responses, with exponential backoff
+  and full jitter, so that the retries of many threads do not arrive in bursts;
+- the 'Retry-After' header of 429 and 503 responses, which both delays the retry and pauses
+  every other request to the same host for that long;
+- a token bucket per host, spacing requests evenly at a steady rate (with an initial burst)
+  instead of sending them as fast as possible until the host starts refusing them;
+- separate connect and read timeouts, so that an unreachable host fails fast while a slow
+  response still has time to arrive;
+- a circuit breaker per host: after a run of consecutive failures, requests to the host fail
+  immediately for a cooldown period, after which a single request probes whether it recovered;
+- optionally, adaptive read timeouts: the latencies of the recent responses of each endpoint
+  type (channel pages and RSS feeds, see endpoint_type) are kept in a rolling histogram, and
+  the read timeout shrinks to a multiple of their 99th percentile, so that a stalled connection
+  is given up (and retried) long before the fixed timeout;
+- optionally, hedged feed fetches: a feed request that has not been answered by the 95th
+  percentile of the recent feed latencies is sent a second time, and whichever response comes
+  first is used. A cap on the hedges in flight keeps a slow host from doubling its load.
+
+Requests refused by an open circuit raise CircuitOpenError, a requests ConnectionError, so that
+callers handle it like any other connection failure. When the retries are exhausted, the last
+error is raised, or the last 429 or 5xx response is returned for the caller to check. Retries
+are added to the instrumentation span of the stage making the request.
+
+Functions:
+    parse_retry_after(value): Parses a 'Retry-After' header into a number of seconds.
+    endpoint_type(url): Returns the endpoint type of a URL, "feed" or "page".
+
+Classes:
+    CircuitOpenError: Raised for requests to a host whose circuit is open.
+    TokenBucket: Spaces requests to one host at a steady rate.
+    CircuitBreaker: Tracks the consecutive failures of one host.
+    LatencyHistogram: Rolling histogram of the latencies of recent responses.
+    HttpClient: A session-like HTTP client adding retries, rate limiting and circuit breaking.
+"""
+
+import bisect
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+
+import instrumentation
+
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+DEFAULT_MAX_RETRY_AFTER = 120.0
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 10.0
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30.0
+DEFAULT_MIN_READ_TIMEOUT = 1.0
+DEFAULT_TIMEOUT_MULTIPLIER = 4.0
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_MAX_HEDGES = 4
+
+# Number of recent responses kept in each latency histogram, and needed before it is used.
+LATENCY_WINDOW = 500
+MIN_LATENCY_SAMPLES = 20
+
+# Upper bounds of the latency histogram buckets: 20% apart, from 1 ms to about 2 minutes.
+LATENCY_BOUNDS = tuple(0.001 * 1.2**exponent for exponent in range(65))
+
+# Response statuses worth retrying: rate limiting and transient server errors.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Endpoint types whose requests are hedged.
+HEDGED_ENDPOINTS = frozenset({"feed"})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised for requests to a host whose circuit is open after repeated failures."""
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parses a 'Retry-After' header into a number of seconds.
+
+    Args:
+        value (str): The header value: a number of seconds or an HTTP date.
+
+    Returns:
+        float: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def endpoint_type(url: str) -> str:
+    """
+    Returns the endpoint type of a URL, whose latencies are tracked together.
+
+    Args:
+        url (str): The requested URL.
+
+    Returns:
+        str: "feed" for RSS feeds ('/feeds/videos.xml'), "page" for any other URL.
+    """
+    return "feed" if urlsplit(url).path.endswith("/feeds/videos.xml") else "page"
+
+
+class LatencyHistogram:
+    """
+    Rolling histogram of the latencies of recent responses.
+
+    Latencies are counted in buckets 20% apart (LATENCY_BOUNDS); the oldest latency leaves the
+    histogram when more than `window` have been recorded, so percentiles follow the current
+    behaviour of the endpoint. Percentiles are the upper bound of their bucket.
+
+    Args:
+        window (int, optional): The number of recent latencies kept. Defaults to 500.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._counts = [0] * (len(LATENCY_BOUNDS) + 1)
+        self._recent: deque[int] = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._recent)
+
+    def record(self, seconds: float) -> None:
+        """
+        Records the latency of a response.
+
+        Args:
+            seconds (float): The latency.
+        """
+        bucket = bisect.bisect_left(LATENCY_BOUNDS, seconds)
+        with self._lock:
+            self._recent.append(bucket)
+            self._counts[bucket] += 1
+            if len(self._recent) > self.window:
+                self._counts[self._recent.popleft()] -= 1
+
+    def quantile(self, fraction: float) -> float | None:
+        """
+        Returns a percentile of the recent latencies.
+
+        Args:
+            fraction (float): The percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            float: The upper bound of the bucket of the percentile in seconds (the largest
+            bound for latencies beyond it), or None if no latency was recorded.
+        """
+        with self._lock:
+            rank = math.ceil(fraction * len(self._recent))
+            if not self._recent:
+                return None
+            cumulative = 0
+            for bucket, count in enumerate(self._counts):
+                cumulative += count
+                if cumulative >= rank:
+                    break
+        return LATENCY_BOUNDS[min(bucket, len(LATENCY_BOUNDS) - 1)]
+
+
+def _in_thread(function, *args) -> Future:
+    """Runs a function in a new daemon thread, returning the future of its result."""
+    future = Future()
+
+    def run():
+        future.set_running_or_notify_cancel()
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="hedged-request", daemon=True).start()
+    return future
+
+
+def _close_response(future: Future) -> None:
+    """Closes the response of a request that lost a hedge race."""
+    if future.exception() is None:
+        future.result().close()
+
+
+class TokenBucket:
+    """
+    Spaces requests to one host at a steady rate.
+
+    The bucket holds up to `burst` tokens and refills at `rate` tokens per second; each request
+    takes one. Requests finding the bucket empty are scheduled one after the other at the refill
+    rate instead of retrying in a burst.
+
+    Args:
+        rate (float): The sustained number of requests per second; 0 disables the limit.
+        burst (float, optional): The number of requests allowed at once after a quiet period.
+            Defaults to one second's worth of requests.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes a token, waiting for the bucket to refill or a pause to end if needed.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(self._paused_until - now, 0.0)
+            if self.rate > 0:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                # Take the token now, even if it is owed, so that waiting requests queue up.
+                self._tokens -= 1
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds back every request for a number of seconds, e.g. as asked by 'Retry-After'.
+
+        Args:
+            seconds (float): The length of the pause.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """
+    Tracks the consecutive failures of one host.
+
+    The circuit opens after `threshold` consecutive failures: requests are refused for
+    `cooldown` seconds, then a single request is let through as a probe. If it succeeds, the
+    circuit closes; if it fails, the circuit opens for another cooldown.
+
+    Args:
+        threshold (int): The number of consecutive failures opening the circuit; 0 disables it.
+        cooldown (float): The number of seconds the circuit stays open.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until: float | None = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Returns whether a request may be sent, claiming the probe once the cooldown is over.
+
+        Returns:
+            bool: False while the circuit is open or another request is probing the host.
+        """
+        with self._lock:
+            if self._open_until is None:
+                return True
+            if self._probing or time.monotonic() < self._open_until:
+                return False
+            self._probing = True
+            return True
+
+    def record(self, success: bool) -> None:
+        """
+        Records the outcome of a request.
+
+        Args:
+            success (bool): Whether the host answered without a retryable error.
+        """
+        with self._lock:
+            if success:
+                self._failures = 0
+                self._open_until = None
+            else:
+                self._failures += 1
+                if self._probing or (self.threshold and self._failures >= self.threshold):
+                    self._open_until = time.monotonic() + self.cooldown
+            self._probing = False
+
+    def release(self) -> None:
+        """Releases the probe claimed by a request whose outcome says nothing about the host."""
+        with self._lock:
+            self._probing = False
+
+
+class _Host:
+    """The rate limit and circuit of one host."""
+
+    def __init__(self, bucket: TokenBucket, breaker: CircuitBreaker):
+        self.bucket = bucket
+        self.breaker = breaker
+
+
+class HttpClient:
+    """
+    A session-like HTTP client adding retries, rate limiting and circuit breaking.
+
+    Args:
+        session (requests.Session, optional): The session sending the requests. Defaults to a
+            new session.
+        retries (int, optional): The maximum number of retries of a request. Defaults to 3.
+        backoff (float, optional): The base delay of the exponential backoff in seconds; the
+            n-th retry waits a random time of up to `backoff * 2 ** n`. Defaults to 0.5.
+        max_backoff (float, optional): The longest backoff delay in seconds. Defaults to 30.
+        max_retry_after (float, optional): The longest 'Retry-After' delay waited for; longer
+            delays are not retried. Defaults to 120.
+        rate (float, optional): The number of requests per second per host; 0 disables the
+            limit. Defaults to 0.
+        burst (float, optional): The number of requests allowed at once per host. Defaults to
+            one second's worth of requests.
+        failure_threshold (int, optional): The number of consecutive failures of a host opening
+            its circuit; 0 disables circuit breaking. Defaults to 5.
+        cooldown (float, optional): The number of seconds a circuit stays open. Defaults to 30.
+        connect_timeout (float, optional): The timeout for connecting, in seconds.
+            Defaults to 3.05.
+        read_timeout (float, optional): The timeout for each read of the response, in seconds;
+            the longest read timeout with adaptive timeouts. Defaults to 10.
+        adaptive_timeouts (bool, optional): Whether to shrink the read timeout of each endpoint
+            type to `timeout_multiplier` times the 99th percentile of its recent latencies.
+            Defaults to False.
+        min_read_timeout (float, optional): The shortest adaptive read timeout, in seconds.
+            Defaults to 1.
+        timeout_multiplier (float, optional): The adaptive read timeout as a multiple of the
+            99th percentile latency. Defaults to 4.
+        hedge (bool, optional): Whether to hedge feed requests that have not been answered by
+            the `hedge_quantile` of the recent feed latencies. Defaults to False.
+        hedge_quantile (float, optional): The percentile of the latencies after which a request
+            is hedged. Defaults to 0.95.
+        max_hedges (int, optional): The maximum number of hedge requests in flight.
+            Defaults to 4.
+
+    Attributes:
+        timeout (tuple): The fixed (connect, read) timeout of requests not given their own.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        max_retry_after: float = DEFAULT_MAX_RETRY_AFTER,
+        rate: float = 0.0,
+        burst: float | None = None,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        cooldown: float = DEFAULT_COOLDOWN,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+        adaptive_timeouts: bool = False,
+        min_read_timeout: float = DEFAULT_MIN_READ_TIMEOUT,
+        timeout_multiplier: float = DEFAULT_TIMEOUT_MULTIPLIER,
+        hedge: bool = False,
+        hedge_quantile: float = DEFAULT_HEDGE_QUANTILE,
+        max_hedges: int = DEFAULT_MAX_HEDGES,
+    ):
+        if retries < 0 or rate < 0 or failure_threshold < 0 or max_hedges < 0:
+            raise ValueError("retries, rate, failure_threshold and max_hedges must not be negative")
+        self.session = session if session is not None else requests.Session()
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.timeout = (connect_timeout, read_timeout)
+        self.adaptive_timeouts = adaptive_timeouts
+        self.min_read_timeout = min_read_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges) if max_hedges else None
+        self._hosts: dict[str, _Host] = {}
+        self._latencies: dict[str, LatencyHistogram] = {}
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "rejected": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+        self._throttled_seconds = 0.0
+        self._rng = random.Random()
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> _Host:
+        """Returns the rate limit and circuit of the host of a URL."""
+        name = urlsplit(url).hostname or ""
+        with self._lock:
+            host = self._hosts.get(name)
+            if host is None:
+                host = self._hosts[name] = _Host(
+                    TokenBucket(self.rate, self.burst),
+                    CircuitBreaker(self.failure_threshold, self.cooldown),
+                )
+        return host
+
+    def latency(self, endpoint: str) -> LatencyHistogram:
+        """
+        Returns the latency histogram of an endpoint type.
+
+        Args:
+            endpoint (str): The endpoint type, see endpoint_type.
+
+        Returns:
+            LatencyHistogram: The latencies of the recent responses of the endpoint type.
+        """
+        with self._lock:
+            histogram = self._latencies.get(endpoint)
+            if histogram is None:
+                histogram = self._latencies[endpoint] = LatencyHistogram()
+        return histogram
+
+    def _count(self, name: str, throttled: float = 0.0) -> None:
+        with self._lock:
+            self._stats[name] += 1
+            self._throttled_seconds += throttled
+
+    def _backoff_delay(self, retry: int) -> float:
+        """Returns the random delay before a retry, growing exponentially ("full jitter")."""
+        return self._rng.uniform(0, min(self.max_backoff, self.backoff * 2**retry))
+
+    def _timeout_for(self, latencies: LatencyHistogram) -> tuple[float, float]:
+        """Returns the (connect, read) timeout of a request, adapted to its recent latencies."""
+        if not self.adaptive_timeouts or len(latencies) < MIN_LATENCY_SAMPLES:
+            return self.timeout
+        read_timeout = latencies.quantile(0.99) * self.timeout_multiplier
+        return (self.timeout[0], min(self.timeout[1], max(self.min_read_timeout, read_timeout)))
+
+    def _timed_get(self, latencies: LatencyHistogram, url: str, kwargs: dict) -> requests.Response:
+        """Sends a request, recording its latency unless it failed."""
+        started = time.monotonic()
+        response = self.session.get(url, **kwargs)
+        if response.status_code not in RETRY_STATUSES:
+            latencies.record(time.monotonic() - started)
+        return response
+
+    def _hedged_get(
+        self, host: _Host, latencies: LatencyHistogram, url: str, kwargs: dict
+    ) -> requests.Response:
+        """
+        Sends a request, and a second one if the first is not answered by the hedge percentile.
+
+        The first response wins; the response of the other request is closed once it arrives.
+        If the winner failed, the other request is waited for.
+        """
+        if self._hedge_slots is None or len(latencies) < MIN_LATENCY_SAMPLES:
+            return self._timed_get(latencies, url, kwargs)
+        primary = _in_thread(self._timed_get, latencies, url, kwargs)
+        done, _ = wait([primary], timeout=latencies.quantile(self.hedge_quantile))
+        if done or not self._hedge_slots.acquire(blocking=False):
+            return primary.result()
+        self._count("hedges")
+        instrumentation.current().set(hedges=1)
+
+        def send_hedge() -> requests.Response:
+            try:
+                self._count("requests", host.bucket.acquire())
+                return self._timed_get(latencies, url, kwargs)
+            finally:
+                self._hedge_slots.release()
+
+        hedge = _in_thread(send_hedge)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Prefer the primary request if both were answered at once.
+            winner = next(
+                (
+                    future
+                    for future in (primary, hedge)
+                    if future in done and future.exception() is None
+                ),
+                None,
+            )
+            if winner is not None:
+                break
+        else:
+            return primary.result()
+        for future in (primary, hedge):
+            if future is not winner:
+                future.add_done_callback(_close_response)
+        if winner is hedge:
+            self._count("hedge_wins")
+            instrumentation.current().set(hedge_wins=1)
+        return winner.result()
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a GET request, retrying transient failures.
+
+        Args:
+            url (str): The URL to request.
+            **kwargs: Further arguments for requests.Session.get, such as `stream`. The
+                `timeout` defaults to the client's (connect, read) timeout, or with adaptive
+                timeouts to one adapted to the recent latencies of the endpoint type.
+
+        Returns:
+            requests.Response: The response; a 429 or 5xx response once the retries are
+            exhausted.
+
+        Raises:
+            CircuitOpenError: If the circuit of the host is open.
+            requests.exceptions.RequestException: If the last attempt failed to connect or
+                timed out, or the request was invalid.
+        """
+        host = self._host(url)
+        endpoint = endpoint_type(url)
+        latencies = self.latency(endpoint)
+        adapt_timeout = "timeout" not in kwargs
+        hedged = self.hedge and endpoint in HEDGED_ENDPOINTS
+        retry = 0
+        while True:
+            if not host.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(
+                    f"Too many failures from {urlsplit(url).hostname}, requests are paused"
+                )
+            throttled = host.bucket.acquire()
+            self._count("requests", throttled)
+            if adapt_timeout:
+                kwargs["timeout"] = self._timeout_for(latencies)
+            try:
+                if hedged:
+                    response = self._hedged_get(host, latencies, url, kwargs)
+                else:
+                    response = self._timed_get(latencies, url, kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                host.breaker.record(False)
+                if retry >= self.retries:
+                    raise
+                delay = self._backoff_delay(retry)
+            except requests.exceptions.RequestException as error:
+                if isinstance(error, ValueError):
+                    # An invalid URL or header is no failure of the host.
+                    host.breaker.release()
+                else:
+                    # Not retried, but recorded, so that a failed probe reopens the circuit.
+                    host.breaker.record(False)
+                raise
+            except BaseException:
+                host.breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    host.breaker.record(True)
+                    return response
+                host.breaker.record(False)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    self._count("rate_limited")
+                if retry_after is not None:
+                    # Hold back the other requests to the host as well.
+                    host.bucket.pause(min(retry_after, self.max_retry_after))
+                if retry >= self.retries or (retry_after or 0) > self.max_retry_after:
+                    return response
+                response.close()
+                # After 'Retry-After', the pause of the host's bucket does the waiting.
+                delay = 0.0 if retry_after is not None else self._backoff_delay(retry)
+            retry += 1
+            self._count("retries")
+            instrumentation.current().set(retries=1)
+            time.sleep(delay)
+
+    def stats(self) -> dict:
+        """
+        Returns the request counters of the client.
+
+        Returns:
+            dict: The numbers of requests sent, retries, 429 responses, requests rejected by an
+            open circuit, hedge requests and hedges answered first, the hedge win rate, the
+            total seconds requests waited for the rate limit, and the 50th, 95th and 99th
+            percentile latencies in seconds of each endpoint type.
+        """
+        with self._lock:
+            stats = {**self._stats, "throttled_seconds": round(self._throttled_seconds, 3)}
+            latencies = dict(self._latencies)
+        stats["hedge_win_rate"] = (
+            round(stats["hedge_wins"] / stats["hedges"], 3) if stats["hedges"] else None
+        )
+        stats["latency"] = {}
+        for endpoint, histogram in latencies.items():
+            stats["latency"][endpoint] = {"samples": len(histogram)}
+            for fraction in (0.5, 0.95, 0.99):
+                value = histogram.quantile(fraction)
+                stats["latency"][endpoint][f"p{round(fraction * 100)}"] = (
+                    None if value is None else round(value, 4)
+                )
+        return stats
+
+    def close(self) -> None:
+        """Closes the underlying session."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,426 @@
+"""
+Per-stage timing and counter instrumentation.
+
+Every stage of a run (fetching the channel page, extracting the channel ID, fetching the RSS
+feed, filtering the videos) is wrapped in a `stage` span, which records its wall time and the CPU
+time of the calling thread, together with the bytes transferred, the HTTP status, the number of
+retries and hedged requests (and hedges answered first), the extraction method that succeeded
+and the type of any error. Comparing wall time with
+CPU time tells a slow network (wall time grows, CPU time does not) apart from a parsing
+regression (both grow).
+
+Instrumentation is disabled by default: `stage` then returns a shared no-op span, so an
+instrumented function costs one global lookup and two no-op method calls. Once enabled, the
+recorded metrics are available as a JSON summary for single runs and as Prometheus text
+exposition for long-running modes.
+
+Functions:
+    enable(): Enables instrumentation and returns the metrics registry.
+    disable(): Disables instrumentation.
+    get_metrics(): Returns the metrics registry, or None if instrumentation is disabled.
+    stage(name): Returns a span timing one run of a stage.
+    current(): Returns the innermost span open in the calling thread.
+    count_bytes(chunks, span): Counts the bytes of an iterable of chunks into a span.
+    write_summary(path): Writes the JSON summary of the recorded metrics.
+    start_metrics_server(address): Serves the Prometheus exposition over HTTP.
+
+Classes:
+    Metrics: Thread-safe registry of the per-stage metrics.
+"""
+
+import bisect
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+
+METRIC_PREFIX = "youtube_rss"
+
+# Upper bounds of the stage duration histogram buckets, in seconds.
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _StageStats:
+    """The metrics accumulated for one stage."""
+
+    def __init__(self):
+        self.count = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_wall_seconds = 0.0
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.bytes = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.statuses: Counter[int] = Counter()
+        self.methods: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+
+class Metrics:
+    """Thread-safe registry of the per-stage metrics."""
+
+    def __init__(self):
+        self._stages: dict[str, _StageStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, name: str, wall_seconds: float, cpu_seconds: float, fields: dict, error: str | None
+    ) -> None:
+        """
+        Records one run of a stage.
+
+        Args:
+            name (str): The name of the stage.
+            wall_seconds (float): The wall time of the run.
+            cpu_seconds (float): The CPU time of the run.
+            fields (dict): The 'bytes', 'status', 'retries', 'hedges', 'hedge_wins' and 'method'
+                set on the span.
+            error (str): The type of the error, or None if the run succeeded.
+        """
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats()
+            stats.count += 1
+            stats.wall_seconds += wall_seconds
+            stats.cpu_seconds += cpu_seconds
+            stats.max_wall_seconds = max(stats.max_wall_seconds, wall_seconds)
+            stats.buckets[bisect.bisect_left(DURATION_BUCKETS, wall_seconds)] += 1
+            stats.bytes += fields.get("bytes", 0)
+            stats.retries += fields.get("retries", 0)
+            stats.hedges += fields.get("hedges", 0)
+            stats.hedge_wins += fields.get("hedge_wins", 0)
+            if fields.get("status") is not None:
+                stats.statuses[fields["status"]] += 1
+            if fields.get("method") is not None:
+                stats.methods[fields["method"]] += 1
+            if error is not None:
+                stats.errors[error] += 1
+
+    def summary(self) -> dict:
+        """
+        Returns the metrics as a JSON-serializable summary.
+
+        Returns:
+            dict: The metrics of every stage, by stage name.
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    name: {
+                        "count": stats.count,
+                        "errors": sum(stats.errors.values()),
+                        "wall_seconds": round(stats.wall_seconds, 6),
+                        "cpu_seconds": round(stats.cpu_seconds, 6),
+                        "mean_wall_ms": round(stats.wall_seconds / stats.count * 1000, 3),
+                        "max_wall_ms": round(stats.max_wall_seconds * 1000, 3),
+                        "bytes": stats.bytes,
+                        "retries": stats.retries,
+                        "hedges": stats.hedges,
+                        "hedge_wins": stats.hedge_wins,
+                        "status": {str(status): n for status, n in sorted(stats.statuses.items())},
+                        "methods": dict(stats.methods),
+                        "errors_by_type": dict(stats.errors),
+                    }
+                    for name, stats in self._stages.items()
+                }
+            }
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition.
+        """
+        duration = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = {
+            duration: [
+                f"# HELP {duration} Wall time of each stage.",
+                f"# TYPE {duration} histogram",
+            ]
+        }
+
+        def counter(name: str, help_text: str) -> list[str]:
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            if metric not in lines:
+                lines[metric] = [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            return lines[metric]
+
+        with self._lock:
+            for name, stats in sorted(self._stages.items()):
+                stage = f'stage="{_escape_label(name)}"'
+                cumulative = 0
+                for bound, bucket in zip((*DURATION_BUCKETS, "+Inf"), stats.buckets):
+                    cumulative += bucket
+                    lines[duration].append(
+                        f'{duration}_bucket{{{stage},le="{bound}"}} {cumulative}'
+                    )
+                lines[duration].append(f"{duration}_sum{{{stage}}} {stats.wall_seconds}")
+                lines[duration].append(f"{duration}_count{{{stage}}} {stats.count}")
+                counter("stage_cpu_seconds", "CPU time of each stage.").append(
+                    f"{METRIC_PREFIX}_stage_cpu_seconds_total{{{stage}}} {stats.cpu_seconds}"
+                )
+                counter("bytes", "Bytes transferred by each stage.").append(
+                    f"{METRIC_PREFIX}_bytes_total{{{stage}}} {stats.bytes}"
+                )
+                counter("retries", "Retried requests of each stage.").append(
+                    f"{METRIC_PREFIX}_retries_total{{{stage}}} {stats.retries}"
+                )
+                counter("hedges", "Hedged requests of each stage.").append(
+                    f"{METRIC_PREFIX}_hedges_total{{{stage}}} {stats.hedges}"
+                )
+                counter("hedge_wins", "Hedged requests answered first, by stage.").append(
+                    f"{METRIC_PREFIX}_hedge_wins_total{{{stage}}} {stats.hedge_wins}"
+                )
+                for status, n in sorted(stats.statuses.items()):
+                    counter("http_responses", "HTTP responses by status.").append(
+                        f'{METRIC_PREFIX}_http_responses_total{{{stage},status="{status}"}} {n}'
+                    )
+                for method, n in sorted(stats.methods.items()):
+                    counter("extraction_method", "Successful extractions by method.").append(
+                        f"{METRIC_PREFIX}_extraction_method_total{{{stage},"
+                        f'method="{_escape_label(method)}"}} {n}'
+                    )
+                for error, n in sorted(stats.errors.items()):
+                    counter("stage_errors", "Failed runs of each stage by error type.").append(
+                        f"{METRIC_PREFIX}_stage_errors_total{{{stage},"
+                        f'error="{_escape_label(error)}"}} {n}'
+                    )
+        return "".join(line + "\n" for metric_lines in lines.values() for line in metric_lines)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Span fields added up over the run, instead of set.
+_ADDED_FIELDS = frozenset({"bytes", "retries", "hedges", "hedge_wins"})
+
+
+class _NoopSpan:
+    """The span returned while instrumentation is disabled; records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **fields) -> None:
+        """Ignores the fields."""
+
+    def fail(self, error: BaseException | str) -> None:
+        """Ignores the error."""
+
+
+class _Span:
+    """Times one run of a stage and records it in the metrics registry on exit."""
+
+    __slots__ = ("_metrics", "_name", "_fields", "_error", "_wall_started", "_cpu_started")
+
+    def __init__(self, metrics: Metrics, name: str):
+        self._metrics = metrics
+        self._name = name
+        self._fields: dict = {}
+        self._error: str | None = None
+
+    def __enter__(self):
+        _open_spans().append(self)
+        self._wall_started = time.perf_counter()
+        self._cpu_started = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        wall_seconds = time.perf_counter() - self._wall_started
+        cpu_seconds = time.thread_time() - self._cpu_started
+        _open_spans().remove(self)
+        if exc_type is not None:
+            self._error = exc_type.__name__
+        self._metrics.record(self._name, wall_seconds, cpu_seconds, self._fields, self._error)
+        return False
+
+    def set(self, **fields) -> None:
+        """
+        Sets fields of the run: 'bytes', 'retries', 'hedges' and 'hedge_wins' are added up,
+        'status' (the HTTP status) and 'method' (the extraction method that succeeded) are
+        counted by value.
+        """
+        for name, value in fields.items():
+            if name in _ADDED_FIELDS:
+                self._fields[name] = self._fields.get(name, 0) + value
+            else:
+                self._fields[name] = value
+
+    def fail(self, error: BaseException | str) -> None:
+        """
+        Marks the run as failed, e.g. when an error is handled inside the stage.
+
+        Args:
+            error (BaseException | str): The error, or the name of its type.
+        """
+        self._error = error if isinstance(error, str) else type(error).__name__
+
+
+_NOOP_SPAN = _NoopSpan()
+_metrics: Metrics | None = None
+_thread_spans = threading.local()
+
+
+def _open_spans() -> list[_Span]:
+    """Returns the spans open in the calling thread, innermost last."""
+    spans = getattr(_thread_spans, "spans", None)
+    if spans is None:
+        spans = _thread_spans.spans = []
+    return spans
+
+
+def enable() -> Metrics:
+    """
+    Enables instrumentation, keeping the metrics recorded so far if it already is.
+
+    Returns:
+        Metrics: The metrics registry.
+    """
+    global _metrics  # pylint: disable=global-statement
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def disable() -> None:
+    """Disables instrumentation and discards the recorded metrics."""
+    global _metrics  # pylint: disable=global-statement
+    _metrics = None
+
+
+def get_metrics() -> Metrics | None:
+    """
+    Returns the metrics registry.
+
+    Returns:
+        Metrics: The metrics registry, or None if instrumentation is disabled.
+    """
+    return _metrics
+
+
+def stage(name: str) -> _Span | _NoopSpan:
+    """
+    Returns a span timing one run of a stage, to be used as a context manager.
+
+    Args:
+        name (str): The name of the stage, e.g. 'page_fetch'.
+
+    Returns:
+        The span; a shared no-op span if instrumentation is disabled.
+    """
+    metrics = _metrics
+    if metrics is None:
+        return _NOOP_SPAN
+    return _Span(metrics, name)
+
+
+def current() -> _Span | _NoopSpan:
+    """
+    Returns the innermost span open in the calling thread, so that shared code such as the
+    HTTP client can add to the stage it runs in without being handed its span.
+
+    Returns:
+        The span; the no-op span if instrumentation is disabled or no span is open.
+    """
+    if _metrics is None:
+        return _NOOP_SPAN
+    spans = _open_spans()
+    return spans[-1] if spans else _NOOP_SPAN
+
+
+def count_bytes(chunks: Iterable[bytes], span: _Span | _NoopSpan) -> Iterable[bytes]:
+    """
+    Counts the bytes of an iterable of chunks into a span as they are consumed.
+
+    Args:
+        chunks (Iterable[bytes]): The chunks.
+        span: The span of the stage; if it is the no-op span, the chunks are returned as is.
+
+    Returns:
+        Iterable[bytes]: The chunks.
+    """
+    if span is _NOOP_SPAN:
+        return chunks
+    return _counted(chunks, span)
+
+
+def _counted(chunks: Iterable[bytes], span: _Span) -> Iterator[bytes]:
+    for chunk in chunks:
+        span.set(bytes=len(chunk))
+        yield chunk
+
+
+def write_summary(path: str) -> None:
+    """
+    Writes the JSON summary of the recorded metrics, if instrumentation is enabled.
+
+    Args:
+        path (str): The file to write, or '-' for stdout.
+    """
+    metrics = _metrics
+    if metrics is None:
+        return
+    text = json.dumps(metrics.summary(), indent=2)
+    if path == "-":
+        print(text)
+        return
+    try:
+        with open(path, "w", encoding="utf-8") as summary_file:
+            summary_file.write(text + "\n")
+    except OSError as e:
+        print(f"Error writing metrics: {e}", file=sys.stderr)
+
+
+def start_metrics_server(address: tuple[str, int]):
+    """
+    Serves the Prometheus exposition at /metrics from a background thread.
+
+    Args:
+        address (tuple): The (host, port) to listen on.
+
+    Returns:
+        http.server.ThreadingHTTPServer: The running server; call shutdown() to stop it.
+    """
+    # Imported here, so that importing this module does not load the network stack.
+    from http.server import (  # pylint: disable=import-outside-toplevel
+        BaseHTTPRequestHandler,
+        ThreadingHTTPServer,
+    )
+
+    class MetricsRequestHandler(BaseHTTPRequestHandler):
+        """Serves the Prometheus exposition at /metrics."""
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Serves /metrics."""
+            metrics = _metrics
+            if self.path.split("?", 1)[0] != "/metrics" or metrics is None:
+                self.send_error(404)
+                return
+            body = metrics.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+            pass
+
+    server = ThreadingHTTPServer(address, MetricsRequestHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
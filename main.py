@@ -1,24 +1,61 @@
 """
 Script converts a YouTube channel URL to RSS feed URL and fetches latest videos from the RSS feed.
-It allows filtering videos by date or title.
+It allows filtering videos by date, date range or title.
 
 Modules:
     requests: To make HTTP requests to fetch YouTube page source code and RSS feed content.
-    bs4 (BeautifulSoup): To parse HTML and XML content.
+    bs4 (BeautifulSoup): To parse HTML content.
+    lxml: To parse the RSS feed incrementally.
     re: To perform regular expression matching.
-    argparse: To handle command-line arguments.
-    datetime: To handle date and time operations.
-    pyperclip: To copy the RSS feed URL to the clipboard.
+    argparse: To handle command-line arguments (in the cli module, see main()).
+    pyperclip: To copy the RSS feed URL to the clipboard (with --copy).
+
+requests, bs4, lxml and pyperclip are imported by the functions that use them, on first use, so
+that importing this module (e.g. to call create_rss_feed_url) stays cheap and does not load the
+network or HTML stack.
 
 Functions:
     get_youtube_source_code(youtube_url): Fetches the source code of a YouTube page.
-    get_youtube_channel_id(source_code): Extracts the channel ID from the YouTube source code.
+    get_youtube_channel_id(source_code, engine="regex"): Extracts the channel ID from the
+        YouTube source code.
+    stream_youtube_channel_id(youtube_url): Streams the YouTube page until the channel ID is found.
+    lookup_channel_id(youtube_url, cache=None): Resolves the channel ID without fetching the page.
+    resolve_channel_id(youtube_url, cache=None): Resolves the channel ID, fetching the page if
+        needed.
     create_rss_feed_url(channel_id): Creates the RSS feed URL from the channel ID.
-    fetch_rss_feed_content(rss_feed_url, limit=5): Fetches and parses the RSS feed content.
-    filter_videos(entries, filter_by=None, filter_value=None): Filters videos.
+    parse_feed_entries(chunks, limit=5, fields=None): Parses RSS feed chunks into VideoEntry
+        records, or into LazyEntry records decoding only the given fields.
+    fetch_rss_feed_content(rss_feed_url, limit=5, feed_cache=None, fields=None): Fetches and
+        parses the RSS feed content.
+    filter_videos(entries, filter_by=None, filter_value=None, video_filter=None, fields=...):
+        Filters videos, returning the given fields of each.
+    copy_to_clipboard(text): Copies text to the clipboard.
+    main(argv=None): Runs the command line interface.
 
 Usage:
-    python main.py <youtube_url> [--filter_by <filter_by>] [--filter_value <filter_value>]
+    python main.py <youtube_url> [--filter_by <filter_by>] [--filter_value <filter_value>] [--copy]
+                   [--stream] [--parser {regex,soup}] [--no-cache] [--cache-ttl <seconds>]
+                   [--feed-freshness <seconds>] [--new-only] [--video-index <path>]
+                   [--since <date>] [--until <date>] [--title <keyword> ...]
+                   [--match {all,any}] [--title-regex <regex>] [--exclude <keyword> ...]
+                   [--fields <field>,...]
+    python main.py --input <file|-> [--workers <n>] [--per-host <n>] [--filter_by ...]
+                   [--parse-workers <n> [--parse-chunksize <n>]]
+                   [--queue-depth <n>] [--checkpoint <path>]
+                   [--watch [--min-interval <s>] [--max-interval <s>] [--jitter <f>]
+                   [--schedule <path>]]
+    python main.py --input <file|-> --timeline [--limit <n>] [--filter_by ...]
+    python main.py --serve [<host>:]<port> [--serve-ttl <seconds>]
+    python main.py --search <query> [--match {all,any}] [--since <date>] [--until <date>]
+                   [--limit <n>] [--title-index <path>]
+    Any of the above: [--metrics <file|->] [--metrics-port [<host>:]<port>]
+    With a URL or --input: [--index-titles] [--title-index <path>]
+    With a URL or --input but --timeline: [--deliver <url|path> ...] [--batch-size <n>]
+                                          [--batch-window <seconds>] [--outbox <path>]
+    Any but --search: [--retries <n>] [--rate <per second>] [--connect-timeout <seconds>]
+                      [--read-timeout <seconds>] [--adaptive-timeouts]
+                      [--hedge [--max-hedges <n>]] [--record <path> | --replay <path>]
+    Any but --serve: [--format {text,jsonl,csv,atom,opml}] [--output <file>]
 
 Example:
     python
@@ -28,66 +65,340 @@ Example:
     --filter_value 2023-10-01
 """
 
+from __future__ import annotations
+
 import re
-import argparse
-from datetime import datetime
-import requests
-from bs4 import BeautifulSoup, FeatureNotFound, ResultSet, PageElement, Tag, NavigableString
-import pyperclip
+from functools import partial
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from typing import TYPE_CHECKING, NamedTuple
+
+from channel_cache import (
+    ChannelIdCache,
+    canonical_channel_url,
+    channel_id_from_url,
+)
+from feed_cache import FeedCache
+from feed_entries import LazyEntry, check_fields, iter_entry_bytes
+from filters import VideoFilter, compile_filter
+import instrumentation
+
+if TYPE_CHECKING:
+    import requests
+    from bs4 import Tag
+
+    from parse_pool import ParsePool
+
+# Number of seconds to wait for the server before giving up on a request.
+REQUEST_TIMEOUT = 10
+
+# Number of bytes read per chunk when streaming a channel page.
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Number of trailing bytes of the previous chunk that are scanned again together with the next
+# chunk, so that a match spanning a chunk boundary is not missed.
+STREAM_CARRY_OVER = 1024
+
+# Number of bytes read per chunk when streaming an RSS feed.
+FEED_CHUNK_SIZE = 8 * 1024
+
+# Engines supported by get_youtube_channel_id.
+CHANNEL_ID_ENGINES = ("regex", "soup")
+
+# Fields of each video returned by filter_videos.
+DEFAULT_VIDEO_FIELDS = ("title", "published", "link")
+
+_OG_URL_META_PATTERN = re.compile(rb"<meta[^>]*?property=[\"']og:url[\"'][^>]*>")
+_CANONICAL_LINK_PATTERN = re.compile(rb"<link[^>]*?rel=[\"']canonical[\"'][^>]*>")
+_CHANNEL_PATH_PATTERN = re.compile(rb"/channel/([UC][a-zA-Z0-9_-]+)")
+_SCRIPT_CHANNEL_ID_PATTERN = re.compile(rb"\"channel_id\":\"([UC][a-zA-Z0-9_-]+)\"")
+_SCRIPT_EXTERNAL_ID_PATTERN = re.compile(rb"\"externalId\":\"([UC][a-zA-Z0-9_-]+)\"")
+
+# Channel ID lookup strategies in order of priority: the name of the method (as reported to the
+# instrumentation), an optional pattern locating the tag to search in (None searches the whole
+# page) and the pattern capturing the channel ID.
+_CHANNEL_ID_STRATEGIES = (
+    ("meta", _OG_URL_META_PATTERN, _CHANNEL_PATH_PATTERN),
+    ("script_channel_id", None, _SCRIPT_CHANNEL_ID_PATTERN),
+    ("script_external_id", None, _SCRIPT_EXTERNAL_ID_PATTERN),
+    ("canonical", _CANONICAL_LINK_PATTERN, _CHANNEL_PATH_PATTERN),
+)
+
+
+def _http_get(url: str, session: requests.Session | None = None, **kwargs) -> requests.Response:
+    """
+    Sends a GET request, through the given session if there is one.
 
+    Args:
+        url (str): The URL to request.
+        session (requests.Session, optional): A session whose connection pool is reused.
+            Defaults to None, which uses a one-off connection.
+        **kwargs: Further arguments for the request, such as `stream`.
 
-def get_youtube_source_code(url: str) -> bytes | None:
+    Returns:
+        requests.Response: The response.
+    """
+    import requests  # pylint: disable=import-outside-toplevel
+
+    # HTTP clients (see http_client) bring their own, possibly adaptive, (connect, read) timeout
+    if getattr(session, "timeout", None) is None:
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    return (session if session is not None else requests).get(url, **kwargs)
+
+
+def get_youtube_source_code(url: str, session: requests.Session | None = None) -> bytes | None:
     """
     Fetches the source code of a YouTube page.
 
     Args:
         url (str): The URL of the YouTube page.
+        session (requests.Session, optional): The HTTP session to use. Defaults to None.
 
     Returns:
         bytes: The content of the YouTube page if the request is successful.
         None: If there is an error fetching the URL.
     """
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Check for bad status codes
-        return response.content
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching URL: {e}")
-        return None
+    import requests  # pylint: disable=import-outside-toplevel
+
+    with instrumentation.stage("page_fetch") as span:
+        try:
+            response = _http_get(url, session)
+            span.set(status=response.status_code)
+            response.raise_for_status()  # Check for bad status codes
+            span.set(bytes=len(response.content))
+            return response.content
+        except requests.exceptions.RequestException as e:
+            span.fail(e)
+            print(f"Error fetching URL: {e}")
+            return None
 
 
-def get_youtube_channel_id(html_source_code: bytes | None) -> str | None:
+def get_youtube_channel_id(
+    html_source_code: bytes | None, engine: str = "regex", parse_pool: ParsePool | None = None
+) -> str | None:
     """
     Extracts the channel ID from the YouTube source code.
 
+    The channel ID is looked up, in order of priority, in the 'og:url' meta tag, the
+    '"channel_id"' and '"externalId"' script data and the canonical link. The default "regex"
+    engine runs precompiled byte patterns directly on the raw page; the "soup" engine builds a
+    BeautifulSoup tree and is kept as a fallback.
+
     Args:
         html_source_code (bytes): The HTML source code of the YouTube page.
+        engine (str, optional): The extraction engine, "regex" or "soup". Defaults to "regex".
+        parse_pool (ParsePool, optional): The worker processes to extract the channel ID in.
+            Defaults to None, which extracts it in the calling thread.
 
     Returns:
         str: The channel ID if found, otherwise None.
+
+    Raises:
+        ValueError: If the engine is unknown.
     """
+    if engine not in CHANNEL_ID_ENGINES:
+        raise ValueError(f"Unknown channel ID engine: {engine!r}")
     if html_source_code is None:
         return None
+    with instrumentation.stage("channel_id_extract") as span:
+        if parse_pool is not None:
+            channel_id, method = parse_pool.run(_extract_channel_id, html_source_code, engine)
+        else:
+            channel_id, method = _extract_channel_id(html_source_code, engine)
+        span.set(bytes=len(html_source_code), method=method)
+        if channel_id is None:
+            span.fail("ChannelIdNotFound")
+        return channel_id
+
+
+def _extract_channel_id(html_source_code: bytes, engine: str) -> tuple[str | None, str | None]:
+    """
+    Extracts the channel ID from the YouTube source code with the given engine.
+
+    Args:
+        html_source_code (bytes): The HTML source code of the YouTube page.
+        engine (str): The extraction engine, "regex" or "soup".
+
+    Returns:
+        tuple: The channel ID and the name of the method that found it, or (None, None).
+    """
+    if engine == "soup":
+        return _get_channel_id_with_soup(html_source_code)
+    return _match_channel_id(html_source_code)
+
+
+def _get_channel_id_with_soup(html_source_code: bytes) -> tuple[str | None, str | None]:
+    """
+    Extracts the channel ID from a BeautifulSoup tree of the YouTube source code.
+
+    Args:
+        html_source_code (bytes): The HTML source code of the YouTube page.
+
+    Returns:
+        tuple: The channel ID and the name of the method that found it, or (None, None).
+    """
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
 
     soup = BeautifulSoup(html_source_code, "html.parser")
 
     # Method 1: Meta tag (most reliable)
     meta_tag = soup.find("meta", property="og:url")
     if meta_tag:
-        og_url = meta_tag.get("content")
+        og_url = meta_tag.get("content") or ""
         match = re.search(r"/channel/([UC][a-zA-Z0-9_-]+)", og_url)
         if match:
-            return match.group(1)
+            return match.group(1), "meta"
+
+    # Methods 2 and 3: Script tags (fallback)
+    script_contents = [str(script) for script in soup.find_all("script")]
+    for method, pattern in (
+        ("script_channel_id", r"\"channel_id\":\"([UC][a-zA-Z0-9_-]+)\""),
+        ("script_external_id", r"\"externalId\":\"([UC][a-zA-Z0-9_-]+)\""),
+    ):
+        for script_content in script_contents:
+            match = re.search(pattern, script_content)
+            if match:
+                return match.group(1), method
+
+    # Method 4: Canonical link
+    link_tag = soup.find("link", rel="canonical")
+    if link_tag:
+        match = re.search(r"/channel/([UC][a-zA-Z0-9_-]+)", link_tag.get("href") or "")
+        if match:
+            return match.group(1), "canonical"
+
+    return None, None
+
+
+def _match_channel_id(data: bytes) -> tuple[str | None, str | None]:
+    """
+    Scans raw page bytes for the channel ID with precompiled byte patterns.
+
+    The 'og:url' meta tag, the '"channel_id"' and '"externalId"' script data and the canonical
+    link are tried in that order, without building a tree or decoding the page.
 
-    # Method 2: Script tags (fallback)
-    script_tags = soup.find_all("script")
-    for script in script_tags:
-        script_content = str(script)
-        match = re.search(r"\"channel_id\":\"([UC][a-zA-Z0-9_-]+)\"", script_content)
+    Args:
+        data (bytes): The HTML source code of the YouTube page, or a fragment of it.
+
+    Returns:
+        tuple: The channel ID and the name of the method that found it, or (None, None).
+    """
+    for method, tag_pattern, id_pattern in _CHANNEL_ID_STRATEGIES:
+        if tag_pattern is None:
+            match = id_pattern.search(data)
+        else:
+            tag_match = tag_pattern.search(data)
+            match = id_pattern.search(tag_match.group(0)) if tag_match else None
         if match:
-            return match.group(1)
+            return match.group(1).decode("ascii"), method
+    return None, None
 
-    return None
+
+def stream_youtube_channel_id(
+    url: str, chunk_size: int = STREAM_CHUNK_SIZE, session: requests.Session | None = None
+) -> tuple[str | None, int]:
+    """
+    Resolves the channel ID by streaming the YouTube page and stopping at the first match.
+
+    The page is read incrementally and every chunk, together with the tail of the previous one,
+    is scanned with the byte patterns of the "regex" engine of get_youtube_channel_id. The
+    connection is closed as soon as a match is found. If the whole page is read without a match,
+    it is handed to get_youtube_channel_id, just like the non-streaming path.
+
+    Args:
+        url (str): The URL of the YouTube page.
+        chunk_size (int, optional): The number of bytes to read per chunk. Defaults to 16 KiB.
+        session (requests.Session, optional): The HTTP session to use. Defaults to None.
+
+    Returns:
+        tuple: The channel ID (None if not found or on error) and the number of bytes read.
+    """
+    import requests  # pylint: disable=import-outside-toplevel
+
+    bytes_read = 0
+    with instrumentation.stage("page_stream") as span:
+        try:
+            response = _http_get(url, session, stream=True)
+            try:
+                span.set(status=response.status_code)
+                response.raise_for_status()
+                page = bytearray()
+                tail = b""
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if not chunk:
+                        continue
+                    bytes_read += len(chunk)
+                    page += chunk
+                    window = tail + chunk
+                    channel_id, method = _match_channel_id(window)
+                    if channel_id:
+                        span.set(bytes=bytes_read, method=method)
+                        return channel_id, bytes_read
+                    tail = window[-STREAM_CARRY_OVER:]
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            span.fail(e)
+            print(f"Error fetching URL: {e}")
+            return None, bytes_read
+        span.set(bytes=bytes_read)
+
+    # No early match: fall back to parsing the complete page.
+    return get_youtube_channel_id(bytes(page)), bytes_read
+
+
+def lookup_channel_id(url: str, cache: ChannelIdCache | None = None) -> str | None:
+    """
+    Resolves the channel ID of a YouTube channel URL without fetching the channel page.
+
+    '/channel/UC...' URLs carry the channel ID themselves; other URLs are looked up in the
+    channel ID cache, if one is given.
+
+    Args:
+        url (str): The URL of the YouTube channel.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+
+    Returns:
+        str: The channel ID if it could be resolved without the network, otherwise None.
+    """
+    channel_id = channel_id_from_url(url)
+    if channel_id is None and cache is not None:
+        channel_id = cache.get(url)
+    return channel_id
+
+
+def resolve_channel_id(
+    url: str,
+    cache: ChannelIdCache | None = None,
+    engine: str = "regex",
+    session: requests.Session | None = None,
+    parse_pool: ParsePool | None = None,
+) -> str | None:
+    """
+    Resolves the channel ID of a YouTube channel URL, fetching the channel page only if needed.
+
+    The page is fetched from the canonical form of the URL, and channel IDs found on it are
+    stored in the cache, if one is given.
+
+    Args:
+        url (str): The URL of the YouTube channel.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+        engine (str, optional): The channel ID extraction engine. Defaults to "regex".
+        session (requests.Session, optional): The HTTP session to use. Defaults to None.
+        parse_pool (ParsePool, optional): The worker processes to extract the channel ID in.
+            Defaults to None.
+
+    Returns:
+        str: The channel ID if found, otherwise None.
+    """
+    channel_id = lookup_channel_id(url, cache)
+    if channel_id is None:
+        page_url = canonical_channel_url(url) or url
+        source_code = get_youtube_source_code(page_url, session)
+        channel_id = get_youtube_channel_id(source_code, engine, parse_pool)
+        if channel_id and cache is not None:
+            cache.set(url, channel_id)
+    return channel_id
 
 
 def create_rss_feed_url(cid: str) -> str | None:
@@ -105,127 +416,340 @@ def create_rss_feed_url(cid: str) -> str | None:
     return None
 
 
+class VideoEntry(NamedTuple):
+    """
+    A compact record of a video entry of the RSS feed.
+
+    Attributes:
+        video_id (str): The YouTube video ID.
+        title (str): The title of the video.
+        published (str): The publication timestamp, e.g. '2023-10-01T00:00:00+00:00'.
+        link (str): The URL of the video.
+        author (str): The name of the channel that published the video.
+    """
+
+    video_id: str
+    title: str
+    published: str
+    link: str
+    author: str
+
+
+def _video_id_from_link(link: str) -> str:
+    """
+    Extracts the video ID from the 'v' query parameter of a video URL.
+
+    Args:
+        link (str): The URL of the video.
+
+    Returns:
+        str: The video ID, or an empty string if the URL has none.
+    """
+    match = re.search(r"[?&]v=([a-zA-Z0-9_-]+)", link)
+    return match.group(1) if match else ""
+
+
+def _video_entry_from_element(element) -> VideoEntry:
+    """
+    Builds a video entry record from an lxml 'entry' element of the RSS feed.
+
+    Args:
+        element (lxml.etree._Element): The 'entry' element.
+
+    Returns:
+        VideoEntry: The video entry record.
+    """
+    link_element = element.find("{*}link")
+    link = link_element.get("href", "") if link_element is not None else ""
+    return VideoEntry(
+        video_id=element.findtext("{*}videoId") or _video_id_from_link(link),
+        title=element.findtext("{*}title") or "",
+        published=element.findtext("{*}published") or "",
+        link=link,
+        author=element.findtext("{*}author/{*}name") or "",
+    )
+
+
+def _video_entry_from_tag(tag: Tag) -> VideoEntry:
+    """
+    Builds a video entry record from a BeautifulSoup 'entry' element of the RSS feed.
+
+    Args:
+        tag (Tag): The 'entry' element.
+
+    Returns:
+        VideoEntry: The video entry record.
+    """
+    link = tag.find("link")["href"]
+    video_id_tag = tag.find("videoId")
+    author_tag = tag.find("author")
+    author_name_tag = author_tag.find("name") if author_tag else None
+    return VideoEntry(
+        video_id=video_id_tag.text if video_id_tag else _video_id_from_link(link),
+        title=tag.find("title").text,
+        published=tag.find("published").text,
+        link=link,
+        author=author_name_tag.text if author_name_tag else "",
+    )
+
+
+def parse_feed_entries(
+    chunks: Iterable[bytes], limit: int = 5, fields: Iterable[str] | None = None
+) -> list[VideoEntry] | list[LazyEntry]:
+    """
+    Parses the RSS feed incrementally, stopping as soon as `limit` entries have been read.
+
+    The chunks are fed to an lxml pull parser; every completed 'entry' element is turned into a
+    VideoEntry record and then cleared, together with the entries before it, so the parsed tree
+    never holds more than one entry.
+
+    With `fields`, the entries are split from the chunks without an XML parser and returned as
+    LazyEntry records, which decode only the given fields and only when they are read (see
+    feed_entries).
+
+    Args:
+        chunks (Iterable[bytes]): The RSS feed content, in chunks.
+        limit (int, optional): The maximum number of entries to parse. Defaults to 5.
+        fields (Iterable[str], optional): The fields of the LazyEntry records, from
+            feed_entries.ALL_FIELDS. Defaults to None, which returns VideoEntry records.
+
+    Returns:
+        list: A list of VideoEntry (or LazyEntry) records, newest first.
+
+    Raises:
+        lxml.etree.XMLSyntaxError: If the RSS feed is not well-formed.
+        ValueError: If `fields` names an unknown field.
+    """
+    if fields is not None:
+        fields = check_fields(fields)
+        return [LazyEntry(raw, fields) for raw in islice(iter_entry_bytes(chunks), max(limit, 0))]
+
+    from lxml import etree  # pylint: disable=import-outside-toplevel
+
+    entries = []
+    if limit <= 0:
+        return entries
+    parser = etree.XMLPullParser(
+        events=("end",), tag="{*}entry", resolve_entities=False, no_network=True
+    )
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, element in parser.read_events():
+            entries.append(_video_entry_from_element(element))
+            if len(entries) >= limit:
+                return entries
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    parser.close()
+    return entries
+
+
+def _parse_feed_body(
+    body: bytes, limit: int, fields: Iterable[str] | None = None
+) -> list[VideoEntry] | list[LazyEntry]:
+    """
+    Parses a complete RSS feed body.
+
+    lxml's syntax errors cannot be pickled, so they are raised as ValueError, which can be sent
+    back from a parse pool worker.
+
+    Args:
+        body (bytes): The RSS feed content.
+        limit (int): The maximum number of entries to parse.
+        fields (Iterable[str], optional): The fields of LazyEntry records. Defaults to None,
+            which returns VideoEntry records.
+
+    Returns:
+        list: A list of VideoEntry (or LazyEntry) records, newest first.
+
+    Raises:
+        ValueError: If the RSS feed is not well-formed.
+    """
+    from lxml import etree  # pylint: disable=import-outside-toplevel
+
+    try:
+        return parse_feed_entries([body], limit, fields)
+    except etree.XMLSyntaxError as e:
+        raise ValueError(str(e)) from None
+
+
 def fetch_rss_feed_content(
-    feed_url: str, limit: int = 5
-) -> ResultSet[PageElement | Tag | NavigableString] | None:
+    feed_url: str,
+    limit: int = 5,
+    session: requests.Session | None = None,
+    feed_cache: FeedCache | None = None,
+    parse_pool: ParsePool | None = None,
+    fields: Iterable[str] | None = None,
+) -> list[VideoEntry] | list[LazyEntry] | None:
     """
     Fetches and parses the RSS feed content, limited to the latest videos.
 
+    Without a feed cache, the feed is streamed and parsed incrementally and the connection is
+    closed as soon as `limit` entries have been read. With a feed cache, the feed is fetched with
+    a conditional request (or not at all while it is fresh) and parsed from the cached content.
+    With a parse pool, the feed is read in full and parsed in a worker process.
+
     Args:
         feed_url (str): The URL of the RSS feed.
         limit (int, optional): The maximum number of videos to fetch. Defaults to 5.
+        session (requests.Session, optional): The HTTP session to use. Defaults to None.
+        feed_cache (FeedCache, optional): The conditional GET feed cache. Defaults to None.
+        parse_pool (ParsePool, optional): The worker processes to parse the feed in. Defaults to
+            None, which parses it in the calling thread.
+        fields (Iterable[str], optional): The fields of each entry, decoded lazily on first
+            access (see parse_feed_entries). Defaults to None, which returns VideoEntry records.
 
     Returns:
-        list: A list of BeautifulSoup 'entry' elements representing the videos if successful.
+        list: A list of VideoEntry (or LazyEntry) records representing the videos if successful.
         None: If there is an error fetching the RSS feed or parsing the content.
     """
+    import requests  # pylint: disable=import-outside-toplevel
+
     try:
-        response = requests.get(feed_url, timeout=10)
-        response.raise_for_status()
+        from lxml import etree  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        print(
+            "Error: Couldn't find a tree builder with the features you requested: xml."
+            " Please install the 'lxml' parser library using 'pip install lxml'."
+        )
+        return None
+    with instrumentation.stage("feed_fetch") as span:
         try:
-            soup = BeautifulSoup(response.content, "xml")
-        except FeatureNotFound:
-            print(
-                "Error: Couldn't find a tree builder with the features you requested: xml."
-                " Please install the 'lxml' parser library using 'pip install lxml'."
-            )
+            if feed_cache is not None:
+                body = feed_cache.fetch(feed_url, partial(_http_get, session=session))
+                span.set(bytes=len(body))
+                if parse_pool is not None:
+                    return parse_pool.run(_parse_feed_body, body, limit, fields)
+                return parse_feed_entries([body], limit, fields)
+            if parse_pool is not None:
+                response = _http_get(feed_url, session)
+                span.set(status=response.status_code)
+                response.raise_for_status()
+                span.set(bytes=len(response.content))
+                return parse_pool.run(_parse_feed_body, response.content, limit, fields)
+            response = _http_get(feed_url, session, stream=True)
+            try:
+                span.set(status=response.status_code)
+                response.raise_for_status()
+                chunks = response.iter_content(chunk_size=FEED_CHUNK_SIZE)
+                return parse_feed_entries(instrumentation.count_bytes(chunks, span), limit, fields)
+            finally:
+                response.close()
+        except requests.exceptions.RequestException as e:
+            span.fail(e)
+            print(f"Error fetching RSS feed: {e}")
             return None
-        _entries = soup.find_all("entry")[:limit]
-        return _entries
-    except requests.exceptions.RequestException as e:
-        print(f"Error fetching RSS feed: {e}")
-        return None
+        except (etree.XMLSyntaxError, ValueError) as e:
+            span.fail(e)
+            print(f"Error parsing RSS feed: {e}")
+            return None
+
+
+def _as_video_entries(
+    param_entries: Iterable[VideoEntry | LazyEntry | Tag],
+) -> Iterator[VideoEntry | LazyEntry]:
+    """
+    Converts BeautifulSoup 'entry' elements to VideoEntry records, passing VideoEntry and
+    LazyEntry records through untouched. The kind of the first entry decides for all of them.
+
+    Args:
+        param_entries (Iterable): VideoEntry or LazyEntry records, or BeautifulSoup 'entry'
+            elements.
+
+    Returns:
+        Iterator[VideoEntry]: The video entry records.
+    """
+    entries = iter(param_entries)
+    first = next(entries, None)
+    if first is None:
+        return iter(())
+    entries = chain((first,), entries)
+    if isinstance(first, (VideoEntry, LazyEntry)):
+        return entries
+    return map(_video_entry_from_tag, entries)
 
 
 def filter_videos(
-    param_entries: list[BeautifulSoup],
+    param_entries: Iterable[VideoEntry | LazyEntry | Tag],
     filter_by: str | None = None,
     filter_value: str | None = None,
-) -> list[dict[str, str]]:
+    video_filter: VideoFilter | None = None,
+    fields: Iterable[str] = DEFAULT_VIDEO_FIELDS,
+) -> list[dict]:
     """
     Filters videos by date, title, or other metadata.
 
     Args:
-        param_entries (list): A list of BeautifulSoup 'entry' elements representing the videos.
+        param_entries (list): A list of VideoEntry or LazyEntry records (or BeautifulSoup
+            'entry' elements) representing the videos, newest first.
         filter_by (str, optional): The criteria to filter videos by ('date' or 'title').
         filter_value (str, optional): The value to filter videos by. Defaults to None.
+        video_filter (VideoFilter, optional): A filter compiled with filters.compile_filter,
+            used instead of `filter_by` and `filter_value`. Defaults to None.
+        fields (Iterable[str], optional): The fields of each returned video; the media fields
+            of feed_entries.MEDIA_FIELDS require LazyEntry records. Defaults to the title,
+            publication date and link.
 
     Returns:
         list: A list of dictionaries containing filtered video details.
+
+    Raises:
+        ValueError: If `filter_by` or `filter_value` is invalid.
     """
-    filtered_videos = []
-    for entry in param_entries:
-        title = entry.find("title").text
-        published = entry.find("published").text
-        link = entry.find("link")["href"]
+    if video_filter is None:
+        video_filter = compile_filter(filter_by, filter_value)
+    fields = tuple(fields)
+    with instrumentation.stage("filter"):
+        return [
+            {field: getattr(entry, field) for field in fields}
+            for entry in video_filter.apply(_as_video_entries(param_entries))
+        ]
 
-        if filter_by == "date":
-            entry_date = datetime.strptime(published, "%Y-%m-%dT%H:%M:%S%z")
-            filter_date = datetime.strptime(filter_value, "%Y-%m-%d")
-            if entry_date.date() == filter_date.date():
-                filtered_videos.append({"title": title, "published": published, "link": link})
-        elif filter_by == "title" and filter_value.lower() in title.lower():
-            filtered_videos.append({"title": title, "published": published, "link": link})
-        elif not filter_by:
-            filtered_videos.append({"title": title, "published": published, "link": link})
-    return filtered_videos
 
+def copy_to_clipboard(text: str) -> bool:
+    """
+    Copies text to the clipboard.
 
-if __name__ == "__main__":
-    # Initialize argument parser with description and example usage
-    parser = argparse.ArgumentParser(
-        description="Convert YouTube channel URL to RSS feed URL and fetch latest videos.",
-        epilog="Example usage: "
-        "python main.py https://www.youtube.com/channel/UC_x5XG1OV2P6uZZ5FSM9Ttw"
-        " --filter_by date --filter_value 2023-10-01",
-    )
+    pyperclip is imported only here, since it probes for a clipboard mechanism, which is slow
+    and fails on headless machines.
 
-    # Add argument for YouTube channel URL
-    parser.add_argument("youtube_url", help="The YouTube channel URL")
+    Args:
+        text (str): The text to copy.
 
-    # Add optional argument for filtering videos by date or title
-    parser.add_argument(
-        "--filter_by", choices=["date", "title"], help="Filter videos by date or title"
-    )
+    Returns:
+        bool: True if the text was copied, False if there is no usable clipboard.
+    """
+    try:
+        import pyperclip  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        print(
+            "Error: Couldn't copy to the clipboard."
+            " Please install the 'pyperclip' library using 'pip install pyperclip'."
+        )
+        return False
+    try:
+        pyperclip.copy(text)
+    except pyperclip.PyperclipException as e:
+        print(f"Error copying to the clipboard: {e}")
+        return False
+    return True
 
-    # Add optional argument for the value to filter videos by
-    parser.add_argument(
-        "--filter_value",
-        help="Value to filter videos by (e.g., date in YYYY-MM-DD format or title keyword)",
-    )
 
-    # Parse command-line arguments
-    args = parser.parse_args()
-
-    # Extract YouTube URL from parsed arguments
-    youtube_url = args.youtube_url
-
-    # Fetch the source code of the YouTube page
-    source_code = get_youtube_source_code(youtube_url)
-    if source_code:
-        # Extract the channel ID from the source code
-        channel_id = get_youtube_channel_id(source_code)
-        if channel_id:
-            # Create the RSS feed URL using the channel ID
-            rss_feed_url = create_rss_feed_url(channel_id)
-            if rss_feed_url:
-                print(f"Channel ID: {channel_id}")
-                print(f"RSS Feed URL: {rss_feed_url}")
-                pyperclip.copy(rss_feed_url)  # Copy RSS feed URL to clipboard
-                print("RSS feed URL has been copied to the clipboard.")
-
-                # Fetch and parse the RSS feed content
-                entries = fetch_rss_feed_content(rss_feed_url)
-                if entries:
-                    # Filter videos based on provided criteria
-                    videos = filter_videos(entries, args.filter_by, args.filter_value)
-                    for video in videos:
-                        print(f"Title: {video['title']}")
-                        print(f"Published: {video['published']}")
-                        print(f"Link: {video['link']}\n")
-                else:
-                    print("Could not fetch RSS feed content.")
-            else:
-                print("Could not create RSS feed URL.")
-        else:
-            print("Channel ID not found.")
+def main(argv: list[str] | None = None) -> None:
+    """
+    Runs the command line interface, see the usage above.
+
+    The interface lives in the `cli` module, imported only here, so that importing this module
+    does not build the argument parser or load the modules of every mode.
+
+    Args:
+        argv (list, optional): The command line arguments. Defaults to sys.argv[1:].
+    """
+    import cli  # pylint: disable=import-outside-toplevel
+
+    cli.run(argv)
+
+
+if __name__ == "__main__":
+    main()
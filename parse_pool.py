@@ -0,0 +1,173 @@
+"""
+Process pool for the CPU-bound parsing of channel pages and feeds.
+
+The threads of a batch run spend most of their time waiting on the network, but extracting the
+channel ID from a page (especially with the BeautifulSoup engine) and parsing a feed are CPU
+bound and hold the GIL, so they do not get faster with more threads. A ParsePool moves them to a
+pool of worker processes: the I/O threads fetch the raw response bytes and hand them to the
+pool, and only the compact results (channel IDs, VideoEntry records) are sent back.
+
+Tasks are sent to the workers in chunks. A dispatcher thread keeps at most one chunk in flight
+per worker; while every worker is busy, new tasks queue up and are sent together as the next
+chunk (up to `chunksize` tasks), so that a busy pool pays the inter-process overhead once per
+chunk instead of once per page, while an idle pool still starts every task at once.
+
+Workers are started with the 'spawn' method, so that they do not inherit the threads and open
+connections of the batch run.
+
+Classes:
+    ParsePool: Runs parsing functions in worker processes, in chunks.
+"""
+
+import multiprocessing
+import os
+import queue
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_CHUNKSIZE = 8
+
+
+def _run_chunk(tasks: list[tuple[Callable, tuple]]) -> list[tuple[BaseException | None, object]]:
+    """Runs a chunk of tasks in a worker process and returns the error or result of each."""
+    outcomes = []
+    for function, args in tasks:
+        try:
+            outcomes.append((None, function(*args)))
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            outcomes.append((e, None))
+    return outcomes
+
+
+class ParsePool:
+    """
+    Runs parsing functions in worker processes, in chunks.
+
+    The functions and their arguments and results must be picklable: functions are defined at
+    module level, arguments are raw bytes, and results are plain records.
+
+    Args:
+        workers (int, optional): The number of worker processes. Defaults to the number of CPUs.
+        chunksize (int, optional): The maximum number of tasks sent to a worker at once.
+            Defaults to 8.
+
+    Attributes:
+        tasks (int): The number of tasks sent to the workers.
+        chunks (int): The number of chunks the tasks were sent in.
+    """
+
+    def __init__(self, workers: int | None = None, chunksize: int = DEFAULT_CHUNKSIZE):
+        if chunksize < 1:
+            raise ValueError(f"chunksize must be at least 1, got {chunksize}")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.tasks = 0
+        self.chunks = 0
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+        self._dispatcher.start()
+
+    def submit(self, function: Callable[..., T], *args) -> Future:
+        """
+        Schedules a function call in a worker process.
+
+        Args:
+            function (Callable): A module-level function.
+            *args: The arguments of the call.
+
+        Returns:
+            Future: The future result of the call.
+        """
+        future = Future()
+        self._queue.put((function, args, future))
+        return future
+
+    def run(self, function: Callable[..., T], *args) -> T:
+        """
+        Calls a function in a worker process and waits for its result.
+
+        Args:
+            function (Callable): A module-level function.
+            *args: The arguments of the call.
+
+        Returns:
+            The result of the call.
+
+        Raises:
+            Exception: Whatever the call raised.
+        """
+        return self.submit(function, *args).result()
+
+    def _dispatch(self) -> None:
+        """Sends the queued tasks to the workers, one chunk per free worker."""
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            chunk = [task]
+            if not self._slots.acquire(blocking=False):
+                # Every worker is busy: wait for one, then send it the tasks queued up meanwhile.
+                self._slots.acquire()
+                chunk.extend(self._drain(self.chunksize - 1))
+            self._send(chunk)
+
+    def _drain(self, count: int) -> list[tuple[Callable, tuple, Future]]:
+        """Takes up to `count` queued tasks without waiting, leaving the stop marker queued."""
+        tasks = []
+        while len(tasks) < count:
+            try:
+                task = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if task is None:
+                self._queue.put(None)
+                break
+            tasks.append(task)
+        return tasks
+
+    def _send(self, chunk: list[tuple[Callable, tuple, Future]]) -> None:
+        """Sends a chunk of tasks to a worker and settles their futures once it is done."""
+        futures = [future for _, _, future in chunk]
+        try:
+            done = self._executor.submit(
+                _run_chunk, [(function, args) for function, args, _ in chunk]
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._slots.release()
+            for future in futures:
+                future.set_exception(e)
+            return
+        self.tasks += len(chunk)
+        self.chunks += 1
+
+        def settle(done: Future) -> None:
+            self._slots.release()
+            error = done.exception()
+            outcomes = done.result() if error is None else [(error, None)] * len(futures)
+            for future, (task_error, result) in zip(futures, outcomes):
+                if task_error is not None:
+                    future.set_exception(task_error)
+                else:
+                    future.set_result(result)
+
+        done.add_done_callback(settle)
+
+    def close(self) -> None:
+        """Waits for the queued tasks and stops the worker processes."""
+        self._queue.put(None)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
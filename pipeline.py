@@ -0,0 +1,431 @@
+"""
+Bounded-memory streaming pipeline for very large channel lists, with checkpoint/resume.
+
+A channel list of 100k lines is read line by line and pushed through a chain of stages, each
+run by its own threads and fed by a bounded queue:
+
+    read -> resolve -> fetch -> filter -> write
+
+The reader resolves nothing itself: it only numbers the input lines and puts the channel URLs
+on the resolve queue. The resolve threads fetch the channel pages and extract the channel IDs,
+the fetch threads fetch and parse the feeds, a filter thread applies the --new-only index and the
+video filter, and the consumer of Pipeline.run writes the results. When a stage falls behind,
+its queue fills up and the stage in front of it blocks on it, down to the reader, so a slow
+writer holds back the reading of the input instead of letting results pile up. The number of
+channels held in memory is bounded by the queue depths and thread counts, whatever the size of
+the input.
+
+Unlike run_batch, the pipeline remembers nothing per channel: concurrent lookups of the same
+channel share the fetch in flight, and repeated channels are answered from the channel ID and
+feed caches, but no result is kept for the rest of the run.
+
+With a checkpoint, the offset of the first input line whose channel has not been written yet is
+saved to a file as the run progresses. Lines complete out of order, so the offset only advances
+past a line once every line before it has been written as well. A run restarted with the same
+checkpoint skips the lines before the saved offset, so a crash at line 80k resumes there
+instead of at line 0; the checkpoint is removed once the whole input has been written.
+
+Classes:
+    Checkpoint: Tracks and persists the input offset up to which every channel was written.
+    Pipeline: Processes a stream of channel URLs through bounded stage queues.
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+import requests
+
+import instrumentation
+from batch import (
+    DEFAULT_PER_HOST_LIMIT,
+    DEFAULT_WORKERS,
+    ChannelResult,
+    HostLimiter,
+    create_session,
+)
+from channel_cache import ChannelIdCache, normalize_channel_url
+from coalesce import SingleFlight
+from feed_cache import FeedCache
+from filters import VideoFilter
+from parse_pool import ParsePool
+from title_index import TitleIndex
+from video_index import VideoIndex
+from main import VideoEntry, create_rss_feed_url, fetch_rss_feed_content, resolve_channel_id
+
+DEFAULT_QUEUE_DEPTH = 64
+DEFAULT_CHECKPOINT_INTERVAL = 100
+
+# The stages of the pipeline after the reader, each fed by its own queue.
+STAGES = ("resolve", "fetch", "filter", "write")
+
+# How often blocked stages check whether the pipeline was stopped, in seconds.
+_POLL_INTERVAL = 0.1
+
+# Marks the end of the input on a stage queue.
+_DONE = object()
+
+
+class Checkpoint:
+    """
+    Tracks and persists the input offset up to which every channel was written.
+
+    Args:
+        path (str | Path): The checkpoint file. An existing file is resumed from.
+        interval (int, optional): Number of written lines between saves. Defaults to 100.
+        flush (Callable, optional): Flushes the output before each save, so that the checkpoint
+            never covers results still in a write buffer. Defaults to None.
+
+    Attributes:
+        offset (int): The number of leading input lines that are done.
+        resumed (int): The offset the run resumed from.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+        flush: Callable[[], None] | None = None,
+    ):
+        self.path = Path(path)
+        self.interval = interval
+        self.flush = flush
+        self.offset = self.resumed = self._load()
+        self._saved = self.offset
+        self._done: set[int] = set()
+        self._lock = threading.Lock()
+
+    def _load(self) -> int:
+        """Reads the saved offset, or 0 if there is no checkpoint yet."""
+        try:
+            offset = json.loads(self.path.read_text(encoding="utf-8"))["offset"]
+        except FileNotFoundError:
+            return 0
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"invalid checkpoint file {self.path}: {e}") from None
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError(f"invalid checkpoint file {self.path}: bad offset {offset!r}")
+        return offset
+
+    def mark(self, offset: int) -> None:
+        """
+        Marks an input line as done, saving the checkpoint every `interval` lines.
+
+        Args:
+            offset (int): The 0-based number of the input line.
+        """
+        with self._lock:
+            self._done.add(offset)
+            while self.offset in self._done:
+                self._done.remove(self.offset)
+                self.offset += 1
+            if self.offset - self._saved >= self.interval:
+                self._save()
+
+    def save(self) -> None:
+        """Writes the current offset to the checkpoint file."""
+        with self._lock:
+            self._save()
+
+    def _save(self) -> None:
+        if self.flush is not None:
+            self.flush()
+        # Write a new file and rename it, so that a crash never leaves a truncated checkpoint.
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_name(self.path.name + ".tmp")
+        temporary.write_text(json.dumps({"offset": self.offset}), encoding="utf-8")
+        os.replace(temporary, self.path)
+        self._saved = self.offset
+
+    def remove(self) -> None:
+        """Removes the checkpoint file, once the whole input is done."""
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+
+
+class _Job:
+    """A channel on its way through the pipeline; blank and comment lines have no URL."""
+
+    __slots__ = ("offset", "url", "started", "channel_id", "feed_url", "entries", "error")
+
+    def __init__(self, offset: int, url: str | None):
+        self.offset = offset
+        self.url = url
+        self.started = 0.0
+        self.channel_id: str | None = None
+        self.feed_url: str | None = None
+        self.entries: list[VideoEntry] | None = None
+        self.error: str | None = None
+
+
+class Pipeline:
+    """
+    Processes a stream of channel URLs through bounded stage queues.
+
+    Args:
+        workers (int, optional): The number of resolve threads and of fetch threads.
+            Defaults to 16.
+        queue_depth (int, optional): The capacity of each stage queue. Defaults to 64.
+        queue_depths (dict, optional): Capacities of individual stage queues, by stage name
+            ('resolve', 'fetch', 'filter', 'write'), overriding `queue_depth`. Defaults to None.
+        per_host_limit (int, optional): The per-host concurrency limit. Defaults to 8.
+        session (requests.Session, optional): The shared HTTP session. Defaults to a new
+            session with a connection pool sized to both network stages.
+        checkpoint (Checkpoint, optional): Where to save the progress and resume from.
+            Defaults to None.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+        feed_cache (FeedCache, optional): The conditional GET feed cache. Defaults to None.
+        video_index (VideoIndex, optional): The index of seen videos; if given, only videos
+            not seen before are kept. Defaults to None.
+        engine (str, optional): The channel ID extraction engine. Defaults to "regex".
+        limit (int, optional): The maximum number of videos to fetch per channel. Defaults to 5.
+        video_filter (VideoFilter, optional): The compiled video filter. Defaults to None.
+        title_index (TitleIndex, optional): The title index the fetched entries are added to.
+            Defaults to None.
+        parse_pool (ParsePool, optional): The worker processes the channel pages and feeds are
+            parsed in. Defaults to None.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        queue_depth: int = DEFAULT_QUEUE_DEPTH,
+        queue_depths: dict[str, int] | None = None,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        session: requests.Session | None = None,
+        checkpoint: Checkpoint | None = None,
+        cache: ChannelIdCache | None = None,
+        feed_cache: FeedCache | None = None,
+        video_index: VideoIndex | None = None,
+        engine: str = "regex",
+        limit: int = 5,
+        video_filter: VideoFilter | None = None,
+        title_index: TitleIndex | None = None,
+        parse_pool: ParsePool | None = None,
+    ):
+        depths = dict.fromkeys(STAGES, queue_depth) | (queue_depths or {})
+        if set(depths) != set(STAGES) or workers < 1 or min(depths.values()) < 1:
+            raise ValueError(
+                f"workers and the queue depths of {', '.join(STAGES)} must be positive,"
+                f" got workers={workers}, queue depths={depths}"
+            )
+        self.workers = workers
+        self.queue_depths = depths
+        self.session = session if session is not None else create_session(2 * workers)
+        self.checkpoint = checkpoint
+        self.cache = cache
+        self.feed_cache = feed_cache
+        self.video_index = video_index
+        self.engine = engine
+        self.limit = limit
+        self.video_filter = video_filter
+        self.title_index = title_index
+        self.parse_pool = parse_pool
+        self._limiter = HostLimiter(per_host_limit)
+        self._resolutions = SingleFlight()
+        self._feeds = SingleFlight()
+
+    def run(self, lines: Iterable[str]) -> Iterator[ChannelResult]:
+        """
+        Processes the channel URLs of the input lines, yielding results in completion order.
+
+        Blank lines and '#' comments are skipped, as in read_channel_urls. A line counts as
+        written for the checkpoint once the consumer asks for the next result; if the consumer
+        stops early, the pipeline is stopped and the checkpoint saved.
+
+        Args:
+            lines (Iterable[str]): The lines of text, e.g. an open file or sys.stdin.
+
+        Yields:
+            ChannelResult: The outcome of each channel, in completion order.
+
+        Raises:
+            Exception: Whatever reading the input raised.
+        """
+        stop = threading.Event()
+        queues = {stage: queue.Queue(self.queue_depths[stage]) for stage in STAGES}
+        reader_errors: list[Exception] = []
+        stage_lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self._read, args=(lines, queues["resolve"], stop, reader_errors)
+            )
+        ]
+        for stage, worker, count, outbox in (
+            ("resolve", self._resolve, self.workers, "fetch"),
+            ("fetch", self._fetch, self.workers, "filter"),
+            ("filter", self._filter, 1, "write"),
+        ):
+            remaining = [count]
+            threads.extend(
+                threading.Thread(
+                    target=self._work,
+                    args=(worker, queues[stage], queues[outbox], stop, remaining, stage_lock),
+                )
+                for _ in range(count)
+            )
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        finished = False
+        try:
+            while True:
+                job = _get(queues["write"], stop)
+                if job is _DONE:
+                    break
+                if job.url is None:
+                    if self.checkpoint is not None:
+                        self.checkpoint.mark(job.offset)
+                    continue
+                yield ChannelResult(
+                    job.url,
+                    job.channel_id,
+                    job.feed_url,
+                    _videos(job.entries) if job.error is None else None,
+                    job.error,
+                    time.perf_counter() - job.started,
+                    entries=job.entries if job.error is None else None,
+                )
+                if self.checkpoint is not None:
+                    self.checkpoint.mark(job.offset)
+            if reader_errors:
+                raise reader_errors[0]
+            finished = True
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if self.checkpoint is not None:
+                if finished:
+                    self.checkpoint.remove()
+                else:
+                    self.checkpoint.save()
+
+    def _read(
+        self,
+        lines: Iterable[str],
+        outbox: queue.Queue,
+        stop: threading.Event,
+        errors: list[Exception],
+    ) -> None:
+        """Numbers the input lines and puts their channel URLs on the resolve queue."""
+        start = self.checkpoint.resumed if self.checkpoint is not None else 0
+        try:
+            for offset, line in enumerate(lines):
+                if offset < start:
+                    continue
+                # Skipped lines go through too, so that the checkpoint can count them in order.
+                url = line.strip()
+                if not url or url.startswith("#"):
+                    url = None
+                if not _put(outbox, _Job(offset, url), stop):
+                    return
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            errors.append(e)
+        _put(outbox, _DONE, stop)
+
+    def _work(
+        self,
+        worker: Callable[[_Job], None],
+        inbox: queue.Queue,
+        outbox: queue.Queue,
+        stop: threading.Event,
+        remaining: list[int],
+        lock: threading.Lock,
+    ) -> None:
+        """Runs one thread of a stage: takes jobs from its queue, works and passes them on."""
+        while True:
+            job = _get(inbox, stop)
+            if job is None:
+                return
+            if job is _DONE:
+                # Let the other threads of the stage see the end too; the last one passes it on.
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                _put(outbox if last else inbox, _DONE, stop)
+                return
+            if job.url is not None and job.error is None:
+                try:
+                    worker(job)
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    job.error = f"Unexpected error: {e}"
+            if not _put(outbox, job, stop):
+                return
+
+    def _resolve(self, job: _Job) -> None:
+        """Resolves the channel ID of a job."""
+        job.started = time.perf_counter()
+
+        def resolve() -> str | None:
+            with self._limiter.limit(job.url):
+                return resolve_channel_id(
+                    job.url, self.cache, self.engine, self.session, self.parse_pool
+                )
+
+        job.channel_id = self._resolutions.do(normalize_channel_url(job.url) or job.url, resolve)
+        if not job.channel_id:
+            job.error = "Channel ID not found."
+            return
+        job.feed_url = create_rss_feed_url(job.channel_id)
+
+    def _fetch(self, job: _Job) -> None:
+        """Fetches the feed entries of a job."""
+
+        def fetch() -> list[VideoEntry] | None:
+            with self._limiter.limit(job.feed_url):
+                fetched = fetch_rss_feed_content(
+                    job.feed_url, self.limit, self.session, self.feed_cache, self.parse_pool
+                )
+            if fetched is not None and self.title_index is not None:
+                self.title_index.add(job.channel_id, fetched)
+            return fetched
+
+        job.entries = self._feeds.do(job.channel_id, fetch)
+        if job.entries is None:
+            job.error = "Could not fetch RSS feed content."
+
+    def _filter(self, job: _Job) -> None:
+        """Keeps the new and matching entries of a job."""
+        entries = job.entries
+        with instrumentation.stage("filter"):
+            if self.video_filter is not None:
+                entries = self.video_filter.apply(entries)
+            if self.video_index is not None:
+                # Only the videos kept by the filter are emitted, and so recorded as seen.
+                entries = self.video_index.iter_new(job.channel_id, entries)
+            job.entries = list(entries)
+
+
+def _videos(entries: list[VideoEntry]) -> list[dict[str, str]]:
+    """Converts the entries of a channel to the video details of a ChannelResult."""
+    return [
+        {"title": entry.title, "published": entry.published, "link": entry.link}
+        for entry in entries
+    ]
+
+
+def _put(outbox: queue.Queue, item: object, stop: threading.Event) -> bool:
+    """Puts an item on a stage queue, waiting for room; returns False if the pipeline stopped."""
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(inbox: queue.Queue, stop: threading.Event) -> object | None:
+    """Takes an item from a stage queue, waiting for one; returns None if the pipeline stopped."""
+    while not stop.is_set():
+        try:
+            return inbox.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return None
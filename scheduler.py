@@ -0,0 +1,276 @@
+"""
+Adaptive polling of many channels from a long-running process.
+
+Instead of polling every channel at the same rate, each channel's next poll is scheduled from its
+observed upload cadence: the median gap between the 'published' timestamps of its feed entries.
+Channels that upload hourly are polled often, channels that upload yearly are polled rarely.
+Intervals are clamped to configurable bounds and randomized with jitter, so that channels added
+together drift apart; failed polls are retried with exponential backoff.
+
+Channels wait in a heap ordered by their next poll time. The schedule of every channel is kept in
+a SQLite database, so a restarted process resumes where the previous one stopped.
+
+Functions:
+    estimate_interval(published, now): Estimates the poll interval from upload timestamps.
+    watch(scheduler, process, on_result): Polls channels as they become due, until stopped.
+
+Classes:
+    PollScheduler: Heap based per-channel poll scheduler with persistent state.
+"""
+
+import heapq
+import random
+import statistics
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from pathlib import Path
+
+from sqlite_store import SQLiteStore
+
+DEFAULT_MIN_INTERVAL = 15 * 60
+DEFAULT_MAX_INTERVAL = 24 * 60 * 60
+DEFAULT_JITTER = 0.1
+
+# Number of polls per expected upload: polling at half the upload gap catches new uploads
+# within about half a gap.
+POLLS_PER_UPLOAD = 2
+
+
+def _parse_timestamp(value: str) -> float | None:
+    """Returns the Unix timestamp of an ISO 8601 timestamp, or None if it is malformed."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+def estimate_interval(published: Iterable[str], now: float) -> float | None:
+    """
+    Estimates the poll interval of a channel from the publication timestamps of its videos.
+
+    The interval is the median gap between consecutive uploads divided by POLLS_PER_UPLOAD. With
+    a single upload, the time since that upload is used as the gap. Missing and malformed
+    timestamps are skipped.
+
+    Args:
+        published (Iterable[str]): The publication timestamps, e.g. '2023-10-01T00:00:00+00:00'.
+        now (float): The current time, as a Unix timestamp.
+
+    Returns:
+        float: The estimated interval in seconds, or None if there are no valid timestamps.
+    """
+    parsed = (_parse_timestamp(value) for value in published if value)
+    timestamps = sorted((timestamp for timestamp in parsed if timestamp is not None), reverse=True)
+    if not timestamps:
+        return None
+    if len(timestamps) == 1:
+        gap = now - timestamps[0]
+    else:
+        gap = statistics.median(a - b for a, b in zip(timestamps, timestamps[1:]))
+    return max(gap, 0.0) / POLLS_PER_UPLOAD
+
+
+class PollScheduler(SQLiteStore):
+    """
+    Heap based per-channel poll scheduler with persistent state.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'schedule.sqlite3' in the
+            user cache directory.
+        min_interval (float, optional): The shortest poll interval in seconds. Defaults to 15
+            minutes.
+        max_interval (float, optional): The longest poll interval (and backoff) in seconds.
+            Defaults to 24 hours.
+        jitter (float, optional): The relative random variation of each interval, e.g. 0.1 for
+            plus or minus 10%. Defaults to 0.1.
+        rng (random.Random, optional): The random number generator for the jitter.
+    """
+
+    FILENAME = "schedule.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS schedule ("
+        " url TEXT PRIMARY KEY,"
+        " next_poll REAL NOT NULL,"
+        " interval REAL NOT NULL,"
+        " failures INTEGER NOT NULL)",
+    )
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        rng: random.Random | None = None,
+    ):
+        if min_interval > max_interval:
+            raise ValueError("min_interval must not be greater than max_interval")
+        super().__init__(path)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        # Per-channel state: url -> [next_poll, interval, failures]
+        self._channels: dict[str, list[float]] = {}
+        self._heap: list[tuple[float, str]] = []
+
+    def add(self, url: str, now: float | None = None) -> float:
+        """
+        Adds a channel, resuming its persisted schedule or polling it right away if it is new.
+
+        Args:
+            url (str): The YouTube channel URL.
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            float: The time of the next poll of the channel.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            if url in self._channels:
+                return self._channels[url][0]
+            row = self._connection.execute(
+                "SELECT next_poll, interval, failures FROM schedule WHERE url = ?", (url,)
+            ).fetchone()
+            state = list(row) if row else [now, self.min_interval, 0]
+            self._channels[url] = state
+            heapq.heappush(self._heap, (state[0], url))
+            if row is None:
+                self._persist(url, state)
+            return state[0]
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def next_poll_time(self) -> float | None:
+        """
+        Returns the time of the earliest scheduled poll.
+
+        Returns:
+            float: The time of the next poll, or None if no channel is scheduled.
+        """
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float | None = None) -> list[str]:
+        """
+        Removes and returns the channels whose poll is due. Each of them must be rescheduled with
+        record_success or record_failure once polled.
+
+        Args:
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            list[str]: The channel URLs due for a poll, earliest first.
+        """
+        now = time.time() if now is None else now
+        due = []
+        with self._lock:
+            self._drop_stale()
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[1])
+                self._drop_stale()
+        return due
+
+    def record_success(self, url: str, published: Iterable[str], now: float | None = None) -> float:
+        """
+        Reschedules a channel after a successful poll, from its observed upload cadence.
+
+        Args:
+            url (str): The YouTube channel URL.
+            published (Iterable[str]): The publication timestamps of the channel's feed entries.
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            float: The time of the next poll of the channel.
+        """
+        now = time.time() if now is None else now
+        interval = estimate_interval(published, now)
+        interval = self.max_interval if interval is None else interval
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return self._reschedule(url, now, interval, interval, failures=0)
+
+    def record_failure(self, url: str, now: float | None = None) -> float:
+        """
+        Reschedules a channel after a failed poll, backing off exponentially.
+
+        Args:
+            url (str): The YouTube channel URL.
+            now (float, optional): The current time. Defaults to time.time().
+
+        Returns:
+            float: The time of the next poll of the channel.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            _, interval, failures = self._channels[url]
+        failures = int(failures) + 1
+        delay = min(self.min_interval * 2 ** (failures - 1), self.max_interval)
+        return self._reschedule(url, now, interval, delay, failures)
+
+    def _reschedule(
+        self, url: str, now: float, interval: float, delay: float, failures: int
+    ) -> float:
+        if self.jitter:
+            delay *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        state = [now + delay, interval, failures]
+        with self._lock:
+            self._channels[url] = state
+            heapq.heappush(self._heap, (state[0], url))
+            self._persist(url, state)
+        return state[0]
+
+    def _drop_stale(self) -> None:
+        # Heap entries left behind by a reschedule are skipped lazily.
+        while self._heap:
+            next_poll, url = self._heap[0]
+            state = self._channels.get(url)
+            if state is not None and state[0] == next_poll:
+                return
+            heapq.heappop(self._heap)
+
+    def _persist(self, url: str, state: list[float]) -> None:
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO schedule (url, next_poll, interval, failures)"
+                " VALUES (?, ?, ?, ?)",
+                (url, *state),
+            )
+
+
+def watch(
+    scheduler: PollScheduler,
+    process: Callable[[list[str]], Iterable],
+    on_result: Callable[[object], None],
+    stop: threading.Event | None = None,
+) -> None:
+    """
+    Polls channels as they become due and reschedules them, until stopped.
+
+    Args:
+        scheduler (PollScheduler): The scheduler holding the channels.
+        process (Callable): Polls a list of channel URLs, yielding a ChannelResult for each,
+            e.g. batch.run_batch.
+        on_result (Callable): Called with every ChannelResult.
+        stop (threading.Event, optional): Stops the loop when set. Defaults to None, which
+            polls until interrupted or no channel is left.
+    """
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        now = time.time()
+        due = scheduler.pop_due(now)
+        if not due:
+            next_poll = scheduler.next_poll_time()
+            if next_poll is None:
+                return
+            stop.wait(max(next_poll - now, 0.0))
+            continue
+        for result in process(due):
+            if result.ok:
+                scheduler.record_success(result.url, result.published or ())
+            else:
+                scheduler.record_failure(result.url)
+            on_result(result)
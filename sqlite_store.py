@@ -0,0 +1,78 @@
+"""
+Base of the SQLite backed stores of the application.
+
+The channel ID cache, the feed cache, the video and title indexes, the poll schedule and the
+delivery outbox each keep their state in a small SQLite database, by default in the per-user
+cache directory. A store opens one connection shared by all threads, serializes its queries with
+a lock, and creates its tables when it is opened.
+
+Functions:
+    default_cache_dir(): Returns the per-user cache directory of the application.
+
+Classes:
+    SQLiteStore: Base class opening, initializing and closing the database of a store.
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+APP_NAME = "youtube_channel_to_rss"
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the per-user cache directory of the application.
+
+    Returns:
+        Path: '%LOCALAPPDATA%' on Windows, '~/Library/Caches' on macOS and '$XDG_CACHE_HOME'
+        (or '~/.cache') elsewhere, followed by the application name.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / APP_NAME
+
+
+class SQLiteStore:
+    """
+    Base class opening, initializing and closing the database of a store.
+
+    Subclasses name their database file in FILENAME and give the statements creating their tables
+    and indexes in SCHEMA, and the PRAGMA statements tuning the connection in PRAGMAS. They run
+    their queries on `self._connection` while holding `self._lock`.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to FILENAME in the user cache
+            directory.
+    """
+
+    FILENAME = "store.sqlite3"
+    SCHEMA: tuple[str, ...] = ()
+    PRAGMAS: tuple[str, ...] = ()
+
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else default_cache_dir() / self.FILENAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        for pragma in self.PRAGMAS:
+            self._connection.execute(pragma)
+        with self._connection:
+            for statement in self.SCHEMA:
+                self._connection.execute(statement)
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,232 @@
+"""
+Merged multi-channel timeline.
+
+Combines the feeds of many channels into a single timeline, newest first. Every channel's feed
+is already sorted newest first, so the feeds are merged with a streaming k-way heap merge instead
+of being concatenated and sorted: the heap holds one entry per channel, and each entry is yielded
+as soon as it is known to be the next one overall. The feeds are fetched concurrently, and
+merging stops as soon as the requested number of entries has been yielded. A channel listed
+under several URL forms is resolved once per canonical URL, and its videos are merged only once.
+
+Functions:
+    merge_timelines(timelines, limit=None): Merges newest-first timelines into one.
+    fetch_timeline(urls, limit=None, ...): Fetches channels concurrently and merges their feeds.
+    format_timeline_entry(entry): Formats a timeline entry for printing.
+"""
+
+import heapq
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from itertools import islice
+
+import requests
+
+from batch import (
+    DEFAULT_PER_HOST_LIMIT,
+    DEFAULT_WORKERS,
+    ChannelCoalescer,
+    HostLimiter,
+    create_session,
+)
+from channel_cache import ChannelIdCache
+from feed_cache import FeedCache
+from filters import VideoFilter
+from parse_pool import ParsePool
+from title_index import TitleIndex
+from main import VideoEntry, create_rss_feed_url, fetch_rss_feed_content, resolve_channel_id
+from video_index import VideoIndex
+
+# Number of entries in a YouTube channel feed.
+FEED_ENTRIES = 15
+
+
+def _published_timestamp(entry: VideoEntry) -> float:
+    """
+    Returns the publication time of an entry as a timestamp, so that entries with different UTC
+    offsets compare correctly. Entries without a valid timestamp sort last.
+    """
+    try:
+        return datetime.fromisoformat(entry.published).timestamp()
+    except ValueError:
+        return float("-inf")
+
+
+def merge_timelines(
+    timelines: Iterable[Iterable[VideoEntry]], limit: int | None = None
+) -> Iterator[VideoEntry]:
+    """
+    Merges newest-first timelines into one newest-first timeline.
+
+    The timelines are consumed lazily, one entry ahead each, so memory is bounded by the number
+    of timelines rather than the number of entries.
+
+    Args:
+        timelines (Iterable[Iterable[VideoEntry]]): The timelines, each sorted newest first.
+        limit (int, optional): The maximum number of entries to yield. Defaults to None, which
+            yields every entry.
+
+    Returns:
+        Iterator[VideoEntry]: The merged entries, newest first.
+    """
+    merged = heapq.merge(*timelines, key=_published_timestamp, reverse=True)
+    return islice(merged, limit)
+
+
+def _channel_entries(
+    url: str,
+    session: requests.Session,
+    limiter: HostLimiter,
+    coalescer: ChannelCoalescer,
+    cache: ChannelIdCache | None,
+    feed_cache: FeedCache | None,
+    video_index: VideoIndex | None,
+    engine: str,
+    limit: int,
+    video_filter: VideoFilter | None,
+    title_index: TitleIndex | None,
+    parse_pool: ParsePool | None,
+) -> tuple[str | None, list[VideoEntry]]:
+    """
+    Resolves a channel and returns its channel ID and the entries of its feed that pass the
+    filters, newest first. With a video index, only the entries not seen before are kept; they
+    are recorded once the merged timeline emits them.
+
+    Failed channels are reported and contribute no entries, as do channels already claimed by
+    another URL form of the same channel.
+    """
+
+    def resolve() -> str | None:
+        with limiter.limit(url):
+            return resolve_channel_id(url, cache, engine, session, parse_pool)
+
+    channel_id = coalescer.resolve(url, resolve)
+    if not channel_id:
+        print(f"Channel ID not found: {url}")
+        return None, []
+    if not coalescer.claim(channel_id):
+        return channel_id, []
+    feed_url = create_rss_feed_url(channel_id)
+    with limiter.limit(feed_url):
+        entries = fetch_rss_feed_content(feed_url, limit, session, feed_cache, parse_pool)
+    if entries is None:
+        print(f"Could not fetch RSS feed content: {url}")
+        return channel_id, []
+    if title_index is not None:
+        title_index.add(channel_id, entries)
+    if video_filter is not None:
+        entries = video_filter.apply(entries)
+    if video_index is not None:
+        entries = video_index.iter_unseen(entries)
+    return channel_id, list(entries)
+
+
+def _future_entries(future: Future, channel_ids: dict[str, str]) -> Iterator[VideoEntry]:
+    """
+    Yields the entries of a channel once its fetch has completed, noting the channel ID of
+    every entry in `channel_ids`.
+    """
+    try:
+        channel_id, entries = future.result()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        print(f"Unexpected error: {e}")
+        return
+    for entry in entries:
+        channel_ids[entry.video_id] = channel_id
+    yield from entries
+
+
+def fetch_timeline(
+    urls: Iterable[str],
+    limit: int | None = None,
+    max_workers: int = DEFAULT_WORKERS,
+    per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+    session: requests.Session | None = None,
+    cache: ChannelIdCache | None = None,
+    feed_cache: FeedCache | None = None,
+    video_index: VideoIndex | None = None,
+    engine: str = "regex",
+    video_filter: VideoFilter | None = None,
+    title_index: TitleIndex | None = None,
+    parse_pool: ParsePool | None = None,
+) -> Iterator[VideoEntry]:
+    """
+    Fetches the feeds of many channels concurrently and yields their merged timeline.
+
+    Every channel is submitted to a bounded thread pool up front. Since any channel may hold the
+    newest video, the first entry is yielded once every channel has been fetched; the following
+    entries are then merged without further waiting. Channels still pending when the caller
+    stops iterating are cancelled.
+
+    Args:
+        urls (Iterable[str]): The YouTube channel URLs.
+        limit (int, optional): The maximum number of entries overall. Defaults to None.
+        max_workers (int, optional): The global concurrency limit. Defaults to 16.
+        per_host_limit (int, optional): The per-host concurrency limit. Defaults to 8.
+        session (requests.Session, optional): The shared HTTP session. Defaults to a new
+            session with a connection pool sized to `max_workers`.
+        cache (ChannelIdCache, optional): The channel ID cache. Defaults to None.
+        feed_cache (FeedCache, optional): The conditional GET feed cache. Defaults to None.
+        video_index (VideoIndex, optional): The index of seen videos; if given, only videos
+            not seen before are kept, and the yielded ones are recorded. Defaults to None.
+        engine (str, optional): The channel ID extraction engine. Defaults to "regex".
+        video_filter (VideoFilter, optional): The compiled video filter. Defaults to None.
+        title_index (TitleIndex, optional): The title index the fetched entries are added to.
+            Defaults to None.
+        parse_pool (ParsePool, optional): The worker processes the channel pages and feeds are
+            parsed in. Defaults to None.
+
+    Yields:
+        VideoEntry: The entries of every channel, newest first.
+    """
+    session = session if session is not None else create_session(max_workers)
+    limiter = HostLimiter(per_host_limit)
+    coalescer = ChannelCoalescer()
+    per_channel = FEED_ENTRIES if limit is None else min(limit, FEED_ENTRIES)
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(
+                _channel_entries,
+                url,
+                session,
+                limiter,
+                coalescer,
+                cache,
+                feed_cache,
+                video_index,
+                engine,
+                per_channel,
+                video_filter,
+                title_index,
+                parse_pool,
+            )
+            for url in dict.fromkeys(urls)
+        ]
+        channel_ids: dict[str, str] = {}
+        timelines = (_future_entries(future, channel_ids) for future in futures)
+        for entry in merge_timelines(timelines, limit):
+            if video_index is not None:
+                # Only the emitted entries are recorded, not those beyond the limit
+                video_index.record(channel_ids[entry.video_id], entry)
+            yield entry
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def format_timeline_entry(entry: VideoEntry) -> str:
+    """
+    Formats a timeline entry for printing.
+
+    Args:
+        entry (VideoEntry): The video entry.
+
+    Returns:
+        str: The formatted entry.
+    """
+    return (
+        f"Published: {entry.published}\n"
+        f"Channel: {entry.author}\n"
+        f"Title: {entry.title}\n"
+        f"Link: {entry.link}\n"
+    )
@@ -0,0 +1,307 @@
+"""
+Persistent inverted index of video titles, for keyword search across every fetched feed.
+
+Every video entry added to the index is stored once, by its YouTube video ID, and its title
+(and description, if the entry has one) is split into lowercased word tokens. Each token is
+recorded in a postings table keyed on (token, published, video), so the postings of a token are
+read newest first from one B-tree range, and a date-bounded lookup is a narrower range of it.
+Queries therefore stream their matches newest first and stop as soon as the requested number
+has been found, instead of collecting and sorting every match:
+
+- a single term reads the first postings of its token;
+- 'any' queries merge the postings of their terms newest first;
+- 'all' queries read the postings of their rarest term and check the other terms with point
+  lookups of the postings key.
+
+A term ending with '*' matches the MAX_PREFIX_TOKENS most frequent indexed words starting with
+it. Token frequencies are kept in a separate table, so that picking the rarest term costs one
+lookup per term. This keeps queries in the milliseconds over millions of entries.
+
+Entries are added incrementally as feeds are fetched; re-adding a known video only updates its
+postings if its title changed. Dates are compared in each entry's own UTC offset, as in the
+filters module.
+
+The index is a SQLite database in the user cache directory, in write-ahead logging mode so that
+adding a feed does not wait for a full sync of the database.
+
+Functions:
+    tokenize(text): Splits text into lowercased word tokens.
+
+Classes:
+    TitleIndex: SQLite backed inverted index of video titles.
+"""
+
+import heapq
+import re
+from collections.abc import Iterable, Iterator
+from datetime import date, timedelta
+from itertools import islice
+
+from main import VideoEntry
+from sqlite_store import SQLiteStore
+
+DEFAULT_SEARCH_LIMIT = 20
+
+# Maximum number of indexed words a prefix term matches.
+MAX_PREFIX_TOKENS = 256
+
+# Maximum number of videos looked up per query, below SQLite's limit of 999 variables in
+# versions before 3.32.
+MAX_QUERY_VARIABLES = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_QUERY_TERM_PATTERN = re.compile(r"\w+\*?")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits text into lowercased word tokens.
+
+    Args:
+        text (str): The text, e.g. a video title.
+
+    Returns:
+        list[str]: The distinct tokens, in order of first occurrence.
+    """
+    return list(dict.fromkeys(_TOKEN_PATTERN.findall(text.casefold())))
+
+
+def _parse_date(value: str | None, option: str) -> date | None:
+    """Validates an optional 'YYYY-MM-DD' date bound of a search."""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{option} must be a date in YYYY-MM-DD format, got {value!r}") from None
+
+
+def _unique(postings: Iterator[tuple[str, int]]) -> Iterator[tuple[str, int]]:
+    """Drops repeated postings from a sorted stream of postings."""
+    previous = None
+    for posting in postings:
+        if posting != previous:
+            previous = posting
+            yield posting
+
+
+class TitleIndex(SQLiteStore):
+    """
+    SQLite backed inverted index of video titles.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'titles.sqlite3' in the user
+            cache directory.
+    """
+
+    FILENAME = "titles.sqlite3"
+    PRAGMAS = ("PRAGMA journal_mode = WAL", "PRAGMA synchronous = NORMAL")
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS videos ("
+        " id INTEGER PRIMARY KEY,"
+        " video_id TEXT NOT NULL UNIQUE,"
+        " channel_id TEXT NOT NULL,"
+        " published TEXT NOT NULL,"
+        " title TEXT NOT NULL,"
+        " link TEXT NOT NULL,"
+        " author TEXT NOT NULL,"
+        " tokens TEXT NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS postings ("
+        " token TEXT NOT NULL,"
+        " published TEXT NOT NULL,"
+        " video INTEGER NOT NULL,"
+        " PRIMARY KEY (token, published, video)) WITHOUT ROWID",
+        "CREATE TABLE IF NOT EXISTS tokens ("
+        " token TEXT PRIMARY KEY,"
+        " count INTEGER NOT NULL) WITHOUT ROWID",
+    )
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM videos").fetchone()
+        return count
+
+    def add(self, channel_id: str, entries: Iterable[VideoEntry]) -> int:
+        """
+        Adds the entries of a channel's feed to the index.
+
+        Entries already indexed with the same title are skipped. The description of entries
+        that have a `description` attribute is indexed together with the title.
+
+        Args:
+            channel_id (str): The YouTube channel ID.
+            entries (Iterable[VideoEntry]): The video entries.
+
+        Returns:
+            int: The number of entries indexed or re-indexed.
+        """
+        indexed = 0
+        with self._lock, self._connection:
+            for entry in entries:
+                row = self._connection.execute(
+                    "SELECT id, title, published, tokens FROM videos WHERE video_id = ?",
+                    (entry.video_id,),
+                ).fetchone()
+                if row is not None and row[1] == entry.title:
+                    continue
+                tokens = tokenize(f"{entry.title} {getattr(entry, 'description', None) or ''}")
+                values = (
+                    channel_id,
+                    entry.published,
+                    entry.title,
+                    entry.link,
+                    entry.author,
+                    " ".join(tokens),
+                )
+                if row is None:
+                    video = self._connection.execute(
+                        "INSERT INTO videos"
+                        " (channel_id, published, title, link, author, tokens, video_id)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (*values, entry.video_id),
+                    ).lastrowid
+                else:
+                    video, _, old_published, old_tokens = row
+                    self._connection.execute(
+                        "UPDATE videos SET channel_id = ?, published = ?, title = ?, link = ?,"
+                        " author = ?, tokens = ? WHERE id = ?",
+                        (*values, video),
+                    )
+                    self._unindex(video, old_published, old_tokens.split())
+                self._connection.executemany(
+                    "INSERT INTO postings (token, published, video) VALUES (?, ?, ?)",
+                    ((token, entry.published, video) for token in tokens),
+                )
+                self._connection.executemany(
+                    "INSERT INTO tokens (token, count) VALUES (?, 1)"
+                    " ON CONFLICT (token) DO UPDATE SET count = count + 1",
+                    ((token,) for token in tokens),
+                )
+                indexed += 1
+        return indexed
+
+    def _unindex(self, video: int, published: str, tokens: list[str]) -> None:
+        """Removes the postings of a video, before it is re-indexed."""
+        self._connection.executemany(
+            "DELETE FROM postings WHERE token = ? AND published = ? AND video = ?",
+            ((token, published, video) for token in tokens),
+        )
+        self._connection.executemany(
+            "UPDATE tokens SET count = count - 1 WHERE token = ?", ((token,) for token in tokens)
+        )
+
+    def _term_tokens(self, term: str) -> tuple[list[str], int]:
+        """
+        Returns the indexed tokens matched by a query term and their total number of postings.
+        """
+        if not term.endswith("*"):
+            row = self._connection.execute(
+                "SELECT count FROM tokens WHERE token = ?", (term,)
+            ).fetchone()
+            return [term], row[0] if row else 0
+        prefix = term[:-1]
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._connection.execute(
+            "SELECT token, count FROM tokens WHERE token >= ? AND token < ? AND count > 0"
+            " ORDER BY count DESC LIMIT ?",
+            (prefix, upper, MAX_PREFIX_TOKENS),
+        ).fetchall()
+        return [token for token, _ in rows], sum(count for _, count in rows)
+
+    def _postings(self, tokens: list[str], bounds: tuple[str, str]) -> Iterator[tuple[str, int]]:
+        """
+        Yields the (published, video) postings of any of the tokens within the date bounds,
+        newest first, reading each token's postings lazily.
+        """
+        cursors = [
+            self._connection.execute(
+                "SELECT published, video FROM postings"
+                " WHERE token = ? AND published >= ? AND published < ?"
+                " ORDER BY published DESC, video DESC",
+                (token, *bounds),
+            )
+            for token in tokens
+        ]
+        return _unique(heapq.merge(*cursors, reverse=True))
+
+    def _contains(self, tokens: list[str], published: str, video: int) -> bool:
+        """Returns whether a video has any of the tokens."""
+        placeholders = ", ".join("?" * len(tokens))
+        row = self._connection.execute(
+            f"SELECT 1 FROM postings WHERE token IN ({placeholders})"
+            " AND published = ? AND video = ? LIMIT 1",
+            (*tokens, published, video),
+        ).fetchone()
+        return row is not None
+
+    def search(
+        self,
+        query: str,
+        match: str = "all",
+        since: str | None = None,
+        until: str | None = None,
+        limit: int | None = DEFAULT_SEARCH_LIMIT,
+    ) -> list[VideoEntry]:
+        """
+        Searches the indexed titles.
+
+        Args:
+            query (str): The search terms, separated by spaces; a term ending with '*' matches
+                every word starting with it, e.g. 'tutor*'.
+            match (str, optional): Whether videos must match 'all' or 'any' of the terms.
+                Defaults to "all".
+            since (str, optional): Only videos published on or after this YYYY-MM-DD date.
+                Defaults to None.
+            until (str, optional): Only videos published on or before this YYYY-MM-DD date.
+                Defaults to None.
+            limit (int, optional): The maximum number of videos returned. Defaults to 20; None
+                returns every match.
+
+        Returns:
+            list[VideoEntry]: The matching videos, newest first.
+
+        Raises:
+            ValueError: If the query has no terms, or `match`, `since` or `until` is invalid.
+        """
+        terms = list(dict.fromkeys(_QUERY_TERM_PATTERN.findall(query.casefold())))
+        if not terms:
+            raise ValueError(f"The search query has no terms: {query!r}")
+        if match not in ("all", "any"):
+            raise ValueError(f"match must be 'all' or 'any', got {match!r}")
+        since_date = _parse_date(since, "since")
+        until_date = _parse_date(until, "until")
+        # Published timestamps start with their date, so the bounds are compared as strings.
+        bounds = (
+            since_date.isoformat() if since_date else "",
+            (until_date + timedelta(days=1)).isoformat() if until_date else "\uffff",
+        )
+
+        with self._lock:
+            term_tokens = sorted(
+                (self._term_tokens(term) for term in terms), key=lambda tokens: tokens[1]
+            )
+            if match == "any":
+                postings = self._postings(
+                    [token for tokens, _ in term_tokens for token in tokens], bounds
+                )
+            else:
+                (driving, _), *others = term_tokens
+                postings = (
+                    (published, video)
+                    for published, video in self._postings(driving, bounds)
+                    if all(self._contains(tokens, published, video) for tokens, _ in others)
+                )
+            found = [video for _, video in islice(postings, limit)]
+            rows = {}
+            # Without a limit the matches can outnumber the variables of a statement.
+            for start in range(0, len(found), MAX_QUERY_VARIABLES):
+                chunk = found[start : start + MAX_QUERY_VARIABLES]
+                rows.update(
+                    (row[0], row[1:])
+                    for row in self._connection.execute(
+                        "SELECT id, video_id, title, published, link, author FROM videos"
+                        f" WHERE id IN ({', '.join('?' * len(chunk))})",
+                        chunk,
+                    )
+                )
+        return [VideoEntry(*rows[video]) for video in found]
@@ -0,0 +1,151 @@
+"""
+Persistent index of the videos seen in RSS feeds, for "new since last run" output.
+
+Every video entry passed through the index is recorded by its YouTube video ID, together with
+its channel ID and publication timestamp. Because RSS feeds list videos newest first, a feed is
+processed in a single pass that stops at the first video already recorded for the channel, or at
+the first video older than the newest recorded one.
+
+The index is a SQLite database in the user cache directory, indexed on (channel_id, published).
+
+Classes:
+    VideoIndex: SQLite backed index of seen video entries.
+"""
+
+import time
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+
+from sqlite_store import SQLiteStore
+
+
+class VideoIndex(SQLiteStore):
+    """
+    SQLite backed index of seen video entries.
+
+    Args:
+        path (str | Path, optional): The database file. Defaults to 'videos.sqlite3' in the user
+            cache directory.
+    """
+
+    FILENAME = "videos.sqlite3"
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS videos ("
+        " video_id TEXT PRIMARY KEY,"
+        " channel_id TEXT NOT NULL,"
+        " published TEXT NOT NULL,"
+        " title TEXT NOT NULL,"
+        " link TEXT NOT NULL,"
+        " recorded_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS videos_channel_published ON videos (channel_id, published)",
+    )
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connection.execute("SELECT COUNT(*) FROM videos").fetchone()
+        return count
+
+    def latest_published(self, channel_id: str) -> str | None:
+        """
+        Returns the publication timestamp of the newest recorded video of a channel.
+
+        Args:
+            channel_id (str): The YouTube channel ID.
+
+        Returns:
+            str: The publication timestamp, or None if no video of the channel was recorded.
+        """
+        with self._lock:
+            (published,) = self._connection.execute(
+                "SELECT MAX(published) FROM videos WHERE channel_id = ?", (channel_id,)
+            ).fetchone()
+        return published
+
+    def record(self, channel_id: str, entry) -> None:
+        """
+        Records a video entry as seen.
+
+        Args:
+            channel_id (str): The YouTube channel ID.
+            entry (VideoEntry): The video entry.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR IGNORE INTO videos"
+                " (video_id, channel_id, published, title, link, recorded_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.video_id, channel_id, entry.published, entry.title, entry.link, time.time()),
+            )
+
+    def iter_new(self, channel_id: str, entries: Iterable) -> Iterator:
+        """
+        Yields the entries of a newest-first feed that were not seen before, recording each one
+        as it is yielded.
+
+        Iteration stops at the first entry that is already recorded, or that is older than the
+        newest recorded video of the channel, since every entry after it is older still. Entries
+        without a valid publication timestamp are only checked against the recorded videos.
+
+        Pass the entries kept by any video filter, so that the videos a filter rejects are not
+        recorded as seen. Because of the cutoff, a rejected video is yielded after a filter
+        change only if it is newer than every recorded video of the channel.
+
+        Args:
+            channel_id (str): The YouTube channel ID.
+            entries (Iterable[VideoEntry]): The video entries of the feed, newest first.
+
+        Yields:
+            VideoEntry: The entries not seen before.
+        """
+        latest = self.latest_published(channel_id)
+        latest_date = _parse_published(latest) if latest else None
+        for entry in entries:
+            if entry.video_id in self:
+                return
+            published = _parse_published(entry.published) if latest_date else None
+            if published is not None and published < latest_date:
+                return
+            self.record(channel_id, entry)
+            yield entry
+
+    def iter_unseen(self, entries: Iterable) -> Iterator:
+        """
+        Yields the entries that are not recorded, without recording them.
+
+        Unlike `iter_new`, every entry is checked: this is meant for callers that emit only
+        some of the new entries, such as a limited timeline, and record those with `record`.
+        The entries left out are yielded again by later calls, even when newer entries of the
+        same channel were emitted.
+
+        Args:
+            entries (Iterable[VideoEntry]): The video entries.
+
+        Yields:
+            VideoEntry: The entries not recorded.
+        """
+        for entry in entries:
+            if entry.video_id not in self:
+                yield entry
+
+
+def _parse_published(published: str) -> datetime | None:
+    """
+    Parses the publication timestamp of a feed entry.
+
+    Args:
+        published (str): The timestamp, e.g. '2023-10-01T00:00:00+00:00'.
+
+    Returns:
+        datetime: The timezone-aware timestamp, or None if it is missing or malformed.
+    """
+    try:
+        return datetime.strptime(published, "%Y-%m-%dT%H:%M:%S%z")
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,308 @@
+"""
+Structured streaming output writers.
+
+Writes channels and videos as structured records instead of the human-readable text output, so
+that downstream tools can consume them without scraping. Every writer writes each record to its
+stream as soon as it is given, and only the document header and footer around the records are
+fixed, so results are streamed as they are produced and never collected into a list first. The
+output file is opened with a large write buffer, so that many small records cost few system
+calls.
+
+Formats:
+    jsonl: One JSON object per video.
+    csv: One row per video, with a header row.
+    atom: A regenerated Atom feed of the videos, in the layout of YouTube channel feeds.
+    opml: An OPML subscription list of the resolved channel RSS feed URLs.
+
+Functions:
+    video_record(entry, channel_id=None, channel_url=None): Converts a video entry into a record.
+    open_output(path): Opens the output file of the writers.
+    create_writer(output_format, stream, title=...): Creates the writer of an output format.
+
+Classes:
+    Writer: Base class of the writers, ignoring every record.
+    JsonLinesWriter: Writes videos as JSON Lines.
+    CsvWriter: Writes videos as CSV rows.
+    AtomWriter: Writes videos as an Atom feed.
+    OpmlWriter: Writes channels as an OPML subscription list.
+"""
+
+import csv
+import json
+import sys
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import TextIO
+from xml.sax.saxutils import escape, quoteattr
+
+from main import VideoEntry
+
+# Size of the write buffer of output files.
+OUTPUT_BUFFER_SIZE = 64 * 1024
+
+ATOM_NAMESPACE = "http://www.w3.org/2005/Atom"
+YOUTUBE_NAMESPACE = "http://www.youtube.com/xml/schemas/2015"
+
+DEFAULT_TITLE = "YouTube channels"
+
+# Fields of the video records, in output order.
+VIDEO_FIELDS = ("channel_id", "channel_url", "video_id", "title", "published", "link", "author")
+
+
+def video_record(
+    entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+) -> dict[str, str | None]:
+    """
+    Converts a video entry into a record with the fields of VIDEO_FIELDS.
+
+    Args:
+        entry (VideoEntry): The video entry, or a feed_entries.LazyEntry decoding the fields of
+            VideoEntry.
+        channel_id (str, optional): The ID of the channel of the video. Defaults to None.
+        channel_url (str, optional): The YouTube URL of the channel. Defaults to None.
+
+    Returns:
+        dict: The video record.
+    """
+    if isinstance(entry, VideoEntry):
+        return {"channel_id": channel_id, "channel_url": channel_url, **entry._asdict()}
+    return {
+        "channel_id": channel_id,
+        "channel_url": channel_url,
+        **{field: getattr(entry, field) for field in VideoEntry._fields},
+    }
+
+
+class Writer:
+    """
+    Base class of the writers, ignoring every record.
+
+    Writers write to a stream they do not own: closing a writer writes the document footer and
+    flushes the stream, but does not close it.
+
+    Args:
+        stream (TextIO): The text stream to write to.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def write_channel(
+        self, url: str, channel_id: str, feed_url: str, title: str | None = None
+    ) -> None:
+        """
+        Writes a resolved channel.
+
+        Args:
+            url (str): The YouTube URL of the channel.
+            channel_id (str): The ID of the channel.
+            feed_url (str): The RSS feed URL of the channel.
+            title (str, optional): The name of the channel. Defaults to None.
+        """
+
+    def write_video(
+        self, entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+    ) -> None:
+        """
+        Writes a video.
+
+        Args:
+            entry (VideoEntry): The video entry.
+            channel_id (str, optional): The ID of the channel of the video. Defaults to None.
+            channel_url (str, optional): The YouTube URL of the channel. Defaults to None.
+        """
+
+    def write_result(self, result) -> None:
+        """
+        Writes the channel and videos of a successful batch result; failed results are skipped.
+
+        Args:
+            result (batch.ChannelResult): The outcome of a channel.
+        """
+        if not result.ok:
+            return
+        entries = result.entries or []
+        title = entries[0].author if entries else None
+        self.write_channel(result.url, result.channel_id, result.feed_url, title)
+        for entry in entries:
+            self.write_video(entry, result.channel_id, result.url)
+
+    def close(self) -> None:
+        """Writes the end of the document and flushes the stream."""
+        self.stream.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JsonLinesWriter(Writer):
+    """Writes videos as JSON Lines, one object with the fields of VIDEO_FIELDS per line."""
+
+    def write_video(
+        self, entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+    ) -> None:
+        record = video_record(entry, channel_id, channel_url)
+        self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class CsvWriter(Writer):
+    """
+    Writes videos as CSV rows with the columns of VIDEO_FIELDS, after a header row. The header
+    is left out when appending to a file that already has rows.
+    """
+
+    def __init__(self, stream: TextIO):
+        super().__init__(stream)
+        self._writer = csv.DictWriter(stream, VIDEO_FIELDS, lineterminator="\n")
+        if not stream.seekable() or stream.tell() == 0:
+            self._writer.writeheader()
+
+    def write_video(
+        self, entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+    ) -> None:
+        self._writer.writerow(video_record(entry, channel_id, channel_url))
+
+
+class AtomWriter(Writer):
+    """
+    Writes videos as an Atom feed in the layout of YouTube channel feeds.
+
+    The feed header is written on creation and every entry as soon as it is given.
+
+    Args:
+        stream (TextIO): The text stream to write to.
+        title (str, optional): The title of the feed. Defaults to "YouTube channels".
+        feed_id (str, optional): The ID of the feed. Defaults to "yt:channels".
+        updated (str, optional): The update timestamp of the feed. Defaults to the current time.
+    """
+
+    def __init__(
+        self,
+        stream: TextIO,
+        title: str = DEFAULT_TITLE,
+        feed_id: str = "yt:channels",
+        updated: str | None = None,
+    ):
+        super().__init__(stream)
+        if updated is None:
+            updated = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        stream.write(
+            "<?xml version='1.0' encoding='utf-8'?>\n"
+            f'<feed xmlns="{ATOM_NAMESPACE}" xmlns:yt="{YOUTUBE_NAMESPACE}">'
+            f"<id>{escape(feed_id)}</id>"
+            f"<title>{escape(title)}</title>"
+            f"<updated>{escape(updated)}</updated>"
+        )
+
+    def write_video(
+        self, entry: VideoEntry, channel_id: str | None = None, channel_url: str | None = None
+    ) -> None:
+        channel = f"<yt:channelId>{escape(channel_id)}</yt:channelId>" if channel_id else ""
+        self.stream.write(
+            "<entry>"
+            f"<id>yt:video:{escape(entry.video_id)}</id>"
+            f"<yt:videoId>{escape(entry.video_id)}</yt:videoId>"
+            f"{channel}"
+            f"<title>{escape(entry.title)}</title>"
+            f'<link rel="alternate" href={quoteattr(entry.link)} />'
+            f"<author><name>{escape(entry.author)}</name></author>"
+            f"<published>{escape(entry.published)}</published>"
+            "</entry>"
+        )
+
+    def close(self) -> None:
+        self.stream.write("</feed>\n")
+        super().close()
+
+
+class OpmlWriter(Writer):
+    """
+    Writes channels as an OPML subscription list of their RSS feed URLs, for import into feed
+    readers. Each channel is written once, however often it is given.
+
+    Args:
+        stream (TextIO): The text stream to write to.
+        title (str, optional): The title of the list. Defaults to "YouTube channels".
+    """
+
+    def __init__(self, stream: TextIO, title: str = DEFAULT_TITLE):
+        super().__init__(stream)
+        self._channel_ids: set[str] = set()
+        created = format_datetime(datetime.now(timezone.utc))
+        stream.write(
+            '<?xml version="1.0" encoding="utf-8"?>\n'
+            '<opml version="2.0">\n'
+            f"<head><title>{escape(title)}</title><dateCreated>{created}</dateCreated></head>\n"
+            "<body>\n"
+        )
+
+    def write_channel(
+        self, url: str, channel_id: str, feed_url: str, title: str | None = None
+    ) -> None:
+        if channel_id in self._channel_ids:
+            return
+        self._channel_ids.add(channel_id)
+        text = quoteattr(title or channel_id)
+        self.stream.write(
+            f'<outline type="rss" text={text} title={text} '
+            f"xmlUrl={quoteattr(feed_url)} htmlUrl={quoteattr(url)} />\n"
+        )
+
+    def close(self) -> None:
+        self.stream.write("</body>\n</opml>\n")
+        super().close()
+
+
+WRITERS = {
+    "jsonl": JsonLinesWriter,
+    "csv": CsvWriter,
+    "atom": AtomWriter,
+    "opml": OpmlWriter,
+}
+
+# Output formats of the command line: the text output, followed by the writers.
+OUTPUT_FORMATS = ("text", *WRITERS)
+
+
+def open_output(path: str | None, append: bool = False) -> TextIO:
+    """
+    Opens the output file of the writers with a large write buffer.
+
+    Args:
+        path (str): The path of the output file, or None or '-' for stdout.
+        append (bool, optional): Whether to append to an existing file, e.g. when resuming an
+            interrupted run. Defaults to False, which truncates it.
+
+    Returns:
+        TextIO: The output stream.
+    """
+    if path is None or path == "-":
+        return sys.stdout
+    mode = "a" if append else "w"
+    return open(path, mode, encoding="utf-8", newline="", buffering=OUTPUT_BUFFER_SIZE)
+
+
+def create_writer(output_format: str, stream: TextIO, title: str = DEFAULT_TITLE) -> Writer:
+    """
+    Creates the writer of an output format.
+
+    Args:
+        output_format (str): The output format, one of WRITERS.
+        stream (TextIO): The text stream to write to.
+        title (str, optional): The title of Atom feeds and OPML lists. Defaults to
+            "YouTube channels".
+
+    Returns:
+        Writer: The writer.
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if output_format in ("atom", "opml"):
+        return WRITERS[output_format](stream, title=title)
+    return WRITERS[output_format](stream)